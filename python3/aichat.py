@@ -5,7 +5,7 @@
 #
 import argparse
 import chardet
-import hashlib
+import contextlib
 import json
 import os
 import queue
@@ -19,6 +19,7 @@ from openai import OpenAI, BadRequestError, APIError, APIConnectionError, RateLi
 from pathlib import Path
 from typing import Dict, List, Any, Union, Optional
 
+from archive_store import get_archive_store
 from config import AIAssistantManager, parse_number_from_readable
 from logger import Logger
 from session import SessionWriter, SessionLoader
@@ -106,6 +107,7 @@ class AIChat:
             from skills.skill_adapter import adapt_legacy_tools
             _skill_registry = SkillRegistry()
             _skill_registry.scan()
+            _skill_registry.watch()
             adapt_legacy_tools(_skill_registry, self._tool)
             _audit = SkillAuditLogger()
             self._skill_executor = SkillExecutor(
@@ -479,14 +481,9 @@ class AIChat:
         """
         if len(long_content) <= 500:
             return long_content
-        archive_dir = self._config.get('archive_dir', '/tmp/zai.archive')
-        os.makedirs(archive_dir, exist_ok=True)
-        rnd_int = random.randint(0, 10000)
-        archive_id = hashlib.md5(f"{time.time()}_{rnd_int}".encode()).hexdigest()[:12]
-        filename = f"{archive_id}.txt"
-        filepath = os.path.join(archive_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(long_content)
+        # 内容寻址：相同内容只写入一次，写盘在后台线程完成
+        filename = get_archive_store(self._config).put_async(
+            long_content, self._session.get_session_id())
         self._has_archives = True
         #return f"‹archive id={archive_id} length={len(long_content)}›\n" + \
         #       f"{long_content[:100]}...{long_content[-100:]}\n" + \
@@ -547,17 +544,9 @@ class AIChat:
             # 内容较短，不需要归档，直接返回简化信息
             return ""
 
-        archive_dir = self._config.get('archive_dir', '/tmp/zai.archive')
-        os.makedirs(archive_dir, exist_ok=True)
-
-        # 生成唯一文件名 (引入随机数和时间戳防冲突)
-        rnd_int = random.randint(0, 10000)
-        archive_id = hashlib.md5(f"{time.time()}_{rnd_int}_{summary_content}".encode()).hexdigest()[:12]
-        filename = f"{archive_id}.txt"
-
-        filepath = os.path.join(archive_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(json_content)
+        # 内容寻址：相同的调用序列只写入一次，写盘在后台线程完成
+        filename = get_archive_store(self._config).put_async(
+            json_content, self._session.get_session_id())
 
         # 计算内容行数
         line_count = len(json_content.split('\n'))
@@ -852,6 +841,11 @@ class AIChat:
         registry = getattr(self, '_skill_registry', None)
         if registry is None:
             return ""
+        # Pick up added/edited/removed skills (no-op unless the dirs changed)
+        try:
+            registry.refresh()
+        except Exception:
+            pass
 
         try:
             from skills.skill_types import SkillOrigin, SkillStatus
@@ -1188,6 +1182,14 @@ class AIChat:
         })
         return True
 
+    def _foreground_llm(self):
+        """Hold back background skill enhancement during a user request."""
+        try:
+            from skills.skill_enhancer import foreground_request
+            return foreground_request()
+        except Exception:
+            return contextlib.nullcontext()
+
     def _generate_response(self, current_round) -> Dict[str,Any]:
         """Generate and process assistant response"""
         if not current_round or not current_round.get("request",{}):
@@ -1439,7 +1441,8 @@ class AIChat:
                     record_lang(request.get("content", ""))
                 except Exception:
                     pass
-                response = self._generate_response(self._cur_round)
+                with self._foreground_llm():
+                    response = self._generate_response(self._cur_round)
             if response:
                 self._cur_round["response"].append(response)
             
@@ -1488,7 +1491,8 @@ class AIChat:
                             tool_returns.get('content', '')
                         )
                     self._cur_round["response"].append(tool_returns)
-                    response = self._generate_response(self._cur_round)
+                    with self._foreground_llm():
+                        response = self._generate_response(self._cur_round)
                 if response:
                     self._cur_round["response"].append(response)
             # 归档当前轮次中较早的大型 tool_calls
@@ -2183,7 +2187,10 @@ class AIChat:
 
     def start(self):
         self._cli.start()
-        self._main_chat_loop()
+        try:
+            self._main_chat_loop()
+        finally:
+            self._tool.close_hooks()
 
     def post_user_input(self, user_input: str) -> bool:
         return self._cli.post_user_input(user_input)
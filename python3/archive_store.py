@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# Zai.Vim - AI Assistant Integration for Vim
+# Copyright (C) 2025-2026 zighouse <zighouse@users.noreply.github.com>
+#
+# Licensed under the MIT License
+#
+"""
+Content-addressed archive store for long chat content.
+
+Layout of the archive directory (default ``/tmp/zai.archive``)::
+
+    <id>.txt          archived content, id = sha256(content)[:12]
+    <id>.idx          line index: uint64 char count + uint64 line starts
+    manifest.jsonl    one {"id", "session", "size", "ts"} line per put
+
+Identical content maps to the same id, so it is written once.  The chat
+thread uses ``put_async``: it only hashes the content and returns the file
+name; the write happens on a background writer thread, and repeated puts of
+an (id, session) pair already seen by this process cost nothing.  Reads of
+an archive whose write is still pending are served from memory.  Page reads
+memory-map the archive and slice it through the line index (``line`` pages)
+or through mapped_file's character checkpoints (``length`` pages); the
+archive is never split or loaded whole.
+
+Eviction removes archives last archived more than ``max_age`` seconds ago,
+then the oldest ones until the directory fits in ``max_bytes``.  Archives
+linked (via the manifest) to a protected session — normally the current
+one — are never evicted.  Appends to the manifest and its rewrite during
+eviction hold an exclusive lock on ``manifest.lock``, so lines appended by
+another process are not lost.  Archives written by older versions have no index
+or manifest entry; their index is built on first read.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+    HAVE_FCNTL = True
+except ImportError:  # Windows: in-process locking only
+    HAVE_FCNTL = False
+
+from mapped_file import open_mapped
+
+DEFAULT_ARCHIVE_DIR = "/tmp/zai.archive"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+# Run eviction after this many puts
+EVICT_EVERY = 100
+# Line indexes kept in memory
+INDEX_CACHE_SIZE = 256
+
+MANIFEST_FILE = "manifest.jsonl"
+MANIFEST_LOCK_FILE = "manifest.lock"
+
+
+def content_id(content: str) -> str:
+    """Archive id of *content*."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+
+
+def _line_index(data: bytes) -> array:
+    """Start offsets of the lines of ``data.split(b'\\n')``."""
+    starts = array("Q", [0])
+    pos = data.find(b"\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = data.find(b"\n", pos + 1)
+    return starts
+
+
+class ArchiveStore:
+    """Archive files under one directory, with dedup, paging and eviction."""
+
+    def __init__(self, archive_dir: str = DEFAULT_ARCHIVE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: float = DEFAULT_MAX_AGE):
+        self.archive_dir = Path(archive_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+        self._puts = 0
+        # id -> (char count, line starts)
+        self._indexes: Dict[str, Tuple[int, array]] = {}
+        # (id, session) pairs already stored by this process
+        self._known: Set[Tuple[str, str]] = set()
+        # id -> content queued for the writer thread
+        self._pending: Dict[str, str] = {}
+        self._write_queue: "queue.Queue[Optional[Tuple[str, str, str]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def archive_id(filename: str) -> str:
+        """Archive id from a reference file name (``<id>.txt``)."""
+        name = os.path.basename(filename)
+        return name[:-4] if name.endswith(".txt") else name
+
+    def path_of(self, archive_id: str) -> Path:
+        return self.archive_dir / f"{archive_id}.txt"
+
+    def _index_path(self, archive_id: str) -> Path:
+        return self.archive_dir / f"{archive_id}.idx"
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def exists(self, archive_id: str) -> bool:
+        return self.path_of(archive_id).is_file()
+
+    def put(self, content: str, session_id: str = "") -> str:
+        """Store *content* and return its file name (``<id>.txt``).
+
+        Nothing is written when an archive with the same content exists;
+        the manifest still records the link to *session_id*.
+        """
+        archive_id = content_id(content)
+        self.write(archive_id, content, session_id)
+        return f"{archive_id}.txt"
+
+    def put_async(self, content: str, session_id: str = "") -> str:
+        """Like put(), but the write happens on the background writer."""
+        archive_id = content_id(content)
+        key = (archive_id, session_id)
+        with self._lock:
+            # Another process may have evicted a known archive: write it again
+            if key in self._known and (archive_id in self._pending
+                                       or self.exists(archive_id)):
+                return f"{archive_id}.txt"
+            self._known.add(key)
+            self._pending.setdefault(archive_id, content)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._background_write, daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+        self._write_queue.put((archive_id, content, session_id))
+        return f"{archive_id}.txt"
+
+    def _background_write(self):
+        """Writer thread: drain the queue, one archive at a time."""
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is None:
+                    break
+                self._write_pending(*item)
+            finally:
+                self._write_queue.task_done()
+
+    def _write_pending(self, archive_id: str, content: str, session_id: str):
+        try:
+            self.write(archive_id, content, session_id)
+        except Exception as e:
+            print(f"[archive] write of {archive_id} failed: {e}", file=sys.stderr)
+            with self._lock:
+                self._known.discard((archive_id, session_id))
+        finally:
+            with self._lock:
+                self._pending.pop(archive_id, None)
+
+    def flush(self):
+        """Block until all queued archives are on disk."""
+        if self._writer is not None and self._writer.is_alive():
+            self._write_queue.join()
+
+    def write(self, archive_id: str, content: str, session_id: str = ""):
+        """Write *content* under a precomputed *archive_id*."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_of(archive_id)
+        data = content.encode("utf-8")
+        if not path.is_file():
+            starts = _line_index(data)
+            self._atomic_write(path, data)
+            self._write_index(archive_id, len(content), starts)
+        self._append_manifest(archive_id, session_id, len(data))
+        with self._lock:
+            self._puts += 1
+            evict = self._puts % EVICT_EVERY == 0
+        if evict:
+            self.evict(protect_sessions={session_id} if session_id else None)
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _write_index(self, archive_id: str, chars: int, starts: array):
+        header = array("Q", [chars])
+        try:
+            self._atomic_write(self._index_path(archive_id),
+                               header.tobytes() + starts.tobytes())
+        except OSError as e:
+            print(f"[archive] cannot write index for {archive_id}: {e}", file=sys.stderr)
+        self._cache_index(archive_id, (chars, starts))
+
+    def _cache_index(self, archive_id: str, index: Tuple[int, array]):
+        with self._lock:
+            if len(self._indexes) >= INDEX_CACHE_SIZE:
+                self._indexes.pop(next(iter(self._indexes)))
+            self._indexes[archive_id] = index
+
+    @contextmanager
+    def _manifest_locked(self):
+        """Serialize manifest updates with other threads and processes."""
+        with self._manifest_lock:
+            lock_fp = None
+            if HAVE_FCNTL:
+                try:
+                    lock_fp = open(self.archive_dir / MANIFEST_LOCK_FILE, "a")
+                    fcntl.flock(lock_fp, fcntl.LOCK_EX)
+                except OSError as e:
+                    print(f"[archive] cannot lock manifest: {e}", file=sys.stderr)
+                    if lock_fp is not None:
+                        lock_fp.close()
+                        lock_fp = None
+            try:
+                yield
+            finally:
+                if lock_fp is not None:
+                    lock_fp.close()
+
+    def _append_manifest(self, archive_id: str, session_id: str, size: int):
+        line = json.dumps({"id": archive_id, "session": session_id,
+                           "size": size, "ts": time.time()})
+        try:
+            with self._manifest_locked():
+                fd = os.open(self.archive_dir / MANIFEST_FILE,
+                             os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, (line + "\n").encode("utf-8"))
+                finally:
+                    os.close(fd)
+        except OSError as e:
+            print(f"[archive] cannot update manifest: {e}", file=sys.stderr)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _pending_content(self, archive_id: str) -> Optional[str]:
+        with self._lock:
+            return self._pending.get(archive_id)
+
+    def _load_index(self, archive_id: str) -> Tuple[int, array]:
+        with self._lock:
+            cached = self._indexes.get(archive_id)
+        if cached is not None:
+            return cached
+        try:
+            raw = self._index_path(archive_id).read_bytes()
+            values = array("Q")
+            values.frombytes(raw)
+            index = (values[0], values[1:])
+        except (OSError, ValueError, IndexError):
+            # Archive from an older version: index it now
+            data = self.path_of(archive_id).read_bytes()
+            index = (len(data.decode("utf-8", "replace")), _line_index(data))
+            self._write_index(archive_id, *index)
+            return index
+        self._cache_index(archive_id, index)
+        return index
+
+    def read_all(self, archive_id: str) -> str:
+        pending = self._pending_content(archive_id)
+        if pending is not None:
+            return pending
+        return self.path_of(archive_id).read_text(encoding="utf-8")
+
+    def char_count(self, archive_id: str) -> int:
+        pending = self._pending_content(archive_id)
+        if pending is not None:
+            return len(pending)
+        return self._load_index(archive_id)[0]
+
+    def line_count(self, archive_id: str) -> int:
+        """Number of lines as counted by ``content.split('\\n')``."""
+        pending = self._pending_content(archive_id)
+        if pending is not None:
+            return pending.count("\n") + 1
+        return len(self._load_index(archive_id)[1])
+
+    def read_lines(self, archive_id: str, start: int, end: int) -> str:
+        """``'\\n'.join(content.split('\\n')[start:end])`` without loading it."""
+        pending = self._pending_content(archive_id)
+        if pending is not None:
+            return "\n".join(pending.split("\n")[start:end])
+        starts = self._load_index(archive_id)[1]
+        end = min(end, len(starts))
+        if start >= end:
+            return ""
+        with open_mapped(self.path_of(archive_id)) as mf:
+            byte_start = starts[start]
+            # Exclude the newline that ends the last requested line
+            byte_end = starts[end] - 1 if end < len(starts) else mf.size
+            return mf.decode(byte_start, byte_end)
+
+    def read_chars(self, archive_id: str, start: int, end: int) -> str:
+        """``content[start:end]`` without loading it."""
+        pending = self._pending_content(archive_id)
+        if pending is not None:
+            return pending[start:end]
+        with open_mapped(self.path_of(archive_id)) as mf:
+            return mf.decode(mf.char_to_byte(start), mf.char_to_byte(end))
+
+    # ------------------------------------------------------------------
+    # Manifest and eviction
+    # ------------------------------------------------------------------
+
+    def _read_manifest(self) -> Dict[str, Dict]:
+        """Aggregate the manifest into {id: {"sessions", "ts"}}."""
+        entries: Dict[str, Dict] = {}
+        try:
+            with open(self.archive_dir / MANIFEST_FILE, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    info = entries.setdefault(rec.get("id", ""), {"sessions": set(), "ts": 0.0})
+                    info["size"] = rec.get("size", 0)
+                    if rec.get("session"):
+                        info["sessions"].add(rec["session"])
+                    info["ts"] = max(info["ts"], rec.get("ts", 0.0))
+        except OSError:
+            pass
+        return entries
+
+    def sessions_of(self, archive_id: str) -> Set[str]:
+        return self._read_manifest().get(archive_id, {}).get("sessions", set())
+
+    def _remove(self, archive_id: str):
+        for path in (self.path_of(archive_id), self._index_path(archive_id)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._indexes.pop(archive_id, None)
+            self._known = {k for k in self._known if k[0] != archive_id}
+
+    def _rewrite_manifest(self, manifest: Dict[str, Dict], keep: Iterable[str]):
+        """Replace the manifest (caller holds ``_manifest_locked``)."""
+        lines = []
+        for archive_id in keep:
+            info = manifest.get(archive_id)
+            if not info:
+                continue
+            sessions = info["sessions"] or {""}
+            for session in sorted(sessions):
+                lines.append(json.dumps({"id": archive_id, "session": session,
+                                         "size": info.get("size", 0), "ts": info["ts"]}))
+        self._atomic_write(self.archive_dir / MANIFEST_FILE,
+                           ("\n".join(lines) + "\n" if lines else "").encode("utf-8"))
+
+    def evict(self, protect_sessions: Optional[Set[str]] = None) -> List[str]:
+        """Apply the age and size bounds; return the evicted archive ids."""
+        if not self.archive_dir.is_dir():
+            return []
+        # Held until the rewrite, so no append can land in between
+        with self._manifest_locked():
+            return self._evict_locked(protect_sessions or set())
+
+    def _evict_locked(self, protect: Set[str]) -> List[str]:
+        manifest = self._read_manifest()
+        now = time.time()
+        archives = []
+        try:
+            for path in self.archive_dir.glob("*.txt"):
+                st = path.stat()
+                archive_id = path.stem
+                info = manifest.get(archive_id, {"sessions": set(), "ts": 0.0})
+                info["size"] = st.st_size
+                manifest.setdefault(archive_id, info)
+                archives.append((max(info["ts"], st.st_mtime), st.st_size, archive_id))
+        except OSError:
+            return []
+
+        archives.sort()
+        total = sum(size for _, size, _ in archives)
+        evicted = []
+        for last_used, size, archive_id in archives:
+            if manifest[archive_id]["sessions"] & protect:
+                continue
+            if now - last_used > self.max_age or total > self.max_bytes:
+                self._remove(archive_id)
+                evicted.append(archive_id)
+                total -= size
+        if evicted:
+            gone = set(evicted)
+            self._rewrite_manifest(manifest, [a for _, _, a in archives if a not in gone])
+        return evicted
+
+
+_stores: Dict[str, ArchiveStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_archive_store(config: Optional[dict] = None) -> ArchiveStore:
+    """Shared store for the ``archive_dir`` of *config*.
+
+    Optional config keys: ``archive_max_bytes``, ``archive_max_age_days``.
+    """
+    config = config or {}
+    archive_dir = config.get("archive_dir", DEFAULT_ARCHIVE_DIR)
+    with _stores_lock:
+        store = _stores.get(archive_dir)
+        if store is None:
+            store = ArchiveStore(
+                archive_dir,
+                max_bytes=int(config.get("archive_max_bytes", DEFAULT_MAX_BYTES)),
+                max_age=float(config.get("archive_max_age_days", 7)) * 24 * 3600,
+            )
+            _stores[archive_dir] = store
+        return store
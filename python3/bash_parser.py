@@ -11,15 +11,23 @@ Decomposes shell command strings into structured semantics:
 command names, arguments, redirects, pipes, operators, env vars, heredocs.
 Used by the permission engine for pre-execution auditing.
 
-Key design: shlex for tokenization (audit layer), /bin/sh -c for execution (execution layer).
-The two layers are intentionally separate.
+Key design: a hand-written single-pass lexer for tokenization (audit layer),
+/bin/sh -c for execution (execution layer).  The two layers are intentionally
+separate.
+
+The lexer (tokenize()) follows shlex's POSIX word rules — quote removal,
+backslash escapes, adjacent quoted parts joined into one word — so word
+values match what shlex.split() produced.  Unlike shlex it also knows shell
+syntax: operators (|, |&, &&, ||, ;, &) and redirections split words even
+without surrounding spaces and are never recognised inside quotes, and
+$(...), `...`, ${...}, <(...) and >(...) are kept as single words with their
+text verbatim.  Every token carries its source span.
 """
 
 import re
-import shlex
 import shutil
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 
 # ---------------------------------------------------------------------------
@@ -105,6 +113,311 @@ SAFE_WRAPPERS = frozenset({
 })
 
 
+# ---------------------------------------------------------------------------
+# Lexer
+# ---------------------------------------------------------------------------
+
+class Token(NamedTuple):
+    """A lexical token with its source span ``original[start:end]``."""
+    kind: str          # 'word' | 'op' (list / pipe operator) | 'redirect'
+    value: str         # word after quote removal, or the operator text
+    start: int
+    end: int
+
+
+class _Unterminated(ValueError):
+    """Unclosed quote or trailing escape — same inputs shlex rejects."""
+
+
+WORD, OP, REDIRECT = 'word', 'op', 'redirect'
+
+# shlex whitespace
+_WHITESPACE = frozenset(' \t\r\n')
+# Runs of characters with no special meaning outside quotes
+_PLAIN_RUN = re.compile(r"[^ \t\r\n'\"\\$`|&;<>]+")
+# Runs of characters with no special meaning inside double quotes
+_DQUOTE_RUN = re.compile(r'[^"\\$`]+')
+# Runs without parens, quotes, escapes or backticks (substitution bodies)
+_PAREN_RUN = re.compile(r"[^()'\"\\`]+")
+_BRACE_RUN = re.compile(r"[^{}'\"\\]+")
+
+# Here-documents / here-strings start a word (the delimiter is glued on,
+# as shlex left it); they are not redirects for _match_redirect().
+_HEREDOC_OPS = ('<<<', '<<-', '<<')
+
+
+def _match_paren(text: str, i: int) -> int:
+    """Index just past the ')' matching the '(' at *i*, or -1."""
+    depth = 0
+    n = len(text)
+    while i < n:
+        m = _PAREN_RUN.match(text, i)
+        if m:
+            i = m.end()
+            continue
+        ch = text[i]
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        elif ch == "'":
+            i = text.find("'", i + 1)
+            if i < 0:
+                return -1
+        elif ch == '"':
+            i = _skip_dquote(text, i + 1)
+            if i < 0:
+                return -1
+            continue
+        elif ch == '\\':
+            i += 1
+        elif ch == '`':
+            i = _match_backtick(text, i)
+            if i < 0:
+                return -1
+            continue
+        i += 1
+    return -1
+
+
+def _match_brace(text: str, i: int) -> int:
+    """Index just past the '}' matching the '{' at *i*, or -1."""
+    depth = 0
+    n = len(text)
+    while i < n:
+        m = _BRACE_RUN.match(text, i)
+        if m:
+            i = m.end()
+            continue
+        ch = text[i]
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        elif ch == "'":
+            i = text.find("'", i + 1)
+            if i < 0:
+                return -1
+        elif ch == '"':
+            i = _skip_dquote(text, i + 1)
+            if i < 0:
+                return -1
+            continue
+        elif ch == '\\':
+            i += 1
+        i += 1
+    return -1
+
+
+def _match_backtick(text: str, i: int) -> int:
+    """Index just past the '`' closing the one at *i*, or -1."""
+    n = len(text)
+    i += 1
+    while i < n:
+        ch = text[i]
+        if ch == '`':
+            return i + 1
+        i += 2 if ch == '\\' else 1
+    return -1
+
+
+def _skip_dquote(text: str, i: int) -> int:
+    """Index just past the '"' closing a string whose body starts at *i*."""
+    n = len(text)
+    while i < n:
+        m = _DQUOTE_RUN.match(text, i)
+        if m:
+            i = m.end()
+            continue
+        ch = text[i]
+        if ch == '"':
+            return i + 1
+        if ch == '\\':
+            i += 2
+        elif ch == '$' and text.startswith('$(', i):
+            end = _match_paren(text, i + 1)
+            i = end if end > 0 else i + 1
+        elif ch == '`':
+            end = _match_backtick(text, i)
+            i = end if end > 0 else i + 1
+        else:
+            i += 1
+    return -1
+
+
+def _scan_substitution(text: str, i: int) -> int:
+    """End of a $(...), ${...}, `...`, <(...) or >(...) starting at *i*, or -1."""
+    ch = text[i]
+    if ch == '`':
+        return _match_backtick(text, i)
+    nxt = text[i + 1:i + 2]
+    if nxt == '(':
+        return _match_paren(text, i + 1)
+    if nxt == '{' and ch == '$':
+        return _match_brace(text, i + 1)
+    return -1
+
+
+def _scan_dquote(text: str, i: int, parts: List[str]) -> int:
+    """Append the body of a double-quoted string starting at *i*; return its end.
+
+    Backslash escapes only '"' and '\\' (shlex POSIX rules); substitutions
+    are copied verbatim so quotes inside them do not end the string.
+    """
+    n = len(text)
+    while i < n:
+        m = _DQUOTE_RUN.match(text, i)
+        if m:
+            parts.append(m.group())
+            i = m.end()
+            continue
+        ch = text[i]
+        if ch == '"':
+            return i + 1
+        if ch == '\\':
+            if i + 1 >= n:
+                break
+            nxt = text[i + 1]
+            parts.append(nxt if nxt in '"\\' else ch + nxt)
+            i += 2
+            continue
+        end = _scan_substitution(text, i)
+        if end > 0:
+            parts.append(text[i:end])
+            i = end
+        else:
+            parts.append(ch)
+            i += 1
+    raise _Unterminated("No closing quotation")
+
+
+def _scan_word(text: str, i: int, parts: List[str]) -> Tuple[int, bool]:
+    """Scan one word starting at *i* into *parts*.
+
+    Returns (end, quoted) — quoted is True if any quoting was seen (a
+    quoted empty string is still a word).
+    """
+    n = len(text)
+    quoted = False
+    while i < n:
+        m = _PLAIN_RUN.match(text, i)
+        if m:
+            parts.append(m.group())
+            i = m.end()
+            continue
+        ch = text[i]
+        if ch in _WHITESPACE or ch in '|&;':
+            break
+        if ch == "'":
+            end = text.find("'", i + 1)
+            if end < 0:
+                raise _Unterminated("No closing quotation")
+            parts.append(text[i + 1:end])
+            quoted = True
+            i = end + 1
+        elif ch == '"':
+            i = _scan_dquote(text, i + 1, parts)
+            quoted = True
+        elif ch == '\\':
+            if i + 1 >= n:
+                raise _Unterminated("No escaped character")
+            parts.append(text[i + 1])
+            quoted = True
+            i += 2
+        else:
+            # $ ` < > — a substitution, else '$' / '`' is literal and
+            # '<' / '>' ends the word (redirection follows)
+            end = _scan_substitution(text, i)
+            if end > 0:
+                parts.append(text[i:end])
+                i = end
+            elif ch in '<>':
+                break
+            else:
+                parts.append(ch)
+                i += 1
+    return i, quoted
+
+
+def _scan_redirect(text: str, i: int) -> int:
+    """End of the redirection operator starting at *i* ('<' or '>')."""
+    if text.startswith(('<>', '>>', '>|'), i):
+        return i + 2
+    if text.startswith(('>&', '<&'), i):
+        j = i + 2
+        n = len(text)
+        if j < n and text[j] == '-':
+            return j + 1
+        while j < n and text[j].isdigit():
+            j += 1
+        return j
+    return i + 1
+
+
+def tokenize(text: str) -> Iterator[Token]:
+    """Split *text* into word, operator and redirect tokens in one pass.
+
+    Raises ValueError on an unclosed quote or a trailing backslash.
+    """
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch in _WHITESPACE:
+            i += 1
+            continue
+        start = i
+
+        if ch == '|':
+            op = '|&' if text.startswith('|&', i) else '||' if text.startswith('||', i) else '|'
+            i += len(op)
+            yield Token(OP, op, start, i)
+            continue
+        if ch == ';':
+            i += 1
+            yield Token(OP, ';', start, i)
+            continue
+        if ch == '&':
+            if text.startswith('&>', i):
+                i += 3 if text.startswith('&>>', i) else 2
+                yield Token(REDIRECT, text[start:i], start, i)
+            else:
+                i += 2 if text.startswith('&&', i) else 1
+                yield Token(OP, text[start:i], start, i)
+            continue
+
+        parts: List[str] = []
+        if ch in '<>' and _scan_substitution(text, i) < 0:
+            if text.startswith(_HEREDOC_OPS, i):
+                op = next(o for o in _HEREDOC_OPS if text.startswith(o, i))
+                parts.append(op)
+                i, _ = _scan_word(text, i + len(op), parts)
+                yield Token(WORD, ''.join(parts), start, i)
+                continue
+            if ch == '>' and text.startswith('>|', i):
+                i += 2  # clobber: same as '>' for auditing
+                yield Token(REDIRECT, '>', start, i)
+                continue
+            i = _scan_redirect(text, i)
+            yield Token(REDIRECT, text[start:i], start, i)
+            continue
+
+        i, quoted = _scan_word(text, i, parts)
+        value = ''.join(parts)
+        # "2>file", "2>&1": an unquoted fd number glued to a redirection
+        if (not quoted and value.isdigit() and value.isascii() and i < n
+                and text[i] in '<>' and not text.startswith(_HEREDOC_OPS, i)
+                and _scan_substitution(text, i) < 0):
+            i = _scan_redirect(text, i)
+            yield Token(REDIRECT, text[start:i], start, i)
+            continue
+        yield Token(WORD, value, start, i)
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -131,24 +444,19 @@ class BashParser:
                 if label not in unsupported:
                     unsupported.append(label)
 
-        # Normalize operator spacing outside quotes so shlex splits them
-        normalized = self._normalize_operator_spacing(original)
-
-        # Tokenize with shlex (handles quoting correctly)
+        # Tokenize in one pass; operators come out as separate tokens
         try:
-            tokens = shlex.split(normalized, posix=True)
+            segments, operators = self._split_tokens(tokenize(original))
         except ValueError:
-            # shlex failed (e.g. unbalanced quotes) — best-effort fallback
-            tokens = self._fallback_split(original)
+            # Unbalanced quotes — best-effort fallback
+            segments, operators = self._split_by_operators(
+                self._fallback_split(original))
 
-        if not tokens:
+        if not segments and not operators:
             return CommandSemantics(
                 commands=[], operators=[], unsupported_features=unsupported, original=original
             )
 
-        # Split tokens by operators into command segments
-        segments, operators = self._split_by_operators(tokens)
-
         commands: List[CommandNode] = []
         for i, seg_tokens in enumerate(segments):
             if not seg_tokens:
@@ -186,6 +494,8 @@ class BashParser:
     def _enrich_substitution_metadata(self, cmd: CommandNode) -> None:
         """Extract substitution metadata from command raw text."""
         raw = cmd.raw
+        if '(' not in raw and '`' not in raw:
+            return
         sources: List[str] = []
         for m in _CMD_SUBST_PATTERN.finditer(raw):
             sources.append(m.group(1).strip())
@@ -201,90 +511,33 @@ class BashParser:
     # Internal: token splitting
     # ------------------------------------------------------------------
 
-    def _normalize_operator_spacing(self, original: str) -> str:
-        """Insert spaces around unquoted, unescaped shell operators.
+    @staticmethod
+    def _split_tokens(tokens: Iterator[Token]) -> Tuple[List[List[str]], List[str]]:
+        """Group lexer tokens into command segments and the operators between them.
 
-        Ensures shlex.split() correctly tokenizes ``;``, ``&&``, ``||``
-        even without surrounding whitespace, while preserving operators
-        inside quotes as literal text.
+        Empty segments (e.g. between two consecutive operators) are dropped,
+        as in _split_by_operators().
         """
-        result: List[str] = []
-        i = 0
-        in_single = False
-        in_double = False
-        escaped = False
-
-        while i < len(original):
-            ch = original[i]
-
-            if escaped:
-                escaped = False
-                result.append(ch)
-                i += 1
-                continue
-
-            # Backslash escaping
-            if ch == '\\' and not in_single:
-                if in_double:
-                    # In double quotes, backslash only escapes: $ ` " \\ newline
-                    if i + 1 < len(original) and original[i + 1] in '$`"\\\n':
-                        escaped = True
-                else:
-                    # Unquoted: backslash escapes next character
-                    escaped = True
-                result.append(ch)
-                i += 1
-                continue
-
-            # Quote state transitions
-            if ch == "'" and not in_double:
-                in_single = not in_single
-                result.append(ch)
-                i += 1
-                continue
-
-            if ch == '"' and not in_single:
-                in_double = not in_double
-                result.append(ch)
-                i += 1
-                continue
-
-            # Inside quotes — everything is literal
-            if in_single or in_double:
-                result.append(ch)
-                i += 1
-                continue
-
-            # Unquoted: check for && or ||
-            if i + 1 < len(original) and original[i:i + 2] in ('&&', '||'):
-                op = original[i:i + 2]
-                if result and result[-1] != ' ':
-                    result.append(' ')
-                result.append(op)
-                i += 2
-                if i < len(original) and original[i] not in (' ', '\t', '\n'):
-                    result.append(' ')
-                continue
-
-            # Unquoted: check for ;
-            if ch == ';':
-                if result and result[-1] != ' ':
-                    result.append(' ')
-                result.append(ch)
-                i += 1
-                if i < len(original) and original[i] not in (' ', '\t', '\n'):
-                    result.append(' ')
-                continue
-
-            result.append(ch)
-            i += 1
-
-        return ''.join(result)
+        segments: List[List[str]] = []
+        operators: List[str] = []
+        current: List[str] = []
+        for tok in tokens:
+            if tok.kind == OP:
+                if current:
+                    segments.append(current)
+                    current = []
+                operators.append(tok.value)
+            else:
+                current.append(tok.value)
+        if current:
+            segments.append(current)
+        return segments, operators
 
     def _split_by_operators(self, tokens: List[str]) -> Tuple[List[List[str]], List[str]]:
         """Split token list into segments at shell operators (|, &&, ||, ;, &).
 
-        Also handles tokens with trailing ; or & without spaces (e.g. 'a;').
+        Used for the whitespace-split fallback only.  Also handles tokens with
+        trailing ; or & without spaces (e.g. 'a;').
         Redirect tokens (>>, 2>, >&, etc.) are kept in segments for _match_redirect().
         """
         segments: List[List[str]] = []
@@ -445,7 +698,7 @@ class BashParser:
         return None
 
     def _fallback_split(self, text: str) -> List[str]:
-        """Best-effort tokenization when shlex fails."""
+        """Best-effort tokenization when the lexer rejects the input."""
         # Simple whitespace split preserving quoted segments loosely
         return text.split()
 
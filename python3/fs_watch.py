@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# Zai.Vim - AI Assistant Integration for Vim
+# Copyright (C) 2025-2026 zighouse <zighouse@users.noreply.github.com>
+#
+# Licensed under the MIT License
+#
+"""
+Shared filesystem watcher.
+
+Registries and caches subscribe to the directories and files they depend on
+instead of stat-ing or checksumming them on every call.  One background
+thread serves every subscriber:
+
+* Linux: inotify through ctypes — one kernel watch per directory, no polling;
+* elsewhere, or when inotify is unavailable: a polling thread that diffs
+  directory stat snapshots every ``POLL_INTERVAL`` seconds.
+
+Callbacks run on the watcher thread.  They should only record what changed
+(set a flag, add a path to a dirty set) and leave the work to the owner's
+next call.  An ``overflow`` event (kernel queue overflow, or a new
+directory that could not be watched) means events were lost: subscribers
+must treat everything they watch as changed.
+
+``sync()`` waits until every change made before the call has been delivered
+to the callbacks (inotify only), so an owner can trust its dirty set before
+answering a query.
+
+Usage::
+
+    handle = get_watcher().watch(skill_dir, on_change, depth=1)
+    if handle is None:
+        ...  # path not watchable: keep polling it the old way
+    get_watcher().unwatch(handle)
+"""
+
+import abc
+import ctypes
+import ctypes.util
+import itertools
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    import fcntl
+    import termios
+    HAVE_FCNTL = True
+except ImportError:  # Windows: polling backend only
+    HAVE_FCNTL = False
+
+# Seconds between polls of the fallback watcher
+POLL_INTERVAL = 1.0
+
+# inotify event masks (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM
+               | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+               | _IN_MOVE_SELF | _IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass(frozen=True)
+class FsEvent:
+    """One change below a watched path."""
+
+    path: str       # changed file or directory ("" for overflow)
+    kind: str       # "created" | "modified" | "deleted" | "overflow"
+
+
+@dataclass
+class _Subscription:
+    root: str                           # watched directory
+    depth: int                          # subdirectory levels below root
+    callback: Callable[[FsEvent], None]
+    names: Optional[FrozenSet[str]]     # only these entries of root (file watches)
+
+    def matches(self, path: str) -> bool:
+        if self.names is not None:
+            return os.path.dirname(path) == self.root and os.path.basename(path) in self.names
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def level(self, path: str) -> int:
+        """Directory levels of *path* below root (0 for root itself)."""
+        if path == self.root:
+            return 0
+        return os.path.relpath(path, self.root).count(os.sep) + 1
+
+    def covers_dir(self, path: str) -> bool:
+        """True if directory *path* lies within this subscription's depth."""
+        if path == self.root:
+            return True
+        if self.names is not None or not path.startswith(self.root + os.sep):
+            return False
+        return self.level(path) <= self.depth
+
+
+class FileWatcher(abc.ABC):
+    """Subscription bookkeeping shared by the inotify and polling backends."""
+
+    backend = "none"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs: Dict[int, _Subscription] = {}
+        self._ids = itertools.count(1)
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def watch(self, path, callback: Callable[[FsEvent], None],
+              depth: int = 0, max_dirs: Optional[int] = None) -> Optional[int]:
+        """Subscribe *callback* to changes of *path*.
+
+        A directory is watched with its entries and, up to *depth* levels,
+        its subdirectories.  A file is watched through its parent directory,
+        so replacing it (editor atomic save) is seen as well.  Returns a
+        handle for unwatch(), or None if the path cannot be watched.
+
+        With *max_dirs* the watch is all or nothing: None is returned when
+        the tree has more than *max_dirs* directories or any of them cannot
+        be watched, so the caller never relies on a partial watch.
+        """
+        path = os.path.abspath(os.fspath(path))
+        if os.path.isdir(path):
+            sub = _Subscription(path, max(depth, 0), callback, None)
+        else:
+            parent = os.path.dirname(path)
+            if not os.path.isdir(parent):
+                return None
+            sub = _Subscription(parent, 0, callback, frozenset([os.path.basename(path)]))
+
+        with self._lock:
+            if max_dirs is not None:
+                dirs = self._tree_dirs(sub.root, sub.depth, max_dirs)
+                if dirs is None or not all(self._add_dir(d) for d in dirs):
+                    return None
+            elif not self._add_tree(sub.root, sub.depth):
+                return None
+            handle = next(self._ids)
+            self._subs[handle] = sub
+            self._start()
+        return handle
+
+    def unwatch(self, handle: Optional[int]) -> None:
+        """Drop a subscription (kernel watches are kept for reuse)."""
+        if handle is None:
+            return
+        with self._lock:
+            self._subs.pop(handle, None)
+
+    def sync(self, timeout: float = 1.0) -> bool:
+        """Wait until changes made before the call reached the callbacks.
+
+        Returns False if that cannot be guaranteed within *timeout* seconds;
+        backends without kernel notification always return False.
+        """
+        return False
+
+    # ------------------------------------------------------------------
+    # Backend hooks
+    # ------------------------------------------------------------------
+
+    @abc.abstractmethod
+    def _add_dir(self, path: str) -> bool:
+        """Start watching directory *path* (lock held); False if impossible."""
+
+    @abc.abstractmethod
+    def _run(self) -> None:
+        """Watcher thread body: deliver changes through _emit."""
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fs-watch",
+                                            daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _subdirs(path: str) -> List[str]:
+        try:
+            with os.scandir(path) as it:
+                return [e.path for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            return []
+
+    def _tree_dirs(self, root: str, depth: int, limit: int) -> Optional[List[str]]:
+        """*root* and its subdirectories down to *depth*, None past *limit*."""
+        dirs: List[str] = []
+        stack = [(root, depth)]
+        while stack:
+            path, left = stack.pop()
+            dirs.append(path)
+            if len(dirs) > limit:
+                return None
+            if left > 0:
+                stack.extend((sub, left - 1) for sub in self._subdirs(path))
+        return dirs
+
+    def _add_tree(self, root: str, depth: int) -> bool:
+        """Watch *root* and its subdirectories down to *depth* (lock held).
+
+        Returns False if *root* cannot be watched.  Subdirectories are added
+        best effort; ``_dir_created`` checks them through ``_tree_dirs``.
+        """
+        if not self._add_dir(root):
+            return False
+        if depth > 0:
+            for sub in self._subdirs(root):
+                self._add_tree(sub, depth - 1)
+        return True
+
+    def _dir_created(self, path: str) -> None:
+        """Extend watches to a new directory inside a subscription."""
+        with self._lock:
+            depths = [s.depth - s.level(path)
+                      for s in self._subs.values() if s.covers_dir(path)]
+            if not depths:
+                return
+            dirs = self._tree_dirs(path, max(depths), sys.maxsize)
+            complete = all([self._add_dir(d) for d in dirs])
+        if not complete:
+            # Changes below the unwatched directories would go unseen
+            self._emit(path, "overflow")
+        # Entries created before the watch existed would otherwise be missed
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    self._emit(entry.path, "created")
+        except OSError:
+            pass
+
+    def _emit(self, path: str, kind: str) -> None:
+        with self._lock:
+            subs = list(self._subs.values())
+        event = FsEvent(path, kind)
+        for sub in subs:
+            if kind == "overflow" or sub.matches(path):
+                try:
+                    sub.callback(event)
+                except Exception as exc:
+                    print(f"[watch][WARN] callback failed for {path}: {exc}",
+                          file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+# inotify backend
+# ---------------------------------------------------------------------------
+
+class InotifyWatcher(FileWatcher):
+    """Kernel-notified watcher (Linux)."""
+
+    backend = "inotify"
+
+    def __init__(self):
+        super().__init__()
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        fd = libc.inotify_init1(_IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._fd = fd
+        self._wd_dirs: Dict[int, str] = {}
+        self._dir_wds: Dict[str, int] = {}
+        # Set while the thread reads and dispatches a batch of events
+        self._busy = False
+        self._idle = threading.Condition()
+        self._failed = False
+
+    def _add_dir(self, path: str) -> bool:
+        if path in self._dir_wds:
+            return True
+        wd = self._add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            print(f"[watch][WARN] cannot watch {path}: {os.strerror(err)}",
+                  file=sys.stderr)
+            return False
+        self._wd_dirs[wd] = path
+        self._dir_wds[path] = wd
+        return True
+
+    def _queued_bytes(self) -> int:
+        buf = fcntl.ioctl(self._fd, termios.FIONREAD, b"\0\0\0\0")
+        return struct.unpack("i", buf)[0]
+
+    def sync(self, timeout: float = 1.0) -> bool:
+        # The kernel queues an event before the changing syscall returns, so
+        # an empty queue and an idle thread mean everything was delivered.
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while True:
+                if self._failed or not HAVE_FCNTL:
+                    return False
+                try:
+                    if not self._busy and self._queued_bytes() == 0:
+                        return True
+                except OSError:
+                    return False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(min(remaining, 0.01))
+
+    def _run(self) -> None:
+        while True:
+            try:
+                select.select([self._fd], [], [])
+                # Mark busy before the read takes the events off the queue
+                with self._idle:
+                    self._busy = True
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                    for path, kind, is_dir in self._decode(data):
+                        if kind == "created" and is_dir:
+                            self._dir_created(path)
+                        self._emit(path, kind)
+                finally:
+                    with self._idle:
+                        self._busy = False
+                        self._idle.notify_all()
+            except InterruptedError:
+                continue
+            except OSError as exc:
+                print(f"[watch][WARN] inotify read failed: {exc}", file=sys.stderr)
+                with self._idle:
+                    self._failed = True
+                return
+
+    def _decode(self, data: bytes) -> List[Tuple[str, str, bool]]:
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                events.append(("", "overflow", False))
+                continue
+            with self._lock:
+                directory = self._wd_dirs.get(wd)
+                if mask & _IN_IGNORED and directory is not None:
+                    # Watch removed by the kernel (directory deleted/unmounted)
+                    del self._wd_dirs[wd]
+                    self._dir_wds.pop(directory, None)
+                    continue
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(raw_name)) if raw_name else directory
+            if mask & (_IN_CREATE | _IN_MOVED_TO):
+                kind = "created"
+            elif mask & (_IN_DELETE | _IN_MOVED_FROM | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                kind = "deleted"
+            else:
+                kind = "modified"
+            events.append((path, kind, bool(mask & _IN_ISDIR)))
+        return events
+
+
+# ---------------------------------------------------------------------------
+# Polling backend
+# ---------------------------------------------------------------------------
+
+class PollingWatcher(FileWatcher):
+    """Portable fallback: diff directory stat snapshots periodically."""
+
+    backend = "poll"
+
+    def __init__(self, interval: float = POLL_INTERVAL):
+        super().__init__()
+        self._interval = interval
+        # directory → {entry name: (inode, mtime_ns, size, is_dir)}
+        self._snapshots: Dict[str, Dict[str, tuple]] = {}
+
+    @staticmethod
+    def _snapshot(path: str) -> Optional[Dict[str, tuple]]:
+        entries = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    entries[entry.name] = (st.st_ino, st.st_mtime_ns, st.st_size,
+                                           entry.is_dir(follow_symlinks=False))
+        except OSError:
+            return None
+        return entries
+
+    def _add_dir(self, path: str) -> bool:
+        if path in self._snapshots:
+            return True
+        snap = self._snapshot(path)
+        if snap is None:
+            return False
+        self._snapshots[path] = snap
+        return True
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self._interval)
+            with self._lock:
+                dirs = list(self._snapshots.items())
+            for directory, old in dirs:
+                new = self._snapshot(directory)
+                if new is None:
+                    with self._lock:
+                        self._snapshots.pop(directory, None)
+                    self._emit(directory, "deleted")
+                    continue
+                with self._lock:
+                    self._snapshots[directory] = new
+                for name in old.keys() - new.keys():
+                    self._emit(os.path.join(directory, name), "deleted")
+                for name, sig in new.items():
+                    path = os.path.join(directory, name)
+                    before = old.get(name)
+                    if before is None:
+                        if sig[3]:
+                            self._dir_created(path)
+                        self._emit(path, "created")
+                    elif before != sig:
+                        self._emit(path, "modified")
+
+
+_watcher: Optional[FileWatcher] = None
+_watcher_lock = threading.Lock()
+
+
+def get_watcher() -> FileWatcher:
+    """Process-wide watcher (inotify where available, polling otherwise)."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            if sys.platform.startswith("linux"):
+                try:
+                    _watcher = InotifyWatcher()
+                except (OSError, AttributeError) as exc:
+                    print(f"[watch][WARN] inotify unavailable ({exc}), polling",
+                          file=sys.stderr)
+            if _watcher is None:
+                _watcher = PollingWatcher()
+        return _watcher
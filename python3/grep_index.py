@@ -0,0 +1,700 @@
+#!/usr/bin/env python3
+# Zai.Vim - AI Assistant Integration for Vim
+# Copyright (C) 2025-2026 zighouse <zighouse@users.noreply.github.com>
+#
+# Licensed under the MIT License
+#
+"""
+Persistent trigram index for repository search.
+
+The index narrows the set of files that ``grep`` / ``search_in_file`` have
+to read.  It never decides a match by itself: every candidate is verified by
+the real matcher, and patterns the index cannot reason about fall back to a
+full scan (``candidate_files`` returns None).
+
+Layout (one SQLite database per sandbox root)::
+
+    <user_dir>/cache/grep_index/<sha1(root)[:16]>.sqlite
+        files(id, path, mtime_ns, size, kind)   -- live files only
+        grams(gram, fids)                       -- posting list as uint32 array
+        meta(key, value)
+
+Trigrams are taken from ASCII-lowercased bytes, so a single index serves both
+case-sensitive and case-insensitive queries.  Files are re-indexed only when
+their (mtime_ns, size) changes.  Queries do not walk the tree: the index
+subscribes to ``fs_watch`` (inotify), waits for pending events before each
+query and re-stats only the paths reported as changed, with a full walk
+every ``REFRESH_TTL`` seconds as a safety net.  Without inotify, or for
+trees with more than ``MAX_WATCHED_DIRS`` directories, every query walks
+the tree.  If pending events cannot be drained the query is a full scan:
+the index never rules out a change it has not indexed.  A changed file gets a fresh id; postings of
+the old id are left behind as garbage (ids are never reused, and dead ids have
+no `files` row) until compaction rewrites the posting lists.
+
+Enable per project in ``.zaivim/project.yaml``::
+
+    - grep_index: true
+"""
+
+import hashlib
+import os
+import stat
+from array import array
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+import fs_watch
+from paths import get_grep_index_dir
+
+# Files larger than this are never trigrammed; they are always candidates.
+MAX_INDEXED_FILE_SIZE = 8 * 1024 * 1024
+# Bytes sniffed for a NUL to classify a file as binary (grep -I heuristic).
+BINARY_SNIFF_SIZE = 8192
+# Above this many candidates the index brings little, so callers full-scan.
+MAX_CANDIDATES = 2000
+# Pending postings kept in memory before they are merged into the database.
+FLUSH_POSTINGS = 4_000_000
+# Compact once dead file ids outnumber live ones (and at least this many).
+COMPACT_MIN_DEAD = 1000
+# Seconds between full walks of a watched tree (safety net for lost events).
+REFRESH_TTL = 300.0
+# Larger trees are walked per query rather than watched (one inotify watch
+# per directory; the default fs.inotify.max_user_watches is 8192 on older
+# kernels and shared with every other process of the user).
+MAX_WATCHED_DIRS = 4096
+# Seconds a query waits for the watcher to deliver pending events.
+SYNC_TIMEOUT = 0.5
+
+_SCHEMA_VERSION = "1"
+
+# files.kind
+KIND_TEXT = 0       # trigrammed
+KIND_LARGE = 1      # too large to trigram, always a candidate
+KIND_BINARY = 2     # skipped by `grep -I`, candidate only for the Python scan
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    kind INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS grams (
+    gram INTEGER PRIMARY KEY,
+    fids BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# ---------------------------------------------------------------------------
+# Trigram extraction
+# ---------------------------------------------------------------------------
+
+def _trigrams(data: bytes) -> Set[int]:
+    """Return the set of trigram codes in *data* (already lowercased)."""
+    if len(data) < 3:
+        return set()
+    return {(a << 16) | (b << 8) | c for a, b, c in set(zip(data, data[1:], data[2:]))}
+
+
+def _literal_trigrams(literals: Iterable[str], ignore_case: bool) -> Set[int]:
+    """Trigram codes that every matching file must contain."""
+    grams: Set[int] = set()
+    for lit in literals:
+        data = lit.encode("utf-8").lower()
+        for gram in _trigrams(data):
+            # Case folding of non-ASCII text is not byte-stable; skip those.
+            if ignore_case and any(
+                (gram >> shift) & 0xFF >= 0x80 for shift in (0, 8, 16)
+            ):
+                continue
+            grams.add(gram)
+    return grams
+
+
+def _bre_literals(pattern: str) -> Optional[List[str]]:
+    """Required literal runs of a grep basic regular expression, or None."""
+    if "\\" in pattern or "[" in pattern:
+        return None
+    runs: List[str] = []
+    current: List[str] = []
+    for ch in pattern:
+        if ch in ".^$":
+            runs.append("".join(current))
+            current = []
+        elif ch == "*":
+            # The preceding character is optional
+            if current:
+                current.pop()
+            runs.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    runs.append("".join(current))
+    return [r for r in runs if r]
+
+
+# GNU ERE bracket expressions Python's parser would read as plain sets.
+_ERE_BRACKET_TOKENS = ("[[:", "[[.", "[[=")
+# Characters whose escape means the character itself in both GNU ERE and
+# Python.  Any other escape (\t, \x41, \w, \<, ...) differs between the two.
+_ERE_ESCAPABLE = frozenset(".[]{}()\\*+?^$|")
+
+
+def _escapes_agree(pattern: str) -> bool:
+    """Whether Python reads every backslash of *pattern* the way GNU ERE does.
+
+    Outside brackets only escaped metacharacters qualify.  Inside a bracket
+    expression ERE takes a backslash literally, which Python does not.
+    """
+    pos, end = 0, len(pattern)
+    in_bracket = False
+    while pos < end:
+        ch = pattern[pos]
+        if in_bracket:
+            if ch == "\\":
+                return False
+            if ch == "]":
+                in_bracket = False
+        elif ch == "[":
+            pos += 1
+            # A leading ']' (after an optional '^') is a member, not the end
+            if pattern[pos:pos + 1] == "^":
+                pos += 1
+            if pattern[pos:pos + 1] == "]":
+                pos += 1
+            in_bracket = True
+            continue
+        elif ch == "\\":
+            if pattern[pos + 1:pos + 2] not in _ERE_ESCAPABLE:
+                return False
+            pos += 2
+            continue
+        pos += 1
+    return True
+
+
+def _regex_literals(pattern: str) -> Optional[Tuple[List[str], bool]]:
+    """Required literal runs of an extended regex plus its inline IGNORECASE.
+
+    Returns None when the pattern cannot be analysed safely.
+    """
+    if any(tok in pattern for tok in _ERE_BRACKET_TOKENS):
+        return None
+    if not _escapes_agree(pattern):
+        return None
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except Exception:
+        return None
+
+    consts = _sre_parse
+    runs: List[str] = []
+
+    def collect(items):
+        current: List[str] = []
+
+        def flush():
+            if current:
+                runs.append("".join(current))
+                current.clear()
+
+        for op, av in items:
+            if op is consts.LITERAL:
+                current.append(chr(av))
+            elif op is consts.AT:
+                continue    # zero-width anchors do not break a run
+            elif op is consts.SUBPATTERN:
+                flush()
+                collect(av[-1])
+            elif op in (consts.MAX_REPEAT, consts.MIN_REPEAT):
+                flush()
+                if av[0] >= 1:
+                    collect(av[2])
+            else:
+                flush()
+        flush()
+
+    try:
+        collect(parsed)
+    except Exception:
+        return None
+    ignore_case = bool(parsed.state.flags & _sre_parse.SRE_FLAG_IGNORECASE)
+    return runs, ignore_case
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+class GrepIndex:
+    """On-disk trigram index for one sandbox root."""
+
+    def __init__(self, root: Path, db_path: Optional[Path] = None):
+        self.root = Path(root).resolve()
+        if db_path is None:
+            digest = hashlib.sha1(str(self.root).encode("utf-8")).hexdigest()[:16]
+            db_path = get_grep_index_dir() / f"{digest}.sqlite"
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=10,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+        self.last_refresh: Dict[str, float] = {}
+        # Snapshot of the files table, valid while meta 'generation' matches
+        self._known: Dict[str, Tuple[int, int, int]] = {}
+        self._known_generation: Optional[str] = None
+        # Change tracking fed by the watcher thread
+        self._watch_lock = threading.Lock()
+        self._watch_handle: Optional[int] = None
+        self._dirty: Set[str] = set()
+        self._full_refresh_at: Optional[float] = None
+        self._rewatch = False
+        self._watch_refused = False
+        self._refresh_lock = threading.Lock()
+
+    def _init_schema(self):
+        conn = self._conn
+        conn.executescript(_SCHEMA)
+        if self._get_meta("version") != _SCHEMA_VERSION:
+            with conn:
+                conn.execute("DELETE FROM files")
+                conn.execute("DELETE FROM grams")
+                conn.execute("DELETE FROM meta")
+            self._set_meta("version", _SCHEMA_VERSION)
+
+    def _get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key: str, value) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, str(value)))
+
+    def _postings(self, gram: int) -> array:
+        row = self._conn.execute(
+            "SELECT fids FROM grams WHERE gram = ?", (gram,)).fetchone()
+        fids = array("I")
+        if row:
+            fids.frombytes(row[0])
+        return fids
+
+    def close(self):
+        fs_watch.get_watcher().unwatch(self._watch_handle)
+        self._watch_handle = None
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Incremental update
+    # ------------------------------------------------------------------
+
+    def _walk(self, top: str = "") -> Dict[str, Tuple[int, int]]:
+        """Return {relative path: (mtime_ns, size)} for regular files.
+
+        Walks the whole tree, or only the subtree *top* (relative path).
+        Symlinks are skipped, matching `grep -r` which does not follow them.
+        """
+        found: Dict[str, Tuple[int, int]] = {}
+        root = str(self.root)
+        skip = len(root) + 1
+        stack = [os.path.join(root, top) if top else root]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            found[entry.path[skip:]] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        return found
+
+    def _scan(self, rels: List[str]) -> Dict[str, Tuple[int, int]]:
+        """Like _walk, limited to the files and subtrees named by *rels*."""
+        found: Dict[str, Tuple[int, int]] = {}
+        for rel in rels:
+            try:
+                st = os.lstat(self.root / rel)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                found.update(self._walk(rel))
+            elif stat.S_ISREG(st.st_mode):
+                found[rel] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def _index_file(self, rel: str, size: int) -> Tuple[int, Set[int]]:
+        """Read one file and return (kind, trigrams)."""
+        if size > MAX_INDEXED_FILE_SIZE:
+            return KIND_LARGE, set()
+        try:
+            with open(self.root / rel, "rb") as f:
+                data = f.read()
+        except OSError:
+            return KIND_LARGE, set()
+        if b"\x00" in data[:BINARY_SNIFF_SIZE]:
+            return KIND_BINARY, set()
+        return KIND_TEXT, _trigrams(data.lower())
+
+    def _flush(self, pending: Dict[int, array]) -> None:
+        """Append pending postings to the stored posting lists."""
+        conn = self._conn
+        for gram, new_fids in pending.items():
+            fids = self._postings(gram)
+            fids.extend(new_fids)
+            conn.execute("INSERT OR REPLACE INTO grams (gram, fids) VALUES (?, ?)",
+                         (gram, fids.tobytes()))
+        pending.clear()
+
+    def _compact(self) -> None:
+        """Drop postings that point at dead file ids."""
+        conn = self._conn
+        live = {row[0] for row in conn.execute("SELECT id FROM files")}
+        rows = conn.execute("SELECT gram, fids FROM grams").fetchall()
+        for gram, blob in rows:
+            fids = array("I")
+            fids.frombytes(blob)
+            kept = array("I", (f for f in fids if f in live))
+            if not kept:
+                conn.execute("DELETE FROM grams WHERE gram = ?", (gram,))
+            elif len(kept) != len(fids):
+                conn.execute("UPDATE grams SET fids = ? WHERE gram = ?",
+                             (kept.tobytes(), gram))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dead', '0')")
+
+    def refresh(self, paths: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Bring the index up to date with the file tree.
+
+        With *paths* (relative to the root) only those files and subtrees are
+        re-examined; otherwise the whole tree is walked.  Only files whose
+        (mtime_ns, size) changed are read.  Returns counters describing the
+        work done.
+        """
+        start = time.perf_counter()
+        if paths is None:
+            scope = None
+            current = self._walk()
+        else:
+            scope = sorted(set(paths))
+            current = self._scan(scope)
+
+        def in_scope(path: str) -> bool:
+            return scope is None or any(
+                path == rel or path.startswith(rel + os.sep) for rel in scope)
+
+        with self._lock:
+            conn = self._conn
+            generation = self._get_meta("generation", "0")
+            if generation != self._known_generation:
+                self._known = {
+                    path: (fid, mtime_ns, size)
+                    for fid, path, mtime_ns, size in conn.execute(
+                        "SELECT id, path, mtime_ns, size FROM files")
+                }
+                self._known_generation = generation
+            known = self._known
+            stale = [fid for path, (fid, mtime_ns, size) in known.items()
+                     if current.get(path) != (mtime_ns, size) and in_scope(path)]
+            changed = [
+                (rel, stamp) for rel, stamp in current.items()
+                if rel not in known or known[rel][1:] != stamp
+            ]
+            if not stale and not changed:
+                self.last_refresh = {
+                    "files": len(current), "indexed": 0, "removed": 0,
+                    "seconds": time.perf_counter() - start,
+                }
+                return self.last_refresh
+            # Force a reload of the snapshot next time, also in other processes
+            self._known_generation = None
+            with conn:
+                for fid in stale:
+                    conn.execute("DELETE FROM files WHERE id = ?", (fid,))
+                pending: Dict[int, array] = {}
+                pending_count = 0
+                for rel, (mtime_ns, size) in changed:
+                    kind, grams = self._index_file(rel, size)
+                    fid = conn.execute(
+                        "INSERT INTO files (path, mtime_ns, size, kind) "
+                        "VALUES (?, ?, ?, ?)", (rel, mtime_ns, size, kind)).lastrowid
+                    for gram in grams:
+                        bucket = pending.get(gram)
+                        if bucket is None:
+                            pending[gram] = bucket = array("I")
+                        bucket.append(fid)
+                    pending_count += len(grams)
+                    if pending_count >= FLUSH_POSTINGS:
+                        self._flush(pending)
+                        pending_count = 0
+                self._flush(pending)
+                dead = int(self._get_meta("dead", "0")) + len(stale)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dead', ?)",
+                             (str(dead),))
+                live = len(current) if scope is None else len(known)
+                if dead >= COMPACT_MIN_DEAD and dead > live:
+                    self._compact()
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) "
+                             "VALUES ('generation', ?)", (str(int(generation) + 1),))
+        self.last_refresh = {
+            "files": len(current),
+            "indexed": len(changed),
+            "removed": sum(1 for path in known
+                           if path not in current and in_scope(path)),
+            "seconds": time.perf_counter() - start,
+        }
+        return self.last_refresh
+
+    def _on_change(self, event: "fs_watch.FsEvent") -> None:
+        """Watcher callback: remember what changed for the next query."""
+        with self._watch_lock:
+            if event.kind == "overflow":
+                # Events were lost: subscribe again and walk everything
+                self._rewatch = True
+                self._full_refresh_at = None
+            elif event.path == str(self.root):
+                self._full_refresh_at = None
+            else:
+                self._dirty.add(os.path.relpath(event.path, self.root))
+
+    def _watch(self) -> bool:
+        """Subscribe to inotify events for the tree; False if unwatched.
+
+        The polling backend is not used: it would stat the whole tree every
+        second, which is what watching is meant to avoid.  Trees with more
+        than ``MAX_WATCHED_DIRS`` directories are not watched either.
+        """
+        watcher = fs_watch.get_watcher()
+        with self._watch_lock:
+            rewatch, self._rewatch = self._rewatch, False
+        if rewatch:
+            watcher.unwatch(self._watch_handle)
+            self._watch_handle = None
+            self._watch_refused = False
+        if self._watch_handle is None and not self._watch_refused:
+            if watcher.backend == "inotify":
+                self._watch_handle = watcher.watch(
+                    self.root, self._on_change, depth=sys.maxsize,
+                    max_dirs=MAX_WATCHED_DIRS)
+            # Do not rescan the directories on every query
+            self._watch_refused = self._watch_handle is None
+        return self._watch_handle is not None
+
+    def ensure_current(self) -> bool:
+        """Bring the index up to date before a query.
+
+        A watched tree waits for the watcher to deliver pending events, then
+        re-stats the reported paths; it is walked in full every
+        ``REFRESH_TTL`` seconds and after lost events.  An unwatched tree is
+        walked in full.  Returns False when the index cannot be shown to be
+        current, in which case the caller must scan everything.
+        """
+        with self._refresh_lock:
+            watched = self._watch()
+            if watched and not fs_watch.get_watcher().sync(SYNC_TIMEOUT):
+                return False
+            now = time.monotonic()
+            with self._watch_lock:
+                last = self._full_refresh_at
+                full = not watched or last is None or now - last >= REFRESH_TTL
+                dirty, self._dirty = self._dirty, set()
+                if full:
+                    self._full_refresh_at = now
+            try:
+                if full:
+                    self.refresh()
+                elif dirty:
+                    self.refresh(dirty)
+            except Exception:
+                with self._watch_lock:
+                    self._full_refresh_at = None
+                raise
+            return True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _files_with_all(self, grams: Set[int]) -> Set[int]:
+        postings = sorted((self._postings(g) for g in grams), key=len)
+        result: Optional[Set[int]] = None
+        for fids in postings:
+            # Intersect smallest posting lists first
+            result = set(fids) if result is None else result.intersection(fids)
+            if not result:
+                return set()
+        return result or set()
+
+    def query(self, grams: Set[int], prefix: str = "", recursive: bool = True,
+              include_binary: bool = False) -> List[str]:
+        """Return relative paths under *prefix* that may contain all *grams*."""
+        with self._lock:
+            fids = list(self._files_with_all(grams))
+            rows = []
+            for i in range(0, len(fids), 500):
+                chunk = fids[i:i + 500]
+                rows.extend(self._conn.execute(
+                    "SELECT path FROM files WHERE id IN (%s)"
+                    % ",".join("?" * len(chunk)), chunk))
+            kinds = (KIND_LARGE, KIND_BINARY) if include_binary else (KIND_LARGE,)
+            rows.extend(self._conn.execute(
+                "SELECT path FROM files WHERE kind IN (%s)"
+                % ",".join("?" * len(kinds)), kinds))
+        out = []
+        for (path,) in rows:
+            if prefix:
+                if not path.startswith(prefix + os.sep):
+                    continue
+                rest = path[len(prefix) + 1:]
+            else:
+                rest = path
+            if not recursive and os.sep in rest:
+                continue
+            out.append(path)
+        out.sort()
+        return out
+
+    def may_contain(self, rel: str, stamp: Tuple[int, int], grams: Set[int]) -> bool:
+        """Whether *rel* may contain all *grams*.
+
+        Answers True unless the file is indexed with the same (mtime_ns, size)
+        as *stamp* and a required trigram is missing from it.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, mtime_ns, size FROM files WHERE path = ?",
+                (rel,)).fetchone()
+            if row is None or row[1] != KIND_TEXT or tuple(row[2:]) != stamp:
+                return True
+            fid = row[0]
+            return all(fid in self._postings(gram) for gram in grams)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            postings = sum(
+                len(blob) // 4 for (blob,) in self._conn.execute("SELECT fids FROM grams"))
+        size = 0
+        for suffix in ("", "-wal", "-shm"):
+            p = Path(str(self.db_path) + suffix)
+            if p.exists():
+                size += p.stat().st_size
+        return {"files": files, "postings": postings, "bytes": size}
+
+
+# ---------------------------------------------------------------------------
+# Module-level helpers used by the tools
+# ---------------------------------------------------------------------------
+
+_indexes: Dict[str, GrepIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    """Whether the project opted in via `grep_index: true`."""
+    try:
+        from toolcommon import get_project_config
+        config = get_project_config()
+    except Exception:
+        return False
+    return bool(config and config.get("grep_index"))
+
+
+def get_index(root: Path) -> GrepIndex:
+    key = str(Path(root).resolve())
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = GrepIndex(Path(key))
+            _indexes[key] = index
+        return index
+
+
+def pattern_trigrams(pattern: str, use_regex: bool, case_sensitive: bool,
+                     basic_regex: bool = False) -> Optional[Set[int]]:
+    """Trigrams required by a grep pattern, or None to force a full scan.
+
+    Args:
+        use_regex: pattern is an extended regex (`grep -E`)
+        basic_regex: pattern is a basic regex (plain `grep` without -E/-F)
+    """
+    if not pattern or "\n" in pattern:
+        return None
+    ignore_case = not case_sensitive
+    if use_regex:
+        analysed = _regex_literals(pattern)
+        if analysed is None:
+            return None
+        literals, inline_icase = analysed
+        ignore_case = ignore_case or inline_icase
+    elif basic_regex:
+        literals = _bre_literals(pattern)
+        if literals is None:
+            return None
+    else:
+        literals = [pattern]
+    grams = _literal_trigrams(literals, ignore_case)
+    return grams or None
+
+
+def candidate_files(root: Path, search_root: Path, pattern: str,
+                    use_regex: bool, case_sensitive: bool, recursive: bool = True,
+                    basic_regex: bool = False,
+                    include_binary: bool = False) -> Optional[List[str]]:
+    """Paths (relative to *root*) that may match, or None to full-scan."""
+    grams = pattern_trigrams(pattern, use_regex, case_sensitive, basic_regex)
+    if grams is None:
+        return None
+    index = get_index(root)
+    if not index.ensure_current():
+        return None
+    prefix = os.path.relpath(search_root, index.root)
+    prefix = "" if prefix == "." else prefix
+    candidates = index.query(grams, prefix, recursive, include_binary)
+    if len(candidates) > MAX_CANDIDATES:
+        return None
+    return candidates
+
+
+def file_may_match(root: Path, target: Path, pattern: str, use_regex: bool,
+                   case_sensitive: bool) -> bool:
+    """False only when the index proves *target* cannot contain *pattern*."""
+    grams = pattern_trigrams(pattern, use_regex, case_sensitive)
+    if grams is None:
+        return True
+    index = get_index(root)
+    rel = os.path.relpath(target, index.root)
+    if rel.startswith(".."):
+        return True
+    try:
+        st = target.stat()
+    except OSError:
+        return True
+    return index.may_contain(rel, (st.st_mtime_ns, st.st_size), grams)
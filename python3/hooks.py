@@ -10,19 +10,32 @@ Tool Hook System for zai.vim
 Provides pre/post tool execution hooks with:
 - Event types: PreToolUse, PostToolUse, PostToolUseFailure
 - Hook types: command (shell), prompt (LLM), python (callable)
-- Matcher-based filtering by tool name patterns
+- Matcher-based filtering by tool name patterns, compiled once per
+  configuration and resolved to a cached tool-name → hook-list map
 - Timeout and blocking semantics
+- Persistent command hooks: one long-running process per hook, fed one
+  JSON line per event on stdin and answering with one JSON line
+- Async PostToolUse / PostToolUseFailure hooks that run on a background
+  worker instead of stalling the tool call; managers are closed (async
+  hooks drained, persistent processes stopped) on reload and at exit,
+  killing hooks that outlive their timeout
 - Configuration via YAML/JSON
 """
 
+import atexit
 import fnmatch
 import json
 import os
+import queue
+import re
+import signal
 import subprocess
 import sys
 import threading
+import time
+import weakref
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 try:
     import yaml
@@ -30,6 +43,9 @@ try:
 except ImportError:
     HAVE_YAML = False
 
+# Seconds close() waits for async hooks beyond the longest async hook timeout
+ASYNC_CLOSE_GRACE = 2.0
+
 
 # ---------------------------------------------------------------------------
 # Hook data classes
@@ -89,6 +105,44 @@ class HookContext:
             env["ZAI_TOOL_ERROR"] = self.tool_error
         return env
 
+    def to_request(self) -> Dict[str, Any]:
+        """Convert to the JSON request sent to persistent hooks."""
+        request = {
+            "event": self.event,
+            "tool_name": self.tool_name,
+            "tool_input": self.tool_input,
+        }
+        if self.tool_output is not None:
+            request["tool_output"] = self.tool_output
+        if self.tool_error:
+            request["tool_error"] = self.tool_error
+        return request
+
+
+# $ZAI_* placeholders (and $ARGUMENTS) substituted into command / prompt text
+_PLACEHOLDER_RE = re.compile(
+    r"\$(ARGUMENTS|ZAI_HOOK_EVENT|ZAI_TOOL_NAME|ZAI_TOOL_INPUT|ZAI_TOOL_OUTPUT|ZAI_TOOL_ERROR)"
+)
+
+
+def _substitute(text: str, env: Dict[str, str], arguments: Optional[str] = None) -> str:
+    """Replace placeholders in one pass; unknown or absent ones are kept."""
+    if "$" not in text:
+        return text
+
+    def repl(m):
+        key = m.group(1)
+        if key == "ARGUMENTS":
+            return m.group(0) if arguments is None else arguments
+        return env.get(key, m.group(0))
+
+    return _PLACEHOLDER_RE.sub(repl, text)
+
+
+def _compile_pattern(pattern: str):
+    """Compile an fnmatch pattern (same semantics as fnmatch.fnmatch)."""
+    return re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+
 
 # ---------------------------------------------------------------------------
 # Hook definition
@@ -106,6 +160,8 @@ class HookDef:
         status_message: str = "",
         condition: str = "",      # matcher pattern for conditional execution
         blocking: bool = True,    # whether to block on failure
+        persistent: bool = False, # command hook kept running, JSON lines over stdin/stdout
+        run_async: bool = False,  # PostToolUse*: run in background, never block
     ):
         self.hook_type = hook_type
         self.command = command
@@ -115,6 +171,15 @@ class HookDef:
         self.status_message = status_message
         self.condition = condition
         self.blocking = blocking
+        self.persistent = persistent
+        self.run_async = run_async
+        self._condition_match = _compile_pattern(condition) if condition else None
+
+    def applies_to(self, tool_name: str) -> bool:
+        """Check the hook's own ``if`` condition."""
+        return self._condition_match is None or bool(
+            self._condition_match(os.path.normcase(tool_name))
+        )
 
     @classmethod
     def from_dict(cls, d: dict) -> "HookDef":
@@ -127,6 +192,8 @@ class HookDef:
             status_message=d.get("status_message", ""),
             condition=d.get("if", ""),
             blocking=d.get("blocking", True),
+            persistent=d.get("persistent", False),
+            run_async=d.get("async", False),
         )
 
 
@@ -135,18 +202,133 @@ class HookGroup:
     def __init__(self, matcher: str, hooks: List[HookDef]):
         self.matcher = matcher
         self.hooks = hooks
+        self._match = None if matcher == "*" else _compile_pattern(matcher)
 
     def matches(self, tool_name: str) -> bool:
         """Check if this group applies to the given tool name."""
-        if self.matcher == "*":
+        if self._match is None:
             return True
-        return fnmatch.fnmatch(tool_name, self.matcher)
+        return bool(self._match(os.path.normcase(tool_name)))
 
 
 # ---------------------------------------------------------------------------
 # Hook runner
 # ---------------------------------------------------------------------------
 
+class _PersistentHookProcess:
+    """A long-running command hook speaking JSON lines over stdin/stdout.
+
+    Each event is written as one JSON object per line; the process answers
+    with one JSON object per line, using the same keys as python hooks
+    (``continue``, ``stop_reason``, ``updated_input``,
+    ``additional_context``).  Requests are serialized per process.  A
+    process that dies or misses a deadline is killed and restarted on the
+    next event.
+    """
+
+    def __init__(self, command: str):
+        self.command = command
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._replies: "queue.Queue[Optional[str]]" = queue.Queue()
+
+    def _start(self):
+        self._replies = queue.Queue()
+        self._proc = subprocess.Popen(
+            self.command,
+            shell=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+        replies = self._replies
+        proc = self._proc
+
+        def read_stdout():
+            for line in proc.stdout:
+                replies.put(line)
+            replies.put(None)
+
+        def read_stderr():
+            for line in proc.stderr:
+                print(f"[hook] {line.rstrip()}", file=sys.stderr)
+
+        threading.Thread(target=read_stdout, daemon=True).start()
+        threading.Thread(target=read_stderr, daemon=True).start()
+
+    def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send one event, return the decoded reply (raises on failure)."""
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            try:
+                self._proc.stdin.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                self._proc.stdin.flush()
+                deadline = time.monotonic() + timeout
+                while True:
+                    line = self._replies.get(timeout=max(0.0, deadline - time.monotonic()))
+                    if line is None:
+                        raise RuntimeError(f"hook process exited ({self._proc.wait()})")
+                    if line.strip():
+                        break
+                reply = json.loads(line)
+                if not isinstance(reply, dict):
+                    raise ValueError(f"expected a JSON object, got: {line.strip()[:80]}")
+                return reply
+            except queue.Empty:
+                self._kill()
+                raise subprocess.TimeoutExpired(self.command, timeout)
+            except Exception:
+                self._kill()
+                raise
+
+    def abort(self):
+        """Kill the process without waiting for a request in progress."""
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+    def _kill(self):
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+            try:
+                proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                pass
+
+    def close(self):
+        """Close stdin so the process can exit, kill it if it lingers."""
+        with self._lock:
+            proc = self._proc
+            if proc is None:
+                return
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=2)
+                self._proc = None
+            except Exception:
+                self._kill()
+
+
+def _kill_tree(proc: subprocess.Popen):
+    """Kill a command hook together with the children of its shell."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except OSError:
+        pass
+
+
 class HookRunner:
     """Executes hooks for a given event and context."""
 
@@ -157,53 +339,65 @@ class HookRunner:
                     Signature: (prompt: str) -> str
         """
         self._llm_fn = llm_fn
+        self._persistent: Dict[str, _PersistentHookProcess] = {}
+        self._persistent_lock = threading.Lock()
+        # Command hook processes currently running, for kill()
+        self._running: Set[subprocess.Popen] = set()
+        self._running_lock = threading.Lock()
 
     def run_command_hook(self, hook: HookDef, ctx: HookContext) -> HookResult:
         """Execute a shell command hook."""
         result = HookResult(hook_name=hook.command)
 
-        # Build command with variable substitution
-        cmd = hook.command
+        # Build command with variable substitution: $ZAI_TOOL_NAME,
+        # $ZAI_TOOL_INPUT, etc. and $ARGUMENTS (full JSON context)
         env = ctx.to_env_dict()
-        # Substitute $ZAI_TOOL_NAME, $ZAI_TOOL_INPUT, etc.
-        for key, val in env.items():
-            cmd = cmd.replace(f"${key}", val)
-        # Also substitute $ARGUMENTS with full JSON context
-        arguments_json = json.dumps(env, ensure_ascii=False)
-        cmd = cmd.replace("$ARGUMENTS", arguments_json)
+        arguments_json = json.dumps(env, ensure_ascii=False) if "$ARGUMENTS" in hook.command else None
+        cmd = _substitute(hook.command, env, arguments_json)
 
         # Merge environment
-        run_env = dict(os.environ)
-        run_env.update(env)
+        run_env = {**os.environ, **env}
 
         try:
             if hook.status_message:
                 print(f"[hook] {hook.status_message}", file=sys.stderr)
 
-            proc = subprocess.run(
+            proc = subprocess.Popen(
                 cmd,
                 shell=True,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=hook.timeout,
                 env=run_env,
+                start_new_session=True,
             )
+            with self._running_lock:
+                self._running.add(proc)
+            try:
+                stdout, stderr = proc.communicate(timeout=hook.timeout)
+            except subprocess.TimeoutExpired:
+                _kill_tree(proc)
+                proc.communicate()
+                raise
+            finally:
+                with self._running_lock:
+                    self._running.discard(proc)
 
             if proc.returncode == 2:
                 # Exit code 2 = blocking error
                 result.continue_execution = False
-                result.stop_reason = proc.stderr.strip() or f"Hook blocked (exit code 2)"
-                result.error = proc.stderr.strip()
+                result.stop_reason = stderr.strip() or f"Hook blocked (exit code 2)"
+                result.error = stderr.strip()
             elif proc.returncode != 0:
                 # Other non-zero = warning but continue
-                result.error = proc.stderr.strip()
+                result.error = stderr.strip()
                 if hook.blocking:
                     result.continue_execution = False
-                    result.stop_reason = f"Hook failed (exit code {proc.returncode}): {proc.stderr.strip()}"
+                    result.stop_reason = f"Hook failed (exit code {proc.returncode}): {stderr.strip()}"
             else:
                 # Success — capture stdout as additional context
-                if proc.stdout.strip():
-                    result.additional_context = proc.stdout.strip()
+                if stdout.strip():
+                    result.additional_context = stdout.strip()
 
         except subprocess.TimeoutExpired:
             result.continue_execution = False
@@ -227,10 +421,7 @@ class HookRunner:
 
         try:
             # Build prompt with context substitution
-            prompt_text = hook.prompt
-            env = ctx.to_env_dict()
-            for key, val in env.items():
-                prompt_text = prompt_text.replace(f"${key}", val)
+            prompt_text = _substitute(hook.prompt, ctx.to_env_dict())
 
             response = self._llm_fn(prompt_text)
             if response:
@@ -242,6 +433,53 @@ class HookRunner:
 
         return result
 
+    def run_persistent_hook(self, hook: HookDef, ctx: HookContext) -> HookResult:
+        """Execute a persistent command hook (one JSON line in, one out)."""
+        result = HookResult(hook_name=hook.command)
+
+        with self._persistent_lock:
+            process = self._persistent.get(hook.command)
+            if process is None:
+                process = self._persistent[hook.command] = _PersistentHookProcess(hook.command)
+
+        try:
+            if hook.status_message:
+                print(f"[hook] {hook.status_message}", file=sys.stderr)
+            reply = process.request(ctx.to_request(), hook.timeout)
+            result.continue_execution = reply.get("continue", True)
+            result.stop_reason = reply.get("stop_reason", "")
+            result.updated_input = reply.get("updated_input")
+            result.additional_context = reply.get("additional_context", "")
+        except subprocess.TimeoutExpired:
+            result.continue_execution = False
+            result.stop_reason = f"Hook timed out after {hook.timeout}s"
+            result.error = result.stop_reason
+        except Exception as ex:
+            result.error = str(ex)
+            if hook.blocking:
+                result.continue_execution = False
+                result.stop_reason = f"Hook error: {ex}"
+
+        return result
+
+    def close(self):
+        """Stop all persistent hook processes."""
+        with self._persistent_lock:
+            processes, self._persistent = list(self._persistent.values()), {}
+        for process in processes:
+            process.close()
+
+    def kill(self):
+        """Kill running command hooks and persistent hook processes."""
+        with self._running_lock:
+            running = list(self._running)
+        for proc in running:
+            _kill_tree(proc)
+        with self._persistent_lock:
+            processes = list(self._persistent.values())
+        for process in processes:
+            process.abort()
+
     def run_python_hook(self, hook: HookDef, ctx: HookContext) -> HookResult:
         """Execute a Python callable hook."""
         result = HookResult(hook_name=hook.python_callable)
@@ -285,11 +523,12 @@ class HookRunner:
     def run_hook(self, hook: HookDef, ctx: HookContext) -> HookResult:
         """Run a single hook based on its type."""
         # Check condition
-        if hook.condition:
-            if not fnmatch.fnmatch(ctx.tool_name, hook.condition):
-                return HookResult(hook_name="skipped")
+        if not hook.applies_to(ctx.tool_name):
+            return HookResult(hook_name="skipped")
 
         if hook.hook_type == "command":
+            if hook.persistent:
+                return self.run_persistent_hook(hook, ctx)
             return self.run_command_hook(hook, ctx)
         elif hook.hook_type == "prompt":
             return self.run_prompt_hook(hook, ctx)
@@ -318,6 +557,15 @@ class HookManager:
     def __init__(self, llm_fn: Optional[Callable] = None):
         self._groups: Dict[str, List[HookGroup]] = {}
         self._runner = HookRunner(llm_fn=llm_fn)
+        # event → tool name → matching hooks (matchers and conditions applied)
+        self._resolved: Dict[str, Dict[str, List[HookDef]]] = {}
+        self._resolved_lock = threading.Lock()
+        # Background worker for async PostToolUse hooks
+        self._async_queue: "queue.Queue[Optional[Tuple[HookDef, HookContext]]]" = queue.Queue()
+        self._async_worker: Optional[threading.Thread] = None
+        self._async_pending = 0
+        self._async_idle = threading.Condition()
+        _live_managers.add(self)
 
     @classmethod
     def supported_events(cls) -> List[str]:
@@ -343,10 +591,32 @@ class HookManager:
                         ]
                     }
                 ],
-                "PostToolUse": [...]
+                "PostToolUse": [
+                    {
+                        "matcher": "write_file",
+                        "hooks": [
+                            {
+                                "type": "command",
+                                "command": "python3 lint_server.py",
+                                "persistent": true,  # JSON lines over stdin/stdout
+                                "async": true        # don't wait for the result
+                            }
+                        ]
+                    }
+                ]
             }
         }
+
+        A persistent hook receives ``{"event", "tool_name", "tool_input",
+        "tool_output"?, "tool_error"?}`` per line and must answer one JSON
+        object per line (``continue``, ``stop_reason``, ``updated_input``,
+        ``additional_context``).  ``async`` applies to PostToolUse and
+        PostToolUseFailure only; async hooks cannot block and their output
+        goes to the log.
         """
+        # Drain async hooks and stop persistent processes of the previous
+        # configuration before it is replaced
+        self.close()
         hooks_config = config.get("hooks", {})
         for event_name in self.supported_events():
             event_hooks = hooks_config.get(event_name, [])
@@ -359,6 +629,8 @@ class HookManager:
                 if hook_defs:
                     groups.append(HookGroup(matcher=matcher, hooks=hook_defs))
             self._groups[event_name] = groups
+        with self._resolved_lock:
+            self._resolved = {}
 
     def load_from_file(self, filepath: str) -> bool:
         """Load hook configuration from a YAML or JSON file."""
@@ -391,12 +663,114 @@ class HookManager:
     # ---- Hook execution ----
 
     def get_matching_hooks(self, event: str, tool_name: str) -> List[HookDef]:
-        """Get all hooks that match the given event and tool name."""
-        result = []
-        for group in self._groups.get(event, []):
-            if group.matches(tool_name):
-                result.extend(group.hooks)
-        return result
+        """Get all hooks that match the given event and tool name.
+
+        Hooks whose ``if`` condition excludes the tool are left out.  The
+        list is computed once per (event, tool name) and cached until the
+        configuration is reloaded.
+        """
+        with self._resolved_lock:
+            by_tool = self._resolved.setdefault(event, {})
+            hooks = by_tool.get(tool_name)
+            if hooks is None:
+                hooks = [
+                    hook
+                    for group in self._groups.get(event, [])
+                    if group.matches(tool_name)
+                    for hook in group.hooks
+                    if hook.applies_to(tool_name)
+                ]
+                by_tool[tool_name] = hooks
+            return hooks
+
+    def _run_async(self, hook_def: HookDef, ctx: HookContext):
+        """Queue *hook_def* for the background worker."""
+        with self._async_idle:
+            if self._async_worker is None or not self._async_worker.is_alive():
+                self._async_worker = threading.Thread(
+                    target=self._async_loop, args=(self._async_queue,),
+                    name="hook-async", daemon=True
+                )
+                self._async_worker.start()
+            self._async_pending += 1
+            self._async_queue.put((hook_def, ctx))
+
+    def _async_loop(self, jobs: "queue.Queue"):
+        while True:
+            item = jobs.get()
+            if item is None:
+                return
+            hook_def, ctx = item
+            try:
+                result = self._runner.run_hook(hook_def, ctx)
+                if result.error:
+                    print(f"[hook] async {result.hook_name}: {result.error}", file=sys.stderr)
+                elif result.additional_context:
+                    print(f"[hook] {result.additional_context}", file=sys.stderr)
+            except Exception as ex:
+                print(f"[hook] async hook error: {ex}", file=sys.stderr)
+            finally:
+                with self._async_idle:
+                    # Jobs of an abandoned queue no longer count
+                    if jobs is self._async_queue:
+                        self._async_pending -= 1
+                        self._async_idle.notify_all()
+
+    def wait_async(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued async hooks have run.
+
+        Returns False if some are still pending after *timeout* seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._async_idle:
+            while self._async_pending:
+                if deadline is None:
+                    self._async_idle.wait()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._async_idle.wait(remaining)
+        return True
+
+    def _abandon_async(self) -> int:
+        """Drop queued async hooks and detach the worker; return the count dropped."""
+        with self._async_idle:
+            jobs, self._async_queue = self._async_queue, queue.Queue()
+            self._async_worker = None
+            self._async_pending = 0
+        dropped = 0
+        while True:
+            try:
+                jobs.get_nowait()
+            except queue.Empty:
+                break
+            dropped += 1
+        # Let the old worker exit once its current hook returns
+        jobs.put(None)
+        return dropped
+
+    def close(self):
+        """Wait for async hooks, then stop persistent hook processes.
+
+        The wait is bounded by the longest async hook timeout plus
+        ``ASYNC_CLOSE_GRACE``.  Hook processes still running after that are
+        killed and queued async hooks are dropped, so a hung hook cannot
+        block a reload or exit.
+        """
+        timeouts = [
+            hook.timeout
+            for groups in self._groups.values()
+            for group in groups
+            for hook in group.hooks
+            if hook.run_async
+        ]
+        if not self.wait_async(max(timeouts, default=0) + ASYNC_CLOSE_GRACE):
+            dropped = self._abandon_async()
+            print(f"[hook] async hooks still running at close: killed"
+                  f"{f', {dropped} queued dropped' if dropped else ''}", file=sys.stderr)
+            self._runner.kill()
+        self._runner.close()
 
     def run_pre_tool_hooks(
         self, tool_name: str, tool_input: dict
@@ -442,6 +816,9 @@ class HookManager:
 
         additional = []
         for hook_def in self.get_matching_hooks(self.POST_TOOL_USE, tool_name):
+            if hook_def.run_async:
+                self._run_async(hook_def, ctx)
+                continue
             result = self._runner.run_hook(hook_def, ctx)
             if not result.continue_execution:
                 return False, result.stop_reason
@@ -467,6 +844,9 @@ class HookManager:
 
         additional = []
         for hook_def in self.get_matching_hooks(self.POST_TOOL_USE_FAILURE, tool_name):
+            if hook_def.run_async:
+                self._run_async(hook_def, ctx)
+                continue
             result = self._runner.run_hook(hook_def, ctx)
             if result.additional_context:
                 additional.append(result.additional_context)
@@ -493,5 +873,24 @@ class HookManager:
                 lines.append(f"    matcher: {group.matcher}")
                 for h in group.hooks:
                     desc = h.command or h.prompt or h.python_callable or h.hook_type
+                    flags = [f for f, on in (("persistent", h.persistent), ("async", h.run_async)) if on]
+                    if flags:
+                        desc = f"{desc} [{', '.join(flags)}]"
                     lines.append(f"      - {h.hook_type}: {desc}")
         return "\n".join(lines) if lines else "  (no hooks configured)"
+
+
+# Managers still alive at interpreter exit are closed by _close_all_managers
+_live_managers: "weakref.WeakSet[HookManager]" = weakref.WeakSet()
+
+
+def _close_all_managers():
+    """Close every live HookManager (called by atexit handler)."""
+    for manager in list(_live_managers):
+        try:
+            manager.close()
+        except Exception as ex:
+            print(f"[hook] close failed: {ex}", file=sys.stderr)
+
+
+atexit.register(_close_all_managers)
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# Zai.Vim - AI Assistant Integration for Vim
+# Copyright (C) 2025-2026 zighouse <zighouse@users.noreply.github.com>
+#
+# Licensed under the MIT License
+#
+"""
+Near-linear line diff with streaming output.
+
+``difflib.SequenceMatcher`` is quadratic in the worst case and its
+formatters are usually materialized into a list.  This module diffs
+two sequences of lines the way ``git diff --patience`` does:
+
+* lines are interned to integer ids, so each comparison is an int compare;
+* common prefix and suffix are stripped in linear time;
+* lines that occur exactly once on both sides become anchors; their longest
+  increasing subsequence (O(k log k)) splits the problem, and each gap is
+  diffed recursively;
+* gaps without unique lines fall back to ``SequenceMatcher`` only while they
+  are small (``FALLBACK_MAX_CELLS``); larger ones become a plain replace.
+
+The formatters are generators that produce the same hunks as
+``difflib.unified_diff`` / ``context_diff`` for a given set of opcodes, so
+output can be capped or streamed without holding the whole diff.  The only
+difference is that every yielded line ends in a newline, including the
+last line of a file that lacks one (difflib yields it unterminated).
+
+Usage::
+
+    for line in unified_diff(lines1, lines2, "file1", "file2", n=3):
+        out.write(line)
+"""
+
+import difflib
+from bisect import bisect_left
+from typing import Iterator, List, Sequence, Tuple
+
+# Largest gap (len(a) * len(b)) handed to SequenceMatcher
+FALLBACK_MAX_CELLS = 250_000
+
+Opcode = Tuple[str, int, int, int, int]
+
+
+def _intern(a: Sequence[str], b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    ids = {}
+    ia = [ids.setdefault(line, len(ids)) for line in a]
+    ib = [ids.setdefault(line, len(ids)) for line in b]
+    return ia, ib
+
+
+def _unique_anchors(a: List[int], alo: int, ahi: int,
+                    b: List[int], blo: int, bhi: int) -> List[Tuple[int, int]]:
+    """(i, j) pairs of lines unique on both sides, longest increasing run."""
+    count_a: dict = {}
+    pos_a: dict = {}
+    for i in range(alo, ahi):
+        x = a[i]
+        count_a[x] = count_a.get(x, 0) + 1
+        pos_a[x] = i
+    count_b: dict = {}
+    pos_b: dict = {}
+    for j in range(blo, bhi):
+        x = b[j]
+        count_b[x] = count_b.get(x, 0) + 1
+        pos_b[x] = j
+    pairs = [(pos_a[x], pos_b[x]) for x, c in count_b.items()
+             if c == 1 and count_a.get(x) == 1]
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Patience sorting: longest increasing subsequence of j over i order
+    tails: List[int] = []           # j value at the end of each pile
+    tail_idx: List[int] = []        # index into pairs of that pile's top
+    prev = [-1] * len(pairs)
+    for k, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(k)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = k
+        prev[k] = tail_idx[pos - 1] if pos else -1
+    result = []
+    k = tail_idx[-1]
+    while k != -1:
+        result.append(pairs[k])
+        k = prev[k]
+    result.reverse()
+    return result
+
+
+def _matching_blocks(a: List[int], b: List[int]) -> List[Tuple[int, int, int]]:
+    """Matching (i, j, size) blocks in order, adjacent blocks merged."""
+    blocks: List[Tuple[int, int, int]] = []
+    # Work items in processing order (popped from the end):
+    # ("r", alo, ahi, blo, bhi) region to diff, ("m", i, j, n) emit a match
+    stack: list = [("r", 0, len(a), 0, len(b))]
+    while stack:
+        item = stack.pop()
+        if item[0] == "m":
+            blocks.append(item[1:])
+            continue
+        _, alo, ahi, blo, bhi = item
+
+        # Common prefix
+        start = 0
+        while alo + start < ahi and blo + start < bhi and a[alo + start] == b[blo + start]:
+            start += 1
+        if start:
+            blocks.append((alo, blo, start))
+            alo += start
+            blo += start
+        # Common suffix (emitted after the middle)
+        end = 0
+        while ahi - end > alo and bhi - end > blo and a[ahi - end - 1] == b[bhi - end - 1]:
+            end += 1
+        if end:
+            ahi -= end
+            bhi -= end
+            stack.append(("m", ahi, bhi, end))
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if anchors:
+            items = []
+            i0, j0 = alo, blo
+            for i, j in anchors:
+                items.append(("r", i0, i, j0, j))
+                items.append(("m", i, j, 1))
+                i0, j0 = i + 1, j + 1
+            items.append(("r", i0, ahi, j0, bhi))
+            stack.extend(reversed(items))
+        elif (ahi - alo) * (bhi - blo) <= FALLBACK_MAX_CELLS:
+            sm = difflib.SequenceMatcher(None, a[alo:ahi], b[blo:bhi], autojunk=False)
+            for i, j, n in sm.get_matching_blocks():
+                if n:
+                    blocks.append((alo + i, blo + j, n))
+        # else: no common anchor in a large gap — reported as a replace
+
+    merged: List[Tuple[int, int, int]] = []
+    for i, j, n in blocks:
+        if merged:
+            pi, pj, pn = merged[-1]
+            if pi + pn == i and pj + pn == j:
+                merged[-1] = (pi, pj, pn + n)
+                continue
+        merged.append((i, j, n))
+    return merged
+
+
+def diff_opcodes(a: Sequence[str], b: Sequence[str]) -> List[Opcode]:
+    """Opcodes in ``SequenceMatcher.get_opcodes()`` form."""
+    ia, ib = _intern(a, b)
+    opcodes: List[Opcode] = []
+    i = j = 0
+    for ai, bj, size in _matching_blocks(ia, ib) + [(len(a), len(b), 0)]:
+        if i < ai and j < bj:
+            opcodes.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            opcodes.append(("insert", i, ai, j, bj))
+        if size:
+            opcodes.append(("equal", ai, ai + size, bj, bj + size))
+        i, j = ai + size, bj + size
+    return opcodes
+
+
+def group_opcodes(opcodes: List[Opcode], n: int = 3) -> Iterator[List[Opcode]]:
+    """Hunks with up to *n* lines of context (as SequenceMatcher.get_grouped_opcodes)."""
+    codes = list(opcodes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    nn = n + n
+    group: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        # End the current group and start a new one whenever
+        # there is a large range with no changes.
+        if tag == "equal" and i2 - i1 > nn:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _line(prefix: str, text: str) -> str:
+    # Like difflib, no "\\ No newline at end of file" marker: a last line
+    # without a newline is only terminated so every output line ends in one.
+    if text.endswith("\n"):
+        return prefix + text
+    return prefix + text + "\n"
+
+
+def _range_unified(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _range_context(start: int, stop: int) -> str:
+    beginning = start + 1
+    length = stop - start
+    if not length:
+        beginning -= 1
+    if length <= 1:
+        return f"{beginning}"
+    return f"{beginning},{beginning + length - 1}"
+
+
+def unified_diff(a: Sequence[str], b: Sequence[str], fromfile: str = "",
+                 tofile: str = "", n: int = 3) -> Iterator[str]:
+    """Unified diff lines, each ending in a newline."""
+    started = False
+    for group in group_opcodes(diff_opcodes(a, b), n):
+        if not started:
+            started = True
+            yield f"--- {fromfile}\n"
+            yield f"+++ {tofile}\n"
+        first, last = group[0], group[-1]
+        yield (f"@@ -{_range_unified(first[1], last[2])} "
+               f"+{_range_unified(first[3], last[4])} @@\n")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield _line(" ", line)
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield _line("-", line)
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield _line("+", line)
+
+
+def context_diff(a: Sequence[str], b: Sequence[str], fromfile: str = "",
+                 tofile: str = "", n: int = 3) -> Iterator[str]:
+    """Context diff lines, each ending in a newline."""
+    prefix = {"insert": "+ ", "delete": "- ", "replace": "! ", "equal": "  "}
+    started = False
+    for group in group_opcodes(diff_opcodes(a, b), n):
+        if not started:
+            started = True
+            yield f"*** {fromfile}\n"
+            yield f"--- {tofile}\n"
+        first, last = group[0], group[-1]
+        yield "***************\n"
+        yield f"*** {_range_context(first[1], last[2])} ****\n"
+        if any(tag in ("replace", "delete") for tag, _, _, _, _ in group):
+            for tag, i1, i2, _, _ in group:
+                if tag != "insert":
+                    for line in a[i1:i2]:
+                        yield _line(prefix[tag], line)
+        yield f"--- {_range_context(first[3], last[4])} ----\n"
+        if any(tag in ("replace", "insert") for tag, _, _, _, _ in group):
+            for tag, _, _, j1, j2 in group:
+                if tag != "delete":
+                    for line in b[j1:j2]:
+                        yield _line(prefix[tag], line)
+
+
+def plain_ndiff(a: Sequence[str], b: Sequence[str]) -> Iterator[str]:
+    """``ndiff``-style listing ("  ", "- ", "+ ") without intraline hints."""
+    for tag, i1, i2, j1, j2 in diff_opcodes(a, b):
+        if tag == "equal":
+            for line in a[i1:i2]:
+                yield _line("  ", line)
+            continue
+        for line in a[i1:i2]:
+            yield _line("- ", line)
+        for line in b[j1:j2]:
+            yield _line("+ ", line)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# Zai.Vim - AI Assistant Integration for Vim
+# Copyright (C) 2025-2026 zighouse <zighouse@users.noreply.github.com>
+#
+# Licensed under the MIT License
+#
+"""
+Memory-mapped file reader with cached line and character offset indexes.
+
+File tools use this instead of ``readlines()`` / text-mode ``seek()`` so that
+large files are never loaded as a whole:
+
+* line starts are indexed once, giving O(1) access to any line;
+* character offsets are resolved through per-64 KiB checkpoints, so a jump to
+  a character offset decodes at most one block;
+* indexes are cached per (path, mtime_ns, size) and rebuilt automatically when
+  the file changes.  Only the indexes are cached — the mapping itself is
+  opened and closed per call, so no file handle outlives a tool call.
+* small files can also be read through a shared content cache
+  (``open_cached``), keyed the same way and bounded by total bytes, so a file
+  read by ``read_files`` and then searched or diffed is read from disk once.
+  Writers call ``invalidate`` so an edit within one mtime tick is not missed.
+
+Character offsets count UTF-8 code points of the raw file content (``\\r\\n``
+counts as two characters).  Invalid bytes count as one character each.
+
+Usage::
+
+    with open_mapped(path) as mf:
+        first = mf.line_text(0)
+        start = mf.char_to_byte(1000)
+        text = mf.decode(start, mf.char_to_byte(2000))
+
+    with open_cached(path) as mf:       # same API, content may come from memory
+        data = mf.buf
+"""
+
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Tuple, Union
+
+# Bytes per character checkpoint block
+_BLOCK = 64 * 1024
+# Number of file indexes kept in memory
+_CACHE_SIZE = 32
+# Files larger than this are mapped, never held in the content cache
+CONTENT_MAX_FILE_BYTES = 4 * 1024 * 1024
+# Total bytes of file content kept in memory
+CONTENT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _is_continuation(byte: int) -> bool:
+    return 0x80 <= byte < 0xC0
+
+
+class FileIndex:
+    """Lazily built line / character offset index for one file version."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._line_starts = None
+        # Checkpoint k: block_bytes[k] is a byte offset on a character
+        # boundary, block_chars[k] the number of characters before it.
+        self._block_bytes = array("Q", [0])
+        self._block_chars = array("Q", [0])
+
+    def line_starts(self, buf) -> array:
+        """Byte offsets at which each line starts."""
+        with self._lock:
+            if self._line_starts is None:
+                starts = array("Q")
+                if self.size:
+                    starts.append(0)
+                    pos = buf.find(b"\n")
+                    while pos != -1:
+                        starts.append(pos + 1)
+                        pos = buf.find(b"\n", pos + 1)
+                    # A trailing newline does not open another line
+                    if starts[-1] == self.size:
+                        starts.pop()
+                self._line_starts = starts
+            return self._line_starts
+
+    def _extend_checkpoints(self, buf, char_off: int):
+        blocks, chars = self._block_bytes, self._block_chars
+        while chars[-1] < char_off and blocks[-1] < self.size:
+            start = blocks[-1]
+            end = min(self.size, start + _BLOCK)
+            # Move the boundary forward to the start of a character
+            while end < self.size and end - start < _BLOCK + 4 and _is_continuation(buf[end]):
+                end += 1
+            count = len(bytes(buf[start:end]).decode("utf-8", "surrogateescape"))
+            blocks.append(end)
+            chars.append(chars[-1] + count)
+
+    def char_to_byte(self, buf, char_off: int) -> int:
+        """Byte offset of character *char_off* (clamped to the file size)."""
+        if char_off <= 0:
+            return 0
+        with self._lock:
+            self._extend_checkpoints(buf, char_off)
+            k = bisect_right(self._block_chars, char_off) - 1
+            start = self._block_bytes[k]
+            remaining = char_off - self._block_chars[k]
+            if remaining == 0 or start >= self.size:
+                return start
+            end = self._block_bytes[k + 1] if k + 1 < len(self._block_bytes) else self.size
+        segment = bytes(buf[start:end]).decode("utf-8", "surrogateescape")
+        if remaining >= len(segment):
+            return end
+        return start + len(segment[:remaining].encode("utf-8", "surrogateescape"))
+
+
+_cache: "OrderedDict[Tuple[str, int, int], FileIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_index(path: str, st: os.stat_result) -> FileIndex:
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+        index = FileIndex(st.st_size)
+        _cache[key] = index
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+        return index
+
+
+_content: "OrderedDict[Tuple[str, int, int], bytes]" = OrderedDict()
+_content_bytes = 0
+_content_lock = threading.Lock()
+
+
+def _get_content(key: Tuple[str, int, int]):
+    with _content_lock:
+        data = _content.get(key)
+        if data is not None:
+            _content.move_to_end(key)
+        return data
+
+
+def _put_content(key: Tuple[str, int, int], data: bytes):
+    global _content_bytes
+    with _content_lock:
+        if key in _content:
+            return
+        # Older versions of the same file can never be hit again
+        for old in [k for k in _content if k[0] == key[0]]:
+            _content_bytes -= len(_content.pop(old))
+        _content[key] = data
+        _content_bytes += len(data)
+        while _content_bytes > CONTENT_MAX_BYTES and len(_content) > 1:
+            _, dropped = _content.popitem(last=False)
+            _content_bytes -= len(dropped)
+
+
+def invalidate(path: Union[str, os.PathLike]) -> None:
+    """Drop cached indexes and content for *path* (any version)."""
+    global _content_bytes
+    path = os.path.abspath(path)
+    with _cache_lock:
+        for key in [k for k in _cache if k[0] == path]:
+            del _cache[key]
+    with _content_lock:
+        for key in [k for k in _content if k[0] == path]:
+            _content_bytes -= len(_content.pop(key))
+
+
+def content_stats() -> dict:
+    """Entries and bytes currently held by the content cache."""
+    with _content_lock:
+        return {"entries": len(_content), "bytes": _content_bytes}
+
+
+class MappedFile:
+    """Read-only view of a mapped file plus its cached index."""
+
+    def __init__(self, buf, index: FileIndex):
+        self.buf = buf
+        self.index = index
+        self.size = index.size
+
+    # ---- lines (0-based) ----
+
+    @property
+    def line_count(self) -> int:
+        return len(self.index.line_starts(self.buf))
+
+    def line_span(self, lineno: int) -> Tuple[int, int]:
+        """(start, end) byte offsets of a line, end including its newline."""
+        starts = self.index.line_starts(self.buf)
+        start = starts[lineno]
+        end = starts[lineno + 1] if lineno + 1 < len(starts) else self.size
+        return start, end
+
+    def line_bytes(self, lineno: int) -> bytes:
+        start, end = self.line_span(lineno)
+        return bytes(self.buf[start:end])
+
+    def line_text(self, lineno: int, errors: str = "replace") -> str:
+        return self.line_bytes(lineno).decode("utf-8", errors)
+
+    def iter_lines(self, errors: str = "replace") -> Iterator[Tuple[int, str]]:
+        """Yield (lineno, text) one line at a time."""
+        for lineno in range(self.line_count):
+            yield lineno, self.line_text(lineno, errors)
+
+    def line_of(self, byte_off: int) -> int:
+        """Line number containing byte offset *byte_off*."""
+        return bisect_right(self.index.line_starts(self.buf), byte_off) - 1
+
+    # ---- characters ----
+
+    def char_to_byte(self, char_off: int) -> int:
+        return self.index.char_to_byte(self.buf, char_off)
+
+    def decode(self, start: int = 0, end: int = None, errors: str = "replace") -> str:
+        end = self.size if end is None else end
+        return bytes(self.buf[start:end]).decode("utf-8", errors)
+
+
+@contextmanager
+def open_mapped(path: Union[str, os.PathLike]) -> Iterator[MappedFile]:
+    """Map *path* read-only for the duration of the ``with`` block."""
+    path = os.path.abspath(path)
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        index = _get_index(path, st)
+        if st.st_size == 0:
+            yield MappedFile(b"", index)
+            return
+        buf = mmap.mmap(f.fileno(), st.st_size, access=mmap.ACCESS_READ)
+        try:
+            yield MappedFile(buf, index)
+        finally:
+            buf.close()
+
+
+@contextmanager
+def open_cached(path: Union[str, os.PathLike]) -> Iterator[MappedFile]:
+    """Like ``open_mapped``, reading small files through the content cache.
+
+    ``buf`` is a ``bytes`` object for cached files and an mmap otherwise;
+    both support the slicing and ``find`` used by ``MappedFile`` callers.
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    data = _get_content(key)
+    if data is not None:
+        yield MappedFile(data, _get_index(path, st))
+        return
+    if st.st_size > CONTENT_MAX_FILE_BYTES:
+        with open_mapped(path) as mf:
+            yield mf
+        return
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    key = (path, st.st_mtime_ns, st.st_size)
+    if len(data) == st.st_size:
+        # A file that grew while being read is served but not cached
+        _put_content(key, data)
+        index = _get_index(path, st)
+    else:
+        index = FileIndex(len(data))
+    yield MappedFile(data, index)
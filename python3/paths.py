@@ -124,6 +124,10 @@ def get_cache_dir() -> Path:
     return get_user_dir() / "cache"
 
 
+def get_grep_index_dir() -> Path:
+    return get_cache_dir() / "grep_index"
+
+
 # ---------------------------------------------------------------------------
 # Specific files
 # ---------------------------------------------------------------------------
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# Zai.Vim - AI Assistant Integration for Vim
+# Copyright (C) 2025-2026 zighouse <zighouse@users.noreply.github.com>
+#
+# Licensed under the MIT License
+#
+"""
+Bounded store for oversized tool results.
+
+When a tool result exceeds its ``max_result_size`` the full output is kept in
+``<sandbox>/.tool_outputs/<output_id>.txt`` and only a preview is returned to
+the model, together with the output id.  ``read_tool_output`` pages stored
+outputs back by byte or line offset.
+
+* Non-string results are serialized as indented JSON (``indent=2``) and
+  streamed: chunks are buffered only until the size limit is crossed, then
+  everything is written straight to disk, so a large result is never held
+  as one string.
+* Stored outputs are tracked in an in-memory index (seeded by a single
+  directory scan) and evicted least-recently-used first once their total size
+  exceeds ``max_bytes``.  No glob/stat pass runs per write.
+
+Usage::
+
+    store = get_result_store()
+    text, total_chars, output_id = store.serialize(result, "grep", limit=8000)
+    page = store.read(output_id, offset=0, limit=200, unit="line")
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from mapped_file import invalidate, open_mapped
+from toolcommon import sandbox_home
+
+# Total bytes of stored outputs kept per sandbox
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Characters per chunk when streaming a string result to disk
+_WRITE_CHUNK = 1024 * 1024
+
+_SUFFIX = ".txt"
+
+
+@dataclass
+class OutputPage:
+    """One page read back from a stored output."""
+
+    text: str
+    start: int          # first byte / line of the page
+    end: int            # one past the last byte / line of the page
+    total: int          # total bytes / lines of the output
+    unit: str
+
+
+class ResultStore:
+    """LRU-bounded directory of stored tool outputs."""
+
+    def __init__(self, out_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.out_dir = Path(out_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # id → bytes
+        self._total = 0
+        self._seq = 0
+        self._loaded = False
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Seed the index from outputs left by earlier sessions (once)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        entries = []
+        try:
+            with os.scandir(self.out_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(_SUFFIX):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, entry.name[:-len(_SUFFIX)], st.st_size))
+        except OSError:
+            return
+        for _, output_id, size in sorted(entries):
+            self._index[output_id] = size
+            self._total += size
+
+    def _evict(self, keep: str):
+        """Drop least-recently-used outputs until under ``max_bytes``."""
+        while self._total > self.max_bytes and len(self._index) > 1:
+            output_id, size = next(iter(self._index.items()))
+            if output_id == keep:
+                self._index.move_to_end(output_id)
+                continue
+            del self._index[output_id]
+            self._total -= size
+            path = self.path_of(output_id)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            invalidate(path)
+
+    def _register(self, output_id: str, size: int):
+        with self._lock:
+            self._index[output_id] = size
+            self._total += size
+            self._evict(keep=output_id)
+
+    def _touch(self, output_id: str) -> bool:
+        with self._lock:
+            self._load()
+            if output_id not in self._index:
+                return False
+            self._index.move_to_end(output_id)
+            return True
+
+    def path_of(self, output_id: str) -> Path:
+        return self.out_dir / f"{output_id}{_SUFFIX}"
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            self._load()
+            return self._total
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    def _new_id(self, function_name: str) -> str:
+        with self._lock:
+            # Seed before the new file exists so it is not counted twice
+            self._load()
+            self._seq += 1
+            seq = self._seq
+        return f"{function_name}_{int(time.time() * 1000)}_{seq}"
+
+    def _write(self, function_name: str, chunks: Iterable[str]) -> str:
+        """Stream *chunks* into a new stored output, return its id."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        output_id = self._new_id(function_name)
+        path = self.path_of(output_id)
+        tmp = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8", errors="replace", newline="") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            raise
+        self._register(output_id, size)
+        return output_id
+
+    def store_text(self, function_name: str, text: str) -> str:
+        """Store an already serialized result, return its output id."""
+        return self._write(
+            function_name,
+            (text[i:i + _WRITE_CHUNK] for i in range(0, len(text), _WRITE_CHUNK)),
+        )
+
+    def serialize(self, result: Any, function_name: str,
+                  limit: int) -> Tuple[str, int, Optional[str]]:
+        """Serialize *result*, spilling it to disk if it exceeds *limit*.
+
+        Returns ``(text, total_chars, output_id)``.  ``text`` is the complete
+        serialization when it fits (``output_id`` is None), otherwise its
+        first *limit* characters.
+        """
+        if isinstance(result, str):
+            if len(result) <= limit:
+                return result, len(result), None
+            return result[:limit], len(result), self.store_text(function_name, result)
+
+        chunks = json.JSONEncoder(ensure_ascii=False, indent=2).iterencode(result)
+        head = []
+        head_chars = 0
+        for chunk in chunks:
+            head.append(chunk)
+            head_chars += len(chunk)
+            if head_chars > limit:
+                break
+        else:
+            return "".join(head), head_chars, None
+
+        # Over the limit: keep the preview, stream the rest to disk.
+        preview = "".join(head)[:limit]
+        total = head_chars
+
+        def counted():
+            nonlocal total
+            yield from head
+            for chunk in chunks:
+                total += len(chunk)
+                yield chunk
+
+        output_id = self._write(function_name, counted())
+        return preview, total, output_id
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    def read(self, output_id: str, offset: int = 0, limit: int = 200,
+             unit: str = "line", max_bytes: int = None) -> OutputPage:
+        """Read one page of a stored output.
+
+        ``unit`` is ``"line"`` (0-based line offset / line count) or
+        ``"byte"`` (byte offset / byte count; the page is widened or narrowed
+        to UTF-8 character boundaries).  ``max_bytes`` caps the page size in
+        either unit.  Raises FileNotFoundError for unknown ids.
+        """
+        if os.path.basename(output_id) != output_id or not self._touch(output_id):
+            raise FileNotFoundError(output_id)
+        with open_mapped(self.path_of(output_id)) as mf:
+            if unit == "byte":
+                start = _char_floor(mf.buf, mf.size, offset)
+                end = min(mf.size, start + limit)
+                if max_bytes is not None:
+                    end = min(end, start + max_bytes)
+                end = _char_floor(mf.buf, mf.size, end)
+                return OutputPage(mf.decode(start, end), start, end, mf.size, unit)
+
+            total = mf.line_count
+            start = min(max(offset, 0), total)
+            end = min(total, start + limit)
+            if start == end:
+                return OutputPage("", start, end, total, unit)
+            first = mf.line_span(start)[0]
+            last = mf.line_span(end - 1)[1]
+            if max_bytes is not None and last - first > max_bytes:
+                # Cut at the last whole line that fits (at least one line).
+                end = max(start + 1, mf.line_of(first + max_bytes))
+                last = mf.line_span(end - 1)[1]
+                last = min(last, _char_floor(mf.buf, mf.size, first + max_bytes))
+            return OutputPage(mf.decode(first, last), start, end, total, unit)
+
+
+def _char_floor(buf, size: int, pos: int) -> int:
+    """Move *pos* back to the start of the UTF-8 character containing it."""
+    pos = min(max(pos, 0), size)
+    limit = max(0, pos - 3)
+    while pos > limit and pos < size and 0x80 <= buf[pos] < 0xC0:
+        pos -= 1
+    return pos
+
+
+_stores: Dict[str, ResultStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Result store of the current sandbox home."""
+    out_dir = sandbox_home() / ".tool_outputs"
+    key = str(out_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ResultStore(out_dir)
+        return store
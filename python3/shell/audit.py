@@ -8,15 +8,17 @@
 Audit Logger - JSONL-based shell audit logging with credential sanitization.
 
 Thread safety: THREAD_SAFE: SINGLE_WRITER
-  - write_entry(): Vim main thread only
+  - log(): any thread (bounded queue, never blocks)
   - sanitize(): any thread (pure function)
-  - _background_flush(): fire-and-forget thread
+  - _background_flush(): fire-and-forget thread, batched writes
 """
 
 from __future__ import annotations
 
 # stdlib imports
 import atexit
+import heapq
+import itertools
 import json
 import os
 import queue
@@ -38,6 +40,17 @@ from shell.error import SafetyError
 
 AUDIT_DIR = get_audit_dir()
 
+# Bounded write queue: entries beyond this are dropped (and counted)
+QUEUE_MAX_ENTRIES = 10000
+# Entries written per batch by the background flusher
+BATCH_MAX_ENTRIES = 256
+# A daily log file rotates to the next sequence past this size
+MAX_FILE_BYTES = 16 * 1024 * 1024
+# Retention cleanup: first run shortly after start, then periodically
+RETENTION_DAYS = 30
+CLEANUP_FIRST_DELAY = 60.0
+CLEANUP_INTERVAL = 6 * 3600.0
+
 _CREDENTIAL_PATTERNS: list[tuple[re.Pattern[str], str]] = [
     # Private key blocks (PEM format) — multi-line, check first
     (re.compile(
@@ -126,6 +139,176 @@ def sanitize(text: str) -> str:
     return text
 
 
+# ---------------------------------------------------------------------------
+# Query index
+# ---------------------------------------------------------------------------
+
+# Entries per indexed block (one byte offset is kept per block)
+INDEX_BLOCK_ENTRIES = 256
+_INDEX_VERSION = 1
+
+_LOG_NAME_RE = re.compile(r"^audit-(\d{4}-\d{2}-\d{2})(?:\.(\d+))?\.jsonl$")
+
+
+def _log_sort_key(path: Path) -> tuple[str, int]:
+    """(date, sequence) of a log file — `.10.jsonl` sorts after `.2.jsonl`."""
+    m = _LOG_NAME_RE.match(path.name)
+    if not m:
+        return (path.name, 0)
+    return (m.group(1), int(m.group(2) or 1))
+
+
+class _AuditFileIndex:
+    """Sidecar index of one audit JSONL file (``audit-*.idx``).
+
+    Kept per file: min/max timestamp, whether timestamps never decrease,
+    one block per INDEX_BLOCK_ENTRIES entries ([byte offset, entries,
+    min ts, max ts]) and a posting list of block numbers per session id.
+    ``size`` is the number of bytes covered; when the log grows, only the
+    new bytes are indexed.
+    """
+
+    __slots__ = ("size", "min_ts", "max_ts", "ordered", "blocks", "sessions")
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.min_ts = ""
+        self.max_ts = ""
+        self.ordered = True
+        self.blocks: list[list] = []
+        self.sessions: dict[str, list[int]] = {}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> _AuditFileIndex:
+        idx = cls()
+        idx.size = d["size"]
+        idx.min_ts = d["min_ts"]
+        idx.max_ts = d["max_ts"]
+        idx.ordered = d["ordered"]
+        idx.blocks = d["blocks"]
+        idx.sessions = d["sessions"]
+        return idx
+
+    def to_dict(self) -> dict:
+        return {
+            "version": _INDEX_VERSION,
+            "size": self.size,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "ordered": self.ordered,
+            "blocks": self.blocks,
+            "sessions": self.sessions,
+        }
+
+    def extend(self, f, end: int) -> None:
+        """Index complete lines of *f* between ``self.size`` and *end*."""
+        f.seek(self.size)
+        offset = self.size
+        for raw in f:
+            if not raw.endswith(b"\n") or offset + len(raw) > end:
+                break  # Partial line of a concurrent write
+            line_off = offset
+            offset += len(raw)
+            try:
+                entry = json.loads(raw)
+                ts = str(entry.get("timestamp", ""))
+                sid = entry.get("session_id")
+            except (ValueError, AttributeError):
+                continue  # Corrupt line: skipped by queries as well
+            blocks = self.blocks
+            if not blocks or blocks[-1][1] >= INDEX_BLOCK_ENTRIES:
+                blocks.append([line_off, 0, ts, ts])
+            block = blocks[-1]
+            block[1] += 1
+            if ts < block[2]:
+                block[2] = ts
+            if ts > block[3]:
+                block[3] = ts
+            if ts < self.max_ts:
+                self.ordered = False
+            if not self.min_ts or ts < self.min_ts:
+                self.min_ts = ts
+            if ts > self.max_ts:
+                self.max_ts = ts
+            postings = self.sessions.setdefault(str(sid), [])
+            if not postings or postings[-1] != len(blocks) - 1:
+                postings.append(len(blocks) - 1)
+        self.size = offset
+
+    def candidate_blocks(
+        self,
+        session_id: str | None,
+        start_time: str | None,
+        end_time: str | None,
+    ) -> list[int]:
+        """Block numbers that may hold matching entries, in file order."""
+        if not self.blocks:
+            return []
+        if start_time is not None and self.max_ts < start_time:
+            return []
+        if end_time is not None and self.min_ts > end_time:
+            return []
+        if session_id is not None:
+            numbers = self.sessions.get(session_id, [])
+        else:
+            numbers = range(len(self.blocks))
+        return [
+            n for n in numbers
+            if (start_time is None or self.blocks[n][3] >= start_time)
+            and (end_time is None or self.blocks[n][2] <= end_time)
+        ]
+
+    def block_span(self, n: int) -> tuple[int, int]:
+        start = self.blocks[n][0]
+        end = self.blocks[n + 1][0] if n + 1 < len(self.blocks) else self.size
+        return start, end
+
+
+_index_cache: dict[Path, tuple[int, int, _AuditFileIndex]] = {}
+_index_cache_lock = threading.Lock()
+
+
+def _index_path(log_file: Path) -> Path:
+    return log_file.with_suffix(".idx")
+
+
+def _load_file_index(log_file: Path) -> _AuditFileIndex:
+    """Return an up-to-date index for *log_file*, extending it as needed."""
+    with _index_cache_lock:
+        st = log_file.stat()
+        cached = _index_cache.get(log_file)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+
+        idx = cached[2] if cached is not None else None
+        idx_path = _index_path(log_file)
+        if idx is None:
+            try:
+                d = json.loads(idx_path.read_text(encoding="utf-8"))
+                if d.get("version") == _INDEX_VERSION:
+                    idx = _AuditFileIndex.from_dict(d)
+            except (OSError, ValueError, KeyError):
+                idx = None
+        if idx is None or idx.size > st.st_size:
+            idx = _AuditFileIndex()  # Missing, stale or file was replaced
+
+        if idx.size < st.st_size:
+            covered = idx.size
+            with open(log_file, "rb") as f:
+                idx.extend(f, st.st_size)
+            if idx.size != covered:
+                try:
+                    tmp = idx_path.with_name(f"{idx_path.name}.{os.getpid()}.tmp")
+                    tmp.write_text(json.dumps(idx.to_dict(), ensure_ascii=False),
+                                   encoding="utf-8")
+                    os.replace(tmp, idx_path)
+                except OSError:
+                    pass  # Index is an optimization; keep it in memory only
+
+        _index_cache[log_file] = (st.st_mtime_ns, st.st_size, idx)
+        return idx
+
+
 # ---------------------------------------------------------------------------
 # Main implementation
 # ---------------------------------------------------------------------------
@@ -135,9 +318,11 @@ class AuditLogger:
     """Singleton JSONL audit logger with fire-and-forget writes.
 
     Thread safety: THREAD_SAFE: SINGLE_WRITER
-      - log(): can be called from any thread (puts to queue)
+      - log(): can be called from any thread (puts to a bounded queue)
       - sanitize(): pure function, thread-safe
-      - _background_flush(): daemon thread, sole writer
+      - _background_flush(): daemon thread, sole writer; drains the queue
+        in batches through one O_APPEND handle
+      - _cleanup(): timer thread, only touches files past retention
     """
 
     _instance: AuditLogger | None = None
@@ -156,18 +341,31 @@ class AuditLogger:
         if self._initialized:
             return
         self._initialized = True
-        self._write_queue: queue.Queue[AuditEntry | None] = queue.Queue()
+        self._write_queue: queue.Queue[AuditEntry | None] = queue.Queue(
+            maxsize=QUEUE_MAX_ENTRIES,
+        )
 
-        # Rotation state (Task 1: Subtask 1.1) — set BEFORE thread starts
-        self._daily_count: int = 0
+        # Rotation state — set BEFORE thread starts.  The open handle and
+        # its byte size are owned by the writer (under _rotate_lock).
         self._current_date: str = ""
+        self._sequence: int = 0
+        self._fd: int | None = None
+        self._file_bytes: int = 0
         self._rotate_lock = threading.Lock()
-        self._write_counter: int = 0
+
+        # Accounting (see stats())
+        self._stats_lock = threading.Lock()
+        self._written: int = 0
+        self._dropped: int = 0
+        self._failed: int = 0
+        self._overflowing: bool = False
 
         self._flush_thread = threading.Thread(
             target=self._background_flush, daemon=True,
         )
         self._flush_thread.start()
+        self._cleanup_timer: threading.Timer | None = None
+        self._schedule_cleanup(CLEANUP_FIRST_DELAY)
         atexit.register(self._flush)
 
     @staticmethod
@@ -178,13 +376,30 @@ class AuditLogger:
     def log(self, entry: AuditEntry) -> tuple[None, SafetyError | None]:
         """Fire-and-forget async write (MUST-1).
 
-        Queues entry for background writing. Never blocks the caller.
+        Queues entry for background writing. Never blocks the caller: when
+        the queue is full the entry is dropped and counted.
         Returns (None, None) on success or (None, SafetyError) on queue failure.
         Audit failure is non-fatal (NFR3).
         """
         try:
-            self._write_queue.put(entry)
+            self._write_queue.put_nowait(entry)
             return (None, None)
+        except queue.Full:
+            with self._stats_lock:
+                self._dropped += 1
+                first = not self._overflowing
+                self._overflowing = True
+            if first:
+                print(
+                    "[shell][WARN] audit queue full, dropping entries",
+                    file=sys.stderr,
+                )
+            return (None, SafetyError(
+                layer="L5_audit",
+                code="QUEUE_FULL",
+                message="audit queue full, entry dropped",
+                degraded=True,
+            ))
         except Exception as e:
             print(
                 f"[shell][WARN] audit log queue failed: {e}",
@@ -197,37 +412,83 @@ class AuditLogger:
                 degraded=True,
             ))
 
+    def stats(self) -> dict:
+        """Counters: entries written, dropped on overflow, failed on I/O."""
+        with self._stats_lock:
+            return {
+                "queued": self._write_queue.qsize(),
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+            }
+
+    def _drain(self, first: AuditEntry) -> tuple[list[AuditEntry], bool]:
+        """Collect *first* plus whatever is already queued (up to a batch).
+
+        Returns (entries, stop) — stop is True if the shutdown sentinel
+        was seen.
+        """
+        batch = [first]
+        while len(batch) < BATCH_MAX_ENTRIES:
+            try:
+                entry = self._write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
     def _background_flush(self) -> None:
-        """Background thread: write queue entries to disk with retry."""
+        """Background thread: write queued entries to disk in batches."""
         while True:
             try:
                 entry = self._write_queue.get()
                 if entry is None:
                     break  # Sentinel for shutdown
-                self._write_with_retry(entry)
-            except (OSError, IOError, queue.Empty):
-                pass  # Expected I/O errors, non-fatal
+                batch, stop = self._drain(entry)
+                self._write_with_retry(batch)
+                if stop:
+                    break
             except Exception as e:
                 print(
                     f"[shell][WARN] audit background flush error: {e}",
                     file=sys.stderr,
                 )
 
-    def _write_with_retry(self, entry: AuditEntry, max_retries: int = 3) -> None:
-        """Write to disk with retry mechanism for transient errors."""
+    def _write_with_retry(self, batch: list[AuditEntry], max_retries: int = 3) -> None:
+        """Write a batch to disk with retry mechanism for transient errors."""
+        data = "".join(
+            json.dumps(asdict(entry), ensure_ascii=False) + "\n"
+            for entry in batch
+        ).encode("utf-8")
         for attempt in range(max_retries):
             try:
-                self._write_to_disk(entry)
-                return
+                self._write_to_disk(data)
+                break
             except (OSError, IOError) as e:
+                self._close_handle()
                 if attempt < max_retries - 1:
                     time.sleep(1)
                 else:
+                    with self._stats_lock:
+                        self._failed += len(batch)
                     print(
                         f"[shell][WARN] audit log write failed after "
                         f"{max_retries} retries: {e}",
                         file=sys.stderr,
                     )
+                    return
+        with self._stats_lock:
+            self._written += len(batch)
+            dropped, overflowed = self._dropped, self._overflowing
+            self._overflowing = False
+        if overflowed:
+            print(
+                f"[shell][WARN] audit queue recovered, {dropped} entries "
+                f"dropped so far",
+                file=sys.stderr,
+            )
 
     def _get_log_path(self, date_str: str, sequence: int = 0) -> Path:
         """Get log file path. sequence=0 means base file, N means .(N+1).jsonl.
@@ -238,57 +499,98 @@ class AuditLogger:
             return AUDIT_DIR / f"audit-{date_str}.jsonl"
         return AUDIT_DIR / f"audit-{date_str}.{sequence + 1}.jsonl"
 
-    def _write_to_disk(self, entry: AuditEntry) -> None:
-        """Write a single audit entry with rotation support (Task 1, Subtask 1.3)."""
-        AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+    @staticmethod
+    def _get_seq_path(date_str: str) -> Path:
+        """Shared rotation counter: the current sequence for *date_str*."""
+        return AUDIT_DIR / f"audit-{date_str}.seq"
 
+    def _read_sequence(self, date_str: str) -> int:
+        try:
+            return int(self._get_seq_path(date_str).read_text().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_sequence(self, date_str: str, sequence: int) -> None:
+        # Writers only ever move the counter forward to "theirs + 1", so
+        # concurrent rotations of the same file agree without a lock.
+        path = self._get_seq_path(date_str)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(str(sequence))
+        os.replace(tmp, path)
+
+    def _close_handle(self) -> None:
         with self._rotate_lock:
-            today = datetime.now().strftime("%Y-%m-%d")
-
-            # Reset counter on day change (AC: 新日切换)
-            # Count existing lines in today's base file to support
-            # multi-instance rotation (NFR16).  Without this, a second
-            # Vim instance starting after 9 500 entries already exist
-            # would never rotate — its per-instance counter starts at 0.
-            if today != self._current_date:
-                self._current_date = today
-                base_path = self._get_log_path(today, 0)
-                if base_path.exists():
-                    try:
-                        with open(base_path, "r") as f:
-                            self._daily_count = sum(
-                                1 for line in f if line.strip()
-                            )
-                    except OSError:
-                        self._daily_count = 0
-                else:
-                    self._daily_count = 0
-
-            sequence = self._daily_count // 10000  # 0 for first 10k, 1 for next, etc.
-            log_path = self._get_log_path(today, sequence)
+            if self._fd is not None:
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+                self._fd = None
 
-            line = json.dumps(asdict(entry), ensure_ascii=False)
-            with open(log_path, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
+    def _open_handle(self, date_str: str) -> None:
+        path = self._get_log_path(date_str, self._sequence)
+        self._fd = os.open(
+            path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600,
+        )
+        self._file_bytes = os.fstat(self._fd).st_size
 
-            self._daily_count += 1
+    def _write_to_disk(self, data: bytes) -> None:
+        """Append a batch of JSONL lines with rotation support (Task 1, Subtask 1.3).
 
-        # Periodic cleanup trigger: run every 100 writes
-        self._write_counter += 1
-        if self._write_counter % 100 == 0:
-            self._cleanup(retention_days=30)
+        Multi-instance rotation (NFR16): every writer appends with O_APPEND,
+        so concurrent Vim instances never overwrite each other.  The current
+        sequence per day lives in a tiny shared counter file; a writer that
+        finds the counter ahead of its own sequence follows it, and the one
+        whose file grows past MAX_FILE_BYTES moves it forward.
+        """
+        with self._rotate_lock:
+            today = datetime.now().strftime("%Y-%m-%d")
+            shared = self._read_sequence(today)
+
+            if today != self._current_date or shared > self._sequence:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                if today != self._current_date:
+                    AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+                self._current_date = today
+                self._sequence = shared
+
+            if self._fd is None:
+                self._open_handle(today)
+
+            # Bytes written by other instances are not tracked, so the
+            # in-memory size is a lower bound; re-check it before rotating.
+            if self._file_bytes >= MAX_FILE_BYTES:
+                self._file_bytes = os.fstat(self._fd).st_size
+            if self._file_bytes >= MAX_FILE_BYTES:
+                os.close(self._fd)
+                self._fd = None
+                self._sequence += 1
+                self._write_sequence(today, self._sequence)
+                self._open_handle(today)
+
+            view = memoryview(data)
+            while view:
+                n = os.write(self._fd, view)
+                view = view[n:]
+            self._file_bytes += len(data)
 
     def _flush(self) -> None:
         """Flush remaining entries before Vim exits (risk I4 mitigation)."""
         while True:
             try:
                 entry = self._write_queue.get_nowait()
-                if entry is not None:
-                    self._write_to_disk(entry)
             except queue.Empty:
                 break
+            if entry is None:
+                continue
+            try:
+                batch, _ = self._drain(entry)
+                self._write_with_retry(batch, max_retries=1)
             except Exception:
                 pass  # Non-fatal
+        self._close_handle()
 
     def query(
         self,
@@ -299,39 +601,46 @@ class AuditLogger:
     ) -> tuple[list[dict], SafetyError | None]:
         """Query audit log entries with optional filters (Task 2, MUST-1).
 
+        Each log file has a sidecar index (see _AuditFileIndex): files whose
+        time range or session postings rule them out are skipped, the rest
+        are read only at candidate blocks.  Per-file streams are merged by
+        timestamp, so no global sort is needed; with ``limit`` the files are
+        streamed newest first and reading stops after ``limit`` matches.
+
         Args:
             session_id: Filter by exact session ID match.
             start_time: ISO 8601 datetime range start (inclusive).
             end_time: ISO 8601 datetime range end (inclusive).
-            limit: Max entries to return (0 = unlimited).
+            limit: Max entries to return (0 = unlimited), the most recent.
 
         Returns:
             (list[dict], None) sorted by timestamp ascending.
             ([], SafetyError) on read error — never raises (MUST-3).
         """
         try:
-            results: list[dict] = []
-            for log_file in sorted(AUDIT_DIR.glob("audit-*.jsonl")):
+            streams = []
+            for log_file in sorted(AUDIT_DIR.glob("audit-*.jsonl"),
+                                   key=_log_sort_key):
                 if not log_file.is_file():
                     continue
                 try:
-                    with open(log_file, "r", encoding="utf-8") as f:
-                        for line in f:
-                            line = line.strip()
-                            if not line:
-                                continue
-                            try:
-                                entry = json.loads(line)
-                            except json.JSONDecodeError:
-                                continue  # Skip corrupt lines
-                            if self._matches(entry, session_id, start_time, end_time):
-                                results.append(entry)
+                    idx = _load_file_index(log_file)
                 except (OSError, IOError):
                     continue  # Skip unreadable files, keep going
-
-            results.sort(key=lambda e: e.get("timestamp", ""))
+                blocks = idx.candidate_blocks(session_id, start_time, end_time)
+                if blocks:
+                    streams.append(self._stream_file(
+                        log_file, idx, blocks, session_id, start_time,
+                        end_time, reverse=limit > 0,
+                    ))
+
+            ts_key = lambda e: e.get("timestamp", "")
             if limit > 0:
-                results = results[-limit:]
+                merged = heapq.merge(*streams, key=ts_key, reverse=True)
+                results = list(itertools.islice(merged, limit))
+                results.reverse()
+            else:
+                results = list(heapq.merge(*streams, key=ts_key))
             return (results, None)
 
         except (OSError, IOError) as e:
@@ -342,6 +651,50 @@ class AuditLogger:
                 degraded=False,
             ))
 
+    def _stream_file(
+        self,
+        log_file: Path,
+        idx: _AuditFileIndex,
+        blocks: list[int],
+        session_id: str | None,
+        start_time: str | None,
+        end_time: str | None,
+        reverse: bool,
+    ):
+        """Yield matching entries of one file in timestamp order.
+
+        Blocks are read lazily; a file whose timestamps are not monotonic
+        (several writers) is sorted locally before yielding.
+        """
+        def read_block(f, n):
+            start, end = idx.block_span(n)
+            f.seek(start)
+            matched = []
+            for raw in f.read(end - start).splitlines():
+                if not raw.strip():
+                    continue
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    continue  # Skip corrupt lines
+                if self._matches(entry, session_id, start_time, end_time):
+                    matched.append(entry)
+            return matched
+
+        try:
+            with open(log_file, "rb") as f:
+                if not idx.ordered:
+                    entries = [e for n in blocks for e in read_block(f, n)]
+                    entries.sort(key=lambda e: e.get("timestamp", ""),
+                                 reverse=reverse)
+                    yield from entries
+                    return
+                for n in (reversed(blocks) if reverse else blocks):
+                    entries = read_block(f, n)
+                    yield from (reversed(entries) if reverse else entries)
+        except (OSError, IOError):
+            return  # Skip unreadable files, keep going
+
     @staticmethod
     def _matches(
         entry: dict,
@@ -373,10 +726,12 @@ class AuditLogger:
 
         try:
             cutoff = datetime.now().timestamp() - retention_days * 86400
-            for log_file in AUDIT_DIR.glob("audit-*.jsonl"):
+            for log_file in AUDIT_DIR.glob("audit-*"):
                 try:
                     if log_file.stat().st_mtime < cutoff:
                         log_file.unlink()
+                        if log_file.suffix == ".jsonl":
+                            _index_path(log_file).unlink(missing_ok=True)
                 except (OSError, IOError):
                     continue  # Skip individual file errors
             return (None, None)
@@ -392,6 +747,18 @@ class AuditLogger:
                 degraded=False,
             ))
 
+    def _schedule_cleanup(self, delay: float) -> None:
+        timer = threading.Timer(delay, self._run_cleanup)
+        timer.daemon = True
+        self._cleanup_timer = timer
+        timer.start()
+
+    def _run_cleanup(self) -> None:
+        """Timer callback: cleanup, then re-arm (Task 3, FR26)."""
+        self._cleanup(retention_days=RETENTION_DAYS)
+        if AuditLogger._instance is self:
+            self._schedule_cleanup(CLEANUP_INTERVAL)
+
     @classmethod
     def reset(cls) -> None:
         """Reset singleton for testing purposes only."""
@@ -400,7 +767,10 @@ class AuditLogger:
                 old = cls._instance
                 cls._instance = None
                 try:
-                    old._write_queue.put(None)
+                    if old._cleanup_timer is not None:
+                        old._cleanup_timer.cancel()
+                    old._write_queue.put(None, timeout=2.0)
                     old._flush_thread.join(timeout=2.0)
+                    old._close_handle()
                 except Exception:
                     pass
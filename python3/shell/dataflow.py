@@ -16,9 +16,10 @@ Thread safety: THREAD_SAFE: READ_ONLY — all methods are pure functions with no
 
 from __future__ import annotations
 
+import operator
 import os
 from dataclasses import dataclass
-from collections.abc import Callable
+from typing import Union
 
 from bash_parser import CommandSemantics, CommandNode
 from .error import SafetyError
@@ -76,8 +77,8 @@ RISKY_SINKS: frozenset[str] = _INTERPRETER_SINKS | _DIRECT_EXEC_SINKS
 
 # Shell operators that create a data flow from left to right.
 # Note: <() (process substitution) and $() (command substitution) are
-# NOT included here — they are detected by dedicated check functions
-# (_check_process_substitution_as_pipe, _check_command_substitution_in_interpreter)
+# NOT included here — they are detected by SubstitutionRule patterns
+# (process_substitution_as_pipe, command_substitution_in_interpreter)
 # that inspect CommandNode.substitution_source rather than operators.
 RISKY_OPERATORS: frozenset[str] = frozenset({"|", "|&"})
 
@@ -92,198 +93,154 @@ _FILE_READERS: frozenset[str] = frozenset({
 
 
 # ---------------------------------------------------------------------------
-# Detection pattern functions (ordered by harm_level: S → A)
+# Declarative detection rules
 # ---------------------------------------------------------------------------
+#
+# Each rule describes one dataflow pattern as data.  The rules are compiled
+# into per-command-name and per-pipe-sink lookup tables (_CompiledRules), so
+# analyze() visits every command once regardless of how many rules exist.
+# Detail strings are str.format templates.
 
 
-def _check_network_source_to_interpreter(sem: CommandSemantics) -> DataflowDecision | None:
-    """Detect pipe from network source to interpreter shell (harm_level=S)."""
-    cmds = sem.commands
-    ops = sem.operators
-    for i, op in enumerate(ops):
-        if op not in RISKY_OPERATORS:
-            continue
-        if i + 1 >= len(cmds):
-            continue
-        src, snk = cmds[i], cmds[i + 1]
-        if src.command in RISKY_SOURCES and snk.command in _INTERPRETER_SINKS:
-            detail = f"{src.command} | {snk.command}: network content piped to interpreter"
-            return DataflowDecision(
-                risk=True,
-                harm_level="S",
-                pattern="network_source_to_interpreter",
-                detail=detail,
-            )
-    return None
-
-
-def _check_file_to_interpreter(sem: CommandSemantics) -> DataflowDecision | None:
-    """Detect file content piped to interpreter (harm_level=A)."""
-    cmds = sem.commands
-    ops = sem.operators
-    for i, op in enumerate(ops):
-        if op not in RISKY_OPERATORS:
-            continue
-        if i + 1 >= len(cmds):
-            continue
-        src, snk = cmds[i], cmds[i + 1]
-        # Skip network sources — handled by _check_network_source_to_interpreter
-        if src.command in RISKY_SOURCES:
-            continue
-        if snk.command in _INTERPRETER_SINKS:
-            src_label = src.command or "command"
-            detail = f"{src_label} | {snk.command}: file content piped to interpreter"
-            return DataflowDecision(
-                risk=True,
-                harm_level="A",
-                pattern="file_to_interpreter",
-                detail=detail,
-            )
-    return None
-
-
-def _check_process_substitution_as_pipe(sem: CommandSemantics) -> DataflowDecision | None:
-    """Detect interpreter <(network_source) process substitution (harm_level=S).
+@dataclass(frozen=True)
+class PipeRule:
+    """A source command piped (| or |&) into a sink command.
 
-    Matches when a sink command has process-substitution (<(...)) containing
-    a network source. Per AC 11, exec and source are also sinks for <().
+    sources=None matches any source not in exclude_sources.
+    Template fields: {src} (source name, "command" if empty), {snk}.
     """
-    proc_sub_sinks = _INTERPRETER_SINKS | {"exec", "source", "."}
-    for cmd in sem.commands:
-        if cmd.command not in proc_sub_sinks:
-            continue
-        if not cmd.is_substitution:
-            continue
-        # Only match <() process substitution, not $() command substitution
-        if "<(" not in cmd.raw:
-            continue
-        sub_source = cmd.substitution_source
-        for risky_src in RISKY_SOURCES:
-            tokens = sub_source.split()
-            if risky_src in tokens:
-                detail = f"{cmd.command} <({sub_source}): process substitution"
-                return DataflowDecision(
-                    risk=True,
-                    harm_level="S",
-                    pattern="process_substitution_as_pipe",
-                    detail=detail,
-                )
-    return None
 
+    pattern: str
+    harm_level: str
+    sinks: frozenset[str]
+    sources: frozenset[str] | None
+    detail: str
+    exclude_sources: frozenset[str] = frozenset()
+
+    def match(self, src: CommandNode, snk: CommandNode) -> DataflowDecision | None:
+        if self.sources is not None and src.command not in self.sources:
+            return None
+        if src.command in self.exclude_sources:
+            return None
+        return DataflowDecision(
+            risk=True,
+            harm_level=self.harm_level,
+            pattern=self.pattern,
+            detail=self.detail.format(src=src.command or "command", snk=snk.command),
+        )
+
+
+@dataclass(frozen=True)
+class SubstitutionRule:
+    """A sink command whose substitution text names a risky source.
+
+    markers select the substitution kind by its syntax in the raw command
+    ("<(" for process substitution, "$(" / "`" for command substitution).
+    Template fields: {cmd}, {sub} (substitution source text).
+    """
 
-def _check_command_substitution_in_interpreter(sem: CommandSemantics) -> DataflowDecision | None:
-    """Detect interpreter -c "$(network_source)" command substitution (harm_level=S).
+    pattern: str
+    harm_level: str
+    sinks: frozenset[str]
+    markers: tuple[str, ...]
+    sources: frozenset[str]
+    detail: str
 
-    Only matches interpreter sinks (bash -c, sh -c, python -c, etc.) — not
-    eval/exec/source which are handled by _check_eval_dynamic_content.
-    """
-    for cmd in sem.commands:
-        if cmd.command not in _INTERPRETER_SINKS:
-            continue
+    def match(self, cmd: CommandNode) -> DataflowDecision | None:
         if not cmd.is_substitution:
-            continue
-        # Only match $() or backtick command substitution, not <() process substitution
-        has_cmd_sub = "$(" in cmd.raw or "`" in cmd.raw
-        if not has_cmd_sub:
-            continue
+            return None
+        if not any(marker in cmd.raw for marker in self.markers):
+            return None
         sub_source = cmd.substitution_source
-        for risky_src in RISKY_SOURCES:
-            tokens = sub_source.split()
-            if risky_src in tokens:
-                detail = f'{cmd.command} -c "$({sub_source} ...)": command substitution in interpreter'
-                return DataflowDecision(
-                    risk=True,
-                    harm_level="S",
-                    pattern="command_substitution_in_interpreter",
-                    detail=detail,
-                )
-    return None
+        if self.sources.isdisjoint(sub_source.split()):
+            return None
+        return DataflowDecision(
+            risk=True,
+            harm_level=self.harm_level,
+            pattern=self.pattern,
+            detail=self.detail.format(cmd=cmd.command, sub=sub_source),
+        )
 
 
-def _check_network_write_and_execute(sem: CommandSemantics) -> DataflowDecision | None:
-    """Detect network download → execute chain in same compound command (harm_level=S).
+@dataclass(frozen=True)
+class DynamicArgRule:
+    """A sink command executing variable or substituted content.
 
-    Two-pass: first extract files written by network sources, then check if
-    any later (non-source) command executes a tracked file path.
+    Template fields: {cmd}, {arg} (first dynamic argument).
     """
-    written_files: dict[str, str] = {}  # normalized path → source command name
-
-    # Pass 1: collect files written by network sources
-    for cmd in sem.commands:
-        if cmd.command in RISKY_SOURCES:
-            output_path = _extract_output_path(cmd)
-            if output_path:
-                written_files[_normalize_path(output_path)] = cmd.command
-
-    if not written_files:
-        return None
 
-    # Pass 2: check if any non-source command executes a tracked file
-    for cmd in sem.commands:
-        if cmd.command in RISKY_SOURCES:
-            continue  # skip the source commands themselves
-
-        # Check command name as an executable path
-        cmd_path_norm = _normalize_path(cmd.command)
-        if cmd_path_norm in written_files:
-            src_name = written_files[cmd_path_norm]
-            detail = f"{src_name} -o {cmd.command} && {cmd.command}: network download executed"
-            return DataflowDecision(
-                risk=True,
-                harm_level="S",
-                pattern="network_write_and_execute",
-                detail=detail,
-            )
+    pattern: str
+    harm_level: str
+    sinks: frozenset[str]
+    arg_markers: tuple[str, ...]
+    detail: str
+    substitution_detail: str
 
-        # Check args for executable paths (e.g., ./x from curl -o ./x)
+    def match(self, cmd: CommandNode) -> DataflowDecision | None:
         for arg in cmd.args:
-            arg_norm = _normalize_path(arg)
-            if arg_norm in written_files and arg.startswith((".", "/", "~")):
-                src_name = written_files[arg_norm]
-                detail = f"{src_name} -o {arg} && {cmd.command} {arg}: network download executed"
-                return DataflowDecision(
-                    risk=True,
-                    harm_level="S",
-                    pattern="network_write_and_execute",
-                    detail=detail,
-                )
-
-    return None
-
+            if any(marker in arg for marker in self.arg_markers):
+                detail = self.detail.format(cmd=cmd.command, arg=arg)
+                break
+        else:
+            if not cmd.is_substitution:
+                return None
+            detail = self.substitution_detail.format(cmd=cmd.command)
+        return DataflowDecision(
+            risk=True,
+            harm_level=self.harm_level,
+            pattern=self.pattern,
+            detail=detail,
+        )
+
+
+@dataclass(frozen=True)
+class WriteExecRule:
+    """A source writes a file (-o/-O/--output) that another command executes.
+
+    Resolved after the pass over the commands, and only when some source
+    actually wrote a file.  Template fields: {src}, {cmd}, {arg}.
+    """
 
-def _check_eval_dynamic_content(sem: CommandSemantics) -> DataflowDecision | None:
-    """Detect eval/exec/source/. with dynamic/variable content (harm_level=A).
+    pattern: str
+    harm_level: str
+    sources: frozenset[str]
+    detail: str
+    arg_detail: str
+
+    def resolve(
+        self, commands: list[CommandNode], written_files: dict[str, str],
+    ) -> DataflowDecision | None:
+        for cmd in commands:
+            if cmd.command in self.sources:
+                continue  # skip the source commands themselves
+
+            # Check command name as an executable path
+            src_name = written_files.get(_normalize_path(cmd.command))
+            if src_name is not None:
+                return self._decision(self.detail.format(
+                    src=src_name, cmd=cmd.command, arg=""))
+
+            # Check args for executable paths (e.g., ./x from curl -o ./x)
+            for arg in cmd.args:
+                src_name = written_files.get(_normalize_path(arg))
+                if src_name is not None and arg.startswith((".", "/", "~")):
+                    return self._decision(self.arg_detail.format(
+                        src=src_name, cmd=cmd.command, arg=arg))
+        return None
 
-    Does NOT cover interpreter -c (bash -c, sh -c) with inline variable
-    references — those are common legitimate operations and not flagged.
-    """
-    for cmd in sem.commands:
-        if cmd.command not in ("eval", "exec", "source", "."):
-            continue
+    def _decision(self, detail: str) -> DataflowDecision:
+        return DataflowDecision(
+            risk=True,
+            harm_level=self.harm_level,
+            pattern=self.pattern,
+            detail=detail,
+        )
 
-        # Check args for variable expansion ($VAR, ${VAR}) or backtick substitution
-        for arg in cmd.args:
-            if "$" in arg or "`" in arg:
-                cmd_label = cmd.command
-                detail = f'{cmd_label} "{arg}": dynamic content execution'
-                return DataflowDecision(
-                    risk=True,
-                    harm_level="A",
-                    pattern="eval_dynamic_content",
-                    detail=detail,
-                )
 
-        # Check for substitution-based dynamic content (e.g., eval "$(cmd)")
-        if cmd.is_substitution:
-            detail = f"{cmd.command}: dynamic content via substitution"
-            return DataflowDecision(
-                risk=True,
-                harm_level="A",
-                pattern="eval_dynamic_content",
-                detail=detail,
-            )
+DataflowRule = Union[PipeRule, SubstitutionRule, DynamicArgRule, WriteExecRule]
 
-    return None
+# Process substitution also feeds exec, source and . (AC 11)
+_PROC_SUB_SINKS: frozenset[str] = _INTERPRETER_SINKS | {"exec", "source", "."}
 
 
 # ---------------------------------------------------------------------------
@@ -292,16 +249,161 @@ def _check_eval_dynamic_content(sem: CommandSemantics) -> DataflowDecision | Non
 
 # Ordered by harm_level priority (S → A) — insert new patterns at the
 # correct position relative to existing ones of the same harm_level.
-DETECTION_PATTERNS: list[Callable[[CommandSemantics], DataflowDecision | None]] = [
-    _check_network_source_to_interpreter,
-    _check_process_substitution_as_pipe,
-    _check_command_substitution_in_interpreter,
-    _check_network_write_and_execute,
-    _check_file_to_interpreter,
-    _check_eval_dynamic_content,
+# The first rule (in this order) that matches decides the result.
+DETECTION_PATTERNS: list[DataflowRule] = [
+    PipeRule(
+        pattern="network_source_to_interpreter",
+        harm_level="S",
+        sources=RISKY_SOURCES,
+        sinks=_INTERPRETER_SINKS,
+        detail="{src} | {snk}: network content piped to interpreter",
+    ),
+    SubstitutionRule(
+        pattern="process_substitution_as_pipe",
+        harm_level="S",
+        sinks=_PROC_SUB_SINKS,
+        markers=("<(",),
+        sources=RISKY_SOURCES,
+        detail="{cmd} <({sub}): process substitution",
+    ),
+    # Interpreter sinks only (bash -c, python -c, ...) — eval/exec/source
+    # are covered by eval_dynamic_content.
+    SubstitutionRule(
+        pattern="command_substitution_in_interpreter",
+        harm_level="S",
+        sinks=_INTERPRETER_SINKS,
+        markers=("$(", "`"),
+        sources=RISKY_SOURCES,
+        detail='{cmd} -c "$({sub} ...)": command substitution in interpreter',
+    ),
+    WriteExecRule(
+        pattern="network_write_and_execute",
+        harm_level="S",
+        sources=RISKY_SOURCES,
+        detail="{src} -o {cmd} && {cmd}: network download executed",
+        arg_detail="{src} -o {arg} && {cmd} {arg}: network download executed",
+    ),
+    # Network sources are excluded — they are network_source_to_interpreter.
+    PipeRule(
+        pattern="file_to_interpreter",
+        harm_level="A",
+        sources=None,
+        exclude_sources=RISKY_SOURCES,
+        sinks=_INTERPRETER_SINKS,
+        detail="{src} | {snk}: file content piped to interpreter",
+    ),
+    # Does NOT cover interpreter -c with inline variable references — those
+    # are common legitimate operations and not flagged.
+    DynamicArgRule(
+        pattern="eval_dynamic_content",
+        harm_level="A",
+        sinks=_DIRECT_EXEC_SINKS | {"."},
+        arg_markers=("$", "`"),
+        detail='{cmd} "{arg}": dynamic content execution',
+        substitution_detail="{cmd}: dynamic content via substitution",
+    ),
 ]
 
 
+# ---------------------------------------------------------------------------
+# Rule compilation
+# ---------------------------------------------------------------------------
+
+
+# Entry kinds in _CompiledRules.by_name
+_PIPE_SINK, _NODE, _WRITER = range(3)
+
+
+class _CompiledRules:
+    """Lookup table built from DETECTION_PATTERNS (index = priority).
+
+    Every rule is keyed on the name of the command being visited — the
+    sink of a pipe edge, the sink of a substitution / dynamic exec, or a
+    source writing a file — so ``by_name`` maps a command name to the
+    (priority, kind, rule) entries to evaluate for it, best priority
+    first.  Commands with no entry are skipped with one dict lookup.
+    """
+
+    def __init__(self, rules: tuple[DataflowRule, ...]) -> None:
+        self.rules = rules
+        table: dict[str, list[tuple[int, int, DataflowRule]]] = {}
+        self.write_rules: list[tuple[int, WriteExecRule]] = []
+
+        for prio, rule in enumerate(rules):
+            if isinstance(rule, PipeRule):
+                kind, names = _PIPE_SINK, rule.sinks
+            elif isinstance(rule, WriteExecRule):
+                self.write_rules.append((prio, rule))
+                kind, names = _WRITER, rule.sources
+            else:
+                kind, names = _NODE, rule.sinks
+            for name in names:
+                table.setdefault(name, []).append((prio, kind, rule))
+
+        self.by_name: dict[str, tuple[tuple[int, int, DataflowRule], ...]] = {
+            name: tuple(entries) for name, entries in table.items()
+        }
+
+    def run(self, sem: CommandSemantics) -> DataflowDecision | None:
+        """Single pass over the command graph; best (lowest) priority wins."""
+        cmds = sem.commands
+        ops = sem.operators
+        by_name = self.by_name
+        best_prio = len(self.rules)
+        best: DataflowDecision | None = None
+        written: dict[int, dict[str, str]] | None = None
+
+        for i, cmd in enumerate(cmds):
+            entries = by_name.get(cmd.command)
+            if entries is None:
+                continue
+            for prio, kind, rule in entries:
+                if prio >= best_prio:
+                    break  # Entries are in priority order
+                if kind == _PIPE_SINK:
+                    # Indexed pipe edge: operator i-1 joins commands i-1 and i
+                    if not (0 < i <= len(ops) and ops[i - 1] in RISKY_OPERATORS):
+                        continue
+                    decision = rule.match(cmds[i - 1], cmd)
+                elif kind == _NODE:
+                    decision = rule.match(cmd)
+                else:
+                    output_path = _extract_output_path(cmd)
+                    if output_path:
+                        if written is None:
+                            written = {}
+                        written.setdefault(prio, {})[
+                            _normalize_path(output_path)] = cmd.command
+                    continue
+                if decision is not None:
+                    best_prio, best = prio, decision
+                    break
+            if best_prio == 0:
+                return best
+
+        if written:
+            for prio, rule in self.write_rules:
+                if prio < best_prio and prio in written:
+                    decision = rule.resolve(cmds, written[prio])
+                    if decision is not None:
+                        return decision
+        return best
+
+
+_compiled: _CompiledRules | None = None
+
+
+def _get_compiled() -> _CompiledRules:
+    """Compile DETECTION_PATTERNS, recompiling if the list was changed."""
+    global _compiled
+    compiled = _compiled
+    if (compiled is None
+            or len(compiled.rules) != len(DETECTION_PATTERNS)
+            or not all(map(operator.is_, compiled.rules, DETECTION_PATTERNS))):
+        compiled = _compiled = _CompiledRules(tuple(DETECTION_PATTERNS))
+    return compiled
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -354,8 +456,9 @@ class DataflowDetector:
         Returns (DataflowDecision, None) on successful analysis,
         or (None, SafetyError) on invalid input.
 
-        Detection runs patterns in harm_level priority order (S → A),
-        returning early on first risk=True match (fail-fast optimization).
+        All DETECTION_PATTERNS are evaluated in one pass over the commands;
+        the match of the highest-priority rule (S → A) is returned, and the
+        pass stops early once the top-priority rule matches.
         """
         if parsed is None:
             return (
@@ -379,26 +482,25 @@ class DataflowDetector:
                 None,
             )
 
-        for pattern_fn in DETECTION_PATTERNS:
-            try:
-                result = pattern_fn(parsed)
-                if result and result.risk:
-                    # Add known-limitation note when ; cross-command separators exist
-                    if any(op in (";", "&") for op in parsed.operators):
-                        result.notes = (
-                            "cross-command analysis not performed; "
-                            "only same-command chains detected"
-                        )
-                    return (result, None)
-            except Exception as exc:
-                return (
-                    None,
-                    SafetyError(
-                        layer="L2.5_dataflow",
-                        code="ANALYSIS_ERROR",
-                        message=f"pattern check failed: {exc!s}"[:80],
-                    ),
+        try:
+            result = _get_compiled().run(parsed)
+        except Exception as exc:
+            return (
+                None,
+                SafetyError(
+                    layer="L2.5_dataflow",
+                    code="ANALYSIS_ERROR",
+                    message=f"pattern check failed: {exc!s}"[:80],
+                ),
+            )
+        if result is not None:
+            # Add known-limitation note when ; cross-command separators exist
+            if any(op in (";", "&") for op in parsed.operators):
+                result.notes = (
+                    "cross-command analysis not performed; "
+                    "only same-command chains detected"
                 )
+            return (result, None)
 
         # No risk detected
         notes = ""
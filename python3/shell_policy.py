@@ -15,7 +15,9 @@ execution layer.
 Architecture:
   PermissionEngine.check() → PolicyDecision
   PolicyLoader loads rules from: built-in → user → project
-  Hot-reload: detects file mtime changes, atomically replaces rules
+  Hot-reload: policy files are watched (fs_watch); a change event makes the
+  next check() reload and atomically replace the rules.  Files that cannot
+  be watched fall back to an mtime comparison per check.
 """
 
 import os
@@ -26,6 +28,7 @@ from pathlib import Path
 from typing import Callable, Dict, List, Optional, Tuple
 
 from bash_parser import BashParser, SAFE_WRAPPERS
+from fs_watch import get_watcher
 
 try:
     import yaml
@@ -345,8 +348,11 @@ class PermissionEngine:
         # Pending ask commands: (session_id, execution_id) → dict
         self._pending_commands: Dict[Tuple[str, str], dict] = {}
 
-        # Hot-reload tracking
+        # Hot-reload tracking: watched files need no stat per check
         self._file_mtimes: Dict[str, float] = {}
+        self._watch_handles: List[int] = []
+        self._watched_files: set = set()
+        self._policy_changed = False
         self._last_load_time: float = 0.0
         self._cwd: Optional[str] = None
 
@@ -361,6 +367,8 @@ class PermissionEngine:
         (e.g. editor mid-write), the previous successful rules for that
         source are kept rather than dropped.
         """
+        # Cleared before reading so an edit during the reload is not lost
+        self._policy_changed = False
         built_in = list(DEFAULT_DENY_RULES)
 
         # Try user-level rules; fall back to last-good snapshot on failure
@@ -387,6 +395,7 @@ class PermissionEngine:
         self._cwd = cwd
         self._last_load_time = time.time()
         self._snapshot_mtimes(cwd)
+        self._watch_policy_files()
 
     def _snapshot_mtimes(self, cwd: Optional[str] = None):
         """Record mtimes of policy source files for change detection."""
@@ -409,18 +418,37 @@ class PermissionEngine:
             except Exception:
                 pass
 
+    def _watch_policy_files(self):
+        """Subscribe to change events for the current policy files."""
+        watcher = get_watcher()
+        for handle in self._watch_handles:
+            watcher.unwatch(handle)
+        self._watch_handles = []
+        self._watched_files = set()
+        for fpath in self._file_mtimes:
+            handle = watcher.watch(fpath, self._on_policy_event)
+            if handle is not None:
+                self._watch_handles.append(handle)
+                self._watched_files.add(fpath)
+
+    def _on_policy_event(self, event):
+        # Runs on the watcher thread: only flag, reload on the next check()
+        self._policy_changed = True
+
     def _check_hot_reload(self, cwd: Optional[str] = None):
         """Check if any policy files have changed and reload if so."""
-        reload_needed = False
+        reload_needed = self._policy_changed
         for fpath, old_mtime in self._file_mtimes.items():
+            if reload_needed:
+                break
+            if fpath in self._watched_files:
+                continue
             try:
                 new_mtime = os.stat(fpath).st_mtime
                 if new_mtime != old_mtime:
                     reload_needed = True
-                    break
             except OSError:
                 reload_needed = True
-                break
         if reload_needed:
             self.reload_rules(cwd or self._cwd)
 
@@ -2,143 +2,419 @@
 Async LLM-based skill enhancement — translate descriptions, extract when_to_use,
 and classify tags when the user's primary language is missing from localized_descriptions.
 
-Uses the ClassifierClient pattern: daemon thread + agent._parent_llm_getter.
+Work goes through a queue rather than one thread per skill:
+
+* jobs are keyed by (skill name, SKILL.md content hash, target language),
+  so each version of a skill is enhanced at most once per language;
+* a small worker pool drains the queue and asks for up to BATCH_SIZE
+  skills in one LLM call, falling back to the per-field prompts;
+* job outcomes are kept in a ledger under the cache dir, so a restart
+  neither repeats finished work nor forgets queued jobs;
+* workers hold back while a foreground chat request is in flight (see
+  foreground_request()) and back off after rate-limit errors.
+
+LLM access uses the ClassifierClient pattern: agent._parent_llm_getter.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import os
+import queue
 import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Callable, Optional
 
+from paths import get_cache_dir
+
 logger = logging.getLogger(__name__)
 
-# In-memory set: skills already attempted in this session (prevent re-trigger)
-_enhanced_skills: set[str] = set()
-_enhanced_lock = threading.Lock()
+# Worker threads draining the queue
+MAX_WORKERS = 2
+# Skills per batched LLM call, and how long a worker waits to fill a batch
+BATCH_SIZE = 4
+BATCH_WINDOW = 0.5
+# Idle time required after a foreground request before enhancement resumes
+QUIET_SECONDS = 2.0
+# Rate-limit backoff (seconds): doubled per hit, capped
+BACKOFF_MIN = 5.0
+BACKOFF_MAX = 300.0
+# Attempts per job before it is given up
+MAX_ATTEMPTS = 3
+# Ledger entries kept (oldest dropped first)
+LEDGER_MAX_ENTRIES = 2000
+
+_LEDGER_FILE = "skill_enhance.json"
+
+
+class _RateLimited(Exception):
+    """The LLM endpoint answered 429; the job is retried after the backoff."""
 
 # Module-level LLM accessor — set once during init
 _llm_getter: Optional[Callable] = None
 _config_getter: Optional[Callable] = None
 
 
+@dataclass
+class _Job:
+    key: str                    # "<skill>:<content hash>:<lang>"
+    skill_name: str
+    skill_path: str
+    lang: str
+
+
+class _Ledger:
+    """Persistent job outcomes: key → {status, skill, path, attempts, updates, ts}.
+
+    status is "pending", "done" or "failed" (MAX_ATTEMPTS reached).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[dict[str, dict]] = None
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._entries = data if isinstance(data, dict) else {}
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._load().get(key)
+            return dict(entry) if entry else None
+
+    def pending(self) -> list[dict]:
+        with self._lock:
+            return [dict(e) for e in self._load().values() if e.get("status") == "pending"]
+
+    def put(self, key: str, entry: dict) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = dict(entry, ts=time.time())
+            if len(entries) > LEDGER_MAX_ENTRIES:
+                oldest = sorted(entries, key=lambda k: entries[k].get("ts", 0))
+                for k in oldest[:len(entries) - LEDGER_MAX_ENTRIES]:
+                    del entries[k]
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.path)
+            except OSError as e:
+                logger.debug("Skill enhancer ledger not saved: %s", e)
+
+
+_ledger: Optional[_Ledger] = None
+_queue: "queue.Queue[_Job]" = queue.Queue()
+_queued: set[str] = set()           # keys queued or in flight
+_seen: dict[str, tuple] = {}        # skill path → (mtime_ns, size, lang) last checked
+_workers: list[threading.Thread] = []
+_state_lock = threading.Lock()
+
+# Foreground requests / backoff
+_fg_cond = threading.Condition()
+_fg_active = 0
+_fg_last_end = 0.0
+_backoff_until = 0.0
+_backoff = BACKOFF_MIN
+
+
+def _get_ledger() -> _Ledger:
+    global _ledger
+    with _state_lock:
+        if _ledger is None:
+            _ledger = _Ledger(get_cache_dir() / _LEDGER_FILE)
+        return _ledger
+
+
 def init(llm_getter: Callable, config_getter: Callable) -> None:
-    """Initialize with LLM client getter and config getter from AIChat."""
+    """Initialize with LLM client getter and config getter from AIChat.
+
+    Jobs left pending by an earlier session are queued again.
+    """
     global _llm_getter, _config_getter
     _llm_getter = llm_getter
     _config_getter = config_getter
+    for entry in _get_ledger().pending():
+        if entry.get("skill") and entry.get("path"):
+            enhance_if_needed(entry["skill"], entry["path"])
+
+
+@contextmanager
+def foreground_request():
+    """Mark a user-facing LLM request as in flight.
+
+    Enhancement workers do not start LLM calls until no foreground request
+    has been active for QUIET_SECONDS.
+    """
+    global _fg_active, _fg_last_end
+    with _fg_cond:
+        _fg_active += 1
+    try:
+        yield
+    finally:
+        with _fg_cond:
+            _fg_active -= 1
+            _fg_last_end = time.monotonic()
+            _fg_cond.notify_all()
+
+
+def _wait_for_idle() -> None:
+    with _fg_cond:
+        while True:
+            if _fg_active:
+                _fg_cond.wait()
+                continue
+            delay = max(_fg_last_end + QUIET_SECONDS, _backoff_until) - time.monotonic()
+            if delay <= 0:
+                return
+            _fg_cond.wait(delay)
+
+
+def _note_rate_limit() -> None:
+    global _backoff_until, _backoff
+    with _fg_cond:
+        _backoff_until = time.monotonic() + _backoff
+        logger.info("Skill enhancer rate-limited, pausing %.0fs", _backoff)
+        _backoff = min(_backoff * 2, BACKOFF_MAX)
+
+
+def _note_success() -> None:
+    global _backoff
+    with _fg_cond:
+        _backoff = BACKOFF_MIN
 
 
 def enhance_if_needed(skill_name: str, skill_path: str | None) -> None:
     """Check if a skill needs enhancement for the user's primary language.
 
     If the localized_descriptions is missing the user's language (or
-    when_to_use/tags are empty), trigger an async LLM enhancement in a
-    daemon thread.  Returns immediately — does not block.
+    when_to_use/tags are empty), queue an LLM enhancement job.  Returns
+    immediately — does not block.  Unchanged files are not re-parsed.
     """
     if not skill_path:
         return
 
-    with _enhanced_lock:
-        if skill_name in _enhanced_skills:
-            return
-        _enhanced_skills.add(skill_name)
-
-    # Check if enhancement is actually needed
     try:
         from .skill_parser import parse
         from .skill_lang import user_primary_lang
 
-        meta = parse(skill_path)
+        st = os.stat(skill_path)
         primary = user_primary_lang()
+        signature = (st.st_mtime_ns, st.st_size, primary)
+        with _state_lock:
+            if _seen.get(skill_path) == signature:
+                return
+            _seen[skill_path] = signature
 
+        # Check if enhancement is actually needed
+        meta = parse(skill_path)
         needs_translate = primary not in (meta.localized_descriptions or {})
-        needs_when = not meta.when_to_use
-        needs_tags = not meta.tags
+        # when_to_use/tags are derived from the body; without one there is
+        # nothing to enhance and a job would only fail repeatedly
+        has_body = bool(_read_body(skill_path).strip())
+        needs_when = not meta.when_to_use and has_body
+        needs_tags = not meta.tags and has_body
 
         if not needs_translate and not needs_when and not needs_tags:
             return
+
+        digest = hashlib.sha256(Path(skill_path).read_bytes()).hexdigest()[:16]
     except Exception:
         return
 
-    # Spawn daemon thread for async enhancement
-    thread = threading.Thread(
-        target=_do_enhance,
-        args=(skill_name, skill_path),
-        daemon=True,
-    )
-    thread.start()
+    _submit(_Job(f"{skill_name}:{digest}:{primary}", skill_name, skill_path, primary))
 
 
-def _do_enhance(skill_name: str, skill_path: str) -> None:
-    """Daemon thread target — call LLM and write back results."""
-    try:
-        from .skill_parser import parse
-        from .skill_lang import user_primary_lang
+def _submit(job: _Job) -> None:
+    ledger = _get_ledger()
+    entry = ledger.get(job.key)
+    if entry and entry.get("status") == "done":
+        # Same content as when the results were produced: they were never
+        # written back (e.g. the file was busy), so apply them without the LLM.
+        if entry.get("updates"):
+            _apply(job, entry["updates"])
+        return
+    if entry and entry.get("status") == "failed":
+        return
 
-        llm = _llm_getter() if _llm_getter else None
-        if llm is None:
-            logger.debug("Skill enhancer: LLM not available, skipping %s", skill_name)
+    with _state_lock:
+        if job.key in _queued:
             return
+        _queued.add(job.key)
+        if len(_workers) < MAX_WORKERS:
+            worker = threading.Thread(target=_worker, name="skill-enhancer", daemon=True)
+            _workers.append(worker)
+            worker.start()
+
+    if entry is None:
+        ledger.put(job.key, {
+            "status": "pending", "skill": job.skill_name,
+            "path": job.skill_path, "attempts": 0,
+        })
+    _queue.put(job)
+
+
+def _worker() -> None:
+    while True:
+        batch = [_queue.get()]
+        deadline = time.monotonic() + BATCH_WINDOW
+        while len(batch) < BATCH_SIZE:
+            try:
+                batch.append(_queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        retry: list[_Job] = []
+        try:
+            retry = _run_batch(batch)
+        except Exception as e:
+            logger.warning("Skill enhancement batch failed: %s", e)
+        finally:
+            with _state_lock:
+                for job in batch:
+                    if job not in retry:
+                        _queued.discard(job.key)
+        # Rate-limited jobs go back on the queue; _wait_for_idle holds the
+        # next call until the backoff has passed
+        for job in retry:
+            _queue.put(job)
+
+
+def _run_batch(batch: list[_Job]) -> list[_Job]:
+    """Enhance a batch of skills — one LLM call if possible, then write back.
+
+    Returns the jobs cut short by a rate limit.  They are to be retried
+    without counting an attempt.
+    """
+    from .skill_parser import parse
 
-        config = _config_getter() if _config_getter else {}
-        model_name = _resolve_model(config)
-        if not model_name:
-            return
+    llm = _llm_getter() if _llm_getter else None
+    if llm is None:
+        logger.debug("Skill enhancer: LLM not available, skipping %d skill(s)", len(batch))
+        return []
 
-        meta = parse(skill_path)
-        primary = user_primary_lang()
-        body = _read_body(skill_path)
+    config = _config_getter() if _config_getter else {}
+    model_name = _resolve_model(config)
+    if not model_name:
+        return []
 
-        updates: dict = {}
+    items = []
+    for job in batch:
+        try:
+            items.append((job, parse(job.skill_path), _read_body(job.skill_path)))
+        except Exception as e:
+            logger.debug("Skill enhancer: cannot read %s: %s", job.skill_path, e)
+
+    results: dict[str, dict] = {}
+    if len(items) > 1:
+        _wait_for_idle()
+        try:
+            results = _batch_enhance(llm, model_name, items)
+        except _RateLimited:
+            return [job for job, _, _ in items]
+
+    retry: list[_Job] = []
+    for job, meta, body in items:
+        updates = results.get(job.skill_name)
+        if updates is None:
+            if retry:
+                # Rate-limited: no more calls in this batch
+                retry.append(job)
+                continue
+            _wait_for_idle()
+            try:
+                updates = _enhance_one(llm, model_name, job.lang, meta, body)
+            except _RateLimited:
+                retry.append(job)
+                continue
+        _finish(job, updates)
+    return retry
+
+
+def _finish(job: _Job, updates: dict) -> None:
+    ledger = _get_ledger()
+    if updates:
+        ledger.put(job.key, {
+            "status": "done", "skill": job.skill_name, "path": job.skill_path,
+            "updates": updates,
+        })
+        _apply(job, updates)
+        return
+    entry = ledger.get(job.key) or {}
+    attempts = entry.get("attempts", 0) + 1
+    ledger.put(job.key, {
+        "status": "failed" if attempts >= MAX_ATTEMPTS else "pending",
+        "skill": job.skill_name, "path": job.skill_path, "attempts": attempts,
+    })
+    # Let the next listing retry this skill
+    with _state_lock:
+        _seen.pop(job.skill_path, None)
+
+
+def _apply(job: _Job, updates: dict) -> None:
+    try:
+        from .skill_parser import serialize
+        serialize(job.skill_path, updates)
+        logger.info("Skill '%s' enhanced: %s", job.skill_name, list(updates.keys()))
+    except Exception as e:
+        logger.warning("Skill enhancement failed for '%s': %s", job.skill_name, e)
 
-        # 1. Translate description if missing
-        if primary not in (meta.localized_descriptions or {}):
-            translated = _translate_description(
-                llm, model_name, meta.description, primary
-            )
-            if translated:
-                loc = dict(meta.localized_descriptions or {})
-                loc[primary] = translated
-                updates["localized_descriptions"] = loc
-
-        # 2. Extract when_to_use if missing
-        if not meta.when_to_use and body:
-            when = _extract_when_to_use(llm, model_name, meta.description, body)
-            if when:
-                updates["when_to_use"] = when
 
-        # 3. Classify tags if missing
-        if not meta.tags and body:
-            tags = _classify_tags(llm, model_name, meta.description, body)
-            if tags:
-                updates["tags"] = tags
+def _enhance_one(llm, model_name: str, primary: str, meta, body: str) -> dict:
+    """Per-field LLM calls for one skill, return frontmatter updates."""
+    updates: dict = {}
 
-        if updates:
-            from .skill_parser import serialize
-            serialize(skill_path, updates)
-            logger.info("Skill '%s' enhanced: %s", skill_name,
-                        list(updates.keys()))
+    # 1. Translate description if missing
+    if primary not in (meta.localized_descriptions or {}):
+        translated = _translate_description(
+            llm, model_name, meta.description, primary
+        )
+        if translated:
+            loc = dict(meta.localized_descriptions or {})
+            loc[primary] = translated
+            updates["localized_descriptions"] = loc
 
-    except Exception as e:
-        logger.warning("Skill enhancement failed for '%s': %s", skill_name, e)
+    # 2. Extract when_to_use if missing
+    if not meta.when_to_use and body:
+        when = _extract_when_to_use(llm, model_name, meta.description, body)
+        if when:
+            updates["when_to_use"] = when
+
+    # 3. Classify tags if missing
+    if not meta.tags and body:
+        tags = _classify_tags(llm, model_name, meta.description, body)
+        if tags:
+            updates["tags"] = tags
+
+    return updates
 
 
 # ---------------------------------------------------------------------------
 # LLM prompt builders
 # ---------------------------------------------------------------------------
 
+_LANG_NAMES = {
+    "zh": "Chinese", "ja": "Japanese", "ko": "Korean",
+    "ar": "Arabic", "ru": "Russian", "hi": "Hindi",
+    "th": "Thai", "en": "English",
+}
+
+
 def _translate_description(
     llm, model_name: str, description: str, target_lang: str
 ) -> str:
     """Translate a skill description to the target language."""
-    lang_names = {
-        "zh": "Chinese", "ja": "Japanese", "ko": "Korean",
-        "ar": "Arabic", "ru": "Russian", "hi": "Hindi",
-        "th": "Thai", "en": "English",
-    }
-    lang_label = lang_names.get(target_lang, target_lang)
+    lang_label = _LANG_NAMES.get(target_lang, target_lang)
     prompt = (
         f"Translate the following skill description to {lang_label}. "
         f"Return ONLY the translated text, nothing else.\n\n"
@@ -188,24 +464,112 @@ def _classify_tags(
     return []
 
 
+def _batch_enhance(llm, model_name: str, items: list) -> dict[str, dict]:
+    """Enhance several skills with one LLM call.
+
+    *items* is a list of (job, meta, body).  Returns skill name → updates
+    for the skills the answer covered; missing skills fall back to the
+    per-field prompts.
+    """
+    blocks = []
+    wanted: dict[str, tuple] = {}
+    for job, meta, body in items:
+        fields = []
+        if job.lang not in (meta.localized_descriptions or {}):
+            fields.append(f"description_{job.lang}")
+        if not meta.when_to_use and body:
+            fields.append("when_to_use")
+        if not meta.tags and body:
+            fields.append("tags")
+        if not fields:
+            continue
+        wanted[job.skill_name] = (job, meta, fields)
+        snippet = body[:1500] if len(body) > 1500 else body
+        blocks.append(
+            f"### Skill: {job.skill_name}\n"
+            f"Fields: {', '.join(fields)}\n"
+            f"Description: {meta.description}\n\n"
+            f"Body:\n{snippet}"
+        )
+    if len(blocks) < 2:
+        return {}
+
+    langs = sorted({job.lang for job, _, _ in wanted.values()})
+    lang_hint = ", ".join(f"description_{l} = {_LANG_NAMES.get(l, l)}" for l in langs)
+    prompt = (
+        "For each skill below, fill in only the listed fields and return ONE "
+        "JSON object mapping skill name to an object of fields, nothing else.\n"
+        f"- description_<lang>: the description translated ({lang_hint})\n"
+        "- when_to_use: one-sentence 'when to use' hint, max 80 chars\n"
+        "- tags: JSON array of 2-5 short category tags\n\n"
+        + "\n\n".join(blocks)
+    )
+    raw = _quick_call(llm, model_name, prompt, max_tokens=256 * len(blocks),
+                      timeout=30 + 15 * len(blocks))
+    start, end = raw.find("{"), raw.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        answer = json.loads(raw[start:end + 1])
+    except ValueError:
+        return {}
+    if not isinstance(answer, dict):
+        return {}
+
+    results: dict[str, dict] = {}
+    for name, (job, meta, fields) in wanted.items():
+        got = answer.get(name)
+        if not isinstance(got, dict):
+            continue
+        updates: dict = {}
+        translated = got.get(f"description_{job.lang}")
+        if isinstance(translated, str) and translated.strip():
+            loc = dict(meta.localized_descriptions or {})
+            loc[job.lang] = translated.strip()
+            updates["localized_descriptions"] = loc
+        when = got.get("when_to_use")
+        if "when_to_use" in fields and isinstance(when, str) and when.strip():
+            updates["when_to_use"] = when.strip()
+        tags = got.get("tags")
+        if "tags" in fields and isinstance(tags, list):
+            tags = [str(t) for t in tags if isinstance(t, (str, int))][:5]
+            if tags:
+                updates["tags"] = tags
+        # Only accept complete answers; partial ones are redone per field
+        if len(updates) == len(fields):
+            results[name] = updates
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _quick_call(llm, model_name: str, prompt: str) -> str:
-    """Single-turn LLM call, returns content string or empty on failure."""
+def _quick_call(llm, model_name: str, prompt: str,
+                max_tokens: int = 256, timeout: float = 30) -> str:
+    """Single-turn LLM call, returns content string or empty on failure.
+
+    Raises _RateLimited on HTTP 429, so the caller can retry the job
+    without counting the attempt.
+    """
     try:
         response = llm.chat.completions.create(
             model=model_name,
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=256,
+            max_tokens=max_tokens,
             temperature=0,
             stream=False,
-            timeout=30,
+            timeout=timeout,
         )
         content = response.choices[0].message.content or ""
+        _note_success()
         return content.strip()
     except Exception as e:
+        # openai.RateLimitError (HTTP 429): pause the queue instead of
+        # burning attempts against the same limit the user is hitting
+        if type(e).__name__ == "RateLimitError" or getattr(e, "status_code", None) == 429:
+            _note_rate_limit()
+            raise _RateLimited(str(e)) from e
         logger.debug("Quick LLM call failed: %s", e)
         return ""
 
@@ -8,22 +8,42 @@ Manages progressive trust levels:
 - Manual override via :ZaiSkillTrust command
 
 State persisted to ~/.zaivim/skill-state.yaml with HMAC integrity.
+
+Persistence is write-behind: each trust change appends one line to a
+journal next to the state file (``skill-state.log``).  Each line carries an
+HMAC chained to the previous line.  The chain starts at the HMAC of the last
+checkpoint, which the journal's header line names.  Every
+``CHECKPOINT_EVERY`` events, and at exit, the full state is written as a
+signed YAML checkpoint and the journal is restarted, so recording a use
+costs one small append regardless of history length.  A journal whose
+header does not match the checkpoint predates it and is ignored.  A broken
+chain is treated like a tampered checkpoint: every skill is reset to L1.
+``trust_history`` keeps the last ``HISTORY_MAX`` entries per skill.
 """
 
 from __future__ import annotations
 
+import atexit
 import hashlib
 import hmac
 import json
 import logging
 import os
 import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
 import yaml
 
+try:
+    import fcntl
+    HAVE_FCNTL = True
+except ImportError:  # Windows: in-process locking only
+    HAVE_FCNTL = False
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from paths import get_skill_state_file
 
@@ -40,18 +60,41 @@ _STATE_FILE = get_skill_state_file()
 _HMAC_KEY_ENV = "ZAI_SKILL_STATE_HMAC_KEY"
 _L2_THRESHOLD = 3   # safe uses to upgrade L1→L2
 _L3_THRESHOLD = 20  # safe uses to upgrade L2→L3
+CHECKPOINT_EVERY = 64  # journal events between full checkpoints
+HISTORY_MAX = 100      # trust_history entries kept per skill
 
 # Default HMAC key — in production, set ZAI_SKILL_STATE_HMAC_KEY env var
 _DEFAULT_HMAC_KEY = b"zai-skill-state-integrity-v1"
 
 
+_UNLOADED = object()
+
+
+def _file_sig(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
 class TrustEvolution:
     """Manages trust level evolution with state persistence."""
 
     def __init__(self, state_file: Optional[Path] = None):
         self._state_file = state_file or _STATE_FILE
+        self._journal_file = self._state_file.with_suffix(".log")
+        self._lock_file = self._state_file.with_suffix(".lock")
         self._state: dict[str, SkillState] = {}
-        self._load_state()
+        self._lock = threading.RLock()
+        self._snapshot_sig: Any = _UNLOADED
+        self._anchor: Optional[str] = None      # HMAC of the last checkpoint
+        self._chain = ""                        # HMAC of the last journal line
+        self._journal_pos: Optional[int] = None  # None: journal must be restarted
+        self._journal_events = 0
+        self._atexit = False
+        with self._locked():
+            pass
 
     # ------------------------------------------------------------------
     # Public API
@@ -68,55 +111,56 @@ class TrustEvolution:
 
         Returns the new TrustLevel if upgraded, else None.
         """
-        state = self.get_state(skill_name)
-        state.safe_use_count += 1
-        state.last_used = datetime.now(timezone.utc).isoformat()
-
-        old_level = state.trust_level
-
-        if state.trust_level == TrustLevel.L1 and state.safe_use_count >= _L2_THRESHOLD:
-            state.trust_level = TrustLevel.L2
-            state._add_history_entry("L1", "L2", f"safe_use_count: {state.safe_use_count}")
-            self._save_state()
-            return TrustLevel.L2
-
-        if state.trust_level == TrustLevel.L2 and state.safe_use_count >= _L3_THRESHOLD:
-            state.trust_level = TrustLevel.L3
-            state._add_history_entry("L2", "L3", f"safe_use_count: {state.safe_use_count}")
-            self._save_state()
-            return TrustLevel.L3
-
-        self._save_state()
-        return None
+        with self._locked():
+            state = self.get_state(skill_name)
+            state.safe_use_count += 1
+            state.last_used = datetime.now(timezone.utc).isoformat()
+
+            if state.trust_level == TrustLevel.L1 and state.safe_use_count >= _L2_THRESHOLD:
+                state.trust_level = TrustLevel.L2
+                entry = state._add_history_entry("L1", "L2", f"safe_use_count: {state.safe_use_count}")
+                self._append_event(state, entry)
+                return TrustLevel.L2
+
+            if state.trust_level == TrustLevel.L2 and state.safe_use_count >= _L3_THRESHOLD:
+                state.trust_level = TrustLevel.L3
+                entry = state._add_history_entry("L2", "L3", f"safe_use_count: {state.safe_use_count}")
+                self._append_event(state, entry)
+                return TrustLevel.L3
+
+            self._append_event(state)
+            return None
 
     def record_security_event(self, skill_name: str, reason: str) -> TrustLevel:
         """Record a security event and downgrade trust.
 
         Returns the new (downgraded) trust level.
         """
-        state = self.get_state(skill_name)
-        state.security_event_count += 1
-        old_level = str(state.trust_level)
+        with self._locked():
+            state = self.get_state(skill_name)
+            state.security_event_count += 1
+            old_level = str(state.trust_level)
 
-        if state.trust_level == TrustLevel.L3:
-            state.trust_level = TrustLevel.L2
-        elif state.trust_level == TrustLevel.L2:
-            state.trust_level = TrustLevel.L1
-        # L1 stays L1
+            if state.trust_level == TrustLevel.L3:
+                state.trust_level = TrustLevel.L2
+            elif state.trust_level == TrustLevel.L2:
+                state.trust_level = TrustLevel.L1
+            # L1 stays L1
 
-        state._add_history_entry(old_level, str(state.trust_level), f"security_event: {reason}")
-        self._save_state()
-        return state.trust_level
+            entry = state._add_history_entry(old_level, str(state.trust_level), f"security_event: {reason}")
+            self._append_event(state, entry)
+            return state.trust_level
 
     def manual_override(
         self, skill_name: str, level: TrustLevel
     ) -> None:
         """Manually set a skill's trust level."""
-        state = self.get_state(skill_name)
-        old_level = str(state.trust_level)
-        state.trust_level = level
-        state._add_history_entry(old_level, str(level), "manual_override")
-        self._save_state()
+        with self._locked():
+            state = self.get_state(skill_name)
+            old_level = str(state.trust_level)
+            state.trust_level = level
+            entry = state._add_history_entry(old_level, str(level), "manual_override")
+            self._append_event(state, entry)
 
     def needs_hitl_confirmation(
         self,
@@ -163,13 +207,72 @@ class TrustEvolution:
         state = self.get_state(skill_name)
         return state.trust_history[-limit:]
 
+    def flush(self) -> None:
+        """Write a checkpoint if anything changed since the last one.
+
+        Also persists fields set directly on a SkillState (``last_schema``).
+        Registered with atexit once the first event is recorded.
+        """
+        with self._locked():
+            data = self._snapshot_data()
+            if self._journal_events == 0:
+                if self._anchor is None and not data:
+                    return
+                canonical = json.dumps(data, sort_keys=True, ensure_ascii=False)
+                if self._compute_hmac(canonical) == self._anchor:
+                    return
+            self._checkpoint(data)
+
     # ------------------------------------------------------------------
     # State persistence
     # ------------------------------------------------------------------
 
+    @contextmanager
+    def _locked(self):
+        """Serialize with other threads and processes, then catch up on disk."""
+        with self._lock:
+            lock_fp = None
+            if HAVE_FCNTL:
+                try:
+                    self._lock_file.parent.mkdir(parents=True, exist_ok=True)
+                    lock_fp = open(self._lock_file, "a")
+                    fcntl.flock(lock_fp, fcntl.LOCK_EX)
+                except OSError as exc:
+                    logger.warning("Failed to lock skill state: %s", exc)
+                    if lock_fp is not None:
+                        lock_fp.close()
+                        lock_fp = None
+            try:
+                self._sync()
+                yield
+            finally:
+                if lock_fp is not None:
+                    lock_fp.close()
+
+    def _sync(self) -> None:
+        """Pick up checkpoints and journal lines written by other processes."""
+        if self._snapshot_sig is _UNLOADED or _file_sig(self._state_file) != self._snapshot_sig:
+            self._load_state()
+            return
+        if self._journal_pos is None:
+            return
+        try:
+            size = self._journal_file.stat().st_size
+        except OSError:
+            size = 0
+        if size < self._journal_pos:
+            self._load_state()
+        elif size > self._journal_pos:
+            self._replay_journal()
+
     def _load_state(self) -> None:
-        """Load state from YAML file with HMAC verification."""
-        if not self._state_file.exists():
+        """Load the checkpoint with HMAC verification, then replay the journal."""
+        self._state = {}
+        self._anchor = None
+        self._journal_pos = None
+        self._journal_events = 0
+        self._snapshot_sig = _file_sig(self._state_file)
+        if self._snapshot_sig is None:
             return
 
         try:
@@ -183,26 +286,16 @@ class TrustEvolution:
             return
 
         stored_hmac = data.pop("_hmac", None)
+        tampered = False
 
         # Verify HMAC using canonical JSON (deterministic serialization)
         if stored_hmac:
             canonical = json.dumps(data, sort_keys=True, ensure_ascii=False)
             expected = self._compute_hmac(canonical)
-            if not hmac.compare_digest(stored_hmac, expected):
-                logger.warning(
-                    "Skill state integrity check failed — resetting to L1"
-                )
-                # Reset all skills to L1 on tampering
-                for name, state_data in data.items():
-                    if isinstance(state_data, dict):
-                        original_level = state_data.get("trust_level", "L1")
-                        state_data["trust_level"] = "L1"
-                        state_data.setdefault("trust_history", []).append({
-                            "timestamp": datetime.now(timezone.utc).isoformat(),
-                            "from": original_level,
-                            "to": "L1",
-                            "reason": "state_tampering_detected",
-                        })
+            if hmac.compare_digest(stored_hmac, expected):
+                self._anchor = stored_hmac
+            else:
+                tampered = True
 
         # Parse state entries
         for name, state_data in data.items():
@@ -215,13 +308,115 @@ class TrustEvolution:
             except Exception as exc:
                 logger.warning("Failed to parse state for %s: %s", name, exc)
 
-    def _save_state(self) -> None:
+        if tampered:
+            # Journal lines chain to the tampered checkpoint: not replayed
+            self._reset_tampered()
+        elif self._anchor is not None:
+            self._replay_journal()
+
+    def _replay_journal(self) -> None:
+        """Apply journal lines past ``_journal_pos``, verifying the chain."""
+        pos = self._journal_pos or 0
+        try:
+            with open(self._journal_file, "rb") as f:
+                f.seek(pos)
+                data = f.read()
+        except OSError:
+            return
+        # A trailing partial line is an append still in progress (or cut
+        # short by a crash) — it is neither applied nor tampering.
+        complete = data[:data.rfind(b"\n") + 1]
+        lines = complete.splitlines()
+        if pos == 0:
+            try:
+                header = json.loads(lines[0]) if lines else {}
+            except ValueError:
+                header = {}
+            if header.get("anchor") != self._anchor:
+                # Written before the current checkpoint, already included
+                return
+            lines = lines[1:]
+            self._chain = self._anchor
+
+        for line in lines:
+            try:
+                event = json.loads(line)
+                mac = event.pop("mac")
+            except (ValueError, KeyError, AttributeError):
+                mac, event = None, None
+            if mac is None or not hmac.compare_digest(
+                    mac, self._compute_hmac(self._chain + self._canonical(event))):
+                self._reset_tampered()
+                return
+            self._apply_event(event)
+            self._chain = mac
+            self._journal_events += 1
+        self._journal_pos = pos + len(complete)
+
+    def _apply_event(self, event: dict) -> None:
+        state = self.get_state(event["skill"])
+        state.trust_level = TrustLevel(event["trust_level"])
+        state.safe_use_count = event["safe_use_count"]
+        state.security_event_count = event["security_event_count"]
+        state.last_used = event["last_used"]
+        if event.get("history"):
+            state.trust_history.append(event["history"])
+            del state.trust_history[:-HISTORY_MAX]
+
+    def _reset_tampered(self) -> None:
+        """Reset all skills to L1 and write a fresh, signed checkpoint."""
+        logger.warning("Skill state integrity check failed — resetting to L1")
+        for state in self._state.values():
+            original_level = str(state.trust_level)
+            state.trust_level = TrustLevel.L1
+            state._add_history_entry(original_level, "L1", "state_tampering_detected")
+        self._checkpoint()
+
+    def _append_event(self, state: SkillState, entry: Optional[dict] = None) -> None:
+        """Journal the new state of one skill (constant cost)."""
+        if not self._atexit:
+            self._atexit = True
+            atexit.register(self.flush)
+        if self._anchor is None or self._journal_pos is None:
+            self._checkpoint()      # the checkpoint already includes this event
+            return
+
+        event = {
+            "skill": state.skill_name,
+            "trust_level": str(state.trust_level),
+            "safe_use_count": state.safe_use_count,
+            "security_event_count": state.security_event_count,
+            "last_used": state.last_used,
+        }
+        if entry:
+            event["history"] = entry
+        mac = self._compute_hmac(self._chain + self._canonical(event))
+        line = json.dumps({**event, "mac": mac}, ensure_ascii=False) + "\n"
+        try:
+            with open(self._journal_file, "ab") as f:
+                f.write(line.encode("utf-8"))
+                pos = f.tell()
+        except OSError as exc:
+            logger.error("Failed to append skill state journal: %s", exc)
+            self._checkpoint()
+            return
+        self._chain = mac
+        self._journal_pos = pos
+        self._journal_events += 1
+        if self._journal_events >= CHECKPOINT_EVERY:
+            self._checkpoint()
+
+    def _snapshot_data(self) -> dict:
+        # Skills never touched need no entry: get_state recreates them
+        return {name: state.to_dict() for name, state in self._state.items()
+                if not state.is_default()}
+
+    def _checkpoint(self, data: Optional[dict] = None) -> None:
         """Save state to YAML file with HMAC integrity and atomic write."""
         self._state_file.parent.mkdir(parents=True, exist_ok=True)
 
-        data = {}
-        for name, state in self._state.items():
-            data[name] = state.to_dict()
+        if data is None:
+            data = self._snapshot_data()
 
         # HMAC over canonical JSON (deterministic, no YAML ordering issues)
         canonical = json.dumps(data, sort_keys=True, ensure_ascii=False)
@@ -245,6 +440,30 @@ class TrustEvolution:
                 tmp_path.unlink(missing_ok=True)
             except OSError:
                 pass
+            return
+        self._snapshot_sig = _file_sig(self._state_file)
+        self._anchor = mac
+        self._restart_journal()
+
+    def _restart_journal(self) -> None:
+        """Replace the journal with a header naming the current checkpoint."""
+        header = json.dumps({"anchor": self._anchor}) + "\n"
+        tmp_path = self._journal_file.with_suffix(".log.tmp")
+        try:
+            tmp_path.write_text(header, encoding="utf-8")
+            tmp_path.chmod(0o600)
+            tmp_path.replace(self._journal_file)
+        except OSError as exc:
+            logger.error("Failed to restart skill state journal: %s", exc)
+            self._journal_pos = None
+            return
+        self._chain = self._anchor
+        self._journal_pos = len(header.encode("utf-8"))
+        self._journal_events = 0
+
+    @staticmethod
+    def _canonical(event: dict) -> str:
+        return json.dumps(event, sort_keys=True, ensure_ascii=False)
 
     @staticmethod
     def _compute_hmac(content: str) -> str:
@@ -268,13 +487,23 @@ class SkillState:
 
     def _add_history_entry(
         self, from_level: str, to_level: str, reason: str
-    ) -> None:
-        self.trust_history.append({
+    ) -> dict:
+        entry = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "from": from_level,
             "to": to_level,
             "reason": reason,
-        })
+        }
+        self.trust_history.append(entry)
+        # Compaction: only the most recent entries are kept
+        del self.trust_history[:-HISTORY_MAX]
+        return entry
+
+    def is_default(self) -> bool:
+        """True for a state that was created but never changed."""
+        return (self.trust_level == TrustLevel.L1 and not self.safe_use_count
+                and not self.security_event_count and not self.last_used
+                and not self.trust_history and not self.last_schema)
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -293,6 +522,6 @@ class SkillState:
         state.safe_use_count = data.get("safe_use_count", 0)
         state.security_event_count = data.get("security_event_count", 0)
         state.last_used = data.get("last_used", "")
-        state.trust_history = data.get("trust_history", [])
+        state.trust_history = list(data.get("trust_history", []))[-HISTORY_MAX:]
         state.last_schema = data.get("last_schema", "")
         return state
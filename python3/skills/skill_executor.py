@@ -2,22 +2,33 @@
 Unified skill execution engine.
 
 Provides a single entry point for invoking any registered skill with:
-- Thread-based execution (non-blocking Vim UI)
-- Configurable timeout (default 30s)
+- Thread-based execution (non-blocking Vim UI), one bounded pool per
+  security domain so hung skills of one domain cannot starve the others
+- Configurable timeout (default 30s); subprocesses a timed-out skill
+  started are killed (whole process group), and a pool whose workers
+  are all stuck in timed-out skills is replaced
+- Dynamic-context shell injections run concurrently
+- Occupancy / queue-depth metrics via SkillExecutor.stats()
 - L0 security fallback (deny cross-domain when verifier not ready)
 - Unified InvocationResult returns for all paths
 """
 
 from __future__ import annotations
 
+import concurrent.futures
+import contextvars
 import json
 import logging
+import os
 import re
 import shlex
+import signal
 import subprocess
 import threading
 import time
+import weakref
 from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.thread import BrokenThreadPool
 from pathlib import Path
 from typing import Any, Callable, Optional
 
@@ -36,7 +47,223 @@ from .skill_types import (
 logger = logging.getLogger(__name__)
 
 _DEFAULT_TIMEOUT = 30
-_DEFAULT_MAX_WORKERS = 4
+_DEFAULT_MAX_WORKERS = 4  # per security domain
+_INJECT_WORKERS = 4       # concurrent dynamic-context shell commands
+
+
+# ---------------------------------------------------------------------------
+# Worker pools and killable subprocesses
+# ---------------------------------------------------------------------------
+
+class _DomainPool:
+    """Bounded worker pool with occupancy counters.
+
+    A worker still running a skill whose caller timed out is "abandoned":
+    it keeps its thread until the skill returns.  Once every worker is
+    abandoned the executor is replaced, so new work is not queued behind
+    hung skills; the old threads exit when their skills finish.  Abandoned
+    workers are counted per executor generation: a skill of a replaced
+    executor that finishes late does not free a slot of the current one.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        # Executor generation, and the generation each pending future runs in
+        self._generation = 0
+        self._generations: weakref.WeakKeyDictionary[Future, int] = (
+            weakref.WeakKeyDictionary())
+        self._queued = 0
+        self._running = 0
+        self._abandoned = 0
+        self._completed = 0
+        self._timeouts = 0
+        self._replaced = 0
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.workers,
+                                  thread_name_prefix=f"skill-{self.name}")
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        def task():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        with self._lock:
+            self._queued += 1
+            executor = self._executor
+            generation = self._generation
+        try:
+            future = executor.submit(task)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            raise
+        with self._lock:
+            self._generations[future] = generation
+        return future
+
+    def abandon(self, future: Future) -> None:
+        """Give up on *future* after a timeout."""
+        with self._lock:
+            self._timeouts += 1
+        if future.done():
+            return
+        if future.cancel():
+            with self._lock:
+                self._queued -= 1       # never started
+            return
+        with self._lock:
+            generation = self._generations.get(future, self._generation)
+            if generation != self._generation:
+                return                  # its executor was already replaced
+            self._abandoned += 1
+            if self._abandoned >= self.workers:
+                logger.warning(
+                    "Skill pool %s: all %d workers stuck in timed-out skills, "
+                    "starting a fresh pool", self.name, self.workers,
+                )
+                self._executor.shutdown(wait=False)
+                self._executor = self._new_executor()
+                self._generation += 1
+                self._abandoned = 0
+                self._replaced += 1
+                return
+        future.add_done_callback(lambda _f: self._release(generation))
+
+    def _release(self, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self._abandoned -= 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": self._queued,
+                "abandoned": self._abandoned,
+                "occupancy": round(self._running / self.workers, 2),
+                "completed": self._completed,
+                "timeouts": self._timeouts,
+                "replaced": self._replaced,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor = self._executor
+        executor.shutdown(wait=wait)
+
+
+class _SkillRun:
+    """Subprocesses started on behalf of one skill invocation.
+
+    Each process leads its own process group; kill() terminates every group
+    still running, which unblocks the worker waiting on it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._procs: set[subprocess.Popen] = set()
+        self.cancelled = False
+
+    def spawn(self, args: Any, **kwargs: Any) -> subprocess.Popen:
+        with self._lock:
+            if self.cancelled:
+                raise RuntimeError("skill timed out")
+            proc = _spawn(args, **kwargs)
+            self._procs.add(proc)
+            return proc
+
+    def release(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.discard(proc)
+
+    def kill(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            procs = list(self._procs)
+        for proc in procs:
+            _kill_group(proc)
+
+
+# The invocation whose subprocesses the current thread starts
+_current_run: contextvars.ContextVar[Optional[_SkillRun]] = contextvars.ContextVar(
+    "skill_run", default=None
+)
+
+
+def _spawn(args: Any, **kwargs: Any) -> subprocess.Popen:
+    return subprocess.Popen(
+        args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+        **kwargs,
+    )
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (OSError, AttributeError):
+        try:
+            proc.kill()
+        except OSError:
+            pass
+
+
+def _run_process(args: Any, **kwargs: Any) -> str:
+    """Run an injection command, return its output (or a bracketed error).
+
+    The process is killed with its whole group on ``_INJECT_TIMEOUT`` or
+    when the owning skill invocation times out.
+    """
+    run = _current_run.get()
+    proc = run.spawn(args, **kwargs) if run is not None else _spawn(args, **kwargs)
+    try:
+        try:
+            stdout, _ = proc.communicate(timeout=_INJECT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            _kill_group(proc)
+            proc.communicate()
+            return f"[command timed out after {_INJECT_TIMEOUT}s]"
+    finally:
+        if run is not None:
+            run.release(proc)
+    if run is not None and run.cancelled:
+        return "[command killed: skill timed out]"
+    output = stdout.strip()
+    if proc.returncode != 0 and not output:
+        return f"[command failed: exit code {proc.returncode}]"
+    return output
+
+
+_inject_pool: Optional[_DomainPool] = None
+_inject_pool_lock = threading.Lock()
+
+
+def _get_inject_pool() -> _DomainPool:
+    global _inject_pool
+    with _inject_pool_lock:
+        if _inject_pool is None:
+            _inject_pool = _DomainPool("inject", _INJECT_WORKERS)
+        return _inject_pool
+
+
+def inject_stats() -> dict[str, Any]:
+    """Occupancy of the dynamic-context injection pool."""
+    return _get_inject_pool().stats()
 
 # ---------------------------------------------------------------------------
 # Dynamic context injection (!`cmd` and ```! ... ```)
@@ -86,24 +313,38 @@ def inject_dynamic_context(
     skill_name = meta.name
 
     # Inline: !`command`
-    def _replace_inline(m: re.Match) -> str:
-        prefix = m.group(1)
-        cmd = m.group(2)
-        output = _run_inject_command(cmd, skill_name)
-        return f"{prefix}{output}"
-
-    content = _INLINE_INJECT_RE.sub(_replace_inline, content)
+    matches = list(_INLINE_INJECT_RE.finditer(content))
+    if matches:
+        outputs = iter(_run_inject_commands([m.group(2) for m in matches], skill_name))
+        content = _INLINE_INJECT_RE.sub(lambda m: f"{m.group(1)}{next(outputs)}", content)
 
     # Block: ```!\n...\n```
-    def _replace_block(m: re.Match) -> str:
-        cmds = m.group(1)
-        output = _run_inject_command(cmds, skill_name)
-        return output
-
-    content = _BLOCK_INJECT_RE.sub(_replace_block, content)
+    matches = list(_BLOCK_INJECT_RE.finditer(content))
+    if matches:
+        outputs = iter(_run_inject_commands([m.group(1) for m in matches], skill_name))
+        content = _BLOCK_INJECT_RE.sub(lambda m: next(outputs), content)
     return content
 
 
+def _run_inject_commands(cmds: list[str], skill_name: str) -> list[str]:
+    """Run injection commands concurrently, outputs in input order."""
+    if len(cmds) == 1:
+        return [_run_inject_command(cmds[0], skill_name)]
+    pool = _get_inject_pool()
+    futures = [
+        # copy_context: commands belong to the calling skill invocation
+        pool.submit(contextvars.copy_context().run, _run_inject_command, cmd, skill_name)
+        for cmd in cmds
+    ]
+    outputs = []
+    for future in futures:
+        try:
+            outputs.append(future.result())
+        except Exception as e:
+            outputs.append(f"[command failed: {e}]")
+    return outputs
+
+
 def _is_injection_allowed(meta: SkillMetadata) -> bool:
     """Check whether dynamic shell injection is allowed for this skill.
 
@@ -212,19 +453,7 @@ def _run_inject_command_sandbox(cmd: str) -> str:
         bwrap_args_safe = list(config.bwrap_args)
         bwrap_cmd = bwrap_args_safe + ['/bin/sh', '-c', cmd]
 
-        result = subprocess.run(
-            bwrap_cmd,
-            capture_output=True,
-            text=True,
-            timeout=_INJECT_TIMEOUT,
-            cwd=project_root,
-        )
-        output = result.stdout.strip()
-        if result.returncode != 0 and not output:
-            return f"[command failed: exit code {result.returncode}]"
-        return output
-    except subprocess.TimeoutExpired:
-        return f"[command timed out after {_INJECT_TIMEOUT}s]"
+        return _run_process(bwrap_cmd, cwd=project_root)
     except Exception as e:
         return f"[command failed: {e}]"
 
@@ -232,19 +461,7 @@ def _run_inject_command_sandbox(cmd: str) -> str:
 def _run_inject_command_host(cmd: str) -> str:
     """Execute command directly on host (legacy mode, opt-in only)."""
     try:
-        result = subprocess.run(
-            cmd,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=_INJECT_TIMEOUT,
-        )
-        output = result.stdout.strip()
-        if result.returncode != 0 and not output:
-            return f"[command failed: exit code {result.returncode}]"
-        return output
-    except subprocess.TimeoutExpired:
-        return f"[command timed out after {_INJECT_TIMEOUT}s]"
+        return _run_process(cmd, shell=True)
     except Exception as e:
         return f"[command failed: {e}]"
 
@@ -355,10 +572,14 @@ class SkillExecutor:
         max_workers: int = _DEFAULT_MAX_WORKERS,
         audit_logger: Optional[SkillAuditLogger] = None,
         l0_verifier: Optional[IntentVerifier] = None,
+        domain_workers: Optional[dict[str, int]] = None,
     ):
         self._registry = registry
         self._tool_pool = tool_pool
-        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._max_workers = max_workers
+        self._domain_workers = dict(domain_workers or {})
+        self._pools: dict[str, _DomainPool] = {}
+        self._pools_lock = threading.Lock()
         self._audit = audit_logger
         self._l0_verifier = l0_verifier or IntentVerifier()
 
@@ -538,6 +759,28 @@ class SkillExecutor:
     # Execution with timeout
     # ------------------------------------------------------------------
 
+    def _pool_for(self, meta: SkillMetadata) -> _DomainPool:
+        domain = str(meta.security_domain)
+        with self._pools_lock:
+            pool = self._pools.get(domain)
+            if pool is None:
+                workers = self._domain_workers.get(domain, self._max_workers)
+                pool = self._pools[domain] = _DomainPool(domain, workers)
+            return pool
+
+    def stats(self) -> dict[str, Any]:
+        """Occupancy and queue depth of each domain pool and the inject pool.
+
+        ``occupancy`` is running / workers; above 1.0 after a pool was
+        replaced while abandoned workers still run.
+        """
+        with self._pools_lock:
+            pools = dict(self._pools)
+        return {
+            "pools": {domain: pool.stats() for domain, pool in pools.items()},
+            "inject": inject_stats(),
+        }
+
     def _execute_with_timeout(
         self,
         name: str,
@@ -545,19 +788,21 @@ class SkillExecutor:
         timeout: int,
         **kwargs: Any,
     ) -> InvocationResult:
-        """Execute skill in a thread with timeout."""
-        future: Future = self._executor.submit(self._run_skill, meta, **kwargs)
-
+        """Execute skill in its domain's pool with timeout."""
+        pool = self._pool_for(meta)
+        skill_run = _SkillRun()
         try:
+            future: Future = pool.submit(self._run_skill, meta, skill_run, **kwargs)
             return future.result(timeout=timeout)
-        except threading.BrokenThreadPool:
+        except BrokenThreadPool:
             return InvocationResult(
                 success=False,
                 error=f"Executor pool broken for {name}",
                 error_code=ErrorCode.SKILL_EXECUTION_ERROR,
             )
-        except TimeoutError:
-            future.cancel()
+        except concurrent.futures.TimeoutError:
+            skill_run.kill()
+            pool.abandon(future)
             logger.warning("Skill %s timed out after %ds", name, timeout)
             return InvocationResult(
                 success=False,
@@ -572,8 +817,11 @@ class SkillExecutor:
                 error_code=ErrorCode.SKILL_EXECUTION_ERROR,
             )
 
-    def _run_skill(self, meta: SkillMetadata, **kwargs: Any) -> InvocationResult:
+    def _run_skill(
+        self, meta: SkillMetadata, skill_run: _SkillRun, **kwargs: Any
+    ) -> InvocationResult:
         """Actual skill invocation (runs in thread pool)."""
+        token = _current_run.set(skill_run)
         try:
             if meta.origin == SkillOrigin.ADAPTED:
                 return invoke_adapted(
@@ -590,6 +838,8 @@ class SkillExecutor:
                 error_code=ErrorCode.SKILL_EXECUTION_ERROR,
                 recoverable=True,
             )
+        finally:
+            _current_run.reset(token)
 
     def _invoke_native(
         self, meta: SkillMetadata, **kwargs: Any
@@ -673,8 +923,11 @@ class SkillExecutor:
     # ------------------------------------------------------------------
 
     def shutdown(self, wait: bool = True) -> None:
-        """Shut down the executor thread pool."""
-        self._executor.shutdown(wait=wait)
+        """Shut down the executor thread pools."""
+        with self._pools_lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.shutdown(wait=wait)
 
 
 def _is_shell_execution_disabled() -> bool:
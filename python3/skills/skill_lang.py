@@ -3,14 +3,22 @@ User language detection and frequency tracking for skill enhancement.
 
 Zero-dependency Unicode block analysis covers: zh, ja, ko, ar, ru, hi, th,
 and Latin-family languages.  Frequency stats persisted to ~/.zaivim/lang-stats.json.
+
+Counts are kept in memory and written back in batches: after
+``FLUSH_EVERY`` new samples, ``FLUSH_INTERVAL`` seconds after the first
+unsaved sample, and at exit.  A flush re-reads the file and adds only the
+unsaved deltas, so several editor instances sharing the file do not lose
+each other's counts.
 """
 
 from __future__ import annotations
 
+import atexit
 import json
 import logging
 import os
 import re
+import threading
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -46,12 +54,17 @@ _BLOCK_TO_LANG: dict[str, str] = {
 
 _ASCII_WORD_RE = re.compile(r"[a-zA-Z]+")
 
+# Characters of a message inspected by detect_lang (pasted files can be huge)
+DETECT_SAMPLE_CHARS = 4096
+
 
 def detect_lang(text: str) -> str:
     """Detect the dominant language of *text* via Unicode block analysis.
 
     Returns a 2-letter code: zh, ja, ko, ar, ru, hi, th, en, or "unknown".
+    Only the first ``DETECT_SAMPLE_CHARS`` characters are inspected.
     """
+    text = text[:DETECT_SAMPLE_CHARS] if text else text
     if not text or not text.strip():
         return "unknown"
 
@@ -80,6 +93,11 @@ def detect_lang(text: str) -> str:
 
 _DEFAULT_LANG = "en"
 
+# Unsaved samples that trigger a flush
+FLUSH_EVERY = 20
+# Seconds an unsaved sample may wait before it is flushed
+FLUSH_INTERVAL = 60.0
+
 
 def _stats_path() -> Path:
     """Return the path to the persistent language stats file."""
@@ -101,15 +119,100 @@ def load_stats() -> dict[str, int]:
     return {}
 
 
-def save_stats(stats: dict[str, int]) -> None:
-    """Persist language frequency stats to disk."""
+def save_stats(stats: dict[str, int]) -> bool:
+    """Persist language frequency stats to disk (atomically).
+
+    Returns False (after logging a warning) if the file could not be written.
+    """
     path = _stats_path()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(stats, ensure_ascii=False, indent=2),
-                        encoding="utf-8")
+        tmp.write_text(json.dumps(stats, ensure_ascii=False, indent=2),
+                       encoding="utf-8")
+        os.replace(tmp, path)
+        return True
     except Exception as e:
         logger.warning("Failed to save lang stats: %s", e)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return False
+
+
+class _LangStats:
+    """In-memory language counters with batched write-back."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._base: dict[str, int] | None = None    # counts as last read/written
+        self._pending: dict[str, int] = {}          # samples not yet on disk
+        self._unsaved = 0
+        self._timer: threading.Timer | None = None
+        self._atexit = False
+
+    def _loaded(self) -> dict[str, int]:
+        if self._base is None:
+            self._base = load_stats()
+        return self._base
+
+    def add(self, lang: str) -> None:
+        with self._lock:
+            self._loaded()
+            self._pending[lang] = self._pending.get(lang, 0) + 1
+            self._unsaved += 1
+            if not self._atexit:
+                self._atexit = True
+                atexit.register(self.flush)
+            flush_now = self._unsaved >= FLUSH_EVERY
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def snapshot(self) -> dict[str, int]:
+        """Counts on disk plus unsaved samples."""
+        with self._lock:
+            merged = dict(self._loaded())
+            for lang, n in self._pending.items():
+                merged[lang] = merged.get(lang, 0) + n
+            return merged
+
+    def flush(self) -> None:
+        """Add unsaved samples to the file on disk.
+
+        If the write fails the samples stay pending and the next flush
+        retries them.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            on_disk = load_stats()
+            merged = dict(on_disk)
+            for lang, n in self._pending.items():
+                merged[lang] = merged.get(lang, 0) + n
+            if not save_stats(merged):
+                # Retry with the next batch (or the timer it starts)
+                self._base = on_disk
+                self._unsaved = 0
+                return
+            self._base = merged
+            self._pending = {}
+            self._unsaved = 0
+
+
+_stats = _LangStats()
+
+
+def flush_stats() -> None:
+    """Write unsaved language samples to disk now."""
+    _stats.flush()
 
 
 def record_lang(text: str) -> str | None:
@@ -121,9 +224,7 @@ def record_lang(text: str) -> str | None:
     if lang in ("unknown", "other"):
         return None
 
-    stats = load_stats()
-    stats[lang] = stats.get(lang, 0) + 1
-    save_stats(stats)
+    _stats.add(lang)
     return lang
 
 
@@ -132,7 +233,7 @@ def user_primary_lang() -> str:
 
     Falls back to LANG/LANGUAGE env vars, then "en".
     """
-    stats = load_stats()
+    stats = _stats.snapshot()
     if stats:
         return max(stats, key=stats.get)  # type: ignore[arg-type]
 
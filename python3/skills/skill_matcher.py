@@ -13,13 +13,35 @@ LLMSkillMatcher (fallback).  All implement the SkillMatcher interface.
 
 from __future__ import annotations
 
+import hashlib
+import heapq
+import json
+import logging
 import math
+import os
 import re
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any
 
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+# Catalog size from which ranking uses NumPy (if installed)
+NUMPY_MIN_DOCS = 2000
+# Bump when the persisted index layout changes
+_INDEX_VERSION = 1
+
+_ALPHA_RE = re.compile(r'[a-zA-Z0-9_]+')
+_NON_CJK_RE = re.compile(r'[\x00-\x7f\s]+')
+
 
 # ---------------------------------------------------------------------------
 # Interface
@@ -43,22 +65,40 @@ class _SkillDoc:
     text: str  # description + when_to_use (localized if available)
 
 
+@dataclass
+class _Postings:
+    """Documents containing one term, with their precomputed BM25 impact.
+
+    impact = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)),
+    i.e. the term's whole score contribution for that document.
+    """
+    doc_ids: list[int] = field(default_factory=list)
+    impacts: list[float] = field(default_factory=list)
+
+
 class BM25SkillMatcher(SkillMatcher):
     """BM25 ranking with mixed Chinese/English tokenizer.
 
     Install-time LLM translation can populate localized_descriptions for
     cross-language matching.  Without it, BM25 works best when the user
     prompt and skill descriptions share a language.
+
+    All query-independent work (idf, length norms) is done at index time, so
+    ranking only walks the postings of the query terms and keeps a top-k
+    heap.  With ``cache_path`` the index is persisted and reused until the
+    indexed skill texts change.
     """
 
-    def __init__(self, k1: float = 1.5, b: float = 0.75):
+    def __init__(self, k1: float = 1.5, b: float = 0.75,
+                 cache_path: str | os.PathLike | None = None):
         self._k1 = k1
         self._b = b
+        self._cache_path = Path(cache_path) if cache_path else None
         self._skills: list[_SkillDoc] = []
-        self._inverted_index: dict[str, list[tuple[int, int]]] = defaultdict(list)
-        self._doc_lengths: list[int] = []
-        self._avgdl: float = 0.0
+        self._postings: dict[str, _Postings] = {}
+        self._arrays: dict[str, tuple] = {}     # term → (ids, impacts) as ndarrays
         self._N: int = 0
+        self._fingerprint: str = ""
 
     # ------------------------------------------------------------------
     # Public API
@@ -68,14 +108,16 @@ class BM25SkillMatcher(SkillMatcher):
                      lang: str | None = None) -> None:
         """Build/replace the skill index.
 
+        Unchanged input keeps the current index; otherwise the persisted
+        index is used when its fingerprint matches, and only then is the
+        index rebuilt.
+
         Args:
             skills: list of dicts with keys: name, description, when_to_use,
                     localized_descriptions (optional).
             lang: preferred language code for localized descriptions.
         """
-        self._inverted_index.clear()
-        self._skills = []
-
+        docs = []
         for s in skills:
             desc = s.get("description", "")
             when = s.get("when_to_use", "")
@@ -84,67 +126,156 @@ class BM25SkillMatcher(SkillMatcher):
             if lang and lang in localized:
                 desc = localized[lang]
             text = f"{desc} {when}".strip()
-            self._skills.append(_SkillDoc(name=s["name"], text=text))
+            docs.append(_SkillDoc(name=s["name"], text=text))
 
-        self._doc_lengths = []
-        for doc_id, sk in enumerate(self._skills):
-            tokens = self._tokenize(sk.text)
-            self._doc_lengths.append(len(tokens))
-            # Build inverted index with term frequencies
-            tf = defaultdict(int)
-            for t in tokens:
-                tf[t] += 1
-            for t, freq in tf.items():
-                self._inverted_index[t].append((doc_id, freq))
-
-        self._N = len(self._skills)
-        self._avgdl = (
-            sum(self._doc_lengths) / max(self._N, 1)
-            if self._N else 0.0
-        )
+        fingerprint = self._fingerprint_of(docs)
+        if fingerprint == self._fingerprint:
+            return
+        if not self._load(fingerprint):
+            self._build(docs)
+            self._fingerprint = fingerprint
+            self._save()
+        self._prepare_arrays()
 
     def rank(self, query: str, top_k: int = 5) -> list[str]:
         """Return top-k skill names for the given query."""
         if self._N == 0 or not query.strip():
             return [s.name for s in self._skills[:top_k]]
 
-        q_tokens = self._tokenize(query)
-        if not q_tokens:
+        q_terms = set(self._tokenize(query))
+        if not q_terms:
             return []
 
-        scores: list[tuple[str, float]] = []
-        for doc_id in range(self._N):
-            dl = self._doc_lengths[doc_id]
-            if dl == 0:
-                scores.append((self._skills[doc_id].name, 0.0))
-                continue
-            score = 0.0
-            for t in set(q_tokens):
-                postings = self._inverted_index.get(t, [])
-                # Find this doc's term frequency in postings
-                tf = 0
-                df = 0  # document frequency
-                for doc, freq in postings:
-                    if doc == doc_id:
-                        tf = freq
-                    else:
-                        df += 1
-                if tf == 0:
+        if self._arrays:
+            ranked = self._rank_numpy(q_terms, top_k)
+        else:
+            # Term-at-a-time accumulation over the query terms' postings
+            acc: dict[int, float] = defaultdict(float)
+            for t in q_terms:
+                p = self._postings.get(t)
+                if p is None:
                     continue
-                # BM25 IDF
-                idf = math.log(
-                    (self._N - df + 0.5) / (df + 0.5) + 1.0
-                )
-                # BM25 score contribution
-                numerator = tf * (self._k1 + 1.0)
-                denominator = tf + self._k1 * (
-                    1.0 - self._b + self._b * dl / self._avgdl
-                )
-                score += idf * numerator / denominator
-            scores.append((self._skills[doc_id].name, score))
-
-        scores.sort(key=lambda x: -x[1])
-        return [name for name, _ in scores[:top_k]]
+                for doc_id, impact in zip(p.doc_ids, p.impacts):
+                    acc[doc_id] += impact
+            # Ties keep index order
+            ranked = [doc_id for doc_id, _ in heapq.nsmallest(
+                top_k, acc.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+        # Unmatched skills fill the remaining slots in index order
+        if len(ranked) < top_k:
+            seen = set(ranked)
+            for doc_id in range(self._N):
+                if len(ranked) >= top_k:
+                    break
+                if doc_id not in seen:
+                    ranked.append(doc_id)
+        return [self._skills[doc_id].name for doc_id in ranked]
+
+    # ------------------------------------------------------------------
+    # Index construction / persistence
+    # ------------------------------------------------------------------
+
+    def _fingerprint_of(self, docs: list[_SkillDoc]) -> str:
+        h = hashlib.sha1(f"{_INDEX_VERSION}:{self._k1}:{self._b}".encode())
+        for d in docs:
+            h.update(b"\0")
+            h.update(d.name.encode("utf-8", "surrogatepass"))
+            h.update(b"\1")
+            h.update(d.text.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    def _build(self, docs: list[_SkillDoc]) -> None:
+        self._skills = docs
+        self._N = len(docs)
+        doc_tfs: list[dict[str, int]] = []
+        doc_lengths: list[int] = []
+        df: dict[str, int] = defaultdict(int)
+        for sk in docs:
+            tokens = self._tokenize(sk.text)
+            doc_lengths.append(len(tokens))
+            tf: dict[str, int] = defaultdict(int)
+            for t in tokens:
+                tf[t] += 1
+            for t in tf:
+                df[t] += 1
+            doc_tfs.append(tf)
+
+        avgdl = sum(doc_lengths) / self._N if self._N else 0.0
+        idf = {t: math.log((self._N - n + 0.5) / (n + 0.5) + 1.0)
+               for t, n in df.items()}
+        postings: dict[str, _Postings] = {}
+        for doc_id, tf in enumerate(doc_tfs):
+            if not tf:
+                # No postings; also avoids avgdl == 0 when no doc has a token
+                continue
+            # Per-document length norm, shared by all its terms
+            norm = self._k1 * (1.0 - self._b + self._b * doc_lengths[doc_id] / avgdl)
+            for t, freq in tf.items():
+                p = postings.get(t)
+                if p is None:
+                    p = postings[t] = _Postings()
+                p.doc_ids.append(doc_id)
+                p.impacts.append(idf[t] * freq * (self._k1 + 1.0) / (freq + norm))
+        self._postings = postings
+
+    def _load(self, fingerprint: str) -> bool:
+        """Adopt the persisted index if it was built from the same input."""
+        if self._cache_path is None:
+            return False
+        try:
+            data = json.loads(self._cache_path.read_text(encoding="utf-8"))
+            if data.get("fingerprint") != fingerprint:
+                return False
+            self._skills = [_SkillDoc(name=n, text="") for n in data["names"]]
+            self._postings = {t: _Postings(ids, imps)
+                              for t, (ids, imps) in data["postings"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self._N = len(self._skills)
+        self._fingerprint = fingerprint
+        return True
+
+    def _save(self) -> None:
+        if self._cache_path is None:
+            return
+        data = {
+            "fingerprint": self._fingerprint,
+            "names": [d.name for d in self._skills],
+            "postings": {t: [p.doc_ids, p.impacts] for t, p in self._postings.items()},
+        }
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._cache_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+                           encoding="utf-8")
+            os.replace(tmp, self._cache_path)
+        except OSError as e:
+            logger.debug("BM25 index not saved: %s", e)
+
+    def _prepare_arrays(self) -> None:
+        self._arrays = {}
+        if not HAVE_NUMPY or self._N < NUMPY_MIN_DOCS:
+            return
+        self._arrays = {
+            t: (np.asarray(p.doc_ids, dtype=np.int32),
+                np.asarray(p.impacts, dtype=np.float64))
+            for t, p in self._postings.items()
+        }
+
+    def _rank_numpy(self, q_terms: set[str], top_k: int) -> list[int]:
+        scores = np.zeros(self._N, dtype=np.float64)
+        for t in q_terms:
+            arrays = self._arrays.get(t)
+            if arrays is not None:
+                # doc ids are unique within a postings list
+                scores[arrays[0]] += arrays[1]
+        matched = np.flatnonzero(scores > 0.0)
+        if len(matched) > top_k:
+            part = np.argpartition(-scores[matched], top_k - 1)[:top_k]
+            matched = matched[part]
+        # Stable sort keeps index order among ties
+        order = np.argsort(-scores[matched], kind="stable")
+        return [int(i) for i in matched[order]]
 
     # ------------------------------------------------------------------
     # Tokenizer — mixed Chinese bigram + English word + digit
@@ -161,10 +292,8 @@ class BM25SkillMatcher(SkillMatcher):
         tokens: list[str] = []
 
         # Extract English/alphanumeric words
-        alpha_pattern = re.compile(r'[a-zA-Z0-9_]+')
-        matches = list(alpha_pattern.finditer(text))
         last_end = 0
-        for m in matches:
+        for m in _ALPHA_RE.finditer(text):
             # Take Chinese text before this match
             chinese_chunk = text[last_end:m.start()]
             tokens.extend(_bigram(chinese_chunk))
@@ -180,7 +309,7 @@ class BM25SkillMatcher(SkillMatcher):
 def _bigram(text: str) -> list[str]:
     """Generate Chinese character bigrams from text."""
     # Strip ASCII-ish characters so only CJK remains
-    chars = re.sub(r'[\x00-\x7f\s]+', '', text)
+    chars = _NON_CJK_RE.sub('', text)
     if len(chars) < 2:
         return list(chars)
     return [chars[i:i + 2] for i in range(len(chars) - 1)]
@@ -200,5 +329,6 @@ def create_matcher(strategy: str = "bm25") -> SkillMatcher:
         A SkillMatcher instance.
     """
     if strategy == "bm25":
-        return BM25SkillMatcher()
+        from paths import get_cache_dir
+        return BM25SkillMatcher(cache_path=get_cache_dir() / "skill_bm25.json")
     raise ValueError(f"Unknown skill matcher strategy: {strategy}")
@@ -3,16 +3,39 @@ MCP connection manager — connect to MCP servers and discover tools.
 
 Manages stdio and streamable HTTP connections to MCP servers, discovers
 tools via tools/list, and registers them as skills in the unified registry.
-Each operation (discover, call) opens its own session to avoid stale
-connection issues with async context managers across asyncio.run() calls.
+
+Sessions are long-lived: one background thread runs an asyncio loop that
+owns every ``ClientSession``, and synchronous callers submit coroutines to
+it with ``run_coroutine_threadsafe``.  Each session is opened on first use
+by an owner task (the transport's async context managers must be entered
+and exited in the same task) and is shared by concurrent calls.  A session
+idle for ``HEALTH_CHECK_IDLE`` seconds is pinged before reuse, a transport
+failure closes it so the next call reconnects, and sessions unused for
+``IDLE_TIMEOUT`` seconds are closed (stdio servers exit).
+
+Startup discovery runs for all servers concurrently, each bounded by its
+own timeout.  tools/list results are persisted per server together with a
+hash of the server's config.  At startup, servers with a matching cache
+entry are registered from it immediately.  They are then rediscovered in
+the background; the results are applied to the registry (schema changes
+reconciled as on reconnect) on the caller's thread, by wait_refresh() or
+on the manager's next synchronous use, never on the loop thread.
 """
 
 from __future__ import annotations
 
 import asyncio
+import atexit
+import concurrent.futures
+import hashlib
 import json
 import logging
 import re
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from pathlib import Path
 from typing import Any, Optional
 
 from .skill_registry import SkillRegistry
@@ -29,6 +52,22 @@ from .skill_evolution import TrustEvolution
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a server to start and answer initialize
+CONNECT_TIMEOUT = 30.0
+# Default seconds a tools/call may take (per-server "timeout" overrides)
+CALL_TIMEOUT = 120.0
+# Sessions idle this long are pinged before they are reused
+HEALTH_CHECK_IDLE = 30.0
+PING_TIMEOUT = 5.0
+# Sessions unused this long are closed
+IDLE_TIMEOUT = 300.0
+# Seconds to wait for a session (and its server process) to shut down
+CLOSE_TIMEOUT = 5.0
+# Per-server seconds allowed for startup discovery ("connect_timeout" overrides)
+DISCOVER_TIMEOUT = CONNECT_TIMEOUT
+
+_SCHEMA_CACHE_FILE = "mcp_tools.json"
+
 _SANITIZED_RE = re.compile(r"[^a-z0-9-]")
 _MULTI_DASH_RE = re.compile(r"-{2,}")
 
@@ -47,15 +86,155 @@ def make_skill_name(server_name: str, tool_name: str) -> str:
     return f"mcp-{sanitize_name(server_name)}-{sanitize_name(tool_name)}"
 
 
+class _LoopThread:
+    """Background asyncio loop that owns every MCP session."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self.connections: "weakref.WeakSet[MCPServerConnection]" = weakref.WeakSet()
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started on first use."""
+        with self._lock:
+            if self._loop is None or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                thread = threading.Thread(target=run, name="mcp-loop", daemon=True)
+                thread.start()
+                started.wait()
+                if self._loop is None:
+                    atexit.register(self.shutdown)
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop())
+
+    def run(self, coro, timeout: float | None = None) -> Any:
+        """Run *coro* on the loop and wait for its result."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"timed out after {timeout:g}s") from None
+
+    def shutdown(self) -> None:
+        """Close every session, then stop the loop (atexit)."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+        if loop is None or not thread.is_alive():
+            return
+
+        async def close_all():
+            await asyncio.gather(
+                *(conn.close() for conn in list(self.connections)),
+                return_exceptions=True,
+            )
+
+        try:
+            self.run(close_all(), CLOSE_TIMEOUT * 2)
+        except Exception as e:
+            logger.warning("MCP shutdown incomplete: %s", e)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(CLOSE_TIMEOUT)
+
+
+_loop_thread = _LoopThread()
+
+
+def _config_hash(config: dict) -> str:
+    canonical = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class _ToolSchemaCache:
+    """Persisted tools/list results: {server: {"config": hash, "tools": [...]}}."""
+
+    def __init__(self, path: Optional[Path]):
+        self._path = path
+        self._lock = threading.Lock()
+        self._data: dict[str, dict] | None = None
+
+    def _loaded(self) -> dict[str, dict]:
+        if self._data is None:
+            self._data = {}
+            if self._path is not None:
+                try:
+                    data = json.loads(self._path.read_text(encoding="utf-8"))
+                    if isinstance(data, dict):
+                        self._data = data
+                except (OSError, ValueError):
+                    pass
+        return self._data
+
+    def get(self, name: str, config: dict) -> list[dict] | None:
+        """Cached tools of *name*, or None if absent or configured differently."""
+        with self._lock:
+            entry = self._loaded().get(name)
+        if not isinstance(entry, dict) or entry.get("config") != _config_hash(config):
+            return None
+        tools = entry.get("tools")
+        return tools if isinstance(tools, list) and tools else None
+
+    def put(self, name: str, config: dict, tools: list[dict]) -> None:
+        with self._lock:
+            data = self._loaded()
+            entry = {"config": _config_hash(config), "tools": tools}
+            if data.get(name) == entry:
+                return
+            data[name] = entry
+            self._save(data)
+
+    def _save(self, data: dict) -> None:
+        if self._path is None:
+            return
+        tmp = self._path.with_name(f".{self._path.name}.tmp")
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self._path)
+        except OSError as e:
+            logger.warning("Failed to save MCP tool cache: %s", e)
+
+
+def _is_server_error(exc: BaseException) -> bool:
+    """True for an error response from the server (the session is fine)."""
+    try:
+        from mcp.shared.exceptions import McpError
+    except ImportError:
+        return False
+    return isinstance(exc, McpError)
+
+
 class MCPServerConnection:
-    """Manages configuration and cached state for one MCP server."""
+    """Manages configuration, cached state and the session of one MCP server."""
 
     def __init__(self, server_name: str, config: dict):
         self.name = server_name
         self.config = config
         self.transport = config.get("transport", "stdio")
+        self.call_timeout = float(config.get("timeout", CALL_TIMEOUT))
+        self.discover_timeout = float(config.get("connect_timeout", DISCOVER_TIMEOUT))
         self._connected = False
         self._tools_cache: dict[str, dict] = {}  # tool_name -> inputSchema
+        # Session state, touched only from the loop thread
+        self._session = None
+        self._owner: asyncio.Task | None = None
+        self._closing: asyncio.Event | None = None
+        self._connect_lock: asyncio.Lock | None = None
+        self._retiring: set[asyncio.Task] = set()
+        self._inflight = 0
+        self._last_used = 0.0
+        self._idle_handle: asyncio.TimerHandle | None = None
 
     @property
     def connected(self) -> bool:
@@ -66,17 +245,15 @@ class MCPServerConnection:
         return dict(self._tools_cache)
 
     async def discover_tools(self) -> list[dict]:
-        """Open a session, discover tools, cache them, then close.
+        """Discover tools over the server's session and cache them.
 
         Returns list of tool dicts: {"name": ..., "inputSchema": ...}
         """
         try:
-            if self.transport == "stdio":
-                return await self._discover_stdio()
-            elif self.transport in ("streamable_http", "http"):
-                return await self._discover_http()
-            else:
-                raise ValueError(f"Unsupported transport: {self.transport}")
+            async with self._use_session() as session:
+                result = await session.list_tools()
+            self._connected = True
+            return self._cache_tools(result.tools)
         except Exception as e:
             logger.warning(
                 "MCP server %s discovery failed: %s", self.name, e
@@ -84,75 +261,178 @@ class MCPServerConnection:
             self._connected = False
             return []
 
-    async def _discover_stdio(self) -> list[dict]:
-        from mcp.client.stdio import stdio_client, StdioServerParameters
-        from mcp import ClientSession
-
-        command = self.config.get("command", "")
-        args = self.config.get("args", [])
-        env = self.config.get("env", {})
-
-        server_params = StdioServerParameters(
-            command=command, args=args, env=env or None,
-        )
-
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.list_tools()
-                self._connected = True
-                return self._cache_tools(result.tools)
-
-    async def _discover_http(self) -> list[dict]:
-        from mcp.client.streamable_http import streamablehttp_client
-        from mcp import ClientSession
+    async def discover_tools_bounded(self) -> list[dict]:
+        """discover_tools() limited to ``discover_timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.discover_tools(), self.discover_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("MCP server %s discovery timed out after %gs",
+                           self.name, self.discover_timeout)
+            self._connected = False
+            await self.close()
+            return []
 
-        url = self.config.get("url", "")
-        if not url:
-            raise ValueError("HTTP transport requires 'url' in config")
+    def seed_tools(self, tools: list[dict]) -> None:
+        """Use cached tool definitions until discovery confirms them."""
+        self._tools_cache = {t["name"]: t.get("inputSchema", {}) for t in tools}
+        self._connected = True
 
-        async with streamablehttp_client(url) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                result = await session.list_tools()
-                self._connected = True
-                return self._cache_tools(result.tools)
+    async def rediscover_tools(self) -> list[dict]:
+        """Drop the current session, then discover over a fresh one."""
+        await self.close()
+        return await self.discover_tools()
 
     async def call_tool(
         self, tool_name: str, arguments: dict[str, Any] | None = None,
     ) -> Any:
-        """Open a session, call a tool, then close."""
+        """Call a tool over the server's session (opened on demand)."""
+        async with self._use_session() as session:
+            return await session.call_tool(tool_name, arguments)
+
+    async def close(self) -> None:
+        """Close the session; the next call opens a new one."""
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+        await self._close_session()
+
+    # ------------------------------------------------------------------
+    # Session lifecycle (loop thread)
+    # ------------------------------------------------------------------
+
+    def _client(self):
+        """Transport context manager for this server's config."""
         if self.transport == "stdio":
-            return await self._call_stdio(tool_name, arguments)
-        elif self.transport in ("streamable_http", "http"):
-            return await self._call_http(tool_name, arguments)
+            from mcp.client.stdio import stdio_client, StdioServerParameters
+
+            server_params = StdioServerParameters(
+                command=self.config.get("command", ""),
+                args=self.config.get("args", []),
+                env=self.config.get("env", {}) or None,
+            )
+            return stdio_client(server_params)
+        if self.transport in ("streamable_http", "http"):
+            from mcp.client.streamable_http import streamablehttp_client
+
+            url = self.config.get("url", "")
+            if not url:
+                raise ValueError("HTTP transport requires 'url' in config")
+            return streamablehttp_client(url)
         raise ValueError(f"Unsupported transport: {self.transport}")
 
-    async def _call_stdio(self, tool_name: str, arguments: dict | None):
-        from mcp.client.stdio import stdio_client, StdioServerParameters
+    async def _own_session(self, ready: asyncio.Future, closing: asyncio.Event):
+        """Owner task: hold one session open until *closing* is set."""
         from mcp import ClientSession
 
-        command = self.config.get("command", "")
-        args = self.config.get("args", [])
-        env = self.config.get("env", {})
-        server_params = StdioServerParameters(
-            command=command, args=args, env=env or None,
-        )
-
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                return await session.call_tool(tool_name, arguments)
-
-    async def _call_http(self, tool_name: str, arguments: dict | None):
-        from mcp.client.streamable_http import streamablehttp_client
-        from mcp import ClientSession
+        try:
+            async with self._client() as streams:
+                read, write = streams[0], streams[1]
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self._session = session
+                    ready.set_result(session)
+                    await closing.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP server %s session ended: %s", self.name, e)
+        finally:
+            if self._closing is closing:
+                self._session = None
+
+    def _session_alive(self) -> bool:
+        return (self._session is not None
+                and self._owner is not None and not self._owner.done()
+                and self._closing is not None and not self._closing.is_set())
+
+    async def _ensure_session(self):
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._session_alive():
+                idle = time.monotonic() - self._last_used
+                if self._inflight or idle < HEALTH_CHECK_IDLE:
+                    return self._session
+                try:
+                    await asyncio.wait_for(self._session.send_ping(), PING_TIMEOUT)
+                    return self._session
+                except Exception as e:
+                    logger.info("MCP server %s failed health check, reconnecting: %s",
+                                self.name, e)
+                    await self._close_session()
+            return await self._open_session()
+
+    async def _open_session(self):
+        loop = asyncio.get_running_loop()
+        if self._owner is not None and not self._owner.done():
+            # Still shutting down: keep a reference until it finishes
+            self._retiring.add(self._owner)
+            self._owner.add_done_callback(self._retiring.discard)
+        ready = loop.create_future()
+        self._closing = asyncio.Event()
+        self._owner = loop.create_task(self._own_session(ready, self._closing))
+        _loop_thread.connections.add(self)
+        try:
+            session = await asyncio.wait_for(asyncio.shield(ready), CONNECT_TIMEOUT)
+        except BaseException:
+            await self._close_session()
+            raise
+        self._last_used = time.monotonic()
+        return session
+
+    async def _close_session(self) -> None:
+        owner, closing, session = self._owner, self._closing, self._session
+        self._owner = None
+        self._session = None
+        if closing is not None:
+            closing.set()
+        if owner is not None and not owner.done():
+            if session is None:
+                # Still starting up: nothing to shut down gracefully
+                owner.cancel()
+            try:
+                await asyncio.wait_for(owner, CLOSE_TIMEOUT)
+            except Exception as e:
+                logger.warning("MCP server %s did not close cleanly: %s", self.name, e)
 
-        url = self.config.get("url", "")
-        async with streamablehttp_client(url) as (read, write, _):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                return await session.call_tool(tool_name, arguments)
+    @asynccontextmanager
+    async def _use_session(self):
+        session = await self._ensure_session()
+        self._inflight += 1
+        try:
+            yield session
+        except Exception as e:
+            if not _is_server_error(e) and self._session is session:
+                # Broken transport: the next call reconnects
+                await self._close_session()
+            raise
+        finally:
+            self._inflight -= 1
+            self._last_used = time.monotonic()
+            self._schedule_idle_close()
+
+    def _schedule_idle_close(self) -> None:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._idle_handle = loop.call_later(IDLE_TIMEOUT, self._on_idle)
+
+    def _on_idle(self) -> None:
+        self._idle_handle = None
+        if self._inflight or self._owner is None:
+            return
+        logger.info("MCP server %s idle for %.0fs, closing session", self.name, IDLE_TIMEOUT)
+        self._retiring.add(self._owner)
+        self._owner.add_done_callback(self._retiring.discard)
+        self._owner = None
+        self._session = None
+        if self._closing is not None:
+            self._closing.set()
 
     def _cache_tools(self, tools) -> list[dict]:
         """Cache tool definitions and return as dicts."""
@@ -174,16 +454,27 @@ class MCPServerConnection:
         return result
 
     def mark_disconnected(self):
-        """Mark connection as disconnected."""
+        """Mark connection as disconnected and close its session."""
         self._connected = False
+        if self._owner is not None:
+            _loop_thread.submit(self.close())
 
 
 class MCPConnectionManager:
     """Manages all MCP server connections and tool registration."""
 
-    def __init__(self, registry: SkillRegistry):
+    def __init__(self, registry: SkillRegistry, schema_cache_path: Optional[Path] = None):
         self._registry = registry
         self._servers: dict[str, MCPServerConnection] = {}
+        if schema_cache_path is None:
+            from paths import get_cache_dir
+            schema_cache_path = get_cache_dir() / _SCHEMA_CACHE_FILE
+        self._schema_cache = _ToolSchemaCache(schema_cache_path)
+        # Background rediscovery of cache-registered servers, and the tool
+        # schemas they were registered with; applied by _apply_refresh().
+        self._refresh: concurrent.futures.Future | None = None
+        self._refresh_old: dict[str, dict[str, dict]] = {}
+        self._refresh_lock = threading.Lock()
 
     def load_config(self, config: dict) -> None:
         """Load MCP server configurations.
@@ -211,29 +502,104 @@ class MCPConnectionManager:
                 server_name=name, config=server_conf
             )
 
-    def connect_all(self) -> dict[str, list[dict]]:
-        """Connect to all configured MCP servers synchronously.
+    def connect_all(self, use_cache: bool = True) -> dict[str, list[dict]]:
+        """Connect to all configured MCP servers.
 
-        Returns {server_name: [tool_dicts]} for each successfully
-        connected server.
+        Servers with cached tools (same config) are registered at once and
+        refreshed in the background; the others are discovered concurrently
+        before returning.  Returns {server_name: [tool_dicts]} for each
+        server whose tools were registered.
         """
+        self._apply_refresh()
         results: dict[str, list[dict]] = {}
+        cached: list[str] = []
+        pending: list[str] = []
         for name, conn in self._servers.items():
+            tools = self._schema_cache.get(name, conn.config) if use_cache else None
+            if tools:
+                conn.seed_tools(tools)
+                self._register_tools(name, tools)
+                results[name] = tools
+                cached.append(name)
+            else:
+                pending.append(name)
+
+        if pending:
+            timeout = max(self._servers[n].discover_timeout for n in pending)
             try:
-                tools = asyncio.run(conn.discover_tools())
+                discovered = _loop_thread.run(
+                    self._discover(pending), timeout + CLOSE_TIMEOUT
+                )
+            except Exception as e:
+                logger.warning("MCP discovery failed: %s", e)
+                discovered = {}
+            for name, tools in discovered.items():
                 if tools:
                     self._register_tools(name, tools)
+                    self._schema_cache.put(name, self._servers[name].config, tools)
                     results[name] = tools
                     logger.info(
                         "MCP server %s: %d tools discovered",
                         name, len(tools),
                     )
-            except Exception as e:
-                logger.warning(
-                    "MCP server %s connection failed: %s", name, e
-                )
+
+        if cached:
+            with self._refresh_lock:
+                self._refresh_old = {
+                    name: self._servers[name].tools for name in cached
+                }
+                self._refresh = _loop_thread.submit(self._discover(cached))
         return results
 
+    async def _discover(self, names: list[str]) -> dict[str, list[dict]]:
+        """Discover tools of *names* concurrently, each with its own timeout."""
+        tools = await asyncio.gather(
+            *(self._servers[n].discover_tools_bounded() for n in names),
+            return_exceptions=True,
+        )
+        result = {}
+        for name, found in zip(names, tools):
+            if isinstance(found, BaseException):
+                logger.warning("MCP server %s connection failed: %s", name, found)
+                found = []
+            result[name] = found
+        return result
+
+    def wait_refresh(self, timeout: float | None = None) -> None:
+        """Block until the background refresh started by connect_all ends,
+        then apply its results to the registry on this thread."""
+        refresh = self._refresh
+        if refresh is not None:
+            concurrent.futures.wait([refresh], timeout)
+            self._apply_refresh()
+
+    def _apply_refresh(self) -> None:
+        """Reconcile the finished background refresh, if any.
+
+        The registry is not thread-safe, so discovery results are collected
+        on the loop thread and applied here, on the caller's thread.
+        """
+        with self._refresh_lock:
+            refresh = self._refresh
+            if refresh is None or not refresh.done():
+                return
+            old = self._refresh_old
+            self._refresh, self._refresh_old = None, {}
+        try:
+            discovered = refresh.result()
+        except Exception as e:
+            logger.warning("MCP background refresh failed: %s", e)
+            return
+        for name, tools in discovered.items():
+            if not tools:
+                self.mark_unavailable(name)
+                continue
+            changes = self._reconcile(name, old[name], tools)
+            self._schema_cache.put(name, self._servers[name].config, tools)
+            if changes:
+                logger.info("MCP server %s: schema changed for %s",
+                            name, ", ".join(changes))
+
     def _register_tools(self, server_name: str, tools: list[dict]) -> None:
         """Register discovered MCP tools as skills."""
         for tool in tools:
@@ -272,8 +638,18 @@ class MCPConnectionManager:
             return SecurityDomain.WORKSPACE
         return SecurityDomain.WORKSPACE
 
+    def close_all(self) -> None:
+        """Close every open session (servers are restarted on next use)."""
+        for conn in self._servers.values():
+            if conn._owner is not None:
+                try:
+                    _loop_thread.run(conn.close(), CLOSE_TIMEOUT * 2)
+                except Exception as e:
+                    logger.warning("MCP server %s close failed: %s", conn.name, e)
+
     def get_connection(self, server_name: str) -> MCPServerConnection | None:
         """Get a server connection by name."""
+        self._apply_refresh()
         return self._servers.get(server_name)
 
     def call_tool_sync(
@@ -283,6 +659,7 @@ class MCPConnectionManager:
         arguments: dict[str, Any] | None = None,
     ) -> InvocationResult:
         """Call a tool on an MCP server synchronously."""
+        self._apply_refresh()
         conn = self._servers.get(server_name)
         if conn is None:
             return InvocationResult(
@@ -299,7 +676,10 @@ class MCPConnectionManager:
                 recoverable=True,
             )
         try:
-            result = asyncio.run(conn.call_tool(tool_name, arguments))
+            result = _loop_thread.run(
+                conn.call_tool(tool_name, arguments),
+                CONNECT_TIMEOUT + conn.call_timeout,
+            )
             content = []
             if hasattr(result, "content"):
                 for item in result.content:
@@ -347,6 +727,7 @@ class MCPConnectionManager:
         Compares new tool schemas with cached ones. Schema changes
         trigger trust downgrade to L1.
         """
+        self._apply_refresh()
         conn = self._servers.get(server_name)
         if conn is None:
             return InvocationResult(
@@ -359,7 +740,9 @@ class MCPConnectionManager:
         old_schemas = dict(conn.tools)
 
         try:
-            tools = asyncio.run(conn.discover_tools())
+            tools = _loop_thread.run(
+                conn.rediscover_tools(), CONNECT_TIMEOUT + 2 * CLOSE_TIMEOUT
+            )
         except Exception as e:
             self.mark_unavailable(server_name)
             return InvocationResult(
@@ -377,6 +760,32 @@ class MCPConnectionManager:
                 recoverable=True,
             )
 
+        self._schema_cache.put(server_name, conn.config, tools)
+        schema_changes = self._reconcile(
+            server_name, old_schemas, tools, trust_evolution
+        )
+
+        return InvocationResult(
+            success=True,
+            data={
+                "server": server_name,
+                "tools_discovered": len(tools),
+                "schema_changes": schema_changes,
+            },
+        )
+
+    def _reconcile(
+        self,
+        server_name: str,
+        old_schemas: dict[str, dict],
+        tools: list[dict],
+        trust_evolution: Optional[TrustEvolution] = None,
+    ) -> list[str]:
+        """Register rediscovered tools against the previous schemas.
+
+        Schema changes trigger trust downgrade to L1; tools that vanished
+        are marked unavailable.  Returns the names of changed tools.
+        """
         # Compare schemas and update trust
         schema_changes = []
         for tool in tools:
@@ -410,11 +819,4 @@ class MCPConnectionManager:
                 if meta:
                     meta.status = SkillStatus.UNAVAILABLE
 
-        return InvocationResult(
-            success=True,
-            data={
-                "server": server_name,
-                "tools_discovered": len(tools),
-                "schema_changes": schema_changes,
-            },
-        )
+        return schema_changes
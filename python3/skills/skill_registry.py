@@ -6,6 +6,15 @@ Two-level architecture:
 - Level 2: Full metadata (loaded on demand when skill details needed)
 
 Priority: project .zaivim/skills/ > user skills dir
+
+Incremental scans compare each SKILL.md's (inode, mtime_ns, size) with the
+index cache (one JSON file under the cache dir).  Parsed index entries are
+kept in that file, so an unchanged skill is neither read nor re-parsed; the
+file is hashed only when its stat signature changed but its size did not
+(touch, checkout) to tell a real edit from a metadata-only change.
+
+After watch(), the scanned directories are observed through fs_watch and
+refresh() only rescans once a change event arrived.
 """
 
 from __future__ import annotations
@@ -13,13 +22,16 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import os
+import time
 from typing import Any
 
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from paths import get_skills_dir, get_project_skills_dir, find_project_root
+from fs_watch import get_watcher
+from paths import get_cache_dir, get_skills_dir, get_project_skills_dir, find_project_root
 
 from .skill_parser import parse, parse_index_only
 from .skill_types import (
@@ -35,19 +47,114 @@ from .skill_types import (
 logger = logging.getLogger(__name__)
 
 _USER_SKILL_DIR = get_skills_dir()
-_MANIFEST_FILE = ".scan-manifest.json"
+_INDEX_CACHE_FILE = "skill_index.json"
+# Bump when the cached index entry layout changes
+_INDEX_CACHE_VERSION = 1
+
+
+class _IndexCache:
+    """Persisted parse results: SKILL.md path → {sig, sha256, index}.
+
+    ``sig`` is [inode, mtime_ns, size]; ``index`` is the parse_index_only()
+    result for that file version.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._entries: dict[str, dict] | None = None
+        self._seen: set[str] = set()
+        self._dirty = False
+        self.stats = {"files": 0, "cached": 0, "hashed": 0, "parsed": 0}
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == _INDEX_CACHE_VERSION:
+                    self._entries = data.get("entries", {})
+            except (OSError, ValueError, AttributeError):
+                pass
+        return self._entries
+
+    def begin(self) -> None:
+        self._seen = set()
+        self.stats = {"files": 0, "cached": 0, "hashed": 0, "parsed": 0}
+
+    def lookup(self, md_path: Path, use_cache: bool = True) -> tuple[dict, bool]:
+        """Return (index entry, unchanged) for *md_path*, parsing only if needed.
+
+        Raises whatever parse_index_only raises for unparsable files.
+        """
+        key = str(md_path)
+        st = os.stat(md_path)
+        sig = [st.st_ino, st.st_mtime_ns, st.st_size]
+        entries = self._load()
+        self._seen.add(key)
+        self.stats["files"] += 1
+
+        entry = entries.get(key) if use_cache else None
+        if entry is not None:
+            if entry.get("sig") == sig:
+                self.stats["cached"] += 1
+                return entry["index"], True
+            if entry.get("sig", [0, 0, -1])[2] == st.st_size:
+                self.stats["hashed"] += 1
+                digest = _file_hash(md_path)
+                if digest == entry.get("sha256"):
+                    entry["sig"] = sig
+                    self._dirty = True
+                    return entry["index"], True
+
+        self.stats["parsed"] += 1
+        idx = parse_index_only(md_path)
+        entries[key] = {"sig": sig, "sha256": _file_hash(md_path), "index": idx}
+        self._dirty = True
+        return idx, False
+
+    def save(self, scanned_dirs: list[Path]) -> None:
+        """Drop entries of vanished files under *scanned_dirs*, then persist."""
+        entries = self._load()
+        prefixes = tuple(str(d) + os.sep for d in scanned_dirs)
+        for key in [k for k in entries if k.startswith(prefixes) and k not in self._seen]:
+            del entries[key]
+            self._dirty = True
+        if not self._dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(
+                json.dumps({"version": _INDEX_CACHE_VERSION, "entries": entries},
+                           ensure_ascii=False, default=str),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning("Failed to save skill index cache: %s", e)
 
 
 class SkillRegistry:
     """Unified registry for all skills with two-level indexing."""
 
     def __init__(self, user_dir: Path = _USER_SKILL_DIR,
-                 project_dir: Path | None = None):
+                 project_dir: Path | None = None,
+                 index_cache: Path | None = None):
         self._user_dir = user_dir
         self._project_dir = project_dir
+        self._index_cache = _IndexCache(
+            index_cache or get_cache_dir() / _INDEX_CACHE_FILE
+        )
+        # Timing / file counts of the last scan()
+        self._last_scan: dict[str, Any] = {}
+        # Directories covered by the last scan(), and their watches
+        self._scanned_dirs: list[Path] = []
+        self._watch_handles: list[int] = []
+        self._fs_changed = False
         # name -> SkillMetadata (lightweight index, always in memory)
         self._skills: dict[str, SkillMetadata] = {}
-        # name -> source path (for manifest tracking)
+        # name -> source path (for incremental scans)
         self._paths: dict[str, str] = {}
         # skillOverrides from settings.json
         self._overrides: dict[str, str] = self._load_overrides()
@@ -57,9 +164,10 @@ class SkillRegistry:
         """Number of skills in the in-memory cache."""
         return self.count
 
-    def cache_stats(self) -> dict[str, int]:
+    def cache_stats(self) -> dict[str, Any]:
         """Return cache statistics for monitoring."""
         return {
+            "last_scan": dict(self._last_scan),
             "total_skills": self.count,
             "enabled": sum(
                 1 for m in self._skills.values()
@@ -87,6 +195,10 @@ class SkillRegistry:
 
         Returns the number of newly registered skills.
         """
+        start = time.perf_counter()
+        # Cleared before reading so an edit during the scan is not lost
+        self._fs_changed = False
+        self._index_cache.begin()
         new_count = 0
         dirs_to_scan: list[tuple[Path, bool]] = []
 
@@ -115,7 +227,11 @@ class SkillRegistry:
         if project_root is not None:
             cc_commands = project_root / ".claude" / "commands"
             if cc_commands.is_dir():
-                new_count += self._scan_cc_commands(cc_commands)
+                new_count += self._scan_cc_commands(cc_commands, incremental)
+                dirs_to_scan.append((cc_commands, True))
+
+        self._scanned_dirs = [d for d, _ in dirs_to_scan]
+        self._index_cache.save(self._scanned_dirs)
 
         # Mark missing: skills in registry whose path no longer exists
         for name, meta in list(self._skills.items()):
@@ -124,14 +240,55 @@ class SkillRegistry:
             if meta.path and not Path(meta.path).exists():
                 meta.status = SkillStatus.MISSING
 
+        self._last_scan = dict(
+            self._index_cache.stats,
+            seconds=round(time.perf_counter() - start, 4),
+            incremental=incremental,
+        )
+        logger.debug("Skill scan: %s", self._last_scan)
         return new_count
 
+    def watch(self) -> bool:
+        """Watch the directories of the last scan() for changes.
+
+        Returns False if some directory cannot be watched; refresh() then
+        scans on every call, as before.
+        """
+        watcher = get_watcher()
+        for handle in self._watch_handles:
+            watcher.unwatch(handle)
+        self._watch_handles = []
+        for skill_dir in self._scanned_dirs:
+            # depth 1: <dir>/<skill>/SKILL.md
+            handle = watcher.watch(skill_dir, self._on_fs_event, depth=1)
+            if handle is None:
+                for h in self._watch_handles:
+                    watcher.unwatch(h)
+                self._watch_handles = []
+                return False
+            self._watch_handles.append(handle)
+        return bool(self._watch_handles)
+
+    def _on_fs_event(self, event) -> None:
+        # Runs on the watcher thread: only flag, rescan on the next refresh()
+        self._fs_changed = True
+
+    def refresh(self) -> int:
+        """Rescan if a watched directory changed since the last scan.
+
+        Unchanged files are served from the index cache, so only the
+        affected skills are re-parsed.  Returns the number of newly
+        registered skills.
+        """
+        if self._watch_handles and not self._fs_changed:
+            return 0
+        return self.scan(incremental=True)
+
     def _scan_skill_dir(
         self, skill_dir: Path, is_project: bool, incremental: bool
     ) -> int:
         """Scan a directory of skill subdirectories."""
         new_count = 0
-        manifest = self._load_manifest(skill_dir) if incremental else {}
 
         for entry in sorted(skill_dir.iterdir()):
             if not entry.is_dir():
@@ -140,21 +297,17 @@ class SkillRegistry:
             if not skill_md.is_file():
                 continue
 
-            # Incremental: skip if mtime unchanged
-            if incremental:
-                current_hash = _file_hash(skill_md)
-                cached = manifest.get(entry.name)
-                if cached == current_hash and entry.name in self._skills:
-                    continue
-                manifest[entry.name] = current_hash
-
             try:
-                idx = parse_index_only(skill_md)
+                idx, unchanged = self._index_cache.lookup(skill_md, incremental)
                 name = idx["name"]
             except Exception as e:
                 logger.warning("Failed to parse %s: %s", skill_md, e)
                 continue
 
+            # Incremental: unchanged file already registered from this path
+            if incremental and unchanged and self._paths.get(name) == str(skill_md):
+                continue
+
             meta = SkillMetadata(
                 name=name,
                 description=idx["description"],
@@ -187,17 +340,14 @@ class SkillRegistry:
             self._apply_override(meta)
             new_count += 1
 
-        if incremental:
-            self._save_manifest(skill_dir, manifest)
-
         return new_count
 
-    def _scan_cc_commands(self, commands_dir: Path) -> int:
+    def _scan_cc_commands(self, commands_dir: Path, incremental: bool = True) -> int:
         """Scan .claude/commands/*.md (CC legacy single-file format)."""
         new_count = 0
         for md_file in sorted(commands_dir.glob("*.md")):
             try:
-                idx = parse_index_only(md_file)
+                idx, _ = self._index_cache.lookup(md_file, incremental)
                 skill_name = idx["name"]
             except Exception as e:
                 logger.warning("Failed to parse CC command %s: %s", md_file, e)
@@ -302,28 +452,6 @@ class SkillRegistry:
     def count(self) -> int:
         return len([n for n in self._skills if not n.startswith("_shadowed:")])
 
-    # ------------------------------------------------------------------
-    # Manifest for incremental scans
-    # ------------------------------------------------------------------
-
-    def _load_manifest(self, skill_dir: Path) -> dict[str, str]:
-        manifest_path = skill_dir / _MANIFEST_FILE
-        if manifest_path.is_file():
-            try:
-                return json.loads(manifest_path.read_text(encoding="utf-8"))
-            except (json.JSONDecodeError, OSError):
-                pass
-        return {}
-
-    def _save_manifest(self, skill_dir: Path, manifest: dict[str, str]) -> None:
-        manifest_path = skill_dir / _MANIFEST_FILE
-        try:
-            manifest_path.write_text(
-                json.dumps(manifest, indent=2), encoding="utf-8"
-            )
-        except OSError as e:
-            logger.warning("Failed to save manifest: %s", e)
-
     # ------------------------------------------------------------------
     # Skill visibility overrides (Task 11)
     # ------------------------------------------------------------------
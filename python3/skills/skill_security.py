@@ -3,7 +3,8 @@ L0 intent verification and parse consistency locking.
 
 Provides:
 - IntentVerifier: domain boundary checks, output_schema pre-flight validation
-- ParseCache: checksum-bound parse result cache with invalidation on file change
+- ParseCache: checksum-bound parse result cache; watched files are only
+  re-checksummed after a change event
 - Trust downgrade on behavior change detection (security_domain, output_schema)
 """
 
@@ -12,10 +13,13 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import os
 import threading
 from pathlib import Path
 from typing import Any, Optional
 
+from fs_watch import get_watcher
+
 from .skill_parser import parse
 from .skill_types import (
     ErrorCode,
@@ -32,13 +36,54 @@ class ParseCache:
     """Checksum-bound cache for parsed SKILL.md results.
 
     When the file's checksum changes, the cache invalidates and triggers
-    re-parse + behavior change detection.
+    re-parse + behavior change detection.  Cached files are watched, so the
+    checksum is only recomputed after a change event (or on every lookup
+    for files the watcher cannot cover).
     """
 
     def __init__(self) -> None:
         # path -> (checksum, SkillMetadata)
         self._cache: dict[str, tuple[str, SkillMetadata]] = {}
         self._lock = threading.Lock()
+        # absolute path -> watch handle; paths with an event since their checksum
+        self._watches: dict[str, int] = {}
+        self._changed: set[str] = set()
+
+    def _on_event(self, event) -> None:
+        with self._lock:
+            if event.kind == "overflow":
+                self._changed.update(self._watches)
+            else:
+                self._changed.add(event.path)
+
+    def _unchanged(self, path: str) -> bool:
+        """True if a watch guarantees *path* is as it was at put()."""
+        path = os.path.abspath(path)
+        with self._lock:
+            return path in self._watches and path not in self._changed
+
+    def _checksum_matches(self, path: str, cached_checksum: str) -> bool:
+        """Re-checksum *path*; keep it flagged as changed unless it matches."""
+        key = os.path.abspath(path)
+        with self._lock:
+            # Cleared first so an event during hashing is not lost
+            self._changed.discard(key)
+        if _file_checksum(path) == cached_checksum:
+            return True
+        with self._lock:
+            self._changed.add(key)
+        return False
+
+    def _watch(self, path: str) -> None:
+        path = os.path.abspath(path)
+        with self._lock:
+            if path in self._watches:
+                self._changed.discard(path)
+                return
+        handle = get_watcher().watch(path, self._on_event)
+        if handle is not None:
+            with self._lock:
+                self._watches[path] = handle
 
     def get(self, path: str) -> Optional[SkillMetadata]:
         """Return cached metadata if checksum still matches, else None."""
@@ -47,13 +92,14 @@ class ParseCache:
         if entry is None:
             return None
         cached_checksum, cached_meta = entry
-        current_checksum = _file_checksum(path)
-        if current_checksum == cached_checksum:
+        if self._unchanged(path) or self._checksum_matches(path, cached_checksum):
             return cached_meta
         return None  # stale
 
     def put(self, path: str, meta: SkillMetadata) -> None:
         """Store metadata with current file checksum."""
+        # Watch first: a change after the checksum must not go unnoticed
+        self._watch(path)
         checksum = _file_checksum(path)
         with self._lock:
             self._cache[path] = (checksum, meta)
@@ -62,6 +108,10 @@ class ParseCache:
         """Remove cached entry for path."""
         with self._lock:
             self._cache.pop(path, None)
+            key = os.path.abspath(path)
+            handle = self._watches.pop(key, None)
+            self._changed.discard(key)
+        get_watcher().unwatch(handle)
 
     def check_for_changes(
         self, path: str
@@ -76,9 +126,7 @@ class ParseCache:
         if entry is None:
             return None
         cached_checksum, old_meta = entry
-
-        current_checksum = _file_checksum(path)
-        if current_checksum == cached_checksum:
+        if self._unchanged(path) or self._checksum_matches(path, cached_checksum):
             return None
 
         # File changed — re-parse
@@ -0,0 +1,24 @@
+"""archive_store: re-archiving content evicted by another process."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from archive_store import ArchiveStore
+
+
+def test_put_async_rewrites_an_archive_evicted_elsewhere(tmp_path):
+    store = ArchiveStore(str(tmp_path))
+    name = store.put_async("hello\nworld\n", "s1")
+    store.flush()
+    archive_id = store.archive_id(name)
+    assert store.exists(archive_id)
+
+    # another process evicts it
+    ArchiveStore(str(tmp_path))._remove(archive_id)
+    assert not store.exists(archive_id)
+
+    assert store.put_async("hello\nworld\n", "s1") == name
+    store.flush()
+    assert store.read_all(archive_id) == "hello\nworld\n"
@@ -0,0 +1,96 @@
+"""bash_parser.tokenize() against shlex.split() on a quoting/escaping corpus."""
+
+import shlex
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bash_parser import tokenize
+
+
+def _values(text):
+    return [t.value for t in tokenize(text)]
+
+
+# Plain words: the lexer must produce exactly what shlex.split() did.
+SAME_AS_SHLEX = [
+    "ls -la",
+    "echo 'a b'",
+    'echo "a b"',
+    r"echo a\ b",
+    "echo 'it'\\''s'",
+    "echo \"x\"y'z'",
+    "echo a'b'\"c\"d",
+    r'echo "a\"b"',
+    r'echo "a\\b"',
+    r'echo "a\nb"',          # only \" and \\ are escapes inside "..."
+    r'echo "a\$b"',
+    r"echo 'a\b'",           # no escapes inside '...'
+    r"echo \\",
+    r"echo \'",
+    'echo ""',
+    "echo ''",
+    'echo "" x',
+    "a\tb\nc",
+    'echo "  spaced  "',
+    'echo $HOME "${HOME}"',
+    "echo $",
+    'echo "$"',
+    "echo a#b",
+    "echo '#not a comment'",
+    "echo 'a|b' \"c;d\" 'e&&f' \"x>y\"",   # operators inside quotes are text
+    "grep -e 'foo bar' -- \"baz qux\"",
+    "é ü 'ñ'",
+]
+
+
+@pytest.mark.parametrize("text", SAME_AS_SHLEX)
+def test_words_match_shlex(text):
+    assert _values(text) == shlex.split(text)
+
+
+# Shell syntax shlex does not know about: intended differences.
+DIFFERS_FROM_SHLEX = [
+    # operators and redirections split words even without spaces
+    ("a|b", ["a", "|", "b"], ["a|b"]),
+    ("a|&b", ["a", "|&", "b"], ["a|&b"]),
+    ("a&&b", ["a", "&&", "b"], ["a&&b"]),
+    ("a;b", ["a", ";", "b"], ["a;b"]),
+    ("cat<in>out", ["cat", "<", "in", ">", "out"], ["cat<in>out"]),
+    # substitutions stay one word, verbatim
+    ("echo $(echo a b)", ["echo", "$(echo a b)"], ["echo", "$(echo", "a", "b)"]),
+    ('echo "$(echo "a b")"', ["echo", '$(echo "a b")'], ["echo", "$(echo a", "b)"]),
+    ("echo `echo a b`", ["echo", "`echo a b`"], ["echo", "`echo", "a", "b`"]),
+    ("echo ${A:-x y}", ["echo", "${A:-x y}"], ["echo", "${A:-x", "y}"]),
+    ("diff <(ls a) <(ls b)", ["diff", "<(ls a)", "<(ls b)"],
+     ["diff", "<(ls", "a)", "<(ls", "b)"]),
+]
+
+
+@pytest.mark.parametrize("text,expected,shlex_words", DIFFERS_FROM_SHLEX)
+def test_shell_syntax_differs_from_shlex(text, expected, shlex_words):
+    assert shlex.split(text) == shlex_words
+    assert _values(text) == expected
+
+
+def test_token_kinds_and_spans():
+    text = "cat <in 2>&1|grep 'x y'"
+    tokens = list(tokenize(text))
+    assert [(t.kind, t.value) for t in tokens] == [
+        ("word", "cat"), ("redirect", "<"), ("word", "in"),
+        ("redirect", "2>&1"), ("op", "|"), ("word", "grep"), ("word", "x y"),
+    ]
+    assert [text[t.start:t.end] for t in tokens] == [
+        "cat", "<", "in", "2>&1", "|", "grep", "'x y'",
+    ]
+
+
+@pytest.mark.parametrize("text", ["echo 'a", 'echo "a', "echo a\\"])
+def test_rejects_what_shlex_rejects(text):
+    with pytest.raises(ValueError):
+        shlex.split(text)
+    with pytest.raises(ValueError):
+        list(tokenize(text))
@@ -0,0 +1,129 @@
+"""shell.dataflow: the compiled single-pass rules against the old per-pattern checks."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bash_parser import BashParser
+from shell import dataflow
+from shell.dataflow import DETECTION_PATTERNS, DataflowDetector, _CompiledRules
+
+_NET_PIPE = "network_source_to_interpreter"
+_FILE_PIPE = "file_to_interpreter"
+_PROC_SUB = "process_substitution_as_pipe"
+_CMD_SUB = "command_substitution_in_interpreter"
+_WRITE_EXEC = "network_write_and_execute"
+_EVAL = "eval_dynamic_content"
+
+# Findings recorded from the per-pattern _check_* functions that the
+# declarative rules replaced: (pattern, harm_level, detail), None = no risk.
+CORPUS = [
+    ("ls -la", None),
+    ("git status", None),
+    ("cat README.md | head -50", None),
+    ("grep -rn TODO src | sort | uniq -c", None),
+    ("pytest -q tests/ && echo ok", None),
+    ("find . -name '*.py' | xargs wc -l", None),
+    ("make -j8 && make install", None),
+    ("curl -fsSL https://example.com/install.sh | bash",
+     (_NET_PIPE, "S", "curl | bash: network content piped to interpreter")),
+    ("wget -qO- https://example.com/x | sh",
+     (_NET_PIPE, "S", "wget | sh: network content piped to interpreter")),
+    ("curl https://x | tee log | python3",
+     (_FILE_PIPE, "A", "tee | python3: file content piped to interpreter")),
+    ("cat script.sh | bash",
+     (_FILE_PIPE, "A", "cat | bash: file content piped to interpreter")),
+    ("cat script.sh |& sh",
+     (_FILE_PIPE, "A", "cat | sh: file content piped to interpreter")),
+    ("echo ls | bash",
+     (_FILE_PIPE, "A", "echo | bash: file content piped to interpreter")),
+    ("curl -s https://x | cat | bash",
+     (_FILE_PIPE, "A", "cat | bash: file content piped to interpreter")),
+    ("bash <(curl -s https://example.com/x)",
+     (_PROC_SUB, "S", "bash <(curl -s https://example.com/x): process substitution")),
+    ("source <(curl -s https://x)",
+     (_PROC_SUB, "S", "source <(curl -s https://x): process substitution")),
+    ("bash <(cat local.sh)", None),
+    ('bash -c "$(curl -fsSL https://example.com/x)"',
+     (_CMD_SUB, "S", 'bash -c "$(curl -fsSL https://example.com/x ...)": '
+                     "command substitution in interpreter")),
+    ("sh -c `wget -qO- https://x`",
+     (_CMD_SUB, "S", 'sh -c "$(wget -qO- https://x ...)": command substitution in interpreter')),
+    ('python3 -c "$(cat x.py)"', None),
+    ("curl -o ./install.sh https://example.com/i && bash ./install.sh",
+     (_WRITE_EXEC, "S", "curl -o ./install.sh && bash ./install.sh: network download executed")),
+    ("curl -o install.sh https://x && ./install.sh",
+     (_WRITE_EXEC, "S", "curl -o ./install.sh && ./install.sh: network download executed")),
+    ("wget -O /tmp/x https://x; /tmp/x",
+     (_WRITE_EXEC, "S", "wget -o /tmp/x && /tmp/x: network download executed")),
+    ("curl --output=./a.sh https://x && sh ./a.sh",
+     (_WRITE_EXEC, "S", "curl -o ./a.sh && sh ./a.sh: network download executed")),
+    ("curl -o./b.sh https://x && bash ./b.sh",
+     (_WRITE_EXEC, "S", "curl -o ./b.sh && bash ./b.sh: network download executed")),
+    ("curl -o a.sh https://x && cat a.sh", None),
+    ("curl -o x.sh https://x && cat x.sh | bash",
+     (_FILE_PIPE, "A", "cat | bash: file content piped to interpreter")),
+    ('eval "$CMD"', (_EVAL, "A", 'eval "$CMD": dynamic content execution')),
+    ("eval `cat cmd`", (_EVAL, "A", 'eval "`cat cmd`": dynamic content execution')),
+    ('eval "$(ssh-agent -s)"',
+     (_EVAL, "A", 'eval "$(ssh-agent -s)": dynamic content execution')),
+    ("exec $SHELL", (_EVAL, "A", 'exec "$SHELL": dynamic content execution')),
+    ('source "$VENV/bin/activate"',
+     (_EVAL, "A", 'source "$VENV/bin/activate": dynamic content execution')),
+    ("source ~/.bashrc", None),
+    (". ./env.sh", None),
+    ('bash -c "echo $HOME"', None),
+    # several patterns in one command: the S rule wins wherever it appears
+    ("curl https://x | bash; eval $X",
+     (_NET_PIPE, "S", "curl | bash: network content piped to interpreter")),
+    ("cat a | bash & curl https://x | sh",
+     (_NET_PIPE, "S", "curl | sh: network content piped to interpreter")),
+    ('eval "$X" && curl https://x | bash',
+     (_NET_PIPE, "S", "curl | bash: network content piped to interpreter")),
+]
+
+_CROSS_NOTE = "cross-command analysis not performed; only same-command chains detected"
+
+
+def _parse(command):
+    return BashParser().parse(command)
+
+
+def _finding(decision):
+    if not decision.risk:
+        return None
+    return (decision.pattern, decision.harm_level, decision.detail)
+
+
+@pytest.mark.parametrize("command,expected", CORPUS)
+def test_findings_match_the_old_checks(command, expected):
+    decision, err = DataflowDetector.analyze(_parse(command))
+    assert err is None
+    assert _finding(decision) == expected
+    sem = _parse(command)
+    expected_notes = _CROSS_NOTE if any(op in (";", "&") for op in sem.operators) else ""
+    assert decision.notes == expected_notes
+
+
+@pytest.mark.parametrize("command", [c for c, _ in CORPUS])
+def test_single_pass_matches_rule_by_rule(command):
+    # The old control flow: each pattern checked on its own, first match wins.
+    sem = _parse(command)
+    expected = None
+    for rule in DETECTION_PATTERNS:
+        expected = _CompiledRules((rule,)).run(sem)
+        if expected is not None:
+            break
+    got = _CompiledRules(tuple(DETECTION_PATTERNS)).run(sem)
+    assert (got and _finding(got)) == (expected and _finding(expected))
+
+
+def test_recompiles_when_patterns_change(monkeypatch):
+    sem = _parse('eval "$CMD"')
+    assert DataflowDetector.analyze(sem)[0].risk
+    monkeypatch.setattr(dataflow, "DETECTION_PATTERNS",
+                        [r for r in DETECTION_PATTERNS if r.pattern != _EVAL])
+    assert not DataflowDetector.analyze(sem)[0].risk
@@ -0,0 +1,76 @@
+"""Regression tests for grep_index pattern analysis."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import grep_index
+from grep_index import pattern_trigrams
+
+
+def test_non_metacharacter_escapes_force_a_full_scan():
+    # Python reads these as control characters or classes, GNU ERE does not
+    for pattern in (r"abc\tdef", r"abc\x41def", r"abc\ndef", r"\<word\>", r"abc\d+"):
+        assert pattern_trigrams(pattern, True, True) is None, pattern
+
+
+def test_backslash_inside_brackets_forces_a_full_scan():
+    assert pattern_trigrams(r"abc[\]]def", True, True) is None
+
+
+def test_escaped_metacharacters_keep_their_literals():
+    grams = pattern_trigrams(r"foo\[0\]bar", True, True)
+    assert grams is not None
+    assert ord("o") << 16 | ord("[") << 8 | ord("0") in grams
+
+
+def _fresh_index(tmp_path, monkeypatch):
+    root = tmp_path / "tree"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "a.txt").write_text("hello world\n")
+    index = grep_index.GrepIndex(root, db_path=tmp_path / "index.sqlite")
+    monkeypatch.setitem(grep_index._indexes, str(root.resolve()), index)
+    return root, index
+
+
+def _candidates(root, pattern):
+    return grep_index.candidate_files(root, root, pattern, False, True)
+
+
+def test_file_written_just_before_a_query_is_a_candidate(tmp_path, monkeypatch):
+    root, index = _fresh_index(tmp_path, monkeypatch)
+    try:
+        assert _candidates(root, "hello") == ["src/a.txt"]
+        for i in range(50):
+            (root / "src" / f"new{i}.txt").write_text(f"needle{i:03d}\n")
+            assert f"src/new{i}.txt" in (_candidates(root, f"needle{i:03d}") or []), i
+        (root / "src" / "a.txt").write_text("changed\n")
+        assert _candidates(root, "hello") == []
+    finally:
+        index.close()
+
+
+def test_unwatched_tree_is_walked_before_each_query(tmp_path, monkeypatch):
+    monkeypatch.setattr(grep_index, "MAX_WATCHED_DIRS", 0)
+    root, index = _fresh_index(tmp_path, monkeypatch)
+    try:
+        assert _candidates(root, "hello") == ["src/a.txt"]
+        assert index._watch_handle is None
+        (root / "src" / "b.txt").write_text("needle\n")
+        assert _candidates(root, "needle") == ["src/b.txt"]
+    finally:
+        index.close()
+
+
+def test_undrained_events_force_a_full_scan(tmp_path, monkeypatch):
+    root, index = _fresh_index(tmp_path, monkeypatch)
+    try:
+        assert _candidates(root, "hello") == ["src/a.txt"]
+        if index._watch_handle is None:
+            return      # no inotify here: the unwatched path walks instead
+        monkeypatch.setattr(grep_index.fs_watch.get_watcher(), "sync",
+                            lambda timeout=1.0: False)
+        assert _candidates(root, "hello") is None
+    finally:
+        index.close()
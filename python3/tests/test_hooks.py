@@ -0,0 +1,40 @@
+"""Tests for HookManager shutdown of async hooks."""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import hooks
+
+
+def _async_config(command, timeout=30):
+    return {"hooks": {"PostToolUse": [{"matcher": "*", "hooks": [
+        {"command": command, "async": True, "timeout": timeout}]}]}}
+
+
+def test_close_kills_async_hooks_past_their_timeout(monkeypatch):
+    monkeypatch.setattr(hooks, "ASYNC_CLOSE_GRACE", 0.2)
+    manager = hooks.HookManager()
+    manager.load_from_dict(_async_config("sleep 30", timeout=1))
+    for _ in range(3):
+        manager.run_post_tool_hooks("write_file", {}, "ok")
+    start = time.monotonic()
+    manager.close()
+    assert time.monotonic() - start < 5
+
+    # The manager keeps working with a fresh worker after the reload
+    manager.load_from_dict(_async_config("true"))
+    manager.run_post_tool_hooks("write_file", {}, "ok")
+    assert manager.wait_async(timeout=10)
+    manager.close()
+
+
+def test_close_waits_for_async_hooks_within_their_timeout(tmp_path):
+    marker = tmp_path / "done"
+    manager = hooks.HookManager()
+    manager.load_from_dict(_async_config(f"sleep 0.3 && touch {marker}"))
+    manager.run_post_tool_hooks("write_file", {}, "ok")
+    manager.close()
+    assert marker.exists()
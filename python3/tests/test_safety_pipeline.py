@@ -0,0 +1,65 @@
+"""Tests for the SafetyPipeline layer scheduling in tool_shell."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from tool_shell import LayerDecision, SafetyContext, SafetyLayer, SafetyPipeline
+
+
+class _Layer(SafetyLayer):
+    def __init__(self, name, decision):
+        self._name = name
+        self.decision = decision
+        self.calls = 0
+
+    @property
+    def name(self):
+        return self._name
+
+    def process(self, ctx):
+        self.calls += 1
+        ctx.trace.append(LayerDecision(self._name, self.decision, "test", 0))
+        return ctx
+
+
+class _Classifier(_Layer):
+    """Stands in for the LLM classifier: calls counts requests sent."""
+
+    def process(self, ctx):
+        if any(d.layer == "L2_policy" and d.decision == "allow" for d in ctx.trace):
+            ctx.trace.append(LayerDecision(self._name, "bypassed", "policy already allowed", 0))
+            return ctx
+        return super().process(ctx)
+
+
+def _pipeline(l2_decision):
+    classifier = _Classifier("L1_classifier", "allow")
+    pipeline = SafetyPipeline(
+        policy=_Layer("L2_policy", l2_decision),
+        classifier=classifier,
+        dataflow=_Layer("L2.5_dataflow", "allow"),
+        sandbox=_Layer("L3_sandbox", "active"),
+    )
+    return pipeline, classifier
+
+
+@pytest.mark.parametrize("l2_decision", ["allow", "deny"])
+def test_classifier_is_not_called_unless_policy_asks(l2_decision):
+    pipeline, classifier = _pipeline(l2_decision)
+    verdict = pipeline.run(SafetyContext(command="ls"))
+    assert verdict.decision == l2_decision
+    assert classifier.calls == 0
+
+
+def test_classifier_runs_after_policy_ask():
+    pipeline, classifier = _pipeline("ask")
+    ctx = SafetyContext(command="make test")
+    verdict = pipeline.run(ctx)
+    assert classifier.calls == 1
+    assert verdict.decision == "allow"
+    assert [d.layer for d in ctx.trace] == [
+        "L2_policy", "L1_classifier", "L2.5_dataflow", "L3_sandbox"]
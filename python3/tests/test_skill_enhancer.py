@@ -0,0 +1,55 @@
+"""Tests for rate-limit handling in skills.skill_enhancer."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skills import skill_enhancer as enhancer
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class _FakeLLM:
+    """Answers like the OpenAI client; raises 429 while *limited*."""
+
+    def __init__(self):
+        self.limited = True
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        if self.limited:
+            raise RateLimitError("429 Too Many Requests")
+        message = SimpleNamespace(content='["test"]')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_rate_limit_does_not_burn_attempts(tmp_path, monkeypatch):
+    skill = tmp_path / "SKILL.md"
+    skill.write_text("---\nname: demo\ndescription: Demo skill\n"
+                     "localized_descriptions:\n  en: Demo skill\n"
+                     "when_to_use: always\n---\nDo the demo.\n")
+    llm = _FakeLLM()
+    monkeypatch.setattr(enhancer, "_ledger", enhancer._Ledger(tmp_path / "ledger.json"))
+    monkeypatch.setattr(enhancer, "_llm_getter", lambda: llm)
+    monkeypatch.setattr(enhancer, "_config_getter", lambda: {"model": {"name": "m"}})
+    monkeypatch.setattr(enhancer, "_wait_for_idle", lambda: None)
+    monkeypatch.setattr(enhancer, "_note_rate_limit", lambda: None)
+    monkeypatch.setattr(enhancer, "_apply", lambda job, updates: None)
+    job = enhancer._Job("demo:abc:en", "demo", str(skill), "en")
+    enhancer._get_ledger().put(job.key, {"status": "pending", "attempts": 0})
+
+    for _ in range(enhancer.MAX_ATTEMPTS + 1):
+        assert enhancer._run_batch([job]) == [job]
+    entry = enhancer._get_ledger().get(job.key)
+    assert entry["status"] == "pending"
+    assert entry["attempts"] == 0
+
+    llm.limited = False
+    assert enhancer._run_batch([job]) == []
+    assert enhancer._get_ledger().get(job.key)["status"] == "done"
@@ -0,0 +1,108 @@
+"""skills.skill_evolution checkpoint + journal persistence."""
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skills import skill_evolution
+from skills.skill_evolution import TrustEvolution
+from skills.skill_types import TrustLevel
+
+
+@pytest.fixture
+def state_file(tmp_path, monkeypatch):
+    monkeypatch.delenv(skill_evolution._HMAC_KEY_ENV, raising=False)
+    # no exit-time checkpoints into the test directory
+    monkeypatch.setattr(skill_evolution.atexit, "register", lambda fn: fn)
+    return tmp_path / "skill-state.yaml"
+
+
+def _journal_lines(state_file):
+    return state_file.with_suffix(".log").read_text(encoding="utf-8").splitlines()
+
+
+def _reasons(trust, name):
+    return [h["reason"] for h in trust.get_history(name, limit=1000)]
+
+
+def test_journal_is_replayed_after_restart(state_file):
+    trust = TrustEvolution(state_file)
+    for _ in range(3):
+        trust.record_safe_use("a")
+    trust.record_security_event("b", "probe")
+    # the first event wrote the checkpoint, the rest are only journalled
+    assert len(_journal_lines(state_file)) == 1 + 3
+
+    restarted = TrustEvolution(state_file)
+    a = restarted.get_state("a")
+    assert (a.trust_level, a.safe_use_count) == (TrustLevel.L2, 3)
+    assert _reasons(restarted, "a") == ["safe_use_count: 3"]
+    assert restarted.get_state("b").security_event_count == 1
+
+
+def test_tampered_journal_line_resets_every_skill_to_l1(state_file):
+    trust = TrustEvolution(state_file)
+    trust.manual_override("b", TrustLevel.L3)
+    for _ in range(3):
+        trust.record_safe_use("a")
+    assert trust.get_effective_trust("a") == TrustLevel.L2
+
+    journal = state_file.with_suffix(".log")
+    lines = _journal_lines(state_file)
+    event = json.loads(lines[-1])
+    event["safe_use_count"] = 50
+    lines[-1] = json.dumps(event)
+    journal.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    restarted = TrustEvolution(state_file)
+    assert restarted.get_effective_trust("a") == TrustLevel.L1
+    assert restarted.get_effective_trust("b") == TrustLevel.L1
+    assert _reasons(restarted, "b")[-1] == "state_tampering_detected"
+    # the reset is written as a fresh, valid checkpoint
+    again = TrustEvolution(state_file)
+    assert again.get_effective_trust("b") == TrustLevel.L1
+    assert _reasons(again, "b").count("state_tampering_detected") == 1
+
+
+def test_journal_of_an_older_checkpoint_is_ignored(state_file):
+    trust = TrustEvolution(state_file)
+    for _ in range(3):
+        trust.record_safe_use("a")
+    journal = state_file.with_suffix(".log")
+    stale = state_file.with_name("stale.log")
+    shutil.copy(journal, stale)
+    trust.flush()                       # new checkpoint includes every event
+    shutil.copy(stale, journal)         # e.g. a crash before the restart
+
+    restarted = TrustEvolution(state_file)
+    a = restarted.get_state("a")
+    assert (a.trust_level, a.safe_use_count) == (TrustLevel.L2, 3)
+    # neither applied twice nor taken for tampering
+    assert _reasons(restarted, "a") == ["safe_use_count: 3"]
+
+
+def test_two_instances_append_to_one_journal(state_file):
+    first = TrustEvolution(state_file)
+    second = TrustEvolution(state_file)
+    first.record_safe_use("a")
+    second.record_safe_use("a")
+    second.record_safe_use("b")
+    assert first.record_safe_use("a") == TrustLevel.L2
+    second.record_security_event("b", "probe")
+
+    assert first.get_state("b").security_event_count == 0   # not synced yet
+    first.record_safe_use("c")
+    assert first.get_state("b").security_event_count == 1
+
+    restarted = TrustEvolution(state_file)
+    assert restarted.get_state("a").safe_use_count == 3
+    assert restarted.get_effective_trust("a") == TrustLevel.L2
+    assert restarted.get_state("b").safe_use_count == 1
+    assert restarted.get_state("b").security_event_count == 1
+    assert restarted.get_state("c").safe_use_count == 1
+    assert "state_tampering_detected" not in _reasons(restarted, "a")
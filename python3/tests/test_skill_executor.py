@@ -0,0 +1,47 @@
+"""skills.skill_executor worker pool bookkeeping."""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skills.skill_executor import _DomainPool
+
+
+def test_late_skills_of_a_replaced_pool_do_not_free_new_workers():
+    pool = _DomainPool("test", 2)
+    old_gate, new_gate = threading.Event(), threading.Event()
+    started = threading.Semaphore(0)
+
+    def hang(gate):
+        started.release()
+        gate.wait(5)
+
+    try:
+        old = [pool.submit(hang, old_gate) for _ in range(2)]
+        for _ in old:
+            assert started.acquire(timeout=5)
+        for future in old:
+            pool.abandon(future)
+        assert pool.stats()["replaced"] == 1
+
+        stuck = pool.submit(hang, new_gate)
+        assert started.acquire(timeout=5)
+        pool.abandon(stuck)
+        assert pool.stats()["abandoned"] == 1
+
+        # the old pool's skills finish: the new pool still has one stuck worker
+        old_gate.set()
+        for future in old:
+            future.result(5)
+        assert pool.stats()["abandoned"] == 1
+
+        second = pool.submit(hang, new_gate)
+        assert started.acquire(timeout=5)
+        pool.abandon(second)
+        assert pool.stats()["replaced"] == 2
+    finally:
+        old_gate.set()
+        new_gate.set()
+        pool.shutdown()
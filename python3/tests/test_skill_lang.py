@@ -0,0 +1,25 @@
+"""Regression tests for skills.skill_lang stats write-back."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skills import skill_lang
+
+
+def test_failed_flush_keeps_samples_for_the_next_flush(tmp_path, monkeypatch):
+    blocked = tmp_path / "blocked"
+    blocked.write_text("")     # a file, so the stats directory cannot be created
+    monkeypatch.setattr(skill_lang, "_stats_path", lambda: blocked / "lang-stats.json")
+    stats = skill_lang._LangStats()
+    stats.add("en")
+    stats.flush()
+    assert stats.snapshot() == {"en": 1}
+
+    target = tmp_path / "lang-stats.json"
+    monkeypatch.setattr(skill_lang, "_stats_path", lambda: target)
+    stats.add("en")
+    stats.flush()
+    assert json.loads(target.read_text()) == {"en": 2}
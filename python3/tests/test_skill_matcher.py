@@ -0,0 +1,27 @@
+"""Regression tests for skills.skill_matcher.BM25SkillMatcher."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skills.skill_matcher import BM25SkillMatcher
+
+
+def test_catalog_without_tokens_ranks_in_index_order():
+    # Every text tokenizes to nothing: avgdl is 0 and must not be divided by
+    matcher = BM25SkillMatcher()
+    matcher.index_skills([
+        {"name": "a", "description": ""},
+        {"name": "b", "description": "!!!"},
+    ])
+    assert matcher.rank("anything") == ["a", "b"]
+
+
+def test_empty_doc_next_to_indexed_doc():
+    matcher = BM25SkillMatcher()
+    matcher.index_skills([
+        {"name": "empty", "description": ""},
+        {"name": "search", "description": "search files"},
+    ])
+    assert matcher.rank("search") == ["search", "empty"]
@@ -0,0 +1,70 @@
+"""skills.skill_mcp background refresh of cache-registered servers."""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from skills.skill_mcp import MCPConnectionManager, make_skill_name
+from skills.skill_registry import SkillRegistry
+from skills.skill_types import SkillStatus, TrustLevel
+
+_OLD = [{"name": "read", "inputSchema": {"type": "object"}},
+        {"name": "gone", "inputSchema": {}}]
+_NEW = [{"name": "read", "inputSchema": {"type": "object", "required": ["path"]}}]
+
+
+class _Registry(SkillRegistry):
+    """Records the threads that register skills."""
+
+    def __init__(self, tmp_path):
+        super().__init__(user_dir=tmp_path / "skills", index_cache=tmp_path / "index.json")
+        self.threads = set()
+
+    def register(self, meta):
+        self.threads.add(threading.get_ident())
+        super().register(meta)
+
+
+def _manager(tmp_path, monkeypatch, discovered):
+    registry = _Registry(tmp_path)
+    manager = MCPConnectionManager(registry, schema_cache_path=tmp_path / "mcp.json")
+    manager.load_config({"mcp_servers": [{"name": "fs", "command": "true"}]})
+    manager._schema_cache.put("fs", manager.get_connection("fs").config, _OLD)
+    release = threading.Event()
+
+    async def fake_discover(names):
+        await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+        return {name: discovered for name in names}
+
+    monkeypatch.setattr(manager, "_discover", fake_discover)
+    return manager, registry, release
+
+
+def test_refresh_results_are_applied_on_the_caller_thread(tmp_path, monkeypatch):
+    manager, registry, release = _manager(tmp_path, monkeypatch, _NEW)
+    assert manager.connect_all() == {"fs": _OLD}
+    release.set()
+    manager.wait_refresh(5)
+
+    assert registry.threads == {threading.get_ident()}
+    read = registry.get(make_skill_name("fs", "read"))
+    assert read.trust_level == TrustLevel.L1
+    assert registry.get(make_skill_name("fs", "gone")).status == SkillStatus.UNAVAILABLE
+    assert manager._schema_cache.get("fs", manager.get_connection("fs").config) == _NEW
+
+
+def test_unfinished_refresh_leaves_the_registry_alone(tmp_path, monkeypatch):
+    manager, registry, release = _manager(tmp_path, monkeypatch, [])
+    manager.connect_all()
+    manager.wait_refresh(0.05)
+    assert registry.get(make_skill_name("fs", "gone")).status != SkillStatus.UNAVAILABLE
+
+    release.set()
+    manager._refresh.result(5)
+    # drained on next use
+    manager.get_connection("fs")
+    assert registry.get(make_skill_name("fs", "gone")).status == SkillStatus.UNAVAILABLE
+    assert manager._refresh is None
@@ -0,0 +1,40 @@
+"""tool_file.invoke_read_files result size."""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import tool_file
+
+
+@pytest.fixture
+def sandbox(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ZAI_VIM_CWD", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("total_budget", [None, 200000])
+def test_read_files_fits_the_result_limit(sandbox, total_budget):
+    paths = []
+    for i in range(5):
+        name = f"dir_{i}/" + "long_name_" * 8 + f"{i}.txt"
+        (sandbox / name).parent.mkdir()
+        (sandbox / name).write_text(f"{i}" * 40000)
+        paths.append(name)
+    paths.append("missing.txt")
+
+    result = tool_file.invoke_read_files(paths, total_budget=total_budget)
+    assert len(result) <= tool_file.READ_FILES_MAX_RESULT
+    hints = re.findall(r"显示前 (\d+) 字符，可使用 read_file\(path='([^']+)', offset=(\d+)\)",
+                       result)
+    assert len(hints) == 5
+    for shown, path, offset in hints:
+        assert shown == offset
+        body = result.split(f"===== {path} =====\n", 1)[1].split("\n[已截断", 1)[0]
+        assert len(body) == int(offset)
+    assert "missing.txt' 不存在" in result
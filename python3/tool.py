@@ -14,7 +14,6 @@ Replaces the old ToolManager.  Tools are auto-discovered from tool_*.json
 import json
 import sys
 import threading
-from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
 
@@ -35,6 +34,7 @@ from tool_spec import (
     ToolSpec,
     classify_output_scale,
 )
+from result_store import get_result_store
 from tool_registry import ToolRegistry, get_registry, init_registry
 from tool_sub_agent import ToolSubAgent
 from toolcommon import set_sandbox_home, sandbox_home
@@ -84,13 +84,15 @@ class ToolPool:
     # ------------------------------------------------------------------
 
     def _ensure_initialised(self):
-        """Lazy init: scan + cache on first use."""
+        """Lazy init: scan + cache on first use, then pick up edited toolsets."""
         if self._initialised:
+            self._registry.refresh()
             return
         self._registry = get_registry(tools_dir=self._tools_dir)
         if self._registry.tool_count == 0:
             self._registry.scan()
             self._registry.load_from_cache()
+        self._registry.watch()
         self._initialised = True
 
     def compile_categories(self, llm_fn: Callable):
@@ -176,32 +178,36 @@ class ToolPool:
             self._registry.record_call(function_name, is_error=True)
             raise
 
-        # Serialise & measure
-        if isinstance(result, str):
+        # Serialise & measure.  Oversized results are spilled to the result
+        # store while serializing; only the preview stays in memory.
+        spec = self._registry.get_tool(function_name)
+        output_id = None
+        if spec and spec.max_result_size > 0:
+            serialized, result_chars, output_id = get_result_store().serialize(
+                result, function_name, spec.max_result_size
+            )
+        elif isinstance(result, str):
             serialized = result
+            result_chars = len(serialized)
         else:
             serialized = json.dumps(result, indent=2, ensure_ascii=False)
+            result_chars = len(serialized)
 
-        result_chars = len(serialized)
-
-        # Large result handling: write to file if over threshold
-        spec = self._registry.get_tool(function_name)
-        truncated = False
-        file_path = None
-        if spec and spec.max_result_size > 0 and result_chars > spec.max_result_size:
-            truncated = True
-            # Write the full content to a temp file
-            file_path = self._write_large_result(function_name, serialized)
+        if output_id is not None:
             # Build a helpful truncation notice with pagination hint
             continuation_hint = ""
             if function_name == "read_file":
                 continuation_hint = " 使用 offset 参数继续读取后续内容。"
+            elif function_name == "read_files":
+                continuation_hint = " 可减小 total_budget，或用 read_file 的 offset 参数单独读取。"
             elif function_name == "skill":
                 continuation_hint = " 技能内容过长，你仍可遵循已显示的部分指令完成任务。"
             serialized = (
-                f"{serialized[: spec.max_result_size]}\n\n"
-                f"[截断: 仅显示了 {spec.max_result_size} 字符。"
-                f"{continuation_hint}]"
+                f"{serialized}\n\n"
+                f"[截断: 仅显示了 {spec.max_result_size}/{result_chars} 字符。"
+                f"{continuation_hint}"
+                f" 完整输出已保存为 `{output_id}`，"
+                f"可用 read_tool_output 按行或字节分页读取。]"
             )
 
         # Post-tool hooks
@@ -219,31 +225,6 @@ class ToolPool:
 
         return serialized
 
-    def _write_large_result(self, function_name: str, content: str) -> str:
-        """Write oversized tool output to a temp file, return the path."""
-        sandbox_root = sandbox_home()
-        out_dir = sandbox_root / ".tool_outputs"
-        out_dir.mkdir(parents=True, exist_ok=True)
-        # Evict oldest files if over limit
-        self._evict_old_results(out_dir, max_files=50)
-        import time
-        ts = int(time.time() * 1000)
-        fname = f"{function_name}_{ts}.txt"
-        fpath = out_dir / fname
-        fpath.write_text(content, encoding="utf-8")
-        return str(fpath)
-
-    @staticmethod
-    def _evict_old_results(out_dir: Path, max_files: int = 50):
-        """Remove oldest .txt files exceeding max_files."""
-        files = sorted(out_dir.glob("*.txt"), key=lambda p: p.stat().st_mtime)
-        if len(files) > max_files:
-            for old in files[:len(files) - max_files]:
-                try:
-                    old.unlink()
-                except OSError:
-                    pass
-
     # ------------------------------------------------------------------
     # Sub-agent dispatch
     # ------------------------------------------------------------------
@@ -381,6 +362,9 @@ class ToolPool:
     # ------------------------------------------------------------------
 
     def set_hook_manager(self, hook_manager: HookManager):
+        old = self._hook_manager
+        if old is not None and old is not hook_manager:
+            old.close()
         self._hook_manager = hook_manager
 
     def get_hook_manager(self) -> Optional[HookManager]:
@@ -392,8 +376,14 @@ class ToolPool:
         if llm_fn and self._hook_manager:
             from hooks import HookRunner
             self._hook_manager._runner._llm_fn = llm_fn
+        # load_from_dict closes the hooks of the previous configuration
         self._hook_manager.load_from_dict(config)
 
+    def close_hooks(self):
+        """Wait for async hooks and stop persistent hook processes."""
+        if self._hook_manager:
+            self._hook_manager.close()
+
     def show_hooks(self):
         if self._hook_manager:
             print(self._hook_manager.summary())
@@ -3,7 +3,7 @@
 #
 # Licensed under the MIT License
 #
-import os
+from archive_store import get_archive_store
 
 _config = {}
 
@@ -51,15 +51,12 @@ def invoke_fetch_archive(archive_file: str,
         归档文件内容（分页或全部）
     """
     global _config
-    archive_dir = _config.get('archive_dir', '/tmp/zai.archive')
-    filepath = os.path.join(archive_dir, f"{archive_file}")
+    store = get_archive_store(_config)
+    archive_id = store.archive_id(archive_file)
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            long_content = f.read()
-
         # 如果没有指定分页参数，返回全部内容
         if page_size is None or page_number is None:
-            return long_content
+            return store.read_all(archive_id)
 
         # 参数校验
         if page_number < 1:
@@ -67,10 +64,9 @@ def invoke_fetch_archive(archive_file: str,
         if page_size < 1:
             return f"错误：页大小必须大于等于1，当前值为 {page_size}"
 
-        # 按行数分页
+        # 按行数分页（通过行偏移索引直接定位，不读取整个文件）
         if page_type == "line":
-            lines = long_content.split('\n')
-            total_lines = len(lines)
+            total_lines = store.line_count(archive_id)
             total_pages = (total_lines + page_size - 1) // page_size
 
             if page_number > total_pages:
@@ -78,7 +74,7 @@ def invoke_fetch_archive(archive_file: str,
 
             start_idx = (page_number - 1) * page_size
             end_idx = min(start_idx + page_size, total_lines)
-            page_content = '\n'.join(lines[start_idx:end_idx])
+            page_content = store.read_lines(archive_id, start_idx, end_idx)
 
             header = f"==========\n[分页内容]\n" \
                      f"- 归档文件:{archive_file}\n" \
@@ -92,7 +88,7 @@ def invoke_fetch_archive(archive_file: str,
 
         # 按字符长度分页
         elif page_type == "length":
-            total_length = len(long_content)
+            total_length = store.char_count(archive_id)
             total_pages = (total_length + page_size - 1) // page_size
 
             if page_number > total_pages:
@@ -100,7 +96,7 @@ def invoke_fetch_archive(archive_file: str,
 
             start_idx = (page_number - 1) * page_size
             end_idx = min(start_idx + page_size, total_length)
-            page_content = long_content[start_idx:end_idx]
+            page_content = store.read_chars(archive_id, start_idx, end_idx)
 
             header = f"==========\n[分页内容]\n" \
                      f"- 归档文件:{archive_file}\n" \
@@ -9,6 +9,7 @@ Shell工具集 - 使用taskbox Docker容器安全地执行shell和Python命令
 完全基于Docker Python SDK，避免subprocess注入风险
 基于taskbox镜像：ubuntu/debian + Python 3.12 + C/C++工具链 + ccache
 支持持久化容器，跨调用保持状态（安装的依赖、文件等）
+持久化容器内运行常驻代理，命令经同一 socket 复用执行，stdout/stderr 分离
 支持项目级配置：通过.zaivim/project.yaml文件配置Docker容器参数
 """
 
@@ -17,8 +18,12 @@ import os
 import sys
 import time
 import base64
+import hashlib
+import itertools
+import shlex
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 
 from toolcommon import sandbox_home, get_project_config
 
@@ -45,6 +50,230 @@ DEFAULT_IMAGE = "taskbox:latest"
 DEFAULT_WORKDIR = "/sandbox"
 DEFAULT_TIMEOUT = 60
 DEFAULT_CONTAINER_NAME = "zai-taskbox"
+# 持久化容器健康状态的缓存时间（秒）
+CONTAINER_CHECK_INTERVAL = 30
+# 代理启动握手超时（秒）
+AGENT_START_TIMEOUT = 10
+# 单条命令每个输出流在内存中保留的最大字节数
+MAX_BUFFERED_OUTPUT = 8 * 1024 * 1024
+
+# 依赖层缓存：按（基础镜像 ID + 安装内容）寻址的派生镜像，仓库名:内容哈希
+LAYER_REPOSITORY = "zai-taskbox-layer"
+LAYER_LABEL = "zai.taskbox.layer"
+# 构建单个依赖层的超时（秒）
+LAYER_BUILD_TIMEOUT = 900
+# 最多保留的依赖层镜像数，超出时按最近使用时间删除最旧的
+LAYER_MAX_COUNT = 20
+# 共享 pip 缓存卷（命名卷，跨容器复用已下载的 wheel），
+# 构建依赖层和执行容器内联 pip 安装时都会挂载
+PIP_CACHE_VOLUME = "zai-pip-cache"
+PIP_CACHE_DIR = "/var/cache/zai-pip"
+
+# 容器内常驻代理：从 stdin 逐行读取 JSON 请求，每条命令一个子进程，
+# stdout/stderr 分块以 base64 写回，响应按请求 id 区分，可并发执行。
+#   请求: {"id": n, "cmd": [...], "cwd": "..."} | {"kill": n}
+#   响应: {"ready": pid} | {"id": n, "s": 1|2, "d": b64} | {"id": n, "exit": code}
+#         | {"id": n, "error": "..."}
+_AGENT_SOURCE = r'''
+import base64, json, os, subprocess, sys, threading
+out = sys.stdout.buffer
+lock = threading.Lock()
+procs = {}
+
+def send(msg):
+    data = (json.dumps(msg) + "\n").encode()
+    with lock:
+        out.write(data)
+        out.flush()
+
+def pump(rid, stream, pipe):
+    while True:
+        chunk = os.read(pipe.fileno(), 65536)
+        if not chunk:
+            break
+        send({"id": rid, "s": stream, "d": base64.b64encode(chunk).decode()})
+
+def run(req):
+    rid = req["id"]
+    try:
+        proc = subprocess.Popen(req["cmd"], cwd=req.get("cwd") or None,
+                                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, start_new_session=True)
+    except Exception as e:
+        send({"id": rid, "error": str(e)})
+        return
+    procs[rid] = proc
+    pumps = [threading.Thread(target=pump, args=(rid, 1, proc.stdout)),
+             threading.Thread(target=pump, args=(rid, 2, proc.stderr))]
+    for t in pumps:
+        t.start()
+    for t in pumps:
+        t.join()
+    code = proc.wait()
+    procs.pop(rid, None)
+    send({"id": rid, "exit": code})
+
+send({"ready": os.getpid()})
+for line in sys.stdin.buffer:
+    req = json.loads(line)
+    if "kill" in req:
+        proc = procs.get(req["kill"])
+        if proc is not None:
+            try:
+                os.killpg(proc.pid, 9)
+            except OSError:
+                pass
+        continue
+    threading.Thread(target=run, args=(req,), daemon=True).start()
+'''
+
+
+class _AgentCommand:
+    """代理中一条正在执行的命令"""
+
+    def __init__(self, on_output: Optional[Callable[[str, bytes], None]] = None):
+        self.on_output = on_output
+        self.streams = {1: bytearray(), 2: bytearray()}
+        self.truncated = False
+        self.exit_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    def feed(self, stream: int, data: bytes):
+        if self.on_output is not None:
+            try:
+                self.on_output("stdout" if stream == 1 else "stderr", data)
+            except Exception as e:
+                print(f"[taskbox][WARN] output callback failed: {e}", file=sys.stderr)
+        buf = self.streams[stream]
+        room = MAX_BUFFERED_OUTPUT - len(buf)
+        if room < len(data):
+            self.truncated = True
+            data = data[:max(room, 0)]
+        buf += data
+
+
+class _TaskboxAgent:
+    """
+    持久化容器内的常驻执行代理
+
+    通过一次 docker exec 启动 _AGENT_SOURCE，并保持其 stdin/stdout 附着在
+    同一个 socket 上。之后的每条命令只是在该 socket 上写一行请求，不再需要
+    exec_create/exec_start/exec_inspect 往返；多条命令可并发执行，stdout 与
+    stderr 分开收集，并可通过 on_output 回调流式获取。
+    """
+
+    def __init__(self, client, container, user: str, working_dir: str):
+        exec_id = client.api.exec_create(
+            container.id,
+            ["python3", "-u", "-c", _AGENT_SOURCE],
+            stdin=True, stdout=True, stderr=True, tty=False,
+            user=user, workdir=working_dir,
+        )["Id"]
+        self._sock = client.api.exec_start(exec_id, socket=True)
+        self._raw = getattr(self._sock, "_sock", self._sock)
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending: Dict[int, _AgentCommand] = {}
+        self._ids = itertools.count(1)
+        self._ready = threading.Event()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, name="taskbox-agent", daemon=True)
+        self._reader.start()
+        if not self._ready.wait(AGENT_START_TIMEOUT):
+            self.close()
+            raise RuntimeError("taskbox agent did not start")
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self._reader.is_alive()
+
+    def _read_loop(self):
+        from docker.utils.socket import frames_iter
+        pending = b""
+        try:
+            # tty=False 时 docker 以 8 字节帧头复用 stdout/stderr
+            for stream, data in frames_iter(self._sock, tty=False):
+                if stream == 2:
+                    # 代理自身的错误输出
+                    print(f"[taskbox][WARN] agent: {data.decode('utf-8', 'replace').rstrip()}", file=sys.stderr)
+                    continue
+                pending += data
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    if line:
+                        self._dispatch(json.loads(line))
+        except Exception as e:
+            if not self._closed:
+                print(f"[taskbox][WARN] agent connection lost: {e}", file=sys.stderr)
+        finally:
+            self._fail_pending("taskbox agent exited")
+
+    def _dispatch(self, msg: Dict[str, Any]):
+        if "ready" in msg:
+            self._ready.set()
+            return
+        with self._lock:
+            cmd = self._pending.get(msg.get("id"))
+        if cmd is None:
+            return
+        if "d" in msg:
+            cmd.feed(msg["s"], base64.b64decode(msg["d"]))
+        elif "exit" in msg or "error" in msg:
+            cmd.exit_code = msg.get("exit")
+            cmd.error = msg.get("error")
+            with self._lock:
+                self._pending.pop(msg["id"], None)
+            cmd.done.set()
+
+    def _fail_pending(self, reason: str):
+        self._closed = True
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for cmd in pending.values():
+            cmd.error = reason
+            cmd.done.set()
+
+    def _send(self, msg: Dict[str, Any]):
+        data = (json.dumps(msg) + "\n").encode()
+        with self._send_lock:
+            self._raw.sendall(data)
+
+    def run(self, cmd_list: List[str], wait: Optional[float], working_dir: str = None,
+            on_output: Optional[Callable[[str, bytes], None]] = None) -> _AgentCommand:
+        """执行一条命令并等待结束；*wait* 秒内未结束则杀掉进程并标记错误"""
+        cmd = _AgentCommand(on_output)
+        rid = next(self._ids)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("taskbox agent is closed")
+            self._pending[rid] = cmd
+        try:
+            self._send({"id": rid, "cmd": cmd_list, "cwd": working_dir})
+        except OSError:
+            with self._lock:
+                self._pending.pop(rid, None)
+            self.close()
+            raise
+        if not cmd.done.wait(wait):
+            with self._lock:
+                self._pending.pop(rid, None)
+            try:
+                self._send({"kill": rid})
+            except OSError:
+                self.close()
+            cmd.error = f"no response within {wait} seconds"
+        return cmd
+
+    def close(self):
+        """关闭 socket；代理读到 EOF 后自行退出"""
+        self._closed = True
+        for sock in (self._sock, self._raw):
+            try:
+                sock.close()
+            except Exception:
+                pass
+
 
 
 class TaskboxExecutor:
@@ -60,6 +289,16 @@ class TaskboxExecutor:
         self.client = docker.from_env()
         self.persistent = persistent
         self.container = None  # 持久化容器实例
+        self._image_ready = False  # 镜像已确认存在（或已构建）
+        self._image_id = None  # 基础镜像 ID，作为依赖层哈希的一部分
+        self._layers = set()  # 已确认存在的依赖层镜像标签
+        self._layer_used: Dict[str, float] = {}  # 本进程内依赖层的最近使用时间（time.time）
+        self._installed_library_keys = set()  # 已装入当前持久化容器的 libraries 集合
+        self._install_failures = 0  # 启动后安装中失败的步骤数，非零时不做快照
+        self._container_checked_at = 0.0  # 上次确认容器运行中的时间（monotonic）
+        self._agent: Optional[_TaskboxAgent] = None
+        self._agent_lock = threading.Lock()
+        self._agent_retry_at = 0.0  # 代理启动失败后，在此时间前直接走 exec 回退
         
         # 获取主机UID/GID
         self.host_uid, self.host_gid = get_host_uid_gid()
@@ -119,6 +358,17 @@ class TaskboxExecutor:
             print(f"Error checking image: {e}", file=sys.stderr)
             return False
     
+    def _ensure_image(self):
+        """确认镜像存在（必要时构建），结果在实例内缓存"""
+        if self._image_ready:
+            return
+        self._build_image_if_needed()
+        try:
+            self._image_id = self.client.images.get(self.image).id
+        except Exception:
+            self._image_id = self.image
+        self._image_ready = True
+    
     def _build_image_if_needed(self):
         if self._image_exists():
             return
@@ -218,6 +468,141 @@ CMD ["tail", "-f", "/dev/null"]
                     "2. Run: docker build -t taskbox:latest -f Dockerfile ."
                 )
     
+    def _layer_tag(self, spec: Dict[str, Any]) -> str:
+        """依赖层的镜像标签：基础镜像 ID + 规范化安装描述的内容哈希"""
+        payload = json.dumps({"base": self._image_id, **spec}, sort_keys=True, ensure_ascii=False)
+        return f"{LAYER_REPOSITORY}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+    
+    def _layer_exists(self, tag: str) -> bool:
+        if tag in self._layers:
+            return True
+        try:
+            self.client.images.get(tag)
+        except docker.errors.ImageNotFound:
+            return False
+        except Exception as e:
+            print(f"[taskbox][WARN] checking layer {tag}: {e}", file=sys.stderr)
+            return False
+        self._layers.add(tag)
+        self._layer_used[tag] = time.time()
+        return True
+    
+    def _commit_layer(self, container, tag: str, kind: str):
+        """将容器当前文件系统提交为依赖层镜像"""
+        repository, key = tag.split(":", 1)
+        container.commit(
+            repository=repository,
+            tag=key,
+            changes=['CMD ["tail", "-f", "/dev/null"]', f"LABEL {LAYER_LABEL}={kind}"],
+        )
+        self._layers.add(tag)
+        self._layer_used[tag] = time.time()
+        self._prune_layers()
+    
+    def _prune_layers(self):
+        """
+        依赖层超过 LAYER_MAX_COUNT 个时删除最久未使用的
+        
+        最近使用时间取镜像创建时间与本进程内最后一次使用中较晚者；
+        仍被容器使用的镜像删除失败，跳过即可。
+        """
+        try:
+            images = self.client.api.images(filters={"label": LAYER_LABEL})
+        except Exception as e:
+            print(f"[taskbox][WARN] listing layers: {e}", file=sys.stderr)
+            return
+        if len(images) <= LAYER_MAX_COUNT:
+            return
+        
+        def last_used(image):
+            tags = image.get("RepoTags") or []
+            return max([image.get("Created", 0)] + [self._layer_used.get(t, 0) for t in tags])
+        
+        images.sort(key=last_used, reverse=True)
+        for image in images[LAYER_MAX_COUNT:]:
+            try:
+                self.client.images.remove(image["Id"])
+            except Exception as e:
+                print(f"[taskbox][WARN] pruning layer {image['Id'][:19]}: {e}", file=sys.stderr)
+                continue
+            for tag in image.get("RepoTags") or []:
+                self._layers.discard(tag)
+                self._layer_used.pop(tag, None)
+            print(f"[taskbox] pruned layer {', '.join(image.get('RepoTags') or [image['Id'][:19]])}",
+                  file=sys.stderr)
+    
+    @staticmethod
+    def _library_spec(language: str, libraries: List[str]) -> Dict[str, Any]:
+        return {
+            "kind": "pip" if language == "python" else "apt",
+            "packages": sorted(set(libraries)),
+        }
+    
+    def _build_library_layer(self, spec: Dict[str, Any], tag: str) -> bool:
+        """
+        在一次性容器中以 root 安装 libraries 并提交为依赖层
+        
+        pip 使用共享缓存卷，同一 wheel 只下载一次；缓存对所有用户可写，
+        执行容器以主机用户内联安装时也能复用。失败时返回 False，
+        调用方回退为在执行容器内安装。
+        """
+        packages = " ".join(shlex.quote(p) for p in spec["packages"])
+        if spec["kind"] == "pip":
+            install = (f"chmod a+rwx {PIP_CACHE_DIR} && umask 000 && "
+                       f"pip install --cache-dir {PIP_CACHE_DIR} {packages}")
+        else:
+            install = f"apt-get update && apt-get install -y {packages}"
+        
+        config = {
+            "image": self.image,
+            "command": ["sh", "-c", install],
+            "user": "0:0",
+            "working_dir": self.working_dir,
+            "volumes": {PIP_CACHE_VOLUME: {"bind": PIP_CACHE_DIR, "mode": "rw"}},
+            "detach": True,
+        }
+        network_mode = self.shell_container_config.get('network_mode')
+        if network_mode:
+            config["network_mode"] = network_mode
+        
+        print(f"[taskbox] building layer {tag}: {spec['kind']} {packages}", file=sys.stderr)
+        t0 = time.monotonic()
+        container = None
+        try:
+            container = self.client.containers.create(**config)
+            container.start()
+            status = container.wait(timeout=LAYER_BUILD_TIMEOUT)["StatusCode"]
+            if status != 0:
+                err = container.logs(stdout=False, stderr=True).decode('utf-8', errors='replace')
+                print(f"[taskbox][WARN] layer build failed (exit {status}): {err[-500:]}", file=sys.stderr)
+                return False
+            self._commit_layer(container, tag, spec["kind"])
+        except Exception as e:
+            print(f"[taskbox][WARN] layer build failed: {e}", file=sys.stderr)
+            return False
+        finally:
+            if container:
+                try:
+                    container.remove(force=True)
+                except Exception:
+                    pass
+        print(f"[taskbox] layer {tag} built in {time.monotonic() - t0:.1f}s", file=sys.stderr)
+        return True
+    
+    def _post_start_spec(self) -> Optional[Dict[str, Any]]:
+        """项目配置中可快照的安装内容（apt_install / pip_install）"""
+        if not self.project_config:
+            return None
+        spec = {
+            key: self.project_config[key]
+            for key in ('apt_install', 'pip_install')
+            if self.project_config.get(key)
+        }
+        if not spec:
+            return None
+        spec.update(kind="post_start", user=self.user)
+        return spec
+    
     def _prepare_mounts(self) -> Dict[str, Dict[str, str]]:
         """
         准备挂载配置
@@ -226,6 +611,7 @@ CMD ["tail", "-f", "/dev/null"]
         1. sandbox_home() -> /sandbox
         2. /etc/localtime -> /etc/localtime:ro
         3. /etc/timezone -> /etc/timezone:ro
+        4. PIP_CACHE_VOLUME -> PIP_CACHE_DIR（共享 pip 缓存卷）
         
         如果项目配置中有volumes字段，则合并使用：
         - 项目配置中的挂载会添加到默认挂载之后
@@ -251,6 +637,12 @@ CMD ["tail", "-f", "/dev/null"]
             "mode": "ro"
         }
         
+        # 默认挂载：共享 pip 缓存卷，内联 pip 安装复用依赖层构建下载的 wheel
+        mounts[PIP_CACHE_VOLUME] = {
+            "bind": PIP_CACHE_DIR,
+            "mode": "rw"
+        }
+        
         # 从项目配置中获取额外的挂载
         volumes = self.shell_container_config.get('volumes', [])
         if isinstance(volumes, list):
@@ -418,7 +810,8 @@ CMD ["tail", "-f", "/dev/null"]
         
         return container_config
     
-    def _execute_post_start_installations(self):
+    def _execute_post_start_installations(self, packages_cached: bool = False,
+                                          snapshot: Optional[str] = None):
         """
         执行容器启动后的安装命令
         
@@ -426,6 +819,9 @@ CMD ["tail", "-f", "/dev/null"]
         1. apt_install: Linux包安装（apt、rpm、dnf）
         2. pip_install: Python包安装
         3. post_start_commands: 通用命令安装
+        
+        packages_cached 为 True 时容器来自已缓存的依赖层，跳过 1、2；
+        否则若给出 snapshot 标签且 1、2 全部成功，在执行 3 之前将容器提交为该依赖层。
         """
         if not self.container:
             return
@@ -437,13 +833,23 @@ CMD ["tail", "-f", "/dev/null"]
         print("执行容器启动后安装命令...", file=sys.stderr)
         
         # 1. 执行系统包安装（如果有）
-        if 'apt_install' in self.project_config:
+        if 'apt_install' in self.project_config and not packages_cached:
             self._execute_system_package_installations(self.project_config['apt_install'])
         
         # 2. 执行pip安装（如果有）
-        if 'pip_install' in self.project_config:
+        if 'pip_install' in self.project_config and not packages_cached:
             self._execute_pip_installations(self.project_config['pip_install'])
         
+        if snapshot and not packages_cached:
+            if self._install_failures:
+                print(f"[taskbox][WARN] {self._install_failures} install step(s) failed, snapshot skipped", file=sys.stderr)
+            else:
+                try:
+                    self._commit_layer(self.container, snapshot, "post_start")
+                    print(f"[taskbox] snapshot {snapshot} saved", file=sys.stderr)
+                except Exception as e:
+                    print(f"[taskbox][WARN] snapshot failed: {e}", file=sys.stderr)
+        
         # 3. 执行通用命令（如果有）
         if 'post_start_commands' in self.project_config:
             self._execute_post_start_commands(self.project_config['post_start_commands'])
@@ -573,6 +979,7 @@ CMD ["tail", "-f", "/dev/null"]
                 
         except Exception as e:
             print(f"执行系统包安装时出错: {e}", file=sys.stderr)
+            self._install_failures += 1
     
     def _detect_package_manager(self, config):
         """
@@ -651,6 +1058,7 @@ CMD ["tail", "-f", "/dev/null"]
             print(f"成功安装{package_manager}包: {' '.join(packages)}", file=sys.stderr)
         else:
             print(f"安装{package_manager}包失败: {result.get('stderr', 'Unknown error')}", file=sys.stderr)
+            self._install_failures += 1
             # 对于apt/dnf/yum，如果失败可能是因为包不存在或网络问题
             if package_manager in ['apt', 'dnf', 'yum']:
                 print(f"建议: 检查包名是否正确或网络连接是否正常", file=sys.stderr)
@@ -667,7 +1075,8 @@ CMD ["tail", "-f", "/dev/null"]
         try:
             # 首先升级pip到最新版本
             print("升级pip到最新版本...", file=sys.stderr)
-            upgrade_result = self._exec_in_container(["pip", "install", "--upgrade", "pip"], timeout=120)
+            upgrade_result = self._exec_in_container(
+                ["pip", "install", "--cache-dir", PIP_CACHE_DIR, "--upgrade", "pip"], timeout=120)
             if not upgrade_result["success"]:
                 print(f"警告: pip升级失败: {upgrade_result['stderr']}", file=sys.stderr)
                 # 继续尝试安装，但可能会使用旧版本pip
@@ -709,6 +1118,7 @@ CMD ["tail", "-f", "/dev/null"]
                 
         except Exception as e:
             print(f"执行pip安装时出错: {e}", file=sys.stderr)
+            self._install_failures += 1
     
     def _install_pip_packages(self, packages, options=None):
         """
@@ -722,7 +1132,7 @@ CMD ["tail", "-f", "/dev/null"]
             return
         
         options = options or []
-        cmd = ["pip", "install"] + options + packages
+        cmd = ["pip", "install", "--cache-dir", PIP_CACHE_DIR] + options + packages
         
         print(f"安装pip包: {' '.join(packages)}", file=sys.stderr)
         if options:
@@ -734,6 +1144,7 @@ CMD ["tail", "-f", "/dev/null"]
             print(f"成功安装pip包: {' '.join(packages)}", file=sys.stderr)
         else:
             print(f"安装pip包失败: {result['stderr']}", file=sys.stderr)
+            self._install_failures += 1
     
     def _execute_post_start_commands(self, commands):
         """
@@ -773,6 +1184,13 @@ CMD ["tail", "-f", "/dev/null"]
         if not self.persistent:
             return False
         
+        # 代理存活即说明容器在运行；否则在 CONTAINER_CHECK_INTERVAL 内信任上次检查
+        if self.container is not None and (
+            (self._agent is not None and self._agent.alive)
+            or time.monotonic() - self._container_checked_at < CONTAINER_CHECK_INTERVAL
+        ):
+            return True
+        
         try:
             self.container = self.client.containers.get(self.container_name)
             
@@ -783,28 +1201,42 @@ CMD ["tail", "-f", "/dev/null"]
                 # 容器重新启动后，执行安装命令
                 self._execute_post_start_installations()
             
+            self._container_checked_at = time.monotonic()
             return True
             
         except docker.errors.NotFound:
             print(f"Container {self.container_name} doesn't exist, creating...", file=sys.stderr)
             
-            if not self._image_exists():
-                self._build_image_if_needed()
+            self._ensure_image()
             
             # 创建持久化容器配置
             container_config = self._create_container_config(is_persistent=True)
             
+            # apt_install/pip_install 的结果按内容快照为依赖层，再次创建容器时直接复用
+            post_start = self._post_start_spec()
+            snapshot = self._layer_tag(post_start) if post_start else None
+            packages_cached = snapshot is not None and self._layer_exists(snapshot)
+            if packages_cached:
+                container_config["image"] = snapshot
+                print(f"[taskbox] using cached layer {snapshot}", file=sys.stderr)
+            
             try:
                 # 创建并启动容器
+                t0 = time.monotonic()
                 self.container = self.client.containers.create(**container_config)
                 self.container.start()
+                self._installed_library_keys.clear()
                 
                 time.sleep(2)
                 print(f"Persistent container {self.container_name} has been started and is running", file=sys.stderr)
                 
                 # 容器首次启动后，执行安装命令
-                self._execute_post_start_installations()
+                self._install_failures = 0
+                self._execute_post_start_installations(packages_cached, snapshot)
+                print(f"[taskbox] container ready in {time.monotonic() - t0:.1f}s "
+                      f"({'warm' if packages_cached else 'cold'})", file=sys.stderr)
                 
+                self._container_checked_at = time.monotonic()
                 return True
             except Exception as e:
                 print(f"Failed to create container: {e}", file=sys.stderr)
@@ -819,6 +1251,8 @@ CMD ["tail", "-f", "/dev/null"]
         if not self.persistent:
             return
         
+        self._reset_container_state()
+        self._installed_library_keys.clear()
         try:
             container = self.client.containers.get(self.container_name)
             container.stop(timeout=1)
@@ -831,55 +1265,106 @@ CMD ["tail", "-f", "/dev/null"]
             print(f"Error stopping container: {e}", file=sys.stderr)
             self.container = None
     
-    def _exec_in_container(self, cmd_list: List[str], timeout: int, working_dir: str = None) -> Dict[str, Any]:
+    def _reset_container_state(self):
+        """丢弃容器健康缓存并关闭代理（容器停止或执行出错后调用）"""
+        with self._agent_lock:
+            agent, self._agent = self._agent, None
+        if agent is not None:
+            agent.close()
+        self._container_checked_at = 0.0
+    
+    def _get_agent(self) -> Optional[_TaskboxAgent]:
+        """返回持久化容器中的常驻代理，必要时启动；不可用时返回 None"""
+        with self._agent_lock:
+            if self._agent is not None and self._agent.alive:
+                return self._agent
+            if self._agent is not None:
+                self._agent.close()
+                self._agent = None
+            if time.monotonic() < self._agent_retry_at:
+                return None
+            try:
+                self._agent = _TaskboxAgent(self.client, self.container, self.user, self.working_dir)
+            except Exception as e:
+                print(f"[taskbox][WARN] agent unavailable, using docker exec: {e}", file=sys.stderr)
+                self._agent_retry_at = time.monotonic() + CONTAINER_CHECK_INTERVAL
+                return None
+            return self._agent
+    
+    def _exec_in_container(self, cmd_list: List[str], timeout: int, working_dir: str = None,
+                           on_output: Optional[Callable[[str, bytes], None]] = None) -> Dict[str, Any]:
         """
         在持久化容器中执行命令
+        
+        优先通过常驻代理执行（stdout/stderr 分离，可经 on_output 流式获取），
+        代理不可用时回退到一次 docker exec。
         """
         if not self.container:
             raise RuntimeError("Container not initialized")
         
-        try:
-            # 如果timeout > 0，使用timeout命令包装
-            if timeout > 0:
-                final_cmd_list = ["timeout", str(timeout)] + cmd_list
+        # 如果timeout > 0，使用timeout命令包装
+        if timeout > 0:
+            final_cmd_list = ["timeout", str(timeout)] + cmd_list
+        else:
+            final_cmd_list = cmd_list
+        
+        agent = self._get_agent()
+        if agent is not None:
+            try:
+                # 留出余量：正常超时由容器内 timeout 命令处理
+                cmd = agent.run(final_cmd_list, timeout + 10 if timeout > 0 else None,
+                                working_dir, on_output)
+            except Exception as e:
+                print(f"[taskbox][WARN] agent failed, using docker exec: {e}", file=sys.stderr)
+                self._reset_container_state()
+                if not self.ensure_container_running():
+                    return {
+                        "exit_code": 1,
+                        "stdout": "",
+                        "stderr": f"Execution error: {e}",
+                        "success": False
+                    }
             else:
-                final_cmd_list = cmd_list
-            
+                if cmd.error is not None:
+                    if not agent.alive:
+                        self._reset_container_state()
+                    return {
+                        "exit_code": 1,
+                        "stdout": cmd.streams[1].decode('utf-8', errors='replace'),
+                        "stderr": f"Execution error: {cmd.error}",
+                        "success": False
+                    }
+                return self._exec_result(
+                    cmd.exit_code,
+                    cmd.streams[1].decode('utf-8', errors='replace'),
+                    cmd.streams[2].decode('utf-8', errors='replace'),
+                    timeout,
+                    truncated=cmd.truncated,
+                )
+        
+        try:
             result = self.container.exec_run(
                 cmd=final_cmd_list,
                 workdir=working_dir or self.working_dir,
                 user=self.user,
                 stdout=True,
                 stderr=True,
-                demux=False  # 不分离 stdout/stderr，返回合并的输出
+                demux=True  # 分离 stdout/stderr
+            )
+            stdout, stderr = result.output or (None, None)
+            if on_output is not None:
+                for name, data in (("stdout", stdout), ("stderr", stderr)):
+                    if data:
+                        on_output(name, data)
+            return self._exec_result(
+                result.exit_code,
+                (stdout or b"").decode('utf-8', errors='replace'),
+                (stderr or b"").decode('utf-8', errors='replace'),
+                timeout,
             )
-            
-            exit_code = result.exit_code
-            output = result.output.decode('utf-8', errors='replace') if isinstance(result.output, bytes) else result.output
-            
-            # 检查是否因timeout命令而退出（退出码124）
-            if timeout > 0 and exit_code == 124:
-                return {
-                    "exit_code": exit_code,
-                    "stdout": "",
-                    "stderr": f"Command execution timeout ({timeout} seconds)",
-                    "success": False
-                }
-            
-            # 由于 demux=False，output 包含合并的 stdout 和 stderr
-            # 我们无法分离它们，所以将全部输出作为 stdout，stderr 留空
-            # 但我们可以通过检查 exit_code 来判断是否出错
-            stdout = output
-            stderr = ""
-            
-            return {
-                "exit_code": exit_code,
-                "stdout": stdout,
-                "stderr": stderr,
-                "success": exit_code == 0
-            }
             
         except docker.errors.APIError as e:
+            self._reset_container_state()
             return {
                 "exit_code": 1,
                 "stdout": "",
@@ -894,6 +1379,62 @@ CMD ["tail", "-f", "/dev/null"]
                 "success": False
             }
     
+    @staticmethod
+    def _exec_result(exit_code: int, stdout: str, stderr: str, timeout: int,
+                     truncated: bool = False) -> Dict[str, Any]:
+        # 检查是否因timeout命令而退出（退出码124）
+        if timeout > 0 and exit_code == 124:
+            return {
+                "exit_code": exit_code,
+                "stdout": "",
+                "stderr": f"Command execution timeout ({timeout} seconds)",
+                "success": False
+            }
+        result = {
+            "exit_code": exit_code,
+            "stdout": stdout,
+            "stderr": stderr,
+            "success": exit_code == 0
+        }
+        if truncated:
+            result["stderr"] += f"\n[output truncated at {MAX_BUFFERED_OUTPUT} bytes per stream]"
+        return result
+    
+    def _resolve_libraries(self, language: str, libraries: List[str], persistent: bool,
+                           enable_network: bool = True):
+        """
+        为 libraries 选择依赖层
+        
+        Returns:
+            (仍需在命令中内联安装的 libraries, 临时容器使用的镜像或 None, layer_cache 信息或 None)
+            
+        layer_cache["status"]:
+            hit       依赖层已存在（临时容器）或已装入当前持久化容器
+            built     本次构建了依赖层（冷启动）
+            installed 在持久化容器中内联安装，pip 成功后记入该容器
+            inline    依赖层不可用，按原方式在命令中安装
+            offline   网络已禁用且依赖层未缓存，不构建依赖层，按原方式在命令中安装
+        """
+        if not libraries:
+            return libraries, None, None
+        spec = self._library_spec(language, libraries)
+        tag = self._layer_tag(spec)
+        if persistent:
+            if tag in self._installed_library_keys:
+                return [], None, {"layer": tag, "status": "hit"}
+            # apt 安装失败时命令仍继续执行，无法判断是否装好，只记录 pip
+            status = "installed" if spec["kind"] == "pip" else "inline"
+            return libraries, None, {"layer": tag, "status": status}
+        hit = self._layer_exists(tag)
+        if not hit and not enable_network:
+            # 构建需要下载软件包，网络禁用时只使用已缓存的依赖层
+            print(f"[taskbox] network disabled: layer {tag} is not cached, not building it",
+                  file=sys.stderr)
+            return libraries, None, {"layer": tag, "status": "offline"}
+        if hit or self._build_library_layer(spec, tag):
+            return [], tag, {"layer": tag, "status": "hit" if hit else "built"}
+        return libraries, None, {"layer": tag, "status": "inline"}
+    
     def execute_command(
         self,
         command: str,
@@ -902,7 +1443,8 @@ CMD ["tail", "-f", "/dev/null"]
         enable_network: bool = True,
         language: str = "shell",
         libraries: List[str] = None,
-        persistent: bool = None
+        persistent: bool = None,
+        on_output: Optional[Callable[[str, bytes], None]] = None
     ) -> Dict[str, Any]:
         """
         在taskbox容器中执行命令
@@ -915,9 +1457,10 @@ CMD ["tail", "-f", "/dev/null"]
             language: 命令语言（shell/python）
             libraries: 需要安装的库列表
             persistent: 是否使用持久化容器（覆盖实例的persistent设置）
+            on_output: 可选回调 (stream, data)，持久化容器中执行时随输出到达被调用
             
         Returns:
-            执行结果字典
+            执行结果字典（含 execution_time 秒数；使用 libraries 时含 layer_cache）
         """
         use_persistent = self.persistent if persistent is None else persistent
         
@@ -925,15 +1468,22 @@ CMD ["tail", "-f", "/dev/null"]
             print("Warning: Cannot use persistent container when network is disabled, falling back to temporary container", file=sys.stderr)
             use_persistent = False
         
+        t0 = time.monotonic()
         try:
-            if not self._image_exists():
-                self._build_image_if_needed()
+            self._ensure_image()
+            
+            if use_persistent and not self.ensure_container_running():
+                print("Warning: Unable to start persistent container, falling back to temporary container", file=sys.stderr)
+                use_persistent = False
+            
+            libraries, image, layer_cache = self._resolve_libraries(
+                language, libraries, use_persistent, enable_network)
             
             # 准备命令
             if language == "python":
                 cmd_list = self._prepare_python_command(command)
                 if libraries:
-                    pip_cmd = ["pip", "install"] + libraries
+                    pip_cmd = ["pip", "install", "--cache-dir", PIP_CACHE_DIR] + libraries
                     pip_install = " ".join(pip_cmd)
                     python_cmd = " ".join(cmd_list)
                     full_cmd = f"{pip_install} && {python_cmd}"
@@ -944,13 +1494,16 @@ CMD ["tail", "-f", "/dev/null"]
                 cmd_list = self._prepare_shell_command(command, libraries)
             
             if use_persistent:
-                if not self.ensure_container_running():
-                    print("Warning: Unable to start persistent container, falling back to temporary container", file=sys.stderr)
-                    return self._execute_in_temp_container(cmd_list, timeout, working_dir, enable_network)
-                
-                return self._exec_in_container(cmd_list, timeout, working_dir)
+                result = self._exec_in_container(cmd_list, timeout, working_dir, on_output)
+                if layer_cache and layer_cache["status"] == "installed" and result["success"]:
+                    self._installed_library_keys.add(layer_cache["layer"])
             else:
-                return self._execute_in_temp_container(cmd_list, timeout, working_dir, enable_network)
+                result = self._execute_in_temp_container(cmd_list, timeout, working_dir, enable_network, image)
+            
+            result["execution_time"] = round(time.monotonic() - t0, 3)
+            if layer_cache:
+                result["layer_cache"] = layer_cache
+            return result
                 
         except Exception as e:
             return {
@@ -960,10 +1513,13 @@ CMD ["tail", "-f", "/dev/null"]
                 "success": False
             }
     
-    def _execute_in_temp_container(self, cmd_list: List[str], timeout: int, working_dir: str, enable_network: bool) -> Dict[str, Any]:
-        """在临时容器中执行命令"""
+    def _execute_in_temp_container(self, cmd_list: List[str], timeout: int, working_dir: str, enable_network: bool,
+                                   image: str = None) -> Dict[str, Any]:
+        """在临时容器中执行命令（image 为依赖层镜像时替代基础镜像）"""
         # 创建临时容器配置
         container_config = self._create_container_config(cmd_list=cmd_list, is_persistent=False)
+        if image:
+            container_config["image"] = image
         
         # 网络设置：优先考虑enable_network参数
         if not enable_network:
@@ -1026,6 +1582,12 @@ CMD ["tail", "-f", "/dev/null"]
                 except:
                     pass
     
+    def _count_layers(self) -> int:
+        try:
+            return len(self.client.images.list(filters={"label": LAYER_LABEL}))
+        except Exception:
+            return len(self._layers)
+    
     def get_sandbox_info(self) -> Dict[str, Any]:
         """获取沙盒环境信息"""
         container_status = "unknown"
@@ -1045,6 +1607,7 @@ CMD ["tail", "-f", "/dev/null"]
                 "enabled": self.persistent,
                 "container_name": self.container_name,
                 "status": container_status,
+                "agent": bool(self._agent is not None and self._agent.alive),
                 "user": self.user,
                 "host_uid": self.host_uid,
                 "host_gid": self.host_gid
@@ -1061,6 +1624,11 @@ CMD ["tail", "-f", "/dev/null"]
             "sandbox_home": str(sandbox_home()),
             "working_dir": self.working_dir,
             "default_timeout": DEFAULT_TIMEOUT,
+            "layer_cache": {
+                "repository": LAYER_REPOSITORY,
+                "pip_cache_volume": PIP_CACHE_VOLUME,
+                "layers": self._count_layers(),
+            },
             "docker_sdk_version": docker.__version__ if DOCKER_AVAILABLE else "Not installed",
             "project_config_loaded": bool(self.project_config),
             "shell_container_config": self.shell_container_config
@@ -1125,6 +1693,9 @@ def invoke_shell_contained_execute(
             "output": result["stdout"]
         }
         
+        if result.get("layer_cache"):
+            output["layer_cache"] = result["layer_cache"]
+        
         if result["stderr"]:
             output["error"] = result["stderr"]
         
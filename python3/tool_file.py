@@ -12,8 +12,32 @@ import shutil
 import os
 import stat
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from toolcommon import sanitize_path
+import grep_index
+import line_diff
+from mapped_file import invalidate, open_cached
+from toolcommon import sanitize_path, sanitize_paths, sandbox_home
+
+
+# 目录复制的并行线程数
+COPY_WORKERS = 8
+# diff_file 单个文件的大小上限（字节）与差异输出上限（字符）
+DIFF_MAX_FILE_BYTES = 32 * 1024 * 1024
+DIFF_MAX_OUTPUT_CHARS = 4 * 1024 * 1024
+# normal 格式超过该行数时不再计算行内差异提示（ndiff 为平方复杂度）
+DIFF_NDIFF_MAX_LINES = 2000
+# read_files 默认的总字符预算与并行读取线程数
+READ_FILES_BUDGET = 60000
+READ_FILES_WORKERS = 8
+# read_files 的结果上限（字符），与 tool_file.json 中的 max_result_size 一致；
+# 超过时结果会被转存，截断提示中的 offset 也就不再对应
+READ_FILES_MAX_RESULT = 65536
+# 流式复制块大小
+_COPY_CHUNK = 8 * 1024 * 1024
+# linux/fs.h: FICLONE = _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
 
 
 def invoke_ls(path: str = "") -> str:
@@ -132,10 +156,11 @@ def invoke_read_file(path: str, offset: int = 0, limit: int = None) -> str:
         if limit is not None and limit <= 0:
             return f"错误：limit 必须大于 0"
 
-        with open(target_file, 'r', encoding='utf-8') as f:
-            if offset > 0:
-                f.seek(offset)
-            content = f.read(limit) if limit else f.read()
+        # 按字符偏移定位到字节位置，只解码所需区间
+        with open_cached(target_file) as mf:
+            start = mf.char_to_byte(offset)
+            end = mf.char_to_byte(offset + limit) if limit else None
+            content = mf.decode(start, end)
 
         # If offset was used, include context so the AI knows where it is
         if offset > 0:
@@ -153,6 +178,112 @@ def invoke_read_file(path: str, offset: int = 0, limit: int = None) -> str:
         return f"错误：{str(e)}"
 
 
+def invoke_read_files(paths: list, per_file_limit: int = None, total_budget: int = None) -> str:
+    """批量并行读取多个文件，按总字符预算公平截断。
+
+    Args:
+        paths: 文件路径列表（重复路径只读取一次）
+        per_file_limit: 单个文件最多返回的字符数，默认 None 表示不限
+        total_budget: 所有文件合计最多返回的字符数，默认 READ_FILES_BUDGET；
+            加上各文件标题与截断提示后不超过 READ_FILES_MAX_RESULT
+    """
+    try:
+        if isinstance(paths, str):
+            paths = [paths]
+        if not paths:
+            return "错误：paths 不能为空"
+        if per_file_limit is not None and per_file_limit <= 0:
+            return "错误：per_file_limit 必须大于 0"
+        budget = READ_FILES_BUDGET if total_budget is None else total_budget
+        if budget <= 0:
+            return "错误：total_budget 必须大于 0"
+
+        # 单个文件不会分到超过总预算的字符，读取时即按此截断
+        cap = budget if per_file_limit is None else min(per_file_limit, budget)
+        unique = list(dict.fromkeys(paths))
+        targets = _sanitize_each(unique)
+        workers = min(READ_FILES_WORKERS, len(unique))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            reads = list(pool.map(lambda item: _read_head(item[0], item[1], cap),
+                                  zip(unique, targets)))
+
+        # 标题、分隔符、错误信息和（最长的）截断提示占用的字符从预算中扣除
+        overhead = 2 * (len(unique) - 1)
+        for path, (_, _, error) in zip(unique, reads):
+            overhead += len(_read_files_header(path)) + 1
+            overhead += len(error) if error else len(_truncation_hint(path, budget))
+        budget = max(0, min(budget, READ_FILES_MAX_RESULT - overhead))
+
+        quotas = _fair_quotas([len(text) for text, _, _ in reads], budget)
+        sections = []
+        for path, (text, truncated, error), quota in zip(unique, reads, quotas):
+            header = _read_files_header(path)
+            if error:
+                sections.append(f"{header}\n{error}")
+                continue
+            if quota < len(text):
+                text, truncated = text[:quota], True
+            if truncated:
+                text += _truncation_hint(path, len(text))
+            sections.append(f"{header}\n{text}")
+        return "\n\n".join(sections)
+
+    except Exception as e:
+        return f"错误：{str(e)}"
+
+
+def _read_files_header(path: str) -> str:
+    return f"===== {path} ====="
+
+
+def _truncation_hint(path: str, shown: int) -> str:
+    return (f"\n[已截断：显示前 {shown} 字符，"
+            f"可使用 read_file(path='{path}', offset={shown}) 继续读取]")
+
+
+def _sanitize_each(paths: list) -> list:
+    """批量校验路径；某个路径越界时只让该路径报错（返回 ValueError 实例）"""
+    try:
+        return sanitize_paths(paths)
+    except ValueError:
+        pass
+    targets = []
+    for path in paths:
+        try:
+            targets.append(sanitize_path(path))
+        except ValueError as e:
+            targets.append(e)
+    return targets
+
+
+def _read_head(path: str, target, limit: int):
+    """读取文件开头最多 limit 个字符，返回 (内容, 是否截断, 错误信息)"""
+    if isinstance(target, ValueError):
+        return "", False, f"安全错误：{target}"
+    try:
+        if not target.exists():
+            return "", False, f"错误：文件 '{path}' 不存在"
+        if not target.is_file():
+            return "", False, f"错误：'{path}' 不是文件"
+        with open_cached(target) as mf:
+            end = mf.char_to_byte(limit)
+            return mf.decode(0, end), end < mf.size, None
+    except Exception as e:
+        return "", False, f"错误：{str(e)}"
+
+
+def _fair_quotas(sizes: list, budget: int) -> list:
+    """按注水法分配预算：短文件完整保留，剩余预算由较长文件平分"""
+    quotas = [0] * len(sizes)
+    remaining = budget
+    order = sorted(range(len(sizes)), key=sizes.__getitem__)
+    for n, i in enumerate(order):
+        share = remaining // (len(order) - n)
+        quotas[i] = min(sizes[i], share)
+        remaining -= quotas[i]
+    return quotas
+
+
 def invoke_write_file(path: str, content: str, mode: str = "w") -> str:
     """向沙盒内的文件写入内容"""
     try:
@@ -163,6 +294,7 @@ def invoke_write_file(path: str, content: str, mode: str = "w") -> str:
 
         with open(target_file, mode, encoding='utf-8') as f:
             f.write(content)
+        invalidate(target_file)
 
         return f"成功写入文件 '{path}'"
 
@@ -214,12 +346,13 @@ def invoke_copy_file(source, destination: str) -> str:
 
         # 如果是文件，直接复制
         if source_path.is_file():
-            shutil.copy2(source_path, dest_path)
+            _copy2_fast(source_path, dest_path)
+            invalidate(dest_path)
             return f"成功复制文件 '{source}' -> '{destination}'"
 
         # 如果是目录，递归复制
         elif source_path.is_dir():
-            shutil.copytree(source_path, dest_path)
+            _copytree_parallel(source_path, dest_path)
             return f"成功复制目录 '{source}' -> '{destination}'"
 
         else:
@@ -245,8 +378,7 @@ def _merge_multiple_files(sources: list, dest_path):
     try:
         # 检查所有源文件是否存在且为文件
         source_paths = []
-        for source in sources:
-            source_path = sanitize_path(source)
+        for source, source_path in zip(sources, sanitize_paths(sources)):
             if not source_path.exists():
                 return f"错误：源文件 '{source}' 不存在"
             if not source_path.is_file():
@@ -256,28 +388,14 @@ def _merge_multiple_files(sources: list, dest_path):
         # 创建目标文件的父目录（如果不存在）
         dest_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # 使用追加模式合并文件
-        with open(dest_path, 'w', encoding='utf-8') as dest_file:
+        # 按块流式拼接（内核内复制），文本文件之间以换行分隔
+        with open(dest_path, 'wb') as dest_file:
             for i, source_path in enumerate(source_paths):
-                try:
-                    with open(source_path, 'r', encoding='utf-8') as src_file:
-                        content = src_file.read()
-                        dest_file.write(content)
-
-                        # 如果不是最后一个文件，添加换行符分隔（可选）
-                        if i < len(source_paths) - 1:
-                            dest_file.write('\n')
-
-                except UnicodeDecodeError:
-                    # 如果是二进制文件，使用二进制模式
-                    with open(source_path, 'rb') as src_file:
-                        content = src_file.read()
-                        # 对于二进制文件，需要切换到二进制模式
-                        dest_file.close()  # 先关闭文本模式文件
-                        with open(dest_path, 'ab' if i > 0 else 'wb') as dest_file_bin:
-                            dest_file_bin.write(content)
-                        # 重新打开文本模式文件用于后续写入
-                        dest_file = open(dest_path, 'a', encoding='utf-8')
+                with open(source_path, 'rb') as src_file:
+                    _copy_stream(src_file.fileno(), dest_file.fileno())
+                if i < len(source_paths) - 1 and not _looks_binary(source_path):
+                    os.write(dest_file.fileno(), b'\n')
+        invalidate(dest_path)
 
         source_names = ', '.join(sources)
         return f"成功合并文件 [{source_names}] -> '{dest_path}'"
@@ -286,6 +404,116 @@ def _merge_multiple_files(sources: list, dest_path):
         return f"错误：合并文件失败 - {str(e)}"
 
 
+def _looks_binary(path) -> bool:
+    """根据文件开头判断是否为二进制（含 NUL 或不是 UTF-8）"""
+    with open(path, 'rb') as f:
+        head = f.read(8192)
+    if b'\0' in head:
+        return True
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # 截断在多字节字符中间不算
+        return e.start < len(head) - 3
+    return False
+
+
+def _copy_stream(src_fd: int, dst_fd: int):
+    """把 src_fd 从当前位置起的内容追加到 dst_fd，优先在内核内完成"""
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while os.copy_file_range(src_fd, dst_fd, _COPY_CHUNK):
+                pass
+            return
+        except OSError:
+            pass  # 跨文件系统 / 不支持：退回 sendfile
+    if hasattr(os, 'sendfile'):
+        try:
+            offset = os.lseek(src_fd, 0, os.SEEK_CUR)
+            while True:
+                sent = os.sendfile(dst_fd, src_fd, offset, _COPY_CHUNK)
+                if not sent:
+                    break
+                offset += sent
+            os.lseek(src_fd, offset, os.SEEK_SET)
+            return
+        except OSError:
+            pass
+    while True:
+        chunk = os.read(src_fd, _COPY_CHUNK)
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view):]
+
+
+def _copy2_fast(src, dst):
+    """shutil.copy2 的替代：支持时使用 reflink（写时复制），否则内核内复制"""
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    # 与 shutil.copy2 一致：源与目标为同一文件时拒绝（否则 'wb' 会清空源文件）
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        cloned = False
+        if sys.platform.startswith('linux'):
+            try:
+                import fcntl
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                cloned = True
+            except (OSError, ImportError):
+                pass
+        if not cloned:
+            _copy_stream(fsrc.fileno(), fdst.fileno())
+    shutil.copystat(src, dst)
+    return dst
+
+
+def _copytree_parallel(src, dst):
+    """并行版 shutil.copytree（跟随符号链接，目标已存在时抛出 FileExistsError）"""
+    os.makedirs(dst)
+    dir_pairs = []
+    errors = []
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+        futures = []
+        pending = [(os.fspath(src), os.fspath(dst))]
+        while pending:
+            src_dir, dst_dir = pending.pop()
+            dir_pairs.append((src_dir, dst_dir))
+            try:
+                with os.scandir(src_dir) as it:
+                    entries = list(it)
+            except OSError as e:
+                errors.append((src_dir, dst_dir, str(e)))
+                continue
+            for entry in entries:
+                target = os.path.join(dst_dir, entry.name)
+                try:
+                    if entry.is_dir():
+                        os.mkdir(target)
+                        pending.append((entry.path, target))
+                    else:
+                        futures.append((entry.path, target,
+                                        pool.submit(_copy2_fast, entry.path, target)))
+                except OSError as e:
+                    errors.append((entry.path, target, str(e)))
+        for src_file, dst_file, future in futures:
+            try:
+                future.result()
+            except OSError as e:
+                errors.append((src_file, dst_file, str(e)))
+    # 目录属性最后设置：只读目录也能先写入内容
+    for src_dir, dst_dir in reversed(dir_pairs):
+        try:
+            shutil.copystat(src_dir, dst_dir)
+        except OSError as e:
+            errors.append((src_dir, dst_dir, str(e)))
+    if errors:
+        raise shutil.Error(errors)
+    return dst
+
+
 def invoke_descript_file(path: str) -> str:
     """
     描述文件类型和格式，使用 file 命令或 Python 内置方法
@@ -499,6 +727,7 @@ def invoke_substitute_file(path: str, old_text: str, new_text: str, use_regex: b
 
         with open(target_file, 'w', encoding='utf-8') as f:
             f.write(new_content)
+        invalidate(target_file)
 
         return f"成功在文件 '{path}' 中完成 {replacements} 处替换"
 
@@ -532,72 +761,83 @@ def invoke_search_in_file(path: str, pattern: str, use_regex: bool = False, case
         if not target_file.is_file():
             return f"错误：'{path}' 不是文件"
 
-        # 读取文件内容
-        with open(target_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        # 若三元组索引证明文件不含该模式，则无需读取文件
+        if grep_index.is_enabled() and not grep_index.file_may_match(
+                sandbox_home(), target_file, pattern, use_regex, case_sensitive):
+            return f"在文件 '{path}' 中未找到匹配的文本"
+
+        if use_regex:
+            try:
+                regex = re.compile(pattern, 0 if case_sensitive else re.IGNORECASE)
+            except re.error as e:
+                return f"错误：无效的正则表达式 '{pattern}' - {str(e)}"
 
         # 准备搜索结果
         results = []
         result_count = 0
 
-        # 执行搜索操作
-        for line_num, line in enumerate(lines, 1):
-            if use_regex:
-                # 使用正则表达式搜索
-                try:
-                    flags = 0 if case_sensitive else re.IGNORECASE
-                    matches = list(re.finditer(pattern, line, flags))
-                    for match in matches:
-                        if max_results > 0 and result_count >= max_results:
-                            break
-
-                        start_pos = match.start()
-                        end_pos = match.end()
-                        matched_text = match.group()
-
-                        # 添加上下文
-                        context_start = max(0, line_num - context_lines - 1)
-                        context_end = min(len(lines), line_num + context_lines)
-                        context = lines[context_start:context_end]
-
-                        results.append({
-                            'line': line_num,
-                            'position': start_pos,
-                            'matched_text': matched_text,
-                            'context': context,
-                            'context_start_line': context_start + 1
-                        })
-                        result_count += 1
-                except re.error as e:
-                    return f"错误：无效的正则表达式 '{pattern}' - {str(e)}"
+        with open_cached(target_file) as mf:
+            total_lines = mf.line_count
+
+            def add_result(line_num, pos, matched_text):
+                # 上下文只记录行号区间，输出时再按需读取
+                context_start = max(0, line_num - context_lines - 1)
+                context_end = min(total_lines, line_num + context_lines)
+                results.append({
+                    'line': line_num,
+                    'position': pos,
+                    'matched_text': matched_text,
+                    'context_start_line': context_start + 1,
+                    'context_end_line': context_end
+                })
+
+            if not use_regex and case_sensitive and pattern and '\n' not in pattern:
+                # 字面量区分大小写：直接在映射内存中查找，跳过不匹配的行
+                needle = pattern.encode('utf-8')
+                pos = mf.buf.find(needle)
+                while pos != -1:
+                    if max_results > 0 and result_count >= max_results:
+                        break
+                    line_idx = mf.line_of(pos)
+                    line_start, _ = mf.line_span(line_idx)
+                    column = len(mf.decode(line_start, pos))
+                    add_result(line_idx + 1, column, pattern)
+                    result_count += 1
+                    pos = mf.buf.find(needle, pos + 1)
             else:
-                # 使用字符串搜索
-                search_text = line if case_sensitive else line.lower()
                 search_pattern = pattern if case_sensitive else pattern.lower()
-
-                start_pos = 0
-                while True:
-                    pos = search_text.find(search_pattern, start_pos)
-                    if pos == -1:
-                        break
-
+                for line_idx, line in mf.iter_lines():
                     if max_results > 0 and result_count >= max_results:
                         break
+                    if line.endswith('\r\n'):
+                        line = line[:-2] + '\n'
+                    line_num = line_idx + 1
+                    if use_regex:
+                        # 使用正则表达式搜索
+                        for match in regex.finditer(line):
+                            if max_results > 0 and result_count >= max_results:
+                                break
+                            add_result(line_num, match.start(), match.group())
+                            result_count += 1
+                    else:
+                        # 使用字符串搜索
+                        search_text = line if case_sensitive else line.lower()
+                        start_pos = 0
+                        while True:
+                            pos = search_text.find(search_pattern, start_pos)
+                            if pos == -1:
+                                break
+                            if max_results > 0 and result_count >= max_results:
+                                break
+                            add_result(line_num, pos, line[pos:pos + len(pattern)])
+                            result_count += 1
+                            start_pos = pos + 1
 
-                    # 添加上下文
-                    context_start = max(0, line_num - context_lines - 1)
-                    context_end = min(len(lines), line_num + context_lines)
-                    context = lines[context_start:context_end]
-
-                    results.append({
-                        'line': line_num,
-                        'position': pos,
-                        'matched_text': line[pos:pos + len(pattern)],
-                        'context': context,
-                        'context_start_line': context_start + 1
-                    })
-                    result_count += 1
-                    start_pos = pos + 1
+            for result in results:
+                result['context'] = [
+                    mf.line_text(n - 1)
+                    for n in range(result['context_start_line'], result['context_end_line'] + 1)
+                ]
 
         # 格式化输出结果
         if not results:
@@ -643,8 +883,7 @@ def invoke_diff_file(file1: str, file2: str, output_format: str = "unified", con
         str: 差异输出结果
     """
     try:
-        target_file1 = sanitize_path(file1)
-        target_file2 = sanitize_path(file2)
+        target_file1, target_file2 = sanitize_paths([file1, file2])
 
         if not target_file1.exists():
             return f"错误：文件 '{file1}' 不存在"
@@ -656,10 +895,14 @@ def invoke_diff_file(file1: str, file2: str, output_format: str = "unified", con
         if not target_file2.is_file():
             return f"错误：'{file2}' 不是文件"
 
-        with open(target_file1, 'r', encoding='utf-8') as f:
-            lines1 = f.readlines()
-        with open(target_file2, 'r', encoding='utf-8') as f:
-            lines2 = f.readlines()
+        for target, name in ((target_file1, file1), (target_file2, file2)):
+            size = target.stat().st_size
+            if size > DIFF_MAX_FILE_BYTES:
+                return (f"错误：文件 '{name}' 过大（{size} 字节），"
+                        f"diff_file 最多比较 {DIFF_MAX_FILE_BYTES} 字节的文件")
+
+        lines1 = _read_lines(target_file1)
+        lines2 = _read_lines(target_file2)
 
         diff_result = _compute_diff(lines1, lines2, output_format, context_lines)
         return diff_result
@@ -670,31 +913,46 @@ def invoke_diff_file(file1: str, file2: str, output_format: str = "unified", con
         return f"错误：{str(e)}"
 
 
+def _read_lines(target_file):
+    """经共享缓存读取文本行（严格 UTF-8，换行符按通用换行规则统一为 \\n）"""
+    with open_cached(target_file) as mf:
+        text = mf.decode(errors='strict')
+    parts = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    lines = [line + '\n' for line in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
 def _compute_diff(lines1, lines2, output_format, context_lines):
-    """计算两个文件内容的差异"""
-    import difflib
+    """计算两个文件内容的差异（逐行生成，输出超过上限时截断）"""
+    if lines1 == lines2:
+        return "文件 'file1' 和 'file2' 内容相同"
 
     if output_format == "unified":
-        diff = difflib.unified_diff(
-            lines1, lines2,
-            fromfile='file1', tofile='file2',
-            lineterm='', n=context_lines
-        )
+        diff = line_diff.unified_diff(lines1, lines2, 'file1', 'file2', n=context_lines)
     elif output_format == "context":
-        diff = difflib.context_diff(
-            lines1, lines2,
-            fromfile='file1', tofile='file2',
-            lineterm='', n=context_lines
-        )
-    else:  # normal
-        diff = difflib.ndiff(lines1, lines2)
-
-    diff_lines = list(diff)
-
-    if not diff_lines:
+        diff = line_diff.context_diff(lines1, lines2, 'file1', 'file2', n=context_lines)
+    elif len(lines1) + len(lines2) <= DIFF_NDIFF_MAX_LINES:  # normal
+        import difflib
+        diff = (line if line.endswith('\n') else line + '\n'
+                for line in difflib.ndiff(lines1, lines2))
+    else:
+        diff = line_diff.plain_ndiff(lines1, lines2)
+
+    parts = []
+    total = 0
+    for line in diff:
+        parts.append(line)
+        total += len(line)
+        if total > DIFF_MAX_OUTPUT_CHARS:
+            parts.append(f"...[差异输出超过 {DIFF_MAX_OUTPUT_CHARS} 字符，已截断]\n")
+            break
+
+    if not parts:
         return "文件 'file1' 和 'file2' 内容相同"
 
-    return '\n'.join(diff_lines)
+    return ''.join(parts).rstrip('\n')
 
 
 def invoke_patch_file(file_path: str, patch_content: str, backup: bool = True, reverse: bool = False) -> str:
@@ -737,11 +995,13 @@ def invoke_patch_file(file_path: str, patch_content: str, backup: bool = True, r
             # 如果补丁应用失败，恢复备份
             if backup and backup_file and backup_file.exists():
                 shutil.copy2(backup_file, target_file)
+                invalidate(target_file)
             return f"错误：补丁应用失败 - {str(e)}"
 
         # 写入补丁后的内容
         with open(target_file, 'w', encoding='utf-8') as f:
             f.write(patched_content)
+        invalidate(target_file)
 
         result = f"成功将补丁应用到文件 '{file_path}'"
         if backup:
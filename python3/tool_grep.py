@@ -17,6 +17,7 @@ import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 
+import grep_index
 from toolcommon import sanitize_path, sandbox_home
 MAX_LEN = 4096
 
@@ -50,11 +51,19 @@ def invoke_grep(
         if not search_root.is_dir():
             return f"Error: '{path}' is not a directory"
         
-        if not _check_grep_available():
+        grep_available = _check_grep_available()
+        candidates = _index_candidates(
+            pattern, search_root, sandbox_root, recursive, case_sensitive, use_regex,
+            include_pattern, exclude_pattern, grep_available
+        )
+        if candidates is not None and not candidates:
+            return f"No matches found for '{pattern}' in directory '{path}'"
+        
+        if not grep_available:
             return _grep_python(
                 pattern, search_root, sandbox_root, recursive, case_sensitive, use_regex,
                 max_results, include_pattern, exclude_pattern,
-                show_line_numbers, context_lines
+                show_line_numbers, context_lines, candidates
             )
         
         cmd_parts = ["grep", "-I"]
@@ -62,7 +71,10 @@ def invoke_grep(
         if not case_sensitive:
             cmd_parts.append("-i")
         
-        if recursive:
+        if candidates is not None:
+            # 索引已筛选出候选文件，逐个传给 grep 验证
+            cmd_parts.append("-H")
+        elif recursive:
             cmd_parts.append("-r")
         
         if use_regex:
@@ -82,7 +94,14 @@ def invoke_grep(
         
         rel_search_path = search_root.relative_to(sandbox_root)
         cmd_parts.append(pattern)
-        cmd_parts.append(str(rel_search_path) if str(rel_search_path) != "." else ".")
+        if candidates is not None:
+            # 保持与 `grep -r .` 相同的输出路径形式
+            if str(rel_search_path) == ".":
+                cmd_parts.extend(os.path.join(".", c) for c in candidates)
+            else:
+                cmd_parts.extend(candidates)
+        else:
+            cmd_parts.append(str(rel_search_path) if str(rel_search_path) != "." else ".")
         
         original_cwd = Path.cwd()
         os.chdir(sandbox_root)
@@ -151,6 +170,42 @@ def invoke_grep(
         return f"Error: {str(e)}"
 
 
+def _index_candidates(
+    pattern: str,
+    search_root: Path,
+    sandbox_root: Path,
+    recursive: bool,
+    case_sensitive: bool,
+    use_regex: bool,
+    include_pattern: Optional[str],
+    exclude_pattern: Optional[str],
+    grep_available: bool
+) -> Optional[List[str]]:
+    """
+    通过三元组索引缩小候选文件范围（需在项目配置中启用 grep_index）
+    
+    返回相对于沙盒根目录的候选路径列表；返回 None 表示需要全量扫描
+    """
+    if not grep_index.is_enabled():
+        return None
+    try:
+        candidates = grep_index.candidate_files(
+            sandbox_root, search_root, pattern, use_regex, case_sensitive, recursive,
+            basic_regex=grep_available and not use_regex,
+            include_binary=not grep_available
+        )
+    except Exception as e:
+        print(f"[grep] index unavailable, falling back to full scan: {e}", file=sys.stderr)
+        return None
+    if candidates is None:
+        return None
+    if include_pattern:
+        candidates = [c for c in candidates if _matches_pattern(os.path.basename(c), include_pattern)]
+    if exclude_pattern:
+        candidates = [c for c in candidates if not _matches_pattern(os.path.basename(c), exclude_pattern)]
+    return candidates
+
+
 def _check_grep_available() -> bool:
     """检查系统grep命令是否可用"""
     try:
@@ -176,10 +231,13 @@ def _grep_python(
     include_pattern: Optional[str],
     exclude_pattern: Optional[str],
     show_line_numbers: bool,
-    context_lines: int
+    context_lines: int,
+    candidates: Optional[List[str]] = None
 ) -> str:
     """
     使用Python实现grep功能（回退方案）
+    
+    candidates 为索引给出的候选文件（相对于沙盒根目录），为 None 时遍历整个目录
     """
     regex_flags = 0 if case_sensitive else re.IGNORECASE
     
@@ -193,7 +251,9 @@ def _grep_python(
     
     results: List[Tuple[Path, int, str]] = []
     
-    if recursive:
+    if candidates is not None:
+        file_iterator = (sandbox_root / c for c in candidates)
+    elif recursive:
         file_iterator = search_root.rglob("*")
     else:
         file_iterator = search_root.glob("*")
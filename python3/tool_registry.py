@@ -27,6 +27,7 @@ import importlib
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from fs_watch import get_watcher
 from tool_spec import (
     CategoryAgentSpec,
     CategorySummary,
@@ -44,6 +45,9 @@ CACHE_DIR_NAME = ".cache/tool_registry"
 CATEGORIES_CACHE_FILE = "categories.json"
 REGISTRY_CACHE_FILE = "registry.json"
 
+# tool_<toolset>.json / tool_<toolset>.py
+_TOOLSET_FILE_RE = re.compile(r"tool_(.+)\.(?:json|py)$")
+
 # LLM compilation prompt
 _CATEGORY_COMPILE_SYSTEM_PROMPT = """\
 你是一个软件架构工具分类器。你会收到一个工具分类名和该分类下一组工具的定义（名称 + 描述）。
@@ -66,6 +70,7 @@ class ToolRegistry:
         registry.load_from_cache() # try to restore cached categories
         # ... (later, optionally)
         registry.compile_categories(llm_fn)  # LLM generates category summaries
+        registry.watch()           # then registry.refresh() picks up edits
     """
 
     def __init__(self, tools_dir: Optional[str] = None):
@@ -85,6 +90,13 @@ class ToolRegistry:
         # LLM callback (set later for compilation)
         self._llm_fn: Optional[Callable] = None
 
+        # toolset → tool names, for reloading a single toolset
+        self._toolsets: Dict[str, List[str]] = {}
+        # Live updates (see watch / refresh)
+        self._watch_handle: Optional[int] = None
+        self._watch_lock = threading.Lock()
+        self._dirty_toolsets: set = set()
+
     # ------------------------------------------------------------------
     # Scanning
     # ------------------------------------------------------------------
@@ -96,71 +108,133 @@ class ToolRegistry:
         """
         self._tools.clear()
         self._invokers.clear()
+        self._toolsets.clear()
+        with self._watch_lock:
+            self._dirty_toolsets.clear()
 
         json_files = sorted(self._tools_dir.glob("tool_*.json"))
         count = 0
 
         for json_path in json_files:
-            match = re.match(r"tool_(.+)\.json", json_path.name)
-            if not match:
-                continue
-            toolset_name = match.group(1)
+            count += self._scan_toolset(json_path)
 
-            # Parse JSON definitions
-            try:
-                raw_tools = json.loads(json_path.read_text(encoding="utf-8"))
-            except Exception as exc:
-                print(f"[registry] WARN: cannot parse {json_path.name}: {exc}",
-                      file=sys.stderr)
-                continue
+        print(f"[registry] scanned {count} tools from {len(json_files)} files",
+              file=sys.stderr)
+        return count
 
-            if not isinstance(raw_tools, list):
-                raw_tools = [raw_tools]
+    def _scan_toolset(self, json_path: Path) -> int:
+        """Register the tools of one tool_<name>.json, return their count."""
+        match = _TOOLSET_FILE_RE.match(json_path.name)
+        if not match:
+            return 0
+        toolset_name = match.group(1)
 
-            # Load corresponding .py module
-            mod = self._load_module(toolset_name)
-            if mod is None:
-                print(f"[registry] WARN: no tool_{toolset_name}.py, skipping",
-                      file=sys.stderr)
-                continue
+        # Parse JSON definitions
+        try:
+            raw_tools = json.loads(json_path.read_text(encoding="utf-8"))
+        except Exception as exc:
+            print(f"[registry] WARN: cannot parse {json_path.name}: {exc}",
+                  file=sys.stderr)
+            return 0
 
-            for raw in raw_tools:
-                fn = raw.get("function")
-                if not fn:
-                    continue
-                name = fn.get("name")
-                if not name:
-                    continue
+        if not isinstance(raw_tools, list):
+            raw_tools = [raw_tools]
 
-                invoker = getattr(mod, f"invoke_{name}", None)
-                if invoker is None:
-                    print(f"[registry] WARN: invoke_{name} not found in "
-                          f"tool_{toolset_name}.py", file=sys.stderr)
-                    continue
+        # Load corresponding .py module
+        mod = self._load_module(toolset_name)
+        if mod is None:
+            print(f"[registry] WARN: no tool_{toolset_name}.py, skipping",
+                  file=sys.stderr)
+            return 0
 
-                # Build ToolSpec
-                spec = ToolSpec(
-                    name=name,
-                    description=fn.get("description", ""),
-                    parameters=fn.get("parameters", {"type": "object", "properties": {}, "required": []}),
-                    output_schema=raw.get("output_schema"),
-                    prompt=raw.get("prompt", ""),
-                    category=raw.get("category", toolset_name),
-                    tier=self._determine_initial_tier(name),
-                    is_read_only=raw.get("is_read_only", True),
-                    is_concurrency_safe=raw.get("is_concurrency_safe", True),
-                    user_only=raw.get("user_only", False),
-                    max_result_size=raw.get("max_result_size", 8000),
-                )
-
-                self._tools[name] = spec
-                self._invokers[name] = invoker
-                count += 1
+        count = 0
+        names = self._toolsets.setdefault(toolset_name, [])
+        for raw in raw_tools:
+            fn = raw.get("function")
+            if not fn:
+                continue
+            name = fn.get("name")
+            if not name:
+                continue
 
-        print(f"[registry] scanned {count} tools from {len(json_files)} files",
-              file=sys.stderr)
+            invoker = getattr(mod, f"invoke_{name}", None)
+            if invoker is None:
+                print(f"[registry] WARN: invoke_{name} not found in "
+                      f"tool_{toolset_name}.py", file=sys.stderr)
+                continue
+
+            # Build ToolSpec
+            spec = ToolSpec(
+                name=name,
+                description=fn.get("description", ""),
+                parameters=fn.get("parameters", {"type": "object", "properties": {}, "required": []}),
+                output_schema=raw.get("output_schema"),
+                prompt=raw.get("prompt", ""),
+                category=raw.get("category", toolset_name),
+                tier=self._determine_initial_tier(name),
+                is_read_only=raw.get("is_read_only", True),
+                is_concurrency_safe=raw.get("is_concurrency_safe", True),
+                user_only=raw.get("user_only", False),
+                max_result_size=raw.get("max_result_size", 8000),
+            )
+
+            self._tools[name] = spec
+            self._invokers[name] = invoker
+            names.append(name)
+            count += 1
         return count
 
+    # ------------------------------------------------------------------
+    # Live updates
+    # ------------------------------------------------------------------
+
+    def watch(self) -> bool:
+        """Watch the tools directory; refresh() then reloads changed toolsets."""
+        if self._watch_handle is None:
+            self._watch_handle = get_watcher().watch(self._tools_dir, self._on_fs_event)
+        return self._watch_handle is not None
+
+    def _on_fs_event(self, event):
+        # Runs on the watcher thread: only record, reload on refresh()
+        with self._watch_lock:
+            if event.kind == "overflow":
+                self._dirty_toolsets.update(self._toolsets)
+                return
+            match = _TOOLSET_FILE_RE.match(os.path.basename(event.path))
+            if match:
+                self._dirty_toolsets.add(match.group(1))
+
+    def refresh(self) -> int:
+        """Re-register toolsets whose tool_<name>.json / .py changed.
+
+        Only the affected modules are reloaded; other tools keep their
+        specs and call statistics.  Returns the number of toolsets reloaded.
+        """
+        with self._watch_lock:
+            dirty = sorted(self._dirty_toolsets)
+            self._dirty_toolsets.clear()
+        reloaded = 0
+        for toolset_name in dirty:
+            json_path = self._tools_dir / f"tool_{toolset_name}.json"
+            if toolset_name not in self._toolsets and not json_path.is_file():
+                continue  # tool_registry.py, tool_spec.py, ...: not a toolset
+            reloaded += 1
+            for name in self._toolsets.pop(toolset_name, []):
+                self._tools.pop(name, None)
+                self._invokers.pop(name, None)
+            count = self._scan_toolset(json_path) if json_path.is_file() else 0
+            print(f"[registry] reloaded tool_{toolset_name}: {count} tools",
+                  file=sys.stderr)
+        if not reloaded:
+            return 0
+
+        # Drop categories left without tools, re-summarise changed ones
+        groups = self.build_categories()
+        for cat_name in [c for c in self._categories if c not in groups]:
+            del self._categories[cat_name]
+        self._compile_simple_categories()
+        return reloaded
+
     def _load_module(self, toolset_name: str):
         """Import tool_{name}.py, returning the module object or None.
 
@@ -560,6 +634,7 @@ def init_registry(llm_fn: Optional[Callable] = None,
     _registry = ToolRegistry(tools_dir=tools_dir)
     _registry.scan()
     _registry.load_from_cache()
+    _registry.watch()
     if llm_fn is not None:
         _registry.compile_categories(llm_fn)
     return _registry
@@ -0,0 +1,56 @@
+# Zai.Vim - AI Assistant Integration for Vim
+# Copyright (C) 2025-2026 zighouse <zighouse@users.noreply.github.com>
+#
+# Licensed under the MIT License
+#
+from result_store import get_result_store
+
+# 单页上限（字节），保证分页结果本身不会再次被截断
+_PAGE_MAX_BYTES = 16000
+
+
+def invoke_read_tool_output(output_id: str,
+                            offset: int = 0,
+                            limit: int = None,
+                            unit: str = "line") -> str:
+    """
+    分页读取被截断的工具结果的完整输出
+
+    参数:
+        output_id: 截断提示中给出的输出 ID
+        offset: 起始行号（unit='line'）或字节偏移（unit='byte'），从 0 开始
+        limit: 读取的行数或字节数
+        unit: 分页单位，'line' 或 'byte'
+
+    返回:
+        带分页信息的输出内容
+    """
+    if unit not in ("line", "byte"):
+        return f"错误：不支持的分页单位 '{unit}'，支持的单位为 'line' 或 'byte'。"
+    offset = 0 if offset is None else offset
+    if offset < 0:
+        return f"错误：offset 必须大于等于 0，当前值为 {offset}"
+    if limit is None:
+        limit = 200 if unit == "line" else _PAGE_MAX_BYTES
+    if limit < 1:
+        return f"错误：limit 必须大于等于 1，当前值为 {limit}"
+
+    try:
+        page = get_result_store().read(output_id, offset, limit, unit,
+                                       max_bytes=_PAGE_MAX_BYTES)
+    except FileNotFoundError:
+        return f"读取工具输出失败：输出 `{output_id}` 不存在或已被清理。"
+    except Exception as e:
+        return f"读取工具输出 `{output_id}` 失败：{e}"
+
+    unit_name = "行" if unit == "line" else "字节"
+    if page.start >= page.total and page.total > 0:
+        return f"错误：offset 超出范围。输出共有 {page.total} {unit_name}，请求的偏移为 {offset}。"
+
+    header = f"==========\n[分页内容]\n" \
+             f"- 输出 ID:{output_id}\n" \
+             f"- 范围:{page.start}-{page.end} / 共 {page.total} {unit_name}\n"
+    if page.end < page.total:
+        header += f"- 下一页:offset={page.end}, unit={unit}\n"
+    header += "============\n\n"
+    return header + page.text
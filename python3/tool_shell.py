@@ -13,7 +13,7 @@ Docker-based isolated execution is still available via tool_contained_shell.
 
 Key design:
   - /bin/sh -c for execution (shell compatibility)
-  - shlex + BashParser for semantic auditing (separate audit layer)
+  - bash_parser lexer + BashParser for semantic auditing (separate audit layer)
   - PermissionEngine.check() before every Popen
   - SafetyChain (L2_policy → user interaction → L3_sandbox) orchestrates
     layered security for every command.
@@ -33,7 +33,8 @@ import threading
 import time
 import uuid
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
@@ -123,6 +124,7 @@ class SafetyContext:
     timeout: int = 120
     trace: list[LayerDecision] = field(default_factory=list)
     sandbox_config: Any = None  # SandboxConfig from shell.sandbox
+    cancel_event: Any = None    # threading.Event set by SafetyPipeline to abandon a layer
 
 
 @dataclass
@@ -950,7 +952,9 @@ class ClassifierLayer(SafetyLayer):
             'received': False,
             'result': None,
         }
-        callback_event = threading.Event()
+        # A speculative run shares its wake-up event with the pipeline, so a
+        # cancel() interrupts the wait below instead of holding a worker.
+        callback_event = ctx.cancel_event or threading.Event()
 
         def callback(result):
             """Handle classifier callback with race condition prevention."""
@@ -971,11 +975,22 @@ class ClassifierLayer(SafetyLayer):
 
             # Wait for callback with timeout (AC #5: 30s or command timeout, whichever shorter)
             timeout = min(30, ctx.timeout)
-            if not callback_event.wait(timeout=timeout):
-                # Timeout: mark as received to prevent late callback (AC #5, AC #12)
-                with self._callback_lock:
-                    callback_state['received'] = True
-
+            callback_event.wait(timeout=timeout)
+            with self._callback_lock:
+                received = callback_state['received']
+                # Mark as received to prevent a late callback (AC #5, AC #12)
+                callback_state['received'] = True
+            if not received and ctx.cancel_event is not None and ctx.cancel_event.is_set():
+                latency = int((time.perf_counter() - start_time) * 1000)
+                ctx.trace.append(LayerDecision(
+                    layer="L1_classifier",
+                    decision="bypassed",
+                    detail="cancelled",
+                    latency_ms=latency,
+                ))
+                return ctx
+            if not received:
+                # Timeout
                 latency = int((time.perf_counter() - start_time) * 1000)
                 ctx.trace.append(LayerDecision(
                     layer="L1_classifier",
@@ -1152,6 +1167,227 @@ class DataflowLayer(SafetyLayer):
         return ctx
 
 
+# ---------------------------------------------------------------------------
+# SafetyPipeline — layer scheduler
+# ---------------------------------------------------------------------------
+
+# Worker threads shared by all pipelines for speculative layers
+_LAYER_POOL_SIZE = 4
+
+_layer_pool: Optional[ThreadPoolExecutor] = None
+_layer_pool_lock = threading.Lock()
+
+
+def _get_layer_pool() -> ThreadPoolExecutor:
+    global _layer_pool
+    with _layer_pool_lock:
+        if _layer_pool is None:
+            _layer_pool = ThreadPoolExecutor(
+                max_workers=_LAYER_POOL_SIZE,
+                thread_name_prefix="safety-layer",
+            )
+        return _layer_pool
+
+
+@dataclass
+class PipelineVerdict:
+    """Combined decision of one SafetyPipeline run."""
+
+    decision: str                       # "deny" | "ask" | "allow"
+    deny_layer: str = ""                # "L2_policy" | "L1_classifier" on deny
+    l2_decision: str = "ask"
+    l1_decision: Optional[str] = None
+    dataflow_risk: bool = False
+    degraded: bool = False
+    policy_decision: Any = None         # PolicyDecision behind an L2 deny
+
+
+class _LayerRun:
+    """A layer running in the background on a private copy of the context.
+
+    The copy starts with an empty trace; its entries are merged into the
+    caller's trace only if the result is used.
+    """
+
+    def __init__(self, layer: SafetyLayer, ctx: SafetyContext, pool: ThreadPoolExecutor):
+        self.ctx = replace(ctx, trace=[], cancel_event=threading.Event())
+        self.future = pool.submit(layer.process, self.ctx)
+
+    def result(self) -> SafetyContext:
+        self.future.result()
+        return self.ctx
+
+    def cancel(self) -> None:
+        self.ctx.cancel_event.set()
+        self.future.cancel()
+
+
+class SafetyPipeline:
+    """Runs the safety layers for one command and combines their verdicts.
+
+    The decision is the one of the sequential chain
+    L2_policy → L1_classifier → L2.5_dataflow → L3_sandbox:
+
+      * L2 deny ends the chain (only L2 entries in the trace);
+      * L1 is bypassed when L2 allowed; L1 deny ends the chain;
+      * L2.5 risk, a degraded sandbox, L1 ask, or L2 ask not lifted by an
+        L1 allow require user confirmation.
+
+    Layers named in *speculate* (default: the sandbox build, which does not
+    depend on the earlier verdicts) are started in parallel before L2 runs
+    and cancelled as soon as a cheap layer makes them irrelevant — an L2 or
+    L1 deny cancels the sandbox build.  The classifier is never speculative:
+    its LLM request cannot be withdrawn once sent, so it is only issued
+    after L2 returns "ask".  The trace lists the same entries in the same
+    order as the sequential chain.
+
+    Layers may be injected for testing and benchmarking; ``speculate=()``
+    runs the chain strictly in sequence.
+    """
+
+    SPECULATIVE_LAYERS = ("L3_sandbox",)
+
+    def __init__(
+        self,
+        policy: Optional[SafetyLayer] = None,
+        classifier: Optional[SafetyLayer] = None,
+        dataflow: Optional[SafetyLayer] = None,
+        sandbox: Optional[SafetyLayer] = None,
+        speculate: Tuple[str, ...] = SPECULATIVE_LAYERS,
+    ) -> None:
+        self.policy = policy or PolicyLayer()
+        self.classifier = classifier or ClassifierLayer()
+        self.dataflow = dataflow or DataflowLayer()
+        self.sandbox = sandbox or SandboxLayer()
+        self.speculate = tuple(speculate)
+
+    def _start(self, layer: SafetyLayer, ctx: SafetyContext) -> Optional[_LayerRun]:
+        if layer.name not in self.speculate or not layer.enabled:
+            return None
+        return _LayerRun(layer, ctx, _get_layer_pool())
+
+    def _check_policy(self, ctx: SafetyContext) -> Tuple[str, Any]:
+        """L2 stage: return (combined decision, PolicyDecision behind a deny).
+
+        Compound commands get one trace entry per sub-command (AC #12); the
+        strictest sub-decision wins.
+        """
+        parsed = ctx.parsed
+        if not (parsed and len(parsed.commands) > 1):
+            ctx = self.policy.process(ctx)
+            l2_decision = _last_trace_decision(ctx, "L2_policy")
+            if l2_decision is None:
+                l2_decision = "ask"  # safety default
+            return l2_decision, getattr(self.policy, 'last_decision', None)
+
+        sub_decisions: list = []
+        try:
+            from shell_policy import get_permission_engine
+            engine = get_permission_engine()
+            from toolcommon import _find_project_config_file
+            engine.set_config_finder(_find_project_config_file)
+            engine.reload_rules(ctx.working_dir)
+
+            for cmd_node in parsed.commands:
+                sub_cmd = cmd_node.raw or cmd_node.command
+                t0 = time.time()
+                decision = engine.check(sub_cmd, session_id=ctx.session_id,
+                                        context={'cwd': ctx.working_dir})
+                latency = int((time.time() - t0) * 1000)
+                detail = (
+                    f"sub-cmd '{sub_cmd}': matched "
+                    f"{decision.matched_rule.match.type}:{decision.matched_rule.match.pattern}"
+                    if decision.matched_rule
+                    and hasattr(decision.matched_rule, 'match')
+                    else f"sub-cmd '{sub_cmd}': {decision.reason}"
+                )
+                ctx.trace.append(LayerDecision(
+                    layer="L2_policy",
+                    decision=decision.decision,
+                    detail=detail,
+                    latency_ms=latency,
+                ))
+                sub_decisions.append(decision)
+        except Exception:
+            ctx.trace.append(LayerDecision(
+                layer="L2_policy",
+                decision="error",
+                detail="compound check failed",
+                latency_ms=0,
+            ))
+            return "ask", None
+
+        # Combine: any deny → deny, any ask → ask, all allow → allow
+        l2_decision = "allow"
+        for d in sub_decisions:
+            if d.decision == "deny":
+                return "deny", d
+            if d.decision == "ask":
+                l2_decision = "ask"
+        return l2_decision, None
+
+    def run(self, ctx: SafetyContext) -> PipelineVerdict:
+        """Run all layers against *ctx*, appending their decisions to its trace."""
+        sandbox_run = self._start(self.sandbox, ctx)
+        try:
+            return self._run(ctx, sandbox_run)
+        finally:
+            if sandbox_run is not None:
+                sandbox_run.cancel()
+
+    def _run(self, ctx: SafetyContext, sandbox_run: Optional[_LayerRun]) -> PipelineVerdict:
+        # 1. L2 policy
+        l2_decision, policy_decision = self._check_policy(ctx)
+        if l2_decision == "deny":
+            return PipelineVerdict(
+                decision="deny",
+                deny_layer="L2_policy",
+                l2_decision=l2_decision,
+                policy_decision=policy_decision,
+            )
+
+        # 2. L1 classifier (bypassed by itself when L2 allowed)
+        ctx = self.classifier.process(ctx)
+
+        l1_decision = _last_trace_decision(ctx, "L1_classifier")
+        if l1_decision == "deny":
+            return PipelineVerdict(
+                decision="deny",
+                deny_layer="L1_classifier",
+                l2_decision=l2_decision,
+                l1_decision=l1_decision,
+            )
+
+        # 3. L2.5 dataflow (veto power)
+        ctx = self.dataflow.process(ctx)
+        dataflow_risk = _last_trace_decision(ctx, "L2.5_dataflow") == "deny"
+
+        # 4. L3 sandbox build (degraded mode forces ask)
+        if sandbox_run is not None:
+            sandbox_ctx = sandbox_run.result()
+            ctx.trace.extend(sandbox_ctx.trace)
+            ctx.sandbox_config = sandbox_ctx.sandbox_config
+        else:
+            ctx = self.sandbox.process(ctx)
+        degraded = _check_degraded_mode(ctx)
+
+        # L1 "allow" overrides L2 "ask" — if the AI classifier determined the
+        # command is safe (score >= 0.7), the L2 policy default-to-ask is lifted.
+        requires_ask = (
+            l1_decision == "ask" or          # L1 scored 0.3-0.7 (uncertain)
+            dataflow_risk or                 # L2.5 detected risk
+            degraded or                      # Degraded sandbox mode
+            (l2_decision == "ask" and l1_decision != "allow")  # L2 asked and L1 didn't override
+        )
+        return PipelineVerdict(
+            decision="ask" if requires_ask else "allow",
+            l2_decision=l2_decision,
+            l1_decision=l1_decision,
+            dataflow_risk=dataflow_risk,
+            degraded=degraded,
+        )
+
+
 # ---------------------------------------------------------------------------
 # Tool entry points
 # ---------------------------------------------------------------------------
@@ -1355,7 +1591,7 @@ def get_safety_status(session_id: str = "") -> tuple[dict | None, SafetyError |
     """
     from shell.sandbox import SandboxBuilder
     from shell.classifier import ClassifierClient
-    from shell.audit import AUDIT_DIR
+    from shell.audit import AUDIT_DIR, AuditLogger
     from shell_policy import get_permission_engine
 
     result: dict[str, Any] = {}
@@ -1418,6 +1654,8 @@ def get_safety_status(session_id: str = "") -> tuple[dict | None, SafetyError |
             "enabled": audit_dir.exists(),
             "log_dir": str(audit_dir),
         }
+        if AuditLogger._instance is not None:
+            result["audit"]["dropped"] = AuditLogger._instance.stats()["dropped"]
     except Exception:
         result["audit"] = {
             "enabled": False,
@@ -1546,6 +1784,7 @@ def invoke_shell_execute(
     """Execute a shell command through the safety chain.
 
     Chain: L2_policy → L1_classifier → L2.5_dataflow → L3_sandbox → execution
+    (scheduled by SafetyPipeline; the decision is that of the sequential chain).
 
     P0 backward-compatible: when called with only command+timeout+working_dir
     (no allow_network, no session_id, no background), the return dict shape
@@ -1571,78 +1810,18 @@ def invoke_shell_execute(
         timeout=timeout,
     )
 
-    # 3. L2 policy check — compound commands get per-sub-command trace (AC #12)
-    l2 = PolicyLayer()
-    if _test_mode:
-        # In test mode, layers can be independently disabled by external code.
-        # The caller sets l2.enabled = False before invoking.
-        pass
-
-    # For compound commands, check each sub-command independently
-    sub_decisions: list = []
-    if parsed and len(parsed.commands) > 1:
-        try:
-            from shell_policy import get_permission_engine
-            engine = get_permission_engine()
-            from toolcommon import _find_project_config_file
-            engine.set_config_finder(_find_project_config_file)
-            engine.reload_rules(cwd)
-
-            sub_decisions = []
-            for cmd_node in parsed.commands:
-                sub_cmd = cmd_node.raw or cmd_node.command
-                t0 = time.time()
-                decision = engine.check(sub_cmd, session_id=session_id,
-                                        context={'cwd': cwd})
-                latency = int((time.time() - t0) * 1000)
-                detail = (
-                    f"sub-cmd '{sub_cmd}': matched "
-                    f"{decision.matched_rule.match.type}:{decision.matched_rule.match.pattern}"
-                    if decision.matched_rule
-                    and hasattr(decision.matched_rule, 'match')
-                    else f"sub-cmd '{sub_cmd}': {decision.reason}"
-                )
-                ctx.trace.append(LayerDecision(
-                    layer="L2_policy",
-                    decision=decision.decision,
-                    detail=detail,
-                    latency_ms=latency,
-                ))
-                sub_decisions.append(decision)
-
-            # Combine: any deny → deny, any ask → ask, all allow → allow
-            l2_decision = "allow"
-            for d in sub_decisions:
-                if d.decision == "deny":
-                    l2_decision = "deny"
-                    break
-                if d.decision == "ask":
-                    l2_decision = "ask"
-        except Exception as e:
-            ctx.trace.append(LayerDecision(
-                layer="L2_policy",
-                decision="error",
-                detail="compound check failed",
-                latency_ms=0,
-            ))
-            l2_decision = "ask"
-    else:
-        ctx = l2.process(ctx)
-        l2_decision = _last_trace_decision(ctx, "L2_policy")
-        if l2_decision is None:
-            l2_decision = "ask"  # safety default
+    # 3. Safety layers: L2 policy → L1 classifier → L2.5 dataflow → L3 sandbox
+    # build.  The sandbox build runs speculatively in parallel with the
+    # policy check (see SafetyPipeline).
+    verdict = SafetyPipeline().run(ctx)
+    l1_decision = verdict.l1_decision
+    dataflow_risk = verdict.dataflow_risk
+    degraded = verdict.degraded
 
-    # 4. Handle deny
-    if l2_decision == "deny":
+    # 4. Handle L2 deny
+    if verdict.deny_layer == "L2_policy":
         # Get PolicyDecision for structured message formatting
-        deny_decision = None
-        if sub_decisions:
-            for d in sub_decisions:
-                if d.decision == "deny":
-                    deny_decision = d
-                    break
-        elif l2.last_decision is not None:
-            deny_decision = l2.last_decision
+        deny_decision = verdict.policy_decision
 
         if deny_decision is not None:
             from shell_policy import get_permission_engine
@@ -1665,15 +1844,8 @@ def invoke_shell_execute(
             'trace': _serialize_trace(ctx.trace),
         }
 
-    # 5. L1 classifier (runs after L2, only if L2 returned "ask") (AC #6)
-    l1 = ClassifierLayer()
-    if _test_mode:
-        pass  # Can be disabled by external code
-    ctx = l1.process(ctx)
-
-    # Check if L1 denied
-    l1_decision = _last_trace_decision(ctx, "L1_classifier")
-    if l1_decision == "deny":
+    # 5. Handle L1 deny
+    if verdict.deny_layer == "L1_classifier":
         deny_detail = ""
         for entry in ctx.trace:
             if entry.layer == "L1_classifier" and entry.decision == "deny":
@@ -1689,32 +1861,8 @@ def invoke_shell_execute(
             'trace': _serialize_trace(ctx.trace),
         }
 
-    # 6. L2.5 dataflow detection (always runs, has veto power) (AC #7)
-    dataflow = DataflowLayer()
-    if _test_mode:
-        pass  # Can be disabled by external code
-    ctx = dataflow.process(ctx)
-
-    # Check if L2.5 detected risk (veto power)
-    l25_decision = _last_trace_decision(ctx, "L2.5_dataflow")
-    dataflow_risk = l25_decision == "deny"
-
-    # 7. L3 sandbox check (before ask, to detect degraded mode)
-    l3 = SandboxLayer()
-    ctx = l3.process(ctx)
-    degraded = _check_degraded_mode(ctx)
-
-    # 8. Handle ask — from L1, L2.5, L2, or degraded mode
-    # Determine if any layer requires user confirmation.
-    # L1 "allow" overrides L2 "ask" — if the AI classifier determined the
-    # command is safe (score >= 0.7), the L2 policy default-to-ask is lifted.
-    requires_ask = (
-        l1_decision == "ask" or          # L1 scored 0.3-0.7 (uncertain)
-        dataflow_risk or                 # L2.5 detected risk
-        degraded or                      # Degraded sandbox mode
-        (l2_decision == "ask" and l1_decision != "allow")  # L2 asked and L1 didn't override
-    )
-
+    # 6. Handle ask — from L1, L2.5, L2, or degraded mode
+    requires_ask = verdict.decision == "ask"
     if requires_ask:
         executor = _get_executor()
         execution_id = uuid.uuid4().hex[:12]
@@ -1762,7 +1910,7 @@ def invoke_shell_execute(
             'trace': _serialize_trace(ctx.trace),
         }
 
-    # 9. L3 sandbox execution (or background task)
+    # 7. L3 sandbox execution (or background task)
     if background:
         # Background task path (AC #10).
         # L5 audit is logged at task completion inside _execute_task,
@@ -1800,7 +1948,7 @@ def invoke_shell_execute(
         # L5 audit (Task 4, Subtask 4.1): fire-and-forget execution logging
         _log_audit_entry(ctx, result)
 
-        # 10. Build output
+        # 8. Build output
         output = {
             'command': command,
             'exit_code': result['exit_code'],
@@ -185,20 +185,26 @@ def invoke_skill_deploy(name: str, force: bool = False) -> str:
 # Skill invocation — loads SKILL.md content for LLM-driven execution
 # ---------------------------------------------------------------------------
 
-# Cached registry — scanned once per session, reused across skill invocations
+# Cached registry — scanned once per session, then refreshed on change events
 _skill_registry_cache = None
 
 
 def _get_skill_registry():
-    """Return a cached SkillRegistry, scanning only on first access."""
+    """Return a cached SkillRegistry, rescanning only when skill dirs changed."""
     global _skill_registry_cache
     if _skill_registry_cache is None:
         try:
             from skills.skill_registry import SkillRegistry
             _skill_registry_cache = SkillRegistry()
             _skill_registry_cache.scan(incremental=True)
+            _skill_registry_cache.watch()
         except Exception:
             return None
+    else:
+        try:
+            _skill_registry_cache.refresh()
+        except Exception:
+            pass
     return _skill_registry_cache
 
 
@@ -25,6 +25,7 @@ ToolTier = Literal["first", "second"]
 # First-class citizen tools: directly exposed with full schema
 DEFAULT_FIRST_CLASS_TOOLS = {
     "read_file",       # file
+    "read_files",      # file (batched read)
     "write_file",      # file
     "substitute_file", # file (Edit replacement)
     "ls",              # file
@@ -35,6 +36,7 @@ DEFAULT_FIRST_CLASS_TOOLS = {
     "web_search",      # web
     "web_get_content", # web
     "skill",           # skill invocation
+    "read_tool_output", # archive (page truncated tool results)
 }
 
 
@@ -7,8 +7,10 @@
 import os
 import sys
 import json
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 from paths import get_user_dir
 
@@ -45,9 +47,21 @@ except ImportError:
 # 默认沙盒路径
 _sandbox_home = None
 _sandbox_home_printed = False
-
-# 项目配置缓存
-_project_config_cache: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+# 每次 set_sandbox_home 递增，使沙盒根目录缓存失效
+_sandbox_generation = 0
+
+# 项目配置缓存：配置文件路径 → ((mtime_ns, size), 配置列表)
+_project_config_cache: Dict[str, Tuple[Optional[Tuple[int, int]], Optional[List[Dict[str, Any]]]]] = {}
+
+# 配置文件查找缓存：起始目录 → (查找时间, 配置文件, (mtime_ns, size))
+# 找到的配置文件每次只 stat 一次；超过 _RESOLVE_TTL 秒后重新向上查找，
+# 以发现新建的配置文件。
+_RESOLVE_TTL = 2.0
+_RESOLVE_CACHE_MAX = 256
+_config_file_cache: Dict[str, Tuple[float, Optional[Path], Optional[Tuple[int, int]]]] = {}
+# 沙盒根目录缓存：(起始目录, 代数, 配置文件, 配置签名) → 已 resolve 的根目录
+_sandbox_root_cache: Dict[tuple, Path] = {}
+_resolve_lock = threading.Lock()
 
 def set_sandbox_home(new_path: str):
     """
@@ -56,7 +70,7 @@ def set_sandbox_home(new_path: str):
     Args:
         new_path: 新的沙盒根目录路径
     """
-    global _sandbox_home
+    global _sandbox_home, _sandbox_home_printed, _sandbox_generation
 
     if not new_path or not isinstance(new_path, str):
         raise ValueError("沙盒路径必须是有效的字符串")
@@ -68,24 +82,34 @@ def set_sandbox_home(new_path: str):
         new_sandbox_path.mkdir(parents=True, exist_ok=True)
         _sandbox_home = new_sandbox_path
         _sandbox_home_printed = False
+        with _resolve_lock:
+            _sandbox_generation += 1
+            _sandbox_root_cache.clear()
         return _sandbox_home
     except Exception as e:
         raise ValueError(f"无法创建沙盒目录 '{new_path}': {e}")
 
 
-def _find_project_config_file(start_path: Optional[Union[str, Path]] = None) -> Optional[Path]:
-    """
-    从指定路径开始向上遍历目录树，查找 .zaivim/project.yaml 文件。
-    为了兼容性，也支持旧格式的配置文件。
+def _start_dir(start_path: Optional[Union[str, Path]] = None) -> str:
+    """查找的起始目录（默认为 ZAI_VIM_CWD 或当前工作目录）"""
+    if start_path is None:
+        return os.getenv('ZAI_VIM_CWD') or os.getcwd()
+    return str(start_path)
 
-    Args:
-        start_path: 起始路径（默认为当前工作目录）
 
-    Returns:
-        找到的配置文件路径，如果未找到则返回 None
-    """
-    if start_path is None:
-        start_path = os.getenv('ZAI_VIM_CWD') or os.getcwd()
+def _file_sig(path: Optional[Path]) -> Optional[Tuple[int, int]]:
+    """文件的 (mtime_ns, size)，不存在时返回 None"""
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _walk_project_config_file(start_path: str) -> Optional[Path]:
+    """从 start_path 逐级向上查找项目配置文件（不使用缓存）"""
     current = Path(start_path).resolve()
 
     if current.is_file():
@@ -117,14 +141,54 @@ def _find_project_config_file(start_path: Optional[Union[str, Path]] = None) ->
         if parent == current:
             break
         current = parent
-        parent = current.parent
-        if parent == current:
-            break
-        current = parent
-    
+
     return None
 
 
+def _lookup_project_config(start_path: Optional[Union[str, Path]] = None) -> Tuple[Optional[Path], Optional[Tuple[int, int]]]:
+    """
+    带缓存的配置文件查找，返回 (配置文件, (mtime_ns, size))。
+
+    缓存命中时只 stat 找到的配置文件一次；配置文件消失或超过
+    _RESOLVE_TTL 秒后重新向上查找。
+    """
+    start = _start_dir(start_path)
+    now = time.monotonic()
+    with _resolve_lock:
+        entry = _config_file_cache.get(start)
+    if entry is not None and now - entry[0] < _RESOLVE_TTL:
+        _, config_file, _ = entry
+        if config_file is None:
+            return None, None
+        sig = _file_sig(config_file)
+        if sig is not None:
+            return config_file, sig
+
+    config_file = _walk_project_config_file(start)
+    sig = _file_sig(config_file)
+    if config_file is not None and sig is None:
+        config_file = None
+    with _resolve_lock:
+        if len(_config_file_cache) >= _RESOLVE_CACHE_MAX:
+            _config_file_cache.clear()
+        _config_file_cache[start] = (now, config_file, sig)
+    return config_file, sig
+
+
+def _find_project_config_file(start_path: Optional[Union[str, Path]] = None) -> Optional[Path]:
+    """
+    从指定路径开始向上遍历目录树，查找 .zaivim/project.yaml 文件。
+    为了兼容性，也支持旧格式的配置文件。结果按起始目录缓存。
+
+    Args:
+        start_path: 起始路径（默认为当前工作目录）
+
+    Returns:
+        找到的配置文件路径，如果未找到则返回 None
+    """
+    return _lookup_project_config(start_path)[0]
+
+
 def load_project_config(config_file: Optional[Union[str, Path]] = None, cwd: Optional[Union[str, Path]] = None) -> Optional[List[Dict[str, Any]]]:
     """
     加载项目配置文件（仅支持 YAML 格式）。
@@ -137,19 +201,21 @@ def load_project_config(config_file: Optional[Union[str, Path]] = None, cwd: Opt
         配置对象列表，如果未找到或解析失败则返回 None
     """
     if config_file is None:
-        config_file = _find_project_config_file(cwd)
+        config_file, sig = _lookup_project_config(cwd)
         if config_file is None:
             return None
     else:
         config_file = Path(config_file)
-        if not config_file.is_file():
+        sig = _file_sig(config_file)
+        if sig is None or not config_file.is_file():
             return None
     
     config_file_str = str(config_file)
     
-    # 检查缓存
-    if config_file_str in _project_config_cache:
-        return _project_config_cache[config_file_str]
+    # 检查缓存（配置文件修改后失效）
+    cached = _project_config_cache.get(config_file_str)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
     
     try:
         with open(config_file, 'r', encoding='utf-8') as f:
@@ -158,7 +224,7 @@ def load_project_config(config_file: Optional[Union[str, Path]] = None, cwd: Opt
         # 只支持 YAML 格式
         if config_file.suffix.lower() not in ('.yaml', '.yml'):
             print(f"错误：只支持 YAML 格式配置文件，不支持 {config_file.suffix} 格式", file=sys.stderr)
-            _project_config_cache[config_file_str] = None
+            _project_config_cache[config_file_str] = (sig, None)
             return None
         
         # 解析 YAML
@@ -168,7 +234,7 @@ def load_project_config(config_file: Optional[Union[str, Path]] = None, cwd: Opt
             print(f"已加载项目配置：{config_file}", file=sys.stderr)
         except ImportError:
             print(f"错误：需要 PyYAML 库来解析 YAML 文件 {config_file}", file=sys.stderr)
-            _project_config_cache[config_file_str] = None
+            _project_config_cache[config_file_str] = (sig, None)
             return None
         
         # 验证配置格式：应该是一个列表
@@ -195,16 +261,16 @@ def load_project_config(config_file: Optional[Union[str, Path]] = None, cwd: Opt
                 print(f"  容器配置：{first['shell_container'].get('image', 'unknown')}", file=sys.stderr)
         
         # 缓存结果
-        _project_config_cache[config_file_str] = config_data
+        _project_config_cache[config_file_str] = (sig, config_data)
         return config_data
     
     except yaml.YAMLError as e:
         print(f"错误：无法解析 YAML 配置文件 {config_file}: {e}", file=sys.stderr)
-        _project_config_cache[config_file_str] = None
+        _project_config_cache[config_file_str] = (sig, None)
         return None
     except Exception as e:
         print(f"错误：读取配置文件 {config_file} 时发生错误: {e}", file=sys.stderr)
-        _project_config_cache[config_file_str] = None
+        _project_config_cache[config_file_str] = (sig, None)
         return None
 
 
@@ -224,27 +290,8 @@ def get_project_config(cwd: Optional[Union[str, Path]] = None) -> Optional[Dict[
     # 返回第一个配置项
     return config_list[0]
 
-def sandbox_home(cwd: Optional[Union[str, Path]] = None) -> Path:
-    """
-    获取当前沙盒根目录。
-
-    优先使用项目配置中的 sandbox_home，否则使用自定义设置或当前工作目录。
-
-    Args:
-        cwd: 当前工作目录，用于查找项目配置。如果为 None，则使用 os.getenv('ZAI_VIM_CWD') or os.getcwd()。
-
-    Returns:
-        沙盒根目录路径
-    """
-    global _sandbox_home, _sandbox_home_printed
-    
-    # 如果已经设置了自定义沙盒路径，直接返回
-    if _sandbox_home is not None:
-        if not _sandbox_home_printed:
-            print(f"使用命令指定的沙盒目录：{_sandbox_home}", file=sys.stderr)
-            _sandbox_home_printed = True
-        return _sandbox_home
-    
+def _resolve_sandbox_root(cwd: Optional[Union[str, Path]], config_file: Optional[Path]) -> Tuple[Path, str]:
+    """计算沙盒根目录（不使用缓存），返回 (已 resolve 的根目录, 来源说明)"""
     # 尝试获取项目配置
     try:
         config = get_project_config(cwd)
@@ -252,32 +299,77 @@ def sandbox_home(cwd: Optional[Union[str, Path]] = None) -> Path:
             sandbox_path = Path(config['sandbox_home']).resolve()
             # 确保目录存在
             sandbox_path.mkdir(parents=True, exist_ok=True)
-            if not _sandbox_home_printed:
-                print(f"使用项目配置的沙盒目录：{sandbox_path}", file=sys.stderr)
-                _sandbox_home_printed = True
-            return sandbox_path
+            return sandbox_path, "使用项目配置的沙盒目录"
     except Exception as e:
         print(f"警告：无法从项目配置获取沙盒目录：{e}", file=sys.stderr)
 
     # 找到项目根目录作为默认 sandbox。
     # 新格式 .zaivim/project.yaml → parent.parent = 项目根
     # 旧格式 project.yaml → parent = 项目根
-    config_file = _find_project_config_file(cwd)
     if config_file is not None:
         project_root = config_file.parent
         if project_root.name in ('.zaivim', '.zai'):
             project_root = project_root.parent
-        if not _sandbox_home_printed:
-            print(f"使用项目根目录：{project_root}", file=sys.stderr)
-            _sandbox_home_printed = True
-        return project_root
+        return project_root.resolve(), "使用项目根目录"
 
     # 没有项目配置时使用当前工作目录
     working_dir = Path(os.getenv('ZAI_VIM_CWD') or os.getcwd()).resolve()
+    return working_dir, "使用当前工作目录"
+
+
+def sandbox_home(cwd: Optional[Union[str, Path]] = None) -> Path:
+    """
+    获取当前沙盒根目录。
+
+    优先使用项目配置中的 sandbox_home，否则使用自定义设置或当前工作目录。
+    结果按 (起始目录, ZAI_VIM_CWD, set_sandbox_home 代数, 配置文件及其 mtime)
+    缓存，重复调用不再向上遍历目录树。
+
+    Args:
+        cwd: 当前工作目录，用于查找项目配置。如果为 None，则使用 os.getenv('ZAI_VIM_CWD') or os.getcwd()。
+
+    Returns:
+        沙盒根目录路径（已 resolve）
+    """
+    global _sandbox_home_printed
+    
+    # 如果已经设置了自定义沙盒路径，直接返回
+    if _sandbox_home is not None:
+        if not _sandbox_home_printed:
+            print(f"使用命令指定的沙盒目录：{_sandbox_home}", file=sys.stderr)
+            _sandbox_home_printed = True
+        return _sandbox_home
+
+    config_file, sig = _lookup_project_config(cwd)
+    # 未指定 cwd 时，工作目录回退依赖 ZAI_VIM_CWD / 进程 cwd
+    key = (str(cwd) if cwd is not None else None,
+           os.getenv('ZAI_VIM_CWD') or os.getcwd(),
+           _sandbox_generation, str(config_file), sig)
+    with _resolve_lock:
+        root = _sandbox_root_cache.get(key)
+    if root is not None:
+        return root
+
+    root, source = _resolve_sandbox_root(cwd, config_file)
     if not _sandbox_home_printed:
-        print(f"使用当前工作目录：{working_dir}", file=sys.stderr)
+        print(f"{source}：{root}", file=sys.stderr)
         _sandbox_home_printed = True
-    return working_dir
+    with _resolve_lock:
+        if len(_sandbox_root_cache) >= _RESOLVE_CACHE_MAX:
+            _sandbox_root_cache.clear()
+        _sandbox_root_cache[key] = root
+    return root
+
+
+def _check_in_sandbox(sandbox_root: Path, user_path: str) -> Path:
+    """解析 user_path，确保结果位于 sandbox_root 内"""
+    target_path = (sandbox_root / user_path).resolve()
+
+    # 安全检查：确保目标路径在沙盒根目录内
+    if target_path != sandbox_root and sandbox_root not in target_path.parents:
+        raise ValueError(f"路径 '{user_path}' 试图逃逸沙盒")
+
+    return target_path
 
 
 def sanitize_path(user_path: str = "", cwd: Optional[Union[str, Path]] = None):
@@ -294,12 +386,24 @@ def sanitize_path(user_path: str = "", cwd: Optional[Union[str, Path]] = None):
     if not user_path or user_path == "":
         return sandbox_home(cwd)
 
-    # 解析路径并确保它在沙盒内
-    sandbox_root = sandbox_home(cwd).resolve()
-    target_path = (sandbox_root / user_path).resolve()
+    # 解析路径并确保它在沙盒内（缓存的根目录已 resolve）
+    return _check_in_sandbox(sandbox_home(cwd), user_path)
 
-    # 安全检查：确保目标路径在沙盒根目录内
-    if sandbox_root not in target_path.parents and target_path != sandbox_root:
-        raise ValueError(f"路径 '{user_path}' 试图逃逸沙盒")
 
-    return target_path
+def sanitize_paths(user_paths: List[str], cwd: Optional[Union[str, Path]] = None) -> List[Path]:
+    """
+    批量版 sanitize_path：沙盒根目录只解析一次。
+
+    Args:
+        user_paths: 用户提供的路径列表
+        cwd: 当前工作目录，用于沙盒目录查找
+
+    Returns:
+        与输入顺序一致的沙盒内绝对路径列表
+
+    Raises:
+        ValueError: 任一路径试图逃逸沙盒
+    """
+    sandbox_root = sandbox_home(cwd)
+    return [sandbox_root if not p else _check_in_sandbox(sandbox_root, p)
+            for p in user_paths]